@@ -0,0 +1,204 @@
+"""
+Asynchronous Logging Pipeline for PulseCheck
+Keeps log formatting and I/O off the request path
+
+Features:
+- Bounded QueueHandler on the root logger; a QueueListener thread does all formatting and I/O
+- Backpressure policy: sample DEBUG/INFO above a high watermark, drop (and count) when full
+- Messages are rendered (msg % args) and request context captured on the calling thread,
+  so the listener never sees arguments in a later state; formatting and I/O stay off-thread
+- LazyTruncate skips repr()/truncation of large payloads for disabled and sampled-out records
+"""
+
+import copy
+import itertools
+import logging
+import queue
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAYLOAD_LIMIT = 512
+
+
+class LazyTruncate:
+    """
+    Log argument that renders (and truncates) only when the record is emitted
+
+    Use with %-style logging so no work happens when the level is disabled
+    or the record is sampled out under backpressure:
+        logger.debug("Entry data: %s", truncate_for_log(entry_data))
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int = DEFAULT_PAYLOAD_LIMIT):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        try:
+            text = self.value if isinstance(self.value, str) else repr(self.value)
+        except Exception as e:
+            return f"<unrenderable {type(self.value).__name__}: {e}>"
+        if len(text) > self.limit:
+            return f"{text[:self.limit]}... [{len(text) - self.limit} chars truncated]"
+        return text
+
+    __repr__ = __str__
+
+
+def truncate_for_log(value: Any, limit: int = DEFAULT_PAYLOAD_LIMIT) -> LazyTruncate:
+    """Wrap a (possibly large) payload for lazy, truncated logging"""
+    return LazyTruncate(value, limit)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Non-blocking QueueHandler with a drop-or-sample backpressure policy
+
+    - Below the high watermark every record is enqueued
+    - Above it, DEBUG/INFO records are sampled 1-in-sample_every
+    - When the queue is full the record is dropped and counted
+    WARNING and above are never sampled, only dropped when the queue is full.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        sample_every: int = 10,
+        pressure_ratio: float = 0.8,
+        context_vars: Optional[Dict[str, ContextVar]] = None,
+    ):
+        super().__init__(queue.Queue(maxsize))
+        self.maxsize = maxsize
+        self.sample_every = max(1, sample_every)
+        self.high_watermark = max(1, int(maxsize * pressure_ratio))
+        self.context_vars = context_vars or {}
+
+        self.enqueued = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._sample_counter = itertools.count()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Render the message and capture request context on the calling thread
+
+        Like the stdlib implementation, msg % args is resolved here so mutable
+        arguments are logged as they were at the call. Unlike it, the full
+        format (JSON, timestamps, tracebacks) is left to the listener thread.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.message = record.msg
+        record.args = None
+        for name, var in self.context_vars.items():
+            if not hasattr(record, name):
+                setattr(record, name, var.get(None))
+        return record
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.queue.qsize() >= self.high_watermark:
+                if record.levelno < logging.WARNING and next(self._sample_counter) % self.sample_every:
+                    self.sampled_out += 1
+                    return
+            elif self.dropped > self._reported_dropped:
+                self._report_drops()
+
+            self.queue.put_nowait(self.prepare(record))
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def _report_drops(self):
+        newly_dropped = self.dropped - self._reported_dropped
+        self._reported_dropped = self.dropped
+        notice = logging.LogRecord(
+            name=__name__, level=logging.WARNING, pathname=__file__, lineno=0,
+            msg="Log pipeline dropped %d records under backpressure (%d total)",
+            args=(newly_dropped, self.dropped), exc_info=None,
+        )
+        try:
+            self.queue.put_nowait(self.prepare(notice))
+        except queue.Full:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_maxsize": self.maxsize,
+            "high_watermark": self.high_watermark,
+            "enqueued": self.enqueued,
+            "sampled_out": self.sampled_out,
+            "dropped": self.dropped,
+        }
+
+
+class AsyncLoggingPipeline:
+    """Owns the root QueueHandler and its QueueListener thread"""
+
+    def __init__(self):
+        self.handler: Optional[BoundedQueueHandler] = None
+        self.listener: Optional[QueueListener] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.listener is not None
+
+    def install(
+        self,
+        handlers: List[logging.Handler],
+        maxsize: int = 10000,
+        sample_every: int = 10,
+        context_vars: Optional[Dict[str, ContextVar]] = None,
+    ):
+        """
+        Route the root logger through a bounded queue
+
+        Existing root handlers are detached and moved behind the listener
+        together with the given handlers, so no output is lost or duplicated.
+        """
+        if self.is_running:
+            return
+
+        root = logging.getLogger()
+        downstream = [h for h in root.handlers if not isinstance(h, QueueHandler)] + list(handlers)
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+
+        self.handler = BoundedQueueHandler(
+            maxsize=maxsize, sample_every=sample_every, context_vars=context_vars
+        )
+        self.listener = QueueListener(self.handler.queue, *downstream, respect_handler_level=True)
+        root.addHandler(self.handler)
+        self.listener.start()
+        logger.info(f"✅ Async logging pipeline installed ({len(downstream)} handlers, queue size {maxsize})")
+
+    def shutdown(self):
+        """Flush queued records and restore direct handlers on the root logger"""
+        if not self.is_running:
+            return
+
+        root = logging.getLogger()
+        self.listener.stop()
+        root.removeHandler(self.handler)
+        for handler in self.listener.handlers:
+            root.addHandler(handler)
+        self.listener = None
+        self.handler = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        if not self.handler:
+            return {"enabled": False}
+        return {"enabled": True, **self.handler.get_stats()}
+
+
+# Global pipeline instance
+log_pipeline = AsyncLoggingPipeline()
@@ -30,6 +30,10 @@ class Settings(BaseSettings):
     # Supabase JWT Secret for token validation - CRITICAL for security
     SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
     
+    # Verified-token cache (entries expire at the token's exp)
+    JWT_CACHE_MAX_ENTRIES: int = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+    JWT_NEGATIVE_CACHE_SECONDS: float = float(os.getenv("JWT_NEGATIVE_CACHE_SECONDS", "30"))
+    
     # Legacy property names for backward compatibility
     @property
     def supabase_url(self) -> str:
@@ -51,6 +55,8 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_PERIOD: int = 60  # seconds
+    RATE_LIMIT_STORAGE_URI: str = os.getenv("RATE_LIMIT_STORAGE_URI", "sqlite:///data/ratelimit.db")  # Shared by all workers on a host
+    RATE_LIMIT_STRATEGY: str = os.getenv("RATE_LIMIT_STRATEGY", "gcra")  # gcra needs sqlite:// storage
     
     # CORS Configuration - PRODUCTION READY
     # Environment variable should be a JSON array string, fallback to hardcoded list
@@ -93,13 +99,90 @@ class Settings(BaseSettings):
     ENABLE_TRACING: bool = os.getenv("ENABLE_TRACING", "true").lower() == "true"
     ENABLE_METRICS: bool = os.getenv("ENABLE_METRICS", "true").lower() == "true"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_ASYNC_ENABLED: bool = os.getenv("LOG_ASYNC_ENABLED", "true").lower() == "true"
+    LOG_QUEUE_MAXSIZE: int = int(os.getenv("LOG_QUEUE_MAXSIZE", "10000"))
+    
+    # Response Serialization (orjson for FastJSONResponse; false = stdlib json)
+    FAST_JSON_ENABLED: bool = os.getenv("FAST_JSON_ENABLED", "true").lower() == "true"
     
     # AI Debugging Configuration
     AI_DEBUG_MODE: bool = os.getenv("AI_DEBUG_MODE", "true").lower() == "true"
     REQUEST_CORRELATION_ENABLED: bool = os.getenv("REQUEST_CORRELATION_ENABLED", "true").lower() == "true"
     PERFORMANCE_MONITORING_ENABLED: bool = os.getenv("PERFORMANCE_MONITORING_ENABLED", "true").lower() == "true"
     USER_JOURNEY_TRACKING_ENABLED: bool = os.getenv("USER_JOURNEY_TRACKING_ENABLED", "true").lower() == "true"
-    
+
+    # Sampling Profiler Configuration
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "true").lower() == "true"
+    PROFILER_SAMPLE_HZ: float = float(os.getenv("PROFILER_SAMPLE_HZ", "100"))
+    PROFILER_MAX_STACKS: int = int(os.getenv("PROFILER_MAX_STACKS", "5000"))
+
+    # Persistent Metrics Store (SQLite rollups; point at a mounted volume to survive deploys)
+    METRICS_STORE_ENABLED: bool = os.getenv("METRICS_STORE_ENABLED", "true").lower() == "true"
+    METRICS_DB_PATH: str = os.getenv("METRICS_DB_PATH", "data/metrics.db")
+    METRICS_MINUTE_RETENTION_DAYS: int = int(os.getenv("METRICS_MINUTE_RETENTION_DAYS", "7"))
+    METRICS_HOUR_RETENTION_DAYS: int = int(os.getenv("METRICS_HOUR_RETENTION_DAYS", "90"))
+    METRICS_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", "10"))
+    
+    # AI Context Budget (prompt tokens for entry + history + summaries; a tier's context_token_budget overrides)
+    AI_CONTEXT_TOKEN_BUDGET: int = int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", "700"))
+    AI_CONTEXT_TOKEN_BUDGET_PREMIUM: int = int(os.getenv("AI_CONTEXT_TOKEN_BUDGET_PREMIUM", "1800"))
+    JOURNAL_SUMMARY_REFRESH_MINUTES: int = int(os.getenv("JOURNAL_SUMMARY_REFRESH_MINUTES", "60"))
+    JOURNAL_SUMMARY_LOOKBACK_WEEKS: int = int(os.getenv("JOURNAL_SUMMARY_LOOKBACK_WEEKS", "12"))
+    TOKEN_COUNT_CACHE_SIZE: int = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "4096"))  # Memoized token counts (by content hash)
+    
+    # Multi-Persona Generation (fanout = one call per persona, combined = one call for all, auto = weigh both)
+    MULTI_PERSONA_MODE: str = os.getenv("MULTI_PERSONA_MODE", "auto")
+    MULTI_PERSONA_LATENCY_BUDGET_MS: float = float(os.getenv("MULTI_PERSONA_LATENCY_BUDGET_MS", "12000"))
+    MULTI_PERSONA_MS_PER_1K_TOKENS: float = float(os.getenv("MULTI_PERSONA_MS_PER_1K_TOKENS", "2000"))  # Extra latency accepted per 1k input tokens saved
+    
+    # AI Response Streaming (pass-through deltas coalesced into frames by size or age)
+    STREAM_FRAME_MAX_CHARS: int = int(os.getenv("STREAM_FRAME_MAX_CHARS", "64"))
+    STREAM_FRAME_MAX_DELAY_MS: float = float(os.getenv("STREAM_FRAME_MAX_DELAY_MS", "40"))
+    STREAM_BUFFER_CHUNKS: int = int(os.getenv("STREAM_BUFFER_CHUNKS", "64"))  # Upstream deltas read ahead of a slow client
+    STREAM_SEND_TIMEOUT_SECONDS: float = float(os.getenv("STREAM_SEND_TIMEOUT_SECONDS", "10"))  # A stalled client is dropped after this
+    STREAM_SSE_HEARTBEAT_SECONDS: float = float(os.getenv("STREAM_SSE_HEARTBEAT_SECONDS", "15"))
+    STREAM_SSE_RETRY_MS: int = int(os.getenv("STREAM_SSE_RETRY_MS", "2000"))  # Reconnect delay suggested to EventSource
+    STREAM_RESUME_TTL_SECONDS: float = float(os.getenv("STREAM_RESUME_TTL_SECONDS", "120"))  # Finished streams stay resumable this long
+    STREAM_RESUME_GRACE_SECONDS: float = float(os.getenv("STREAM_RESUME_GRACE_SECONDS", "30"))  # Unwatched streams are cancelled after this
+    STREAM_RESUME_MAX_EVENTS: int = int(os.getenv("STREAM_RESUME_MAX_EVENTS", "1000"))
+    
+    # Near-Duplicate Response Cache (MinHash/LSH over entry text; scope "user" keeps reuse within one user's entries)
+    SIMILARITY_CACHE_ENABLED: bool = os.getenv("SIMILARITY_CACHE_ENABLED", "true").lower() == "true"
+    SIMILARITY_CACHE_THRESHOLD: float = float(os.getenv("SIMILARITY_CACHE_THRESHOLD", "0.7"))  # Jaccard similarity of word shingles
+    SIMILARITY_CACHE_SCOPE: str = os.getenv("SIMILARITY_CACHE_SCOPE", "user")
+    SIMILARITY_CACHE_MIN_CHARS: int = int(os.getenv("SIMILARITY_CACHE_MIN_CHARS", "40"))
+    
+    # Persistent Response Cache (in-memory LRU in front of a SQLite file shared by all workers on the host)
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"  # Off: Pulse replies are never cached and the store is not started
+    RESPONSE_CACHE_PERSIST_ENABLED: bool = os.getenv("RESPONSE_CACHE_PERSIST_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_DB_PATH: str = os.getenv("RESPONSE_CACHE_DB_PATH", "data/response_cache.db")
+    RESPONSE_CACHE_TTL_HOURS: float = float(os.getenv("RESPONSE_CACHE_TTL_HOURS", "24"))  # Default per-entry TTL
+    RESPONSE_CACHE_L1_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_L1_MAX_ENTRIES", "1000"))
+    RESPONSE_CACHE_DISK_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_DISK_MAX_ENTRIES", "50000"))
+    RESPONSE_CACHE_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_FLUSH_INTERVAL_SECONDS", "2"))  # Write-behind delay
+    
+    # Model Routing (cheapest allowed model within the route's latency SLO, from EWMA latency / error / 429 rates)
+    MODEL_ROUTING_ENABLED: bool = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+    MODEL_ROUTING_EWMA_ALPHA: float = float(os.getenv("MODEL_ROUTING_EWMA_ALPHA", "0.2"))
+    MODEL_ROUTING_MIN_SAMPLES: int = int(os.getenv("MODEL_ROUTING_MIN_SAMPLES", "3"))  # Models are not judged before this
+    MODEL_ROUTING_MAX_ERROR_RATE: float = float(os.getenv("MODEL_ROUTING_MAX_ERROR_RATE", "0.25"))
+    MODEL_ROUTING_MAX_RATE_LIMIT_RATE: float = float(os.getenv("MODEL_ROUTING_MAX_RATE_LIMIT_RATE", "0.1"))
+    MODEL_ROUTING_PROBE_SECONDS: float = float(os.getenv("MODEL_ROUTING_PROBE_SECONDS", "30"))  # One request to a degraded model per interval
+    MODEL_ROUTING_DEFAULT_SLO_MS: float = float(os.getenv("MODEL_ROUTING_DEFAULT_SLO_MS", "10000"))
+    PULSE_AI_MODELS: str = os.getenv("PULSE_AI_MODELS", "gpt-4o-mini,gpt-3.5-turbo")
+    PULSE_AI_LATENCY_SLO_MS: float = float(os.getenv("PULSE_AI_LATENCY_SLO_MS", "8000"))
+    MULTI_PERSONA_MODELS: str = os.getenv("MULTI_PERSONA_MODELS", "gpt-4o")
+    MULTI_PERSONA_SHED_MODELS: str = os.getenv("MULTI_PERSONA_SHED_MODELS", "gpt-4o-mini")  # Faster models used only when all above degrade
+    MULTI_PERSONA_LATENCY_SLO_MS: float = float(os.getenv("MULTI_PERSONA_LATENCY_SLO_MS", "15000"))
+    
+    # Interactive AI Deadlines and Hedging (duplicate a slow completion after its route's p95, first reply wins)
+    AI_INTERACTIVE_DEADLINE_MS: float = float(os.getenv("AI_INTERACTIVE_DEADLINE_MS", "6000"))  # From request arrival; 0 disables
+    AI_DEADLINE_DELIVER_LATER: bool = os.getenv("AI_DEADLINE_DELIVER_LATER", "true").lower() == "true"  # Store the real reply once it arrives
+    AI_HEDGE_ENABLED: bool = os.getenv("AI_HEDGE_ENABLED", "true").lower() == "true"
+    AI_HEDGE_MIN_DELAY_MS: float = float(os.getenv("AI_HEDGE_MIN_DELAY_MS", "1000"))  # Floor under the p95 hedge delay
+    AI_HEDGE_MIN_SAMPLES: int = int(os.getenv("AI_HEDGE_MIN_SAMPLES", "20"))  # No hedging before a route has this many latencies
+    AI_HEDGE_MAX_RATIO: float = float(os.getenv("AI_HEDGE_MAX_RATIO", "0.1"))  # Hedges per primary request, at most
+
     @property
     def allowed_origins_list(self) -> List[str]:
         """Get allowed origins list (alias for ALLOWED_ORIGINS property)"""
@@ -129,8 +129,8 @@ class Database:
             logger.warning(f"Database health check failed: {e}")
             return False
     
-    async def health_check(self) -> dict:
-        """Enhanced health check with performance metrics"""
+    def check_health_sync(self) -> dict:
+        """Enhanced health check with performance metrics (blocking; run off the event loop)"""
         start_time = time.time()
         try:
             if not self._connected:
@@ -154,6 +154,14 @@ class Database:
                 "error": str(e),
                 "response_time_ms": round(response_time, 2)
             }
+    
+    async def health_check(self) -> dict:
+        """Latest database health snapshot (refreshed in the background by the health collector)"""
+        from app.core.health_collector import health_collector
+        snapshot = await health_collector.get_or_refresh("database")
+        if snapshot.value is None:
+            return {"status": "unhealthy", "error": snapshot.error, "snapshot": snapshot.metadata()}
+        return {**snapshot.value, "snapshot": snapshot.metadata()}
 
 @lru_cache(maxsize=1)
 def get_database_url() -> str:
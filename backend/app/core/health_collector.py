@@ -0,0 +1,415 @@
+"""
+Background Health Collector for PulseCheck
+Refreshes expensive health probes on their own schedule and serves cached snapshots
+
+Health endpoints (/health-detailed, quick-health-check, AI debugging health checks,
+comprehensive diagnostics) used to run their probes inline on every call, so every
+uptime checker and dashboard poll hit Supabase, OpenAI and psutil again. Probes are
+now refreshed by background tasks; endpoints read the latest snapshot together with
+staleness metadata.
+
+Probes with side effects or outbound calls (the AI debugger's synthetic journal
+checks, comprehensive diagnostics, network connectivity) are registered with
+background=False: they run only when an endpoint asks and are cached for their interval;
+an expired snapshot is still served at once while a refresh runs in the background.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HealthProbe:
+    """A health probe and its refresh schedule"""
+    name: str
+    func: Callable[[], Any]
+    interval_seconds: float
+    timeout_seconds: float = 30.0
+    initial_delay_seconds: float = 0.0
+    background: bool = True  # False: refreshed on demand when older than interval_seconds
+
+
+@dataclass
+class HealthSnapshot:
+    """Latest result of a probe plus freshness bookkeeping"""
+    name: str
+    value: Any = None
+    refreshed_at: Optional[float] = None
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+    refresh_count: int = 0
+    interval_seconds: float = 0.0
+    
+    @property
+    def age_seconds(self) -> Optional[float]:
+        if self.refreshed_at is None:
+            return None
+        return time.time() - self.refreshed_at
+    
+    @property
+    def is_stale(self) -> bool:
+        age = self.age_seconds
+        return age is None or age > self.interval_seconds * 2 or self.error is not None
+    
+    def metadata(self) -> Dict[str, Any]:
+        age = self.age_seconds
+        return {
+            "probe": self.name,
+            "refreshed_at": datetime.fromtimestamp(self.refreshed_at, timezone.utc).isoformat() if self.refreshed_at else None,
+            "age_seconds": round(age, 2) if age is not None else None,
+            "refresh_interval_seconds": self.interval_seconds,
+            "stale": self.is_stale,
+            "refresh_duration_ms": round(self.duration_ms, 2),
+            "last_error": self.error,
+            "refresh_count": self.refresh_count,
+        }
+
+
+class BackgroundHealthCollector:
+    """
+    Runs each registered probe on its own interval and caches the result
+    
+    - Sync probes run in a worker thread so blocking clients (supabase, requests,
+      psutil) never stall the event loop
+    - A failed refresh keeps the last good value and records the error
+    - Concurrent refreshes of the same probe are coalesced into one
+    - On-demand probes (background=False) get no loop; a reader that finds one expired
+      starts a background refresh and is served the expired snapshot
+    """
+    
+    def __init__(self):
+        self._probes: Dict[str, HealthProbe] = {}
+        self._snapshots: Dict[str, HealthSnapshot] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}  # On-demand refreshes started by readers
+        self.started = False
+    
+    def register(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval_seconds: float,
+        timeout_seconds: float = 30.0,
+        initial_delay_seconds: float = 0.0,
+        background: bool = True,
+    ):
+        """Register (or replace) a probe; sync or async callables are both accepted"""
+        self._probes[name] = HealthProbe(name, func, interval_seconds, timeout_seconds, initial_delay_seconds, background)
+        self._snapshots.setdefault(name, HealthSnapshot(name=name, interval_seconds=interval_seconds))
+        if self.started and background and name not in self._tasks:
+            self._tasks[name] = asyncio.create_task(self._probe_loop(self._probes[name]))
+    
+    async def start(self):
+        """Start one refresh loop per background probe"""
+        if self.started:
+            return
+        self.started = True
+        for probe in self._probes.values():
+            if probe.background:
+                self._tasks[probe.name] = asyncio.create_task(self._probe_loop(probe))
+        logger.info(f"✅ Background health collector started ({len(self._tasks)} background, {len(self._probes) - len(self._tasks)} on-demand probes)")
+    
+    async def stop(self):
+        tasks = [*self._tasks.values(), *self._refresh_tasks.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self.started = False
+    
+    async def _probe_loop(self, probe: HealthProbe):
+        if probe.initial_delay_seconds:
+            await asyncio.sleep(probe.initial_delay_seconds)
+        while True:
+            await self.refresh(probe.name)
+            await asyncio.sleep(probe.interval_seconds)
+    
+    async def refresh(self, name: str) -> HealthSnapshot:
+        """Run a probe now (coalesced with any refresh already in flight)"""
+        inflight = self._inflight.get(name)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[name] = future
+        try:
+            snapshot = await self._run_probe(self._probes[name])
+            future.set_result(snapshot)
+            return snapshot
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unobserved failure doesn't log "never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(name, None)
+    
+    async def _run_probe(self, probe: HealthProbe) -> HealthSnapshot:
+        snapshot = self._snapshots[probe.name]
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(probe.func):
+                value = await asyncio.wait_for(probe.func(), probe.timeout_seconds)
+            else:
+                value = await asyncio.wait_for(asyncio.to_thread(probe.func), probe.timeout_seconds)
+            snapshot.value = value
+            snapshot.error = None
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            snapshot.error = f"Probe timed out after {probe.timeout_seconds}s"
+            logger.warning(f"Health probe '{probe.name}' timed out")
+        except Exception as e:
+            snapshot.error = f"{type(e).__name__}: {e}"
+            logger.warning(f"Health probe '{probe.name}' failed: {e}")
+        
+        snapshot.duration_ms = (time.perf_counter() - started) * 1000
+        snapshot.refreshed_at = time.time()
+        snapshot.refresh_count += 1
+        return snapshot
+    
+    def get(self, name: str) -> Optional[HealthSnapshot]:
+        """Latest snapshot without triggering any probe work"""
+        return self._snapshots.get(name)
+    
+    async def get_or_refresh(self, name: str) -> HealthSnapshot:
+        """
+        Latest snapshot, refreshing inline only on a cold start
+        
+        Once a probe has produced a value (good or failed) readers never wait on it
+        again: background probes are kept fresh by their loop, and an on-demand probe
+        older than its interval is refreshed in the background while the reader gets
+        the expired snapshot (its metadata carries the age).
+        """
+        snapshot = self._snapshots.get(name)
+        if snapshot is None:
+            raise KeyError(f"Unknown health probe: {name}")
+        if snapshot.refreshed_at is None:
+            return await self.refresh(name)
+        if not self._probes[name].background and snapshot.age_seconds > snapshot.interval_seconds:
+            self._schedule_refresh(name)
+        return snapshot
+    
+    def _schedule_refresh(self, name: str) -> None:
+        """Start refresh(name) as a task unless one is already running or scheduled"""
+        if name in self._inflight or name in self._refresh_tasks:
+            return
+        task = asyncio.create_task(self.refresh(name))
+        self._refresh_tasks[name] = task
+        task.add_done_callback(lambda done: self._finish_refresh_task(name, done))
+    
+    def _finish_refresh_task(self, name: str, task: asyncio.Task) -> None:
+        self._refresh_tasks.pop(name, None)
+        # Probe errors are recorded on the snapshot; keep asyncio from logging "never retrieved"
+        if not task.cancelled():
+            task.exception()
+    
+    async def get_value(self, name: str) -> Any:
+        """Latest probe value; raises if the probe has never succeeded"""
+        snapshot = await self.get_or_refresh(name)
+        if snapshot.value is None:
+            raise RuntimeError(snapshot.error or f"Health probe '{name}' has no data yet")
+        return snapshot.value
+    
+    def get_overview(self) -> Dict[str, Any]:
+        return {
+            "collector_running": self.started,
+            "probes": {name: snapshot.metadata() for name, snapshot in self._snapshots.items()},
+        }
+
+
+# Default probes (imports are deferred so a broken subsystem can't break the collector)
+
+def _system_health_probe():
+    from app.core.monitoring import monitor
+    return monitor.check_system_health()
+
+
+def _database_health_probe() -> Dict[str, Any]:
+    from app.core.database import get_database
+    return get_database().check_health_sync()
+
+
+def _ai_debugger_health_probe():
+    # The check makes blocking requests calls (one of them to this service's own /health);
+    # running it on a private loop in the worker thread keeps the main loop free to answer
+    from app.services.ai_debugging_service import ai_debugger
+    return asyncio.run(ai_debugger.run_full_health_check())
+
+
+async def _comprehensive_diagnostics_probe():
+    from app.services.debugging_service import debugging_service
+    return await debugging_service.run_comprehensive_diagnostics(apply_auto_fixes=False)
+
+
+def _detailed_diagnostics_probe() -> Dict[str, Any]:
+    """Runtime, memory, package, environment and database checks for /health-detailed (no outbound calls)"""
+    diagnostics = {
+        "status": "checking",
+        "timestamp": time.time(),
+        "checks": {}
+    }
+    
+    # 1. Python Runtime Check
+    try:
+        diagnostics["checks"]["python_runtime"] = {
+            "status": "healthy",
+            "version": sys.version,
+            "executable": sys.executable,
+            "recursion_limit": sys.getrecursionlimit()
+        }
+    except Exception as e:
+        diagnostics["checks"]["python_runtime"] = {
+            "status": "unhealthy",
+            "error": str(e)
+        }
+    
+    # 2. Memory Check
+    try:
+        import psutil
+        memory_info = psutil.virtual_memory()
+        diagnostics["checks"]["memory"] = {
+            "status": "healthy" if memory_info.percent < 90 else "warning",
+            "available_gb": round(memory_info.available / (1024**3), 2),
+            "usage_percent": memory_info.percent
+        }
+    except Exception as e:
+        diagnostics["checks"]["memory"] = {
+            "status": "unhealthy",
+            "error": str(e)
+        }
+    
+    # 3. Package Availability Check
+    required_packages = [
+        'fastapi', 'uvicorn', 'pydantic', 'supabase',
+        'openai', 'python-dotenv', 'slowapi', 'requests'
+    ]
+    
+    package_status = {}
+    for package in required_packages:
+        try:
+            __import__(package)
+            package_status[package] = "available"
+        except ImportError:
+            package_status[package] = "missing"
+    
+    diagnostics["checks"]["packages"] = {
+        "status": "healthy" if all(status == "available" for status in package_status.values()) else "unhealthy",
+        "packages": package_status
+    }
+    
+    # 4. Environment Variables Check
+    critical_env_vars = {
+        "SUPABASE_URL": os.getenv("SUPABASE_URL"),
+        "SUPABASE_ANON_KEY": os.getenv("SUPABASE_ANON_KEY"),
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
+    }
+    
+    env_status = {}
+    for var_name, var_value in critical_env_vars.items():
+        env_status[var_name] = "present" if var_value else "missing"
+    
+    diagnostics["checks"]["environment"] = {
+        "status": "healthy" if all(status == "present" for status in env_status.values()) else "unhealthy",
+        "variables": env_status
+    }
+    
+    # 5. Database Connection Check
+    try:
+        from app.core.database import get_database
+        get_database().get_client().table('profiles').select('id').limit(1).execute()
+        diagnostics["checks"]["database"] = {
+            "status": "healthy",
+            "connection": "successful"
+        }
+    except Exception as e:
+        diagnostics["checks"]["database"] = {
+            "status": "unhealthy",
+            "error": str(e)
+        }
+    
+    return summarize_diagnostics(diagnostics)
+
+
+def _network_connectivity_probe() -> Dict[str, Any]:
+    """Outbound DNS and HTTP check; on demand only so idle workers don't call out every minute"""
+    try:
+        import socket
+        import requests
+        
+        dns_error = http_error = http_status_code = None
+        
+        # DNS check
+        try:
+            socket.gethostbyname('google.com')
+            dns_status = "healthy"
+        except Exception as e:
+            dns_status = "unhealthy"
+            dns_error = str(e)
+        
+        # HTTP check
+        try:
+            response = requests.get("https://httpbin.org/get", timeout=5)
+            http_status = "healthy"
+            http_status_code = response.status_code
+        except Exception as e:
+            http_status = "unhealthy"
+            http_error = str(e)
+        
+        return {
+            "status": "healthy" if dns_status == "healthy" and http_status == "healthy" else "unhealthy",
+            "dns": {"status": dns_status, "error": dns_error},
+            "http": {"status": http_status, "status_code": http_status_code, "error": http_error}
+        }
+    except Exception as e:
+        return {
+            "status": "unhealthy",
+            "error": str(e)
+        }
+
+
+def summarize_diagnostics(diagnostics: Dict[str, Any]) -> Dict[str, Any]:
+    """Set the overall status, message and summary from diagnostics["checks"]"""
+    all_checks = diagnostics["checks"]
+    healthy_checks = sum(1 for check in all_checks.values() if check.get("status") == "healthy")
+    total_checks = len(all_checks)
+    
+    if healthy_checks == total_checks:
+        diagnostics["status"] = "healthy"
+        diagnostics["message"] = "All systems operational"
+    elif healthy_checks >= total_checks * 0.8:  # 80% healthy
+        diagnostics["status"] = "degraded"
+        diagnostics["message"] = "Some systems degraded but operational"
+    else:
+        diagnostics["status"] = "unhealthy"
+        diagnostics["message"] = "Multiple systems unhealthy"
+    
+    diagnostics["summary"] = {
+        "total_checks": total_checks,
+        "healthy_checks": healthy_checks,
+        "unhealthy_checks": total_checks - healthy_checks
+    }
+    
+    return diagnostics
+
+
+# Global collector instance
+health_collector = BackgroundHealthCollector()
+health_collector.register("system_health", _system_health_probe, interval_seconds=15, timeout_seconds=10)
+health_collector.register("database", _database_health_probe, interval_seconds=30, timeout_seconds=10)
+health_collector.register("detailed_diagnostics", _detailed_diagnostics_probe, interval_seconds=60, timeout_seconds=20)
+health_collector.register("network_connectivity", _network_connectivity_probe, interval_seconds=60, timeout_seconds=15, background=False)
+health_collector.register("ai_debugger", _ai_debugger_health_probe, interval_seconds=300, timeout_seconds=60, background=False)
+health_collector.register("comprehensive_diagnostics", _comprehensive_diagnostics_probe, interval_seconds=300, timeout_seconds=60, background=False)
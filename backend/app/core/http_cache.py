@@ -0,0 +1,101 @@
+"""
+Conditional GET Support for PulseCheck
+Strong ETags derived from row versions so polling clients get 304s instead of full bodies
+
+Features:
+- ETag = hash of (resource, user, params, row count, max updated_at)
+- If-None-Match parsing per RFC 9110 (lists, "*", weak validators compared weakly)
+- Cheap version probes: one indexed row plus an exact count, no payload columns
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+logger = logging.getLogger(__name__)
+
+# Bump when a response shape changes so old validators stop matching
+ETAG_SCHEMA_VERSION = "1"
+
+# Per-user data: caches may store it but must revalidate before reuse
+CACHE_CONTROL_REVALIDATE = "private, no-cache"
+# Expensive derived data whose inputs are versioned: serve briefly, then revalidate
+CACHE_CONTROL_SHORT = "private, max-age=300, must-revalidate"
+
+Version = Tuple[int, Optional[str]]
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the given version parts (any JSON-serializable values)"""
+    raw = json.dumps([ETAG_SCHEMA_VERSION, *parts], separators=(",", ":"), default=str)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def rows_version(rows: Iterable[Dict[str, Any]], field: str = "updated_at") -> Version:
+    """(count, max field) over rows already in memory; falls back to created_at"""
+    count = 0
+    latest = None
+    for row in rows:
+        count += 1
+        value = row.get(field) or row.get("created_at")
+        if value and (latest is None or value > latest):
+            latest = value
+    return count, latest
+
+
+def table_version(client, table: str, eq: Dict[str, Any], gte: Optional[Dict[str, Any]] = None) -> Version:
+    """
+    (row count, max updated_at) for the filtered rows, without fetching payload columns
+    
+    Served by the (user_id, updated_at) indexes; deletions change the count and
+    inserts/updates move max updated_at, so either invalidates the ETag.
+    """
+    def probe(column: str) -> Version:
+        query = client.table(table).select(column, count="exact")
+        for name, value in eq.items():
+            query = query.eq(name, value)
+        for name, value in (gte or {}).items():
+            query = query.gte(name, value)
+        result = query.order(column, desc=True).limit(1).execute()
+        latest = result.data[0].get(column) if result.data else None
+        return result.count or 0, latest
+    
+    try:
+        return probe("updated_at")
+    except Exception as e:
+        # Tables without updated_at (sync migration not applied) still version on inserts
+        logger.warning(f"⚠️ {table}.updated_at unavailable for ETag probe, using created_at: {e}")
+        return probe("created_at")
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when If-None-Match lists etag (or "*"); comparison is weak as RFC 9110 requires"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str = CACHE_CONTROL_REVALIDATE) -> None:
+    """Attach validator and caching hints to a full response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Vary"] = "Authorization"
+
+
+def not_modified(etag: str, cache_control: str = CACHE_CONTROL_REVALIDATE) -> Response:
+    """Empty 304 carrying the same validator and caching hints as the 200 would"""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, cache_control)
+    return response
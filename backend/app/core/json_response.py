@@ -0,0 +1,83 @@
+"""
+Fast JSON Responses for PulseCheck
+orjson-backed rendering for large payloads (entry pages, admin exports, debug context)
+
+The default FastAPI path for a dict return is jsonable_encoder (a recursive
+Python walk that copies every value) followed by stdlib json.dumps. Returning
+FastJSONResponse(content) directly skips the encoder: orjson serializes dicts,
+lists, datetimes, UUIDs, enums and dataclasses natively, and pydantic models are
+dumped in python mode (no model_dump(mode="json") pass).
+
+Usage:
+- Per router: APIRouter(default_response_class=FastJSONResponse) renders with orjson
+- Per endpoint: return FastJSONResponse(payload) to also skip jsonable_encoder
+- FAST_JSON_ENABLED=false falls back to stdlib json with the same type coverage
+"""
+
+import dataclasses
+import json
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Import orjson with fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    logger.warning("orjson not available - FastJSONResponse will use stdlib json")
+    ORJSON_AVAILABLE = False
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Types orjson does not serialize natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_default(obj: Any) -> Any:
+    """Stdlib equivalent of orjson's native types plus _orjson_default"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    return _orjson_default(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE and settings.FAST_JSON_ENABLED:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=_stdlib_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson (stdlib fallback), same media type and status handling"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,401 @@
+"""
+Persistent Metrics Store for PulseCheck
+Embedded SQLite time-series rollups that survive deploys
+
+Features:
+- record() is O(1) and never touches disk; samples fold into in-memory minute buckets
+- A background task flushes buckets into 1-minute rollups (count/sum/min/max)
+- Completed hours are downsampled into 1-hour rollups; an hour that receives late
+  minute rows (another worker's flush) is marked dirty again and re-aggregated
+- Retention: 1-minute rollups for 7 days, hourly rollups for 90 days (configurable)
+- Query API picks the resolution and merges not-yet-downsampled minutes into hourly reads
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MINUTE = 60
+HOUR = 3600
+
+# (name, series, bucket) -> [count, sum, min, max]
+_Bucket = List[float]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_1m (
+    name TEXT NOT NULL,
+    series TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (name, series, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_1h (
+    name TEXT NOT NULL,
+    series TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (name, series, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS dirty_hours (
+    hour INTEGER PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+_RESOLUTIONS = ("1m", "1h")
+
+
+def series_key(tags: Optional[Dict[str, Any]]) -> str:
+    """Canonical series key for a tag set ("" when untagged)"""
+    if not tags:
+        return ""
+    return ",".join(f"{k}={tags[k]}" for k in sorted(tags))
+
+
+class MetricsStore:
+    """
+    SQLite-backed rollup store for counters, timings and gauges
+    
+    Every sample is aggregated as count/sum/min/max, so one series serves as a
+    counter (count or sum), a timing (avg/min/max) or a gauge (avg). Several
+    workers may share the same database file: flushes are additive upserts that
+    mark their hours dirty in the same transaction, and downsampling recomputes
+    whole dirty hours, so both are safe to repeat and no late row is skipped.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        minute_retention_days: int = 7,
+        hour_retention_days: int = 90,
+        flush_interval_seconds: float = 10.0,
+    ):
+        self.path = path
+        self.minute_retention_days = minute_retention_days
+        self.hour_retention_days = hour_retention_days
+        self.flush_interval_seconds = flush_interval_seconds
+        
+        self._pending: Dict[Tuple[str, str, int], _Bucket] = {}
+        self._pending_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self.disabled = False
+        
+        # Bookkeeping for status
+        self.samples_recorded = 0
+        self.rows_flushed = 0
+        self.last_flush_at: Optional[float] = None
+        self.last_downsample_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+    
+    # ----- Recording (request path) -----
+    
+    def record(self, name: str, value: float = 1.0, tags: Optional[Dict[str, Any]] = None, timestamp: Optional[float] = None):
+        """Fold one sample into its minute bucket (no I/O)"""
+        if self.disabled:
+            return
+        ts = timestamp if timestamp is not None else time.time()
+        key = (name, series_key(tags), int(ts // MINUTE) * MINUTE)
+        value = float(value)
+        with self._pending_lock:
+            bucket = self._pending.get(key)
+            if bucket is None:
+                self._pending[key] = [1, value, value, value]
+            else:
+                bucket[0] += 1
+                bucket[1] += value
+                if value < bucket[2]:
+                    bucket[2] = value
+                if value > bucket[3]:
+                    bucket[3] = value
+            self.samples_recorded += 1
+    
+    # ----- Storage -----
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+    
+    def flush(self) -> int:
+        """Write pending minute buckets to SQLite; returns rows written"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        
+        rows = [(name, series, bucket, int(b[0]), b[1], b[2], b[3]) for (name, series, bucket), b in pending.items()]
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        """
+                        INSERT INTO rollup_1m (name, series, bucket, count, sum, min, max)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (name, series, bucket) DO UPDATE SET
+                            count = count + excluded.count,
+                            sum = sum + excluded.sum,
+                            min = MIN(min, excluded.min),
+                            max = MAX(max, excluded.max)
+                        """,
+                        rows,
+                    )
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO dirty_hours (hour) VALUES (?)",
+                        [(hour,) for hour in {bucket // HOUR * HOUR for _, _, bucket in pending}],
+                    )
+        except Exception as e:
+            # Put the samples back so the next flush retries them
+            with self._pending_lock:
+                for key, b in pending.items():
+                    current = self._pending.get(key)
+                    if current is None:
+                        self._pending[key] = b
+                    else:
+                        current[0] += b[0]
+                        current[1] += b[1]
+                        current[2] = min(current[2], b[2])
+                        current[3] = max(current[3], b[3])
+            self.last_error = str(e)
+            raise
+        
+        self.rows_flushed += len(rows)
+        self.last_flush_at = time.time()
+        return len(rows)
+    
+    def downsample(self, now: Optional[float] = None) -> int:
+        """Roll dirty completed hours into rollup_1h and apply retention; returns hours rolled up"""
+        now = now if now is not None else time.time()
+        current_hour = int(now // HOUR) * HOUR
+        
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                hours = [row[0] for row in conn.execute("SELECT hour FROM dirty_hours WHERE hour < ?", (current_hour,))]
+                for hour in hours:
+                    # Recompute the whole hour so repeated, concurrent or late runs stay idempotent
+                    conn.execute(
+                        """
+                        INSERT INTO rollup_1h (name, series, bucket, count, sum, min, max)
+                        SELECT name, series, ?, SUM(count), SUM(sum), MIN(min), MAX(max)
+                        FROM rollup_1m
+                        WHERE bucket >= ? AND bucket < ?
+                        GROUP BY name, series
+                        ON CONFLICT (name, series, bucket) DO UPDATE SET
+                            count = excluded.count,
+                            sum = excluded.sum,
+                            min = excluded.min,
+                            max = excluded.max
+                        """,
+                        (hour, hour, hour + HOUR),
+                    )
+                    conn.execute("DELETE FROM dirty_hours WHERE hour = ?", (hour,))
+                
+                conn.execute("DELETE FROM rollup_1m WHERE bucket < ?", (now - self.minute_retention_days * 86400,))
+                conn.execute("DELETE FROM rollup_1h WHERE bucket < ?", (now - self.hour_retention_days * 86400,))
+        
+        self.last_downsample_at = time.time()
+        return len(hours)
+    
+    # ----- Query API -----
+    
+    def query(
+        self,
+        name: str,
+        start: float,
+        end: Optional[float] = None,
+        resolution: str = "auto",
+        tags: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rollup points for a metric between start and end (unix seconds)
+        
+        resolution: "1m", "1h" or "auto" (1m for spans up to 6h inside the
+        minute retention window, otherwise 1h). With tags the exact series is
+        returned; without, all series of the metric are summed per bucket.
+        """
+        end = end if end is not None else time.time()
+        if resolution == "auto":
+            in_minute_window = start >= end - self.minute_retention_days * 86400
+            resolution = "1m" if in_minute_window and end - start <= 6 * HOUR else "1h"
+        if resolution not in _RESOLUTIONS:
+            raise ValueError("resolution must be '1m', '1h' or 'auto'")
+        if self.disabled:
+            return []
+        
+        # Make recent samples visible to the query
+        self.flush()
+        
+        series_filter = ""
+        params: List[Any] = [name]
+        if tags is not None:
+            series_filter = "AND series = ?"
+            params.append(series_key(tags))
+        
+        with self._db_lock:
+            conn = self._connect()
+            if resolution == "1m":
+                sql = f"""
+                    SELECT bucket, SUM(count), SUM(sum), MIN(min), MAX(max) FROM rollup_1m
+                    WHERE name = ? {series_filter} AND bucket >= ? AND bucket < ?
+                    GROUP BY bucket ORDER BY bucket
+                """
+                rows = conn.execute(sql, (*params, int(start // MINUTE) * MINUTE, end)).fetchall()
+            else:
+                # Dirty hours (current, not yet downsampled, or with late rows) are
+                # aggregated from minute rollups on the fly
+                sql = f"""
+                    SELECT bucket, SUM(count), SUM(sum), MIN(min), MAX(max) FROM (
+                        SELECT bucket, count, sum, min, max FROM rollup_1h
+                        WHERE name = ? {series_filter} AND bucket >= ? AND bucket < ?
+                              AND bucket NOT IN (SELECT hour FROM dirty_hours)
+                        UNION ALL
+                        SELECT (bucket / 3600) * 3600 AS hour, count, sum, min, max FROM rollup_1m
+                        WHERE name = ? {series_filter} AND bucket >= ? AND bucket < ?
+                              AND hour IN (SELECT hour FROM dirty_hours)
+                    )
+                    GROUP BY bucket ORDER BY bucket
+                """
+                first_hour = int(start // HOUR) * HOUR
+                rows = conn.execute(sql, (*params, first_hour, end, *params, first_hour, end)).fetchall()
+        
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(bucket, timezone.utc).isoformat(),
+                "bucket": bucket,
+                "count": count,
+                "sum": total,
+                "avg": total / count if count else 0.0,
+                "min": low,
+                "max": high,
+            }
+            for bucket, count, total, low, high in rows
+        ]
+    
+    def list_metrics(self) -> List[Dict[str, Any]]:
+        """Known metric names and series with their retained time range"""
+        if self.disabled:
+            return []
+        self.flush()
+        with self._db_lock:
+            rows = self._connect().execute(
+                """
+                SELECT name, series, MIN(bucket), MAX(bucket) FROM (
+                    SELECT name, series, bucket FROM rollup_1h
+                    UNION ALL
+                    SELECT name, series, bucket FROM rollup_1m
+                ) GROUP BY name, series ORDER BY name, series
+                """
+            ).fetchall()
+        return [
+            {
+                "name": name,
+                "series": series,
+                "first_bucket": datetime.fromtimestamp(first, timezone.utc).isoformat(),
+                "last_bucket": datetime.fromtimestamp(last, timezone.utc).isoformat(),
+            }
+            for name, series, first, last in rows
+        ]
+    
+    # ----- Background maintenance -----
+    
+    async def start(self):
+        """Open the database and start the flush/downsample loop"""
+        if self._task or self.disabled:
+            return
+        try:
+            await asyncio.to_thread(self._connect_locked)
+        except Exception as e:
+            self.disabled = True
+            self.last_error = str(e)
+            logger.warning(f"⚠️ Metrics store disabled, cannot open {self.path}: {e}")
+            return
+        self._task = asyncio.create_task(self._maintenance_loop())
+        logger.info(f"✅ Metrics store started ({self.path})")
+    
+    async def stop(self):
+        """Stop the loop and flush whatever is still pending"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            logger.warning(f"⚠️ Final metrics flush failed: {e}")
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _connect_locked(self):
+        with self._db_lock:
+            self._connect()
+    
+    async def _maintenance_loop(self):
+        last_downsample_hour = None
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await asyncio.to_thread(self.flush)
+                current_hour = int(time.time() // HOUR)
+                if current_hour != last_downsample_hour:
+                    await asyncio.to_thread(self.downsample)
+                    last_downsample_hour = current_hour
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"⚠️ Metrics store maintenance failed: {e}")
+    
+    def get_status(self) -> Dict[str, Any]:
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {
+            "enabled": not self.disabled,
+            "running": self._task is not None,
+            "path": self.path,
+            "pending_buckets": pending,
+            "samples_recorded": self.samples_recorded,
+            "rows_flushed": self.rows_flushed,
+            "last_flush_at": datetime.fromtimestamp(self.last_flush_at, timezone.utc).isoformat() if self.last_flush_at else None,
+            "last_downsample_at": datetime.fromtimestamp(self.last_downsample_at, timezone.utc).isoformat() if self.last_downsample_at else None,
+            "minute_retention_days": self.minute_retention_days,
+            "hour_retention_days": self.hour_retention_days,
+            "last_error": self.last_error,
+        }
+
+
+# Global metrics store instance
+metrics_store = MetricsStore(
+    path=settings.METRICS_DB_PATH,
+    minute_retention_days=settings.METRICS_MINUTE_RETENTION_DAYS,
+    hour_retention_days=settings.METRICS_HOUR_RETENTION_DAYS,
+    flush_interval_seconds=settings.METRICS_FLUSH_INTERVAL_SECONDS,
+)
+metrics_store.disabled = not settings.METRICS_STORE_ENABLED
+
+
+def record_metric(name: str, value: float = 1.0, tags: Optional[Dict[str, Any]] = None):
+    """Convenience function to record a metric sample"""
+    metrics_store.record(name, value, tags)
@@ -8,9 +8,11 @@ import logging
 import time
 import json
 import hashlib
+import re
+from collections import Counter, OrderedDict, deque
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Tuple, Deque
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import traceback
 import os
@@ -18,8 +20,36 @@ import sys
 import inspect
 import asyncio
 
+from app.core.metrics_store import metrics_store
+
 logger = logging.getLogger(__name__)
 
+# Error fingerprinting
+FINGERPRINT_TOP_FRAMES = 3  # Innermost frames that take part in the fingerprint
+FINGERPRINT_MAX_TRACKED = 2000  # Least recently seen fingerprints are evicted beyond this
+FINGERPRINT_SAMPLE_CONTEXTS = 5  # Request contexts kept per fingerprint
+FINGERPRINT_RECENT_IDS = 10  # Recent occurrence ids kept per fingerprint (similar_errors)
+FINGERPRINT_RETENTION_HOURS = 168  # Hourly occurrence buckets kept per fingerprint
+FINGERPRINT_TRACE_SAMPLE_SECONDS = 5  # A repeat's stack trace is re-formatted at most this often
+SYSTEM_CONTEXT_TTL_SECONDS = 30  # System info / env snapshot reuse window
+
+# Volatile message tokens, replaced so recurring errors share one template
+_MESSAGE_TEMPLATE_RULES = [
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<uuid>"),
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b|\b[0-9a-fA-F]{16,}\b"), "<hex>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+]
+_MESSAGE_TEMPLATE_MAX_CHARS = 500
+
+def template_error_message(message: str) -> str:
+    """Normalize an error message by templating ids, numbers and quoted values"""
+    template = message[:_MESSAGE_TEMPLATE_MAX_CHARS]
+    for pattern, placeholder in _MESSAGE_TEMPLATE_RULES:
+        template = pattern.sub(placeholder, template)
+    return template
+
 class ErrorSeverity(str, Enum):
     """Error severity levels"""
     LOW = "low"
@@ -80,6 +110,76 @@ class DebugContext:
     resolution_time: Optional[datetime] = None
     resolution_notes: Optional[str] = None
     ai_debugging_attempts: List[Dict[str, Any]] = None
+    
+    # Key into AIOptimizedMonitor.error_fingerprints
+    fingerprint: Optional[str] = None
+
+@dataclass
+class ErrorFingerprint:
+    """Aggregated occurrences of one normalized error (type + message template + top frames)"""
+    fingerprint: str
+    error_type: str
+    message_template: str
+    top_frames: List[str]
+    category: ErrorCategory
+    severity: ErrorSeverity  # Severity of the latest occurrence
+    first_seen: datetime
+    last_seen: datetime
+    count: int = 0
+    stack_trace: str = ""  # Latest sampled occurrence's trace
+    trace_sampled_at: float = 0.0  # time.monotonic() of that sample
+    
+    # Pattern analysis, computed once when the fingerprint is first seen
+    potential_causes: List[str] = field(default_factory=list)
+    suggested_solutions: List[str] = field(default_factory=list)
+    debugging_steps: List[str] = field(default_factory=list)
+    
+    # Occurrence tracking
+    hourly_counts: Dict[int, int] = field(default_factory=dict)  # epoch hour -> occurrences
+    recent_error_ids: Deque[str] = field(default_factory=lambda: deque(maxlen=FINGERPRINT_RECENT_IDS))
+    sample_contexts: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=FINGERPRINT_SAMPLE_CONTEXTS))
+    resolved: bool = False
+    
+    def record(self, error_id: str, timestamp: datetime, severity: ErrorSeverity, context: Optional[Dict[str, Any]]):
+        """Count one occurrence"""
+        hour = int(timestamp.timestamp() // 3600)
+        if hour not in self.hourly_counts:
+            # New bucket: drop the ones that fell out of retention
+            expired = hour - FINGERPRINT_RETENTION_HOURS
+            for old_hour in [h for h in self.hourly_counts if h <= expired]:
+                del self.hourly_counts[old_hour]
+        self.hourly_counts[hour] = self.hourly_counts.get(hour, 0) + 1
+        
+        self.count += 1
+        self.last_seen = timestamp
+        self.severity = severity
+        self.resolved = False  # A new occurrence reopens a resolved fingerprint
+        self.recent_error_ids.append(error_id)
+        if context:
+            self.sample_contexts.append(context)
+    
+    def count_since(self, cutoff: datetime) -> int:
+        """Occurrences since cutoff (hour granularity)"""
+        if self.last_seen <= cutoff:
+            return 0
+        cutoff_hour = int(cutoff.timestamp() // 3600)
+        return sum(n for hour, n in self.hourly_counts.items() if hour >= cutoff_hour)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "error_type": self.error_type,
+            "message_template": self.message_template,
+            "top_frames": self.top_frames,
+            "category": self.category.value,
+            "severity": self.severity.value,
+            "count": self.count,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+            "resolved": self.resolved,
+            "recent_error_ids": list(self.recent_error_ids),
+            "sample_contexts": list(self.sample_contexts),
+        }
 
 @dataclass
 class PerformanceMetric:
@@ -108,12 +208,12 @@ class AIOptimizedMonitor:
     """
     
     def __init__(self):
-        self.errors: List[DebugContext] = []
+        self.max_errors_stored = 1000
+        self.errors: Deque[DebugContext] = deque(maxlen=self.max_errors_stored)
         self.performance_metrics: List[PerformanceMetric] = []
         self.health_checks: List[SystemHealth] = []
         
         # Configuration
-        self.max_errors_stored = 1000
         self.max_metrics_stored = 5000
         self.max_health_checks_stored = 100
         
@@ -127,6 +227,11 @@ class AIOptimizedMonitor:
         self.error_counts: Dict[str, int] = {}
         self.last_health_check = None
         
+        # Error fingerprint index (fingerprint -> aggregate, most recently seen last)
+        self.error_fingerprints: "OrderedDict[str, ErrorFingerprint]" = OrderedDict()
+        self._errors_by_id: Dict[str, DebugContext] = {}
+        self._system_context: Optional[Tuple[float, Dict[str, Any], Dict[str, str]]] = None
+        
         # AI Debugging Patterns
         self.error_patterns = self._load_error_patterns()
         self.solution_templates = self._load_solution_templates()
@@ -400,17 +505,75 @@ class AIOptimizedMonitor:
         
         return potential_causes, suggested_solutions, debugging_steps
     
-    def _find_similar_errors(self, error_type: str, error_message: str) -> List[str]:
-        """Find similar errors for pattern recognition"""
-        similar_errors = []
+    def _get_system_context(self) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """System info and environment snapshot, reused for SYSTEM_CONTEXT_TTL_SECONDS"""
+        now = time.monotonic()
+        if self._system_context is None or now - self._system_context[0] > SYSTEM_CONTEXT_TTL_SECONDS:
+            self._system_context = (now, self._get_system_info(), self._get_environment_context())
+        return self._system_context[1], self._system_context[2]
+    
+    def _get_top_frames(self, error: Exception, caller_frame) -> List[str]:
+        """Innermost frames of the error's traceback (or the logging call site)"""
+        frames = deque(maxlen=FINGERPRINT_TOP_FRAMES)
+        tb = error.__traceback__
+        while tb is not None:
+            code = tb.tb_frame.f_code
+            frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            tb = tb.tb_next
+        if not frames and caller_frame is not None:
+            code = caller_frame.f_code
+            frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        return list(frames)
+    
+    def _get_fingerprint(
+        self,
+        error: Exception,
+        category: ErrorCategory,
+        severity: ErrorSeverity,
+        caller_frame,
+        timestamp: datetime,
+        context: Optional[Dict[str, Any]] = None
+    ) -> ErrorFingerprint:
+        """Look up (or create) the fingerprint aggregate for an error"""
+        error_type = type(error).__name__
+        message_template = template_error_message(str(error))
+        top_frames = self._get_top_frames(error, caller_frame)
+        
+        key_str = f"{category.value}|{error_type}|{message_template}|{'>'.join(top_frames)}"
+        key = hashlib.md5(key_str.encode()).hexdigest()[:12]
         
-        for error in self.errors[-50:]:  # Check last 50 errors
-            if (error.error_type == error_type or 
-                error.error_message.lower() in error_message.lower() or
-                error_message.lower() in error.error_message.lower()):
-                similar_errors.append(error.error_id)
+        fingerprint = self.error_fingerprints.get(key)
+        if fingerprint is not None:
+            self.error_fingerprints.move_to_end(key)
+            # Keep a recent trace (outer frames and line numbers can differ) without
+            # formatting every repeat of a burst
+            now = time.monotonic()
+            if now - fingerprint.trace_sampled_at >= FINGERPRINT_TRACE_SAMPLE_SECONDS:
+                fingerprint.stack_trace = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+                fingerprint.trace_sampled_at = now
+            return fingerprint
         
-        return similar_errors
+        # First occurrence: run the pattern analysis once
+        potential_causes, suggested_solutions, debugging_steps = self._analyze_error_pattern(error, context or {})
+        fingerprint = ErrorFingerprint(
+            fingerprint=key,
+            error_type=error_type,
+            message_template=message_template,
+            top_frames=top_frames,
+            category=category,
+            severity=severity,
+            first_seen=timestamp,
+            last_seen=timestamp,
+            stack_trace="".join(traceback.format_exception(type(error), error, error.__traceback__)),
+            trace_sampled_at=time.monotonic(),
+            potential_causes=potential_causes,
+            suggested_solutions=suggested_solutions,
+            debugging_steps=debugging_steps
+        )
+        self.error_fingerprints[key] = fingerprint
+        if len(self.error_fingerprints) > FINGERPRINT_MAX_TRACKED:
+            self.error_fingerprints.popitem(last=False)
+        return fingerprint
     
     def log_error(
         self,
@@ -423,10 +586,15 @@ class AIOptimizedMonitor:
     ) -> str:
         """
         Log an error with AI-optimized debugging context
+        
+        Errors are aggregated by fingerprint (type + templated message + top frames);
+        pattern analysis runs once per fingerprint (with the first occurrence's context)
+        and the stack trace is re-sampled at most every FINGERPRINT_TRACE_SAMPLE_SECONDS,
+        so repeats during an error burst cost a dict lookup.
         Returns: error_id
         """
         try:
-            error_id = self._generate_error_id(error, context)
+            timestamp = datetime.now()
             
             # Get current frame information
             current_frame = inspect.currentframe()
@@ -437,45 +605,51 @@ class AIOptimizedMonitor:
             file_path = caller_frame.f_code.co_filename if caller_frame else "unknown"
             module_name = caller_frame.f_globals.get('__name__', 'unknown') if caller_frame else "unknown"
             
-            # Analyze error pattern
-            potential_causes, suggested_solutions, debugging_steps = self._analyze_error_pattern(error, context or {})
+            fingerprint = self._get_fingerprint(error, category, severity, caller_frame, timestamp, context)
+            error_id = self._generate_error_id(fingerprint)
             
-            # Find similar errors
-            similar_errors = self._find_similar_errors(type(error).__name__, str(error))
+            # Previous occurrences of the same fingerprint
+            similar_errors = list(fingerprint.recent_error_ids)
+            fingerprint.record(error_id, timestamp, severity, context)
+            
+            system_info, environment_vars = self._get_system_context()
             
             debug_context = DebugContext(
                 error_id=error_id,
-                timestamp=datetime.now(),
-                error_type=type(error).__name__,
+                timestamp=timestamp,
+                error_type=fingerprint.error_type,
                 error_message=str(error),
-                stack_trace=traceback.format_exc(),
+                stack_trace=fingerprint.stack_trace,
                 severity=severity,
                 category=category,
                 function_name=function_name,
                 line_number=line_number,
                 file_path=file_path,
                 module_name=module_name,
-                system_info=self._get_system_info(),
-                environment_vars=self._get_environment_context(),
+                system_info=system_info,
+                environment_vars=environment_vars,
                 request_context=context,
                 user_context={"user_id": user_id, "endpoint": endpoint} if user_id or endpoint else None,
                 similar_errors=similar_errors,
-                potential_causes=potential_causes,
-                suggested_solutions=suggested_solutions,
-                debugging_steps=debugging_steps,
-                ai_debugging_attempts=[]
+                potential_causes=list(fingerprint.potential_causes),
+                suggested_solutions=list(fingerprint.suggested_solutions),
+                debugging_steps=list(fingerprint.debugging_steps),
+                ai_debugging_attempts=[],
+                fingerprint=fingerprint.fingerprint
             )
             
-            # Add to error list
+            # Add to the bounded error log, dropping the evicted entry from the id index
+            if len(self.errors) == self.max_errors_stored:
+                evicted = self.errors[0]
+                if self._errors_by_id.get(evicted.error_id) is evicted:
+                    del self._errors_by_id[evicted.error_id]
             self.errors.append(debug_context)
-            
-            # Maintain list size
-            if len(self.errors) > self.max_errors_stored:
-                self.errors.pop(0)
+            self._errors_by_id[error_id] = debug_context
             
             # Update error counts
             error_key = f"{category.value}_{debug_context.error_type}"
             self.error_counts[error_key] = self.error_counts.get(error_key, 0) + 1
+            metrics_store.record("errors", 1, {"category": category.value, "severity": severity.value})
             
             # Log based on severity
             if severity == ErrorSeverity.CRITICAL:
@@ -493,12 +667,43 @@ class AIOptimizedMonitor:
             logger.error(f"Error logging failed: {e}")
             return "logging_failed"
     
+    def get_error(self, error_id: str) -> Optional[DebugContext]:
+        """Look up a stored error by id"""
+        return self._errors_by_id.get(error_id)
+    
+    def get_recent_errors(self, limit: int = 100) -> List[DebugContext]:
+        """Most recent stored errors, oldest first"""
+        if limit >= len(self.errors):
+            return list(self.errors)
+        return list(self.errors)[-limit:]
+    
+    def get_error_fingerprints(self, hours: int = 24, limit: int = 20) -> List[Dict[str, Any]]:
+        """Fingerprints seen in the window, most frequent first"""
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        ranked = self._get_active_fingerprints(cutoff_time)
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return [
+            {**fingerprint.to_dict(), "window_count": count}
+            for fingerprint, count in ranked[:limit]
+        ]
+    
+    def _get_active_fingerprints(self, cutoff_time: datetime) -> List[Tuple[ErrorFingerprint, int]]:
+        """(fingerprint, occurrences since cutoff) for every fingerprint active in the window"""
+        active = []
+        for fingerprint in reversed(self.error_fingerprints.values()):
+            if fingerprint.last_seen <= cutoff_time:
+                break  # Ordered by recency, the rest are older
+            count = fingerprint.count_since(cutoff_time)
+            if count:
+                active.append((fingerprint, count))
+        return active
+    
     def get_ai_debugging_context(self, error_id: str) -> Dict[str, Any]:
         """
         Get comprehensive debugging context for AI analysis
         """
         try:
-            error = next((e for e in self.errors if e.error_id == error_id), None)
+            error = self.get_error(error_id)
             if not error:
                 return {"error": "Error not found"}
             
@@ -526,7 +731,7 @@ class AIOptimizedMonitor:
     def _get_error_pattern_summary(self) -> Dict[str, Any]:
         """Get summary of error patterns for AI analysis"""
         try:
-            recent_errors = self.errors[-100:] if len(self.errors) > 100 else self.errors
+            recent_errors = self.get_recent_errors(100)
             
             patterns = {
                 "total_errors": len(recent_errors),
@@ -596,11 +801,11 @@ class AIOptimizedMonitor:
             if len(self.performance_metrics) > self.max_metrics_stored:
                 self.performance_metrics.pop(0)
             
+            metrics_store.record(metric_name, value)
+            
             # Track request times for API endpoints
             if metric_name == "api_response_time":
-                self.request_times.append(value)
-                if len(self.request_times) > 100:
-                    self.request_times.pop(0)
+                self.record_request_time(value)
             
             logger.debug(f"Performance metric [{metric_id}]: {metric_name}={value}{unit}")
             return metric_id
@@ -609,6 +814,12 @@ class AIOptimizedMonitor:
             logger.error(f"Performance metric logging failed: {e}")
             return "metric_logging_failed"
     
+    def record_request_time(self, response_time_ms: float):
+        """Keep the last 100 request times for the health check's response time metrics"""
+        self.request_times.append(response_time_ms)
+        if len(self.request_times) > 100:
+            self.request_times.pop(0)
+    
     def check_system_health(self) -> SystemHealth:
         """
         Perform comprehensive system health check
@@ -691,6 +902,11 @@ class AIOptimizedMonitor:
                 alerts=alerts
             )
             
+            # Persist resource gauges for capacity trends
+            for gauge in ("memory_usage", "disk_usage"):
+                if gauge in metrics:
+                    metrics_store.record(f"system_{gauge}", metrics[gauge])
+            
             # Store health check
             self.health_checks.append(health)
             if len(self.health_checks) > self.max_health_checks_stored:
@@ -719,40 +935,43 @@ class AIOptimizedMonitor:
     def get_error_summary(self, hours: int = 24) -> Dict[str, Any]:
         """
         Get error summary for monitoring
+        
+        Read from the fingerprint aggregates (hour granularity), so the cost
+        scales with distinct errors rather than occurrences.
         """
         try:
             cutoff_time = datetime.now() - timedelta(hours=hours)
-            recent_errors = [e for e in self.errors if e.timestamp > cutoff_time]
+            active = self._get_active_fingerprints(cutoff_time)
             
             summary = {
-                "total_errors": len(recent_errors),
+                "total_errors": sum(count for _, count in active),
                 "errors_by_severity": {},
                 "errors_by_category": {},
                 "errors_by_type": {},
-                "unresolved_errors": len([e for e in recent_errors if not e.resolved]),
-                "critical_errors": len([e for e in recent_errors if e.severity == ErrorSeverity.CRITICAL]),
+                "unresolved_errors": sum(count for fp, count in active if not fp.resolved),
+                "critical_errors": sum(count for fp, count in active if fp.severity == ErrorSeverity.CRITICAL),
+                "distinct_errors": len(active),
                 "time_period_hours": hours,
                 "ai_debugging_context": {
-                    "common_causes": self._get_common_causes(recent_errors),
-                    "recommended_actions": self._get_recommended_actions(recent_errors),
-                    "pattern_analysis": self._analyze_error_patterns(recent_errors)
+                    "common_causes": self._get_weighted_top(active, "potential_causes"),
+                    "recommended_actions": self._get_weighted_top(active, "suggested_solutions"),
+                    "pattern_analysis": self._analyze_fingerprint_patterns(active, cutoff_time),
+                    "top_fingerprints": [
+                        {**fp.to_dict(), "window_count": count}
+                        for fp, count in sorted(active, key=lambda item: item[1], reverse=True)[:10]
+                    ]
                 }
             }
             
-            # Group by severity
-            for error in recent_errors:
-                severity = error.severity.value
-                summary["errors_by_severity"][severity] = summary["errors_by_severity"].get(severity, 0) + 1
-            
-            # Group by category
-            for error in recent_errors:
-                category = error.category.value
-                summary["errors_by_category"][category] = summary["errors_by_category"].get(category, 0) + 1
-            
-            # Group by type
-            for error in recent_errors:
-                error_type = error.error_type
-                summary["errors_by_type"][error_type] = summary["errors_by_type"].get(error_type, 0) + 1
+            for fingerprint, count in active:
+                severity = fingerprint.severity.value
+                summary["errors_by_severity"][severity] = summary["errors_by_severity"].get(severity, 0) + count
+                
+                category = fingerprint.category.value
+                summary["errors_by_category"][category] = summary["errors_by_category"].get(category, 0) + count
+                
+                error_type = fingerprint.error_type
+                summary["errors_by_type"][error_type] = summary["errors_by_type"].get(error_type, 0) + count
             
             return summary
             
@@ -760,6 +979,40 @@ class AIOptimizedMonitor:
             logger.error(f"Error summary generation failed: {e}")
             return {"error": str(e)}
     
+    def _get_weighted_top(self, active: List[Tuple[ErrorFingerprint, int]], attribute: str, limit: int = 5) -> List[str]:
+        """Most common causes/solutions across fingerprints, weighted by occurrences"""
+        counts = Counter()
+        for fingerprint, count in active:
+            for item in getattr(fingerprint, attribute):
+                counts[item] += count
+        return [item for item, _ in counts.most_common(limit)]
+    
+    def _analyze_fingerprint_patterns(self, active: List[Tuple[ErrorFingerprint, int]], cutoff_time: datetime) -> Dict[str, Any]:
+        """Analyze error patterns for AI debugging from fingerprint aggregates"""
+        if not active:
+            return {}
+        
+        type_counts = Counter()
+        category_counts = Counter()
+        time_distribution: Dict[int, int] = {}
+        cutoff_hour = int(cutoff_time.timestamp() // 3600)
+        for fingerprint, count in active:
+            type_counts[fingerprint.error_type] += count
+            category_counts[fingerprint.category.value] += count
+            for hour, hour_count in fingerprint.hourly_counts.items():
+                if hour < cutoff_hour:
+                    continue
+                hour_of_day = datetime.fromtimestamp(hour * 3600).hour
+                time_distribution[hour_of_day] = time_distribution.get(hour_of_day, 0) + hour_count
+        
+        return {
+            "most_common_type": type_counts.most_common(1)[0][0],
+            "most_common_category": category_counts.most_common(1)[0][0],
+            "recurring_errors": sum(count for fp, count in active if fp.count > 1),
+            "unresolved_errors": sum(count for fp, count in active if not fp.resolved),
+            "time_distribution": time_distribution
+        }
+    
     def _get_common_causes(self, errors: List[DebugContext]) -> List[str]:
         """Get common causes from recent errors"""
         causes = []
@@ -768,7 +1021,6 @@ class AIOptimizedMonitor:
                 causes.extend(error.potential_causes)
         
         # Count and return most common
-        from collections import Counter
         cause_counts = Counter(causes)
         return [cause for cause, count in cause_counts.most_common(5)]
     
@@ -780,7 +1032,6 @@ class AIOptimizedMonitor:
                 actions.extend(error.suggested_solutions)
         
         # Count and return most common
-        from collections import Counter
         action_counts = Counter(actions)
         return [action for action, count in action_counts.most_common(5)]
     
@@ -790,8 +1041,8 @@ class AIOptimizedMonitor:
             return {}
         
         patterns = {
-            "most_common_type": max(set(e.error_type for e in errors), key=lambda x: sum(1 for e in errors if e.error_type == x)),
-            "most_common_category": max(set(e.category.value for e in errors), key=lambda x: sum(1 for e in errors if e.category.value == x)),
+            "most_common_type": Counter(e.error_type for e in errors).most_common(1)[0][0],
+            "most_common_category": Counter(e.category.value for e in errors).most_common(1)[0][0],
             "recurring_errors": len([e for e in errors if e.similar_errors]),
             "unresolved_errors": len([e for e in errors if not e.resolved]),
             "time_distribution": {}
@@ -847,16 +1098,22 @@ class AIOptimizedMonitor:
         Mark an error as resolved
         """
         try:
-            for error in self.errors:
-                if error.error_id == error_id:
-                    error.resolved = True
-                    error.resolution_time = datetime.now()
-                    error.resolution_notes = resolution_notes
-                    logger.info(f"Error {error_id} marked as resolved")
-                    return True
+            error = self.get_error(error_id)
+            if not error:
+                logger.warning(f"Error {error_id} not found for resolution")
+                return False
             
-            logger.warning(f"Error {error_id} not found for resolution")
-            return False
+            error.resolved = True
+            error.resolution_time = datetime.now()
+            error.resolution_notes = resolution_notes
+            
+            # Until it recurs, the fingerprint counts as resolved in summaries
+            fingerprint = self.error_fingerprints.get(error.fingerprint)
+            if fingerprint:
+                fingerprint.resolved = True
+            
+            logger.info(f"Error {error_id} marked as resolved")
+            return True
             
         except Exception as e:
             logger.error(f"Error resolution failed: {e}")
@@ -869,7 +1126,8 @@ class AIOptimizedMonitor:
         try:
             return {
                 "timestamp": datetime.now().isoformat(),
-                "errors": [asdict(e) for e in self.errors[-100:]],  # Last 100 errors
+                "errors": [asdict(e) for e in self.get_recent_errors(100)],  # Last 100 errors
+                "error_fingerprints": self.get_error_fingerprints(hours=24, limit=50),
                 "performance_metrics": [asdict(m) for m in self.performance_metrics[-500:]],  # Last 500 metrics
                 "health_checks": [asdict(h) for h in self.health_checks[-50:]],  # Last 50 health checks
                 "error_summary": self.get_error_summary(),
@@ -884,9 +1142,9 @@ class AIOptimizedMonitor:
             logger.error(f"Data export failed: {e}")
             return {"error": str(e)}
     
-    def _generate_error_id(self, error: Exception, context: Optional[Dict[str, Any]]) -> str:
-        """Generate unique error ID"""
-        error_str = f"{type(error).__name__}_{str(error)}_{json.dumps(context or {}, sort_keys=True)}"
+    def _generate_error_id(self, fingerprint: ErrorFingerprint) -> str:
+        """Generate unique error ID for the next occurrence of a fingerprint"""
+        error_str = f"{fingerprint.fingerprint}_{fingerprint.count}_{time.time_ns()}"
         return hashlib.md5(error_str.encode()).hexdigest()[:8]
     
     def _generate_metric_id(self, metric_name: str, context: Optional[Dict[str, Any]]) -> str:
@@ -901,7 +1159,7 @@ class AIOptimizedMonitor:
         """
         try:
             # Find the error
-            error = next((e for e in self.errors if e.error_id == error_id), None)
+            error = self.get_error(error_id)
             if not error:
                 return {"success": False, "error": "Error not found"}
             
@@ -22,6 +22,7 @@ from dataclasses import dataclass, asdict
 import traceback
 
 from app.core.config import settings
+from app.core.async_logging import log_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,46 @@ request_id_var: ContextVar[str] = ContextVar('request_id')
 user_id_var: ContextVar[Optional[str]] = ContextVar('user_id', default=None)
 operation_var: ContextVar[Optional[str]] = ContextVar('operation', default=None)
 
+# Captured onto each LogRecord by the queue handler so formatting can happen off-thread
+LOG_CONTEXT_VARS = {
+    "request_id": request_id_var,
+    "user_id": user_id_var,
+    "operation": operation_var,
+}
+
+class AIStructuredFormatter(logging.Formatter):
+    """AI-friendly JSON log formatter (safe to run on the log listener thread)"""
+    
+    # Pre-bound encoder: no per-record JSONEncoder construction
+    _encode = json.JSONEncoder(default=str).encode
+    
+    def format(self, record):
+        log_entry = {
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        
+        # Add request context: captured by the queue handler, or read directly when synchronous
+        request_id = getattr(record, "request_id", None) or request_id_var.get(None)
+        if request_id:
+            log_entry["request_id"] = request_id
+            log_entry["user_id"] = getattr(record, "user_id", None) or user_id_var.get()
+            log_entry["operation"] = getattr(record, "operation", None) or operation_var.get()
+            
+        # Add exception info if present
+        if record.exc_info:
+            log_entry["exception"] = {
+                "type": record.exc_info[0].__name__,
+                "message": str(record.exc_info[1]),
+                "traceback": traceback.format_exception(*record.exc_info)
+            }
+        
+        return self._encode(log_entry)
+
 @dataclass
 class RequestContext:
     """AI-optimized request context for debugging"""
@@ -115,44 +156,26 @@ class AIOptimizedObservability:
             
     def _setup_structured_logging(self):
         """Configure structured logging for AI analysis"""
-        # Custom formatter for AI-friendly logs
-        class AIStructuredFormatter(logging.Formatter):
-            def format(self, record):
-                log_entry = {
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "level": record.levelname,
-                    "message": record.getMessage(),
-                    "module": record.module,
-                    "function": record.funcName,
-                    "line": record.lineno,
-                }
-                
-                # Add request context if available
-                try:
-                    log_entry["request_id"] = request_id_var.get()
-                    log_entry["user_id"] = user_id_var.get()
-                    log_entry["operation"] = operation_var.get()
-                except LookupError:
-                    pass
-                    
-                # Add exception info if present
-                if record.exc_info:
-                    log_entry["exception"] = {
-                        "type": record.exc_info[0].__name__,
-                        "message": str(record.exc_info[1]),
-                        "traceback": traceback.format_exception(*record.exc_info)
-                    }
-                
-                return json.dumps(log_entry)
-        
-        # Apply to logger
         handler = logging.StreamHandler()
         handler.setFormatter(AIStructuredFormatter())
         
+        if settings.LOG_ASYNC_ENABLED:
+            # Formatting and stream I/O happen on the listener thread, not per request
+            log_pipeline.install(
+                [handler],
+                maxsize=settings.LOG_QUEUE_MAXSIZE,
+                context_vars=LOG_CONTEXT_VARS
+            )
+            return
+        
         # Add to root logger if not already present
         if not any(isinstance(h.formatter, AIStructuredFormatter) for h in logging.getLogger().handlers):
             logging.getLogger().addHandler(handler)
     
+    def shutdown(self):
+        """Flush and stop background logging"""
+        log_pipeline.shutdown()
+    
     def _filter_sentry_events(self, event, hint):
         """Filter Sentry events to reduce noise and focus on actionable errors"""
         # Skip health check errors
@@ -342,6 +365,7 @@ class AIOptimizedObservability:
                     if durations
                 },
                 "active_users": len(self.user_journey_states),
+                "logging_pipeline": log_pipeline.get_stats(),
             },
             "recent_requests": [
                 context.to_dict() 
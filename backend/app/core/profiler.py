@@ -0,0 +1,290 @@
+"""
+Statistical Sampling Profiler for PulseCheck
+Low-overhead, always-on CPU attribution under real traffic
+
+Features:
+- Samples every thread's Python stack at a configurable rate (default 100 Hz)
+- Aggregates samples into a bounded stack -> count table
+- Self-throttles so sampling cost stays under a CPU overhead budget
+- Exports collapsed stacks (flamegraph.pl / speedscope import) or speedscope JSON
+"""
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Stack bucket used once the aggregation table is full
+OVERFLOW_STACK: Tuple[str, ...] = ("[overflow]",)
+
+# Leaf frames that only mean "this thread is parked" (event loop select, idle workers)
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("selectors.py", "poll"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("concurrent/futures/thread.py", "_worker"),
+}
+
+_THREAD_SUFFIX = re.compile(r"[_-]\d+$")
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that periodically snapshots all thread stacks
+
+    Sampling runs on a daemon thread using sys._current_frames(), so request
+    handlers are never instrumented or slowed down directly. Each sample is
+    folded into an aggregated table keyed by the stack tuple; the table is
+    capped at max_stacks distinct stacks and further novel stacks are counted
+    under OVERFLOW_STACK.
+    """
+
+    def __init__(
+        self,
+        sample_hz: float = 100.0,
+        max_stacks: int = 5000,
+        max_depth: int = 64,
+        max_overhead: float = 0.01,
+        include_idle: bool = False,
+        max_frame_labels: int = 20000,
+    ):
+        self.sample_hz = sample_hz
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.max_overhead = max_overhead
+        self.include_idle = include_idle
+        self.max_frame_labels = max_frame_labels  # Label cache size (it also keeps code objects alive)
+
+        self._stack_counts: Dict[Tuple[str, ...], int] = {}
+        self._frame_labels: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        # Bookkeeping for status and overhead accounting
+        self.total_samples = 0
+        self.dropped_samples = 0
+        self.idle_samples = 0
+        self.sampling_time_s = 0.0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.effective_interval_s = 1.0 / sample_hz
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, sample_hz: Optional[float] = None) -> Dict[str, Any]:
+        """Start sampling (no-op if already running)"""
+        if sample_hz:
+            self.sample_hz = max(1.0, min(float(sample_hz), 1000.0))
+        if self.is_running:
+            # The sampling loop picks the new rate up on its next iteration
+            self.effective_interval_s = 1.0 / self.sample_hz
+            return self.get_status()
+
+        self._stop_event.clear()
+        self.effective_interval_s = 1.0 / self.sample_hz
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._thread = threading.Thread(
+            target=self._run, name="pulsecheck-profiler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"🔬 Sampling profiler started at {self.sample_hz:.0f} Hz")
+        return self.get_status()
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop sampling; collected samples are kept until reset()"""
+        if self.is_running:
+            self._stop_event.set()
+            self._thread.join(timeout=2.0)
+            self.stopped_at = time.time()
+            logger.info("🔬 Sampling profiler stopped")
+        self._thread = None
+        return self.get_status()
+
+    def reset(self):
+        """Drop all collected samples"""
+        with self._lock:
+            self._stack_counts.clear()
+            self._frame_labels.clear()
+            self.total_samples = 0
+            self.dropped_samples = 0
+            self.idle_samples = 0
+            self.sampling_time_s = 0.0
+            self.started_at = time.time() if self.is_running else None
+
+    def _run(self):
+        own_ident = threading.get_ident()
+
+        while not self._stop_event.wait(self.effective_interval_s):
+            # thread_time() counts only this thread's CPU, not GIL waits
+            began = time.thread_time()
+            try:
+                self._sample(own_ident)
+            except Exception as e:
+                # Never let a sampling failure kill the profiler thread
+                logger.debug(f"Profiler sample failed: {e}")
+            cost = time.thread_time() - began
+            self.sampling_time_s += cost
+
+            # Stretch the interval if a single sample would blow the budget (sample_hz may change while running)
+            self.effective_interval_s = max(1.0 / self.sample_hz, cost / self.max_overhead)
+
+    def _sample(self, own_ident: int):
+        frames = sys._current_frames()
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+
+        with self._lock:
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+
+                if not self.include_idle and self._is_idle(frame):
+                    self.idle_samples += 1
+                    continue
+
+                stack = self._fold(frame, thread_names.get(ident, f"thread-{ident}"))
+                self.total_samples += 1
+
+                if stack in self._stack_counts:
+                    self._stack_counts[stack] += 1
+                elif len(self._stack_counts) < self.max_stacks:
+                    self._stack_counts[stack] = 1
+                else:
+                    self.dropped_samples += 1
+                    self._stack_counts[OVERFLOW_STACK] = self._stack_counts.get(OVERFLOW_STACK, 0) + 1
+
+    def _is_idle(self, frame) -> bool:
+        filename = frame.f_code.co_filename.replace("\\", "/")
+        name = frame.f_code.co_name
+        return any(filename.endswith(suffix) and name == func for suffix, func in _IDLE_LEAVES)
+
+    def _fold(self, frame, thread_name: str) -> Tuple[str, ...]:
+        """Collapse a frame chain into a root-first tuple of labels"""
+        labels: List[str] = []
+        depth = 0
+        while frame is not None and depth < self.max_depth:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+            depth += 1
+        if frame is not None:
+            labels.append("[truncated]")
+        labels.append(_THREAD_SUFFIX.sub("", thread_name))
+        labels.reverse()
+        return tuple(labels)
+
+    def _label(self, code) -> str:
+        label = self._frame_labels.get(code)
+        if label is None:
+            qualname = getattr(code, "co_qualname", code.co_name)
+            label = f"{qualname} ({self._short_path(code.co_filename)}:{code.co_firstlineno})"
+            if len(self._frame_labels) < self.max_frame_labels:
+                self._frame_labels[code] = label
+        return label
+
+    @staticmethod
+    def _short_path(filename: str) -> str:
+        filename = filename.replace("\\", "/")
+        for marker in ("/site-packages/", "/backend/"):
+            if marker in filename:
+                return filename.split(marker, 1)[1]
+        return os.path.basename(filename)
+
+    def _snapshot(self) -> List[Tuple[Tuple[str, ...], int]]:
+        with self._lock:
+            return sorted(self._stack_counts.items(), key=lambda item: item[1], reverse=True)
+
+    def export_collapsed(self) -> str:
+        """Export in Brendan Gregg's collapsed-stack format ("a;b;c count")"""
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self._snapshot())
+
+    def export_speedscope(self, name: str = "PulseCheck API") -> Dict[str, Any]:
+        """Export a speedscope 'sampled' profile (https://www.speedscope.app)"""
+        frames: List[Dict[str, Any]] = []
+        frame_index: Dict[str, int] = {}
+        samples: List[List[int]] = []
+        weights: List[int] = []
+
+        for stack, count in self._snapshot():
+            indexed = []
+            for label in stack:
+                if label not in frame_index:
+                    frame_index[label] = len(frames)
+                    frames.append({"name": label})
+                indexed.append(frame_index[label])
+            samples.append(indexed)
+            weights.append(count)
+
+        total = sum(weights)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "pulsecheck-sampling-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{name} @ {self.sample_hz:.0f} Hz",
+                "unit": "none",
+                "startValue": 0,
+                "endValue": total,
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def get_top_frames(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Self-time ranking of leaf frames"""
+        leaf_counts: Dict[str, int] = {}
+        for stack, count in self._snapshot():
+            leaf = stack[-1]
+            leaf_counts[leaf] = leaf_counts.get(leaf, 0) + count
+        total = sum(leaf_counts.values()) or 1
+        ranked = sorted(leaf_counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            {"frame": frame, "samples": count, "percent": round(count / total * 100, 2)}
+            for frame, count in ranked
+        ]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Profiler state and self-measured overhead"""
+        end = self.stopped_at if not self.is_running and self.stopped_at else time.time()
+        elapsed = (end - self.started_at) if self.started_at else 0.0
+        return {
+            "running": self.is_running,
+            "sample_hz": self.sample_hz,
+            "effective_hz": round(1.0 / self.effective_interval_s, 2) if self.effective_interval_s else 0,
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat() if self.started_at else None,
+            "elapsed_seconds": round(elapsed, 2),
+            "total_samples": self.total_samples,
+            "idle_samples_skipped": self.idle_samples,
+            "dropped_samples": self.dropped_samples,
+            "distinct_stacks": len(self._stack_counts),
+            "max_stacks": self.max_stacks,
+            "overhead_percent": round(self.sampling_time_s / elapsed * 100, 3) if elapsed else 0.0,
+            "max_overhead_percent": self.max_overhead * 100,
+        }
+
+
+# Global profiler instance
+profiler = SamplingProfiler(
+    sample_hz=settings.PROFILER_SAMPLE_HZ,
+    max_stacks=settings.PROFILER_MAX_STACKS,
+)
+
+
+def init_profiler():
+    """Start the always-on profiler if enabled by configuration"""
+    if settings.PROFILER_ENABLED:
+        profiler.start()
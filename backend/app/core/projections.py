@@ -0,0 +1,130 @@
+"""
+Column Projections for PulseCheck
+Named select lists per use case, so hot queries stop pulling every column with select("*")
+
+Use cases:
+- existence: just the primary key, for counts and "is there any row" checks
+- stats: the numeric columns aggregate endpoints actually read
+- timeline: id + created_at for streaks, recency and activity windows
+- listing: every column the API response model exposes (nothing internal)
+- ai_context: what prompt builders read from history (no list columns the AI never sees)
+- embedded: listing columns with insights/reactions/reply counts embedded in the same
+  response (JournalEntryRepository's embed and RPC reads)
+
+Every Projection.execute() records the rows it returned as db_response_rows, and
+for one result in RESPONSE_SIZE_SAMPLE_EVERY the JSON bytes as db_response_bytes,
+tagged by table and projection, so the savings show up in /monitoring/metrics per
+table and use case (read the bytes' avg; the sampled count/sum undercount).
+"""
+
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.core.json_response import dumps
+from app.core.metrics_store import metrics_store
+
+logger = logging.getLogger(__name__)
+
+# Re-serializing a result only to measure it costs about as much as the response
+# itself, so byte sizes are measured for one result in this many
+RESPONSE_SIZE_SAMPLE_EVERY = 20
+
+_results_seen = itertools.count()
+
+
+@dataclass(frozen=True)
+class Projection:
+    """A table plus the minimal column list for one use case"""
+    table: str
+    name: str
+    columns: str
+    
+    def select(self, client, count: Optional[str] = None):
+        """client.table(table).select(columns), ready for filters"""
+        return client.table(self.table).select(self.columns, count=count)
+    
+    def execute(self, query):
+        """Execute a query built from select() and record what it transferred"""
+        result = query.execute()
+        record_response_size(self, result.data)
+        return result
+
+
+# table -> use case -> Projection
+PROJECTIONS: Dict[str, Dict[str, Projection]] = {}
+
+
+def register_projection(table: str, name: str, columns: str) -> Projection:
+    projection = Projection(table, name, columns)
+    PROJECTIONS.setdefault(table, {})[name] = projection
+    return projection
+
+
+def get_projection(table: str, name: str) -> Projection:
+    """Registered projection; raises KeyError naming the missing use case"""
+    try:
+        return PROJECTIONS[table][name]
+    except KeyError:
+        raise KeyError(f"No '{name}' projection registered for {table}")
+
+
+def record_response_size(projection: Projection, data: Any) -> None:
+    """Rows of a query result, plus sampled serialized bytes (the JSON body PostgREST sent)"""
+    if metrics_store.disabled or data is None:
+        return
+    try:
+        tags = {"table": projection.table, "projection": projection.name}
+        metrics_store.record("db_response_rows", len(data) if isinstance(data, list) else 1, tags)
+        if next(_results_seen) % RESPONSE_SIZE_SAMPLE_EVERY == 0:
+            metrics_store.record("db_response_bytes", len(dumps(data)), tags)
+    except Exception as e:
+        logger.debug(f"Could not record response size for {projection.table}.{projection.name}: {e}")
+
+
+# journal_entries: columns of JournalEntryResponse (ai_insights is attached from its own table)
+ENTRY_COLUMNS = "id,user_id,content,mood_level,energy_level,stress_level,sleep_hours,work_hours,tags,work_challenges,gratitude_items,created_at,updated_at"
+
+ENTRY_EXISTS = register_projection("journal_entries", "existence", "id")
+ENTRY_STATS = register_projection("journal_entries", "stats", "mood_level,energy_level,stress_level,created_at")
+ENTRY_TIMELINE = register_projection("journal_entries", "timeline", "id,user_id,created_at")
+ENTRY_LISTING = register_projection("journal_entries", "listing", ENTRY_COLUMNS)
+ENTRY_EMBEDDED = register_projection("journal_entries", "embedded", ENTRY_COLUMNS)  # + embedded children
+ENTRY_AI_CONTEXT = register_projection(
+    "journal_entries", "ai_context",
+    "id,user_id,content,mood_level,energy_level,stress_level,sleep_hours,work_hours,tags,created_at,updated_at",
+)
+
+# ai_insights: public fields returned by the insight endpoints
+INSIGHT_COLUMNS = "id,journal_entry_id,ai_response,persona_used,topic_flags,confidence_score,created_at"
+
+INSIGHT_EXISTS = register_projection("ai_insights", "existence", "id")
+INSIGHT_TIMELINE = register_projection("ai_insights", "timeline", "id,created_at")
+INSIGHT_LISTING = register_projection("ai_insights", "listing", INSIGHT_COLUMNS)
+INSIGHT_AI_CONTEXT = register_projection(
+    "ai_insights", "ai_context",
+    "id,journal_entry_id,persona_used,ai_response,topic_flags,created_at",
+)
+
+REACTION_COLUMNS = "id,ai_insight_id,user_id,reaction_type,reaction_by,created_at"
+
+REACTION_EXISTS = register_projection("ai_reactions", "existence", "id")
+REACTION_LISTING = register_projection("ai_reactions", "listing", REACTION_COLUMNS)
+
+REPLY_EXISTS = register_projection("ai_user_replies", "existence", "id")
+REPLY_LISTING = register_projection(
+    "ai_user_replies", "listing",
+    "id,journal_entry_id,user_id,reply_text,is_ai_response,ai_persona,created_at",
+)
+
+FEEDBACK_STATS = register_projection("ai_feedback", "stats", "feedback_type")
+
+PROFILE_EXISTS = register_projection("profiles", "existence", "id")
+
+# journal_summaries: rolling weekly compressions read by the beta context builder
+SUMMARY_TIMELINE = register_projection("journal_summaries", "timeline", "period_start,period_end")
+SUMMARY_AI_CONTEXT = register_projection(
+    "journal_summaries", "ai_context",
+    "summary_type,period_start,period_end,mood_trend,energy_trend,stress_trend,key_insights,top_themes,entry_count,token_count",
+)
@@ -0,0 +1,262 @@
+"""
+Shared Rate Limiting Backend for PulseCheck
+GCRA limiter whose state is shared by every uvicorn worker on the host
+
+Features:
+- "gcra" strategy for slowapi/limits: one theoretical-arrival-time per key, O(1) per check
+- SQLite WAL storage ("sqlite:///path") shared across worker processes
+- Falls back to in-process state if the database cannot be opened
+- Fails open: a check that cannot get the write lock within a few ms is allowed,
+  so the limiter never stalls the event loop it runs on
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple
+
+from limits.limits import RateLimitItem
+from limits.storage import Storage
+from limits.strategies import STRATEGIES, RateLimiter
+from limits.util import WindowStats
+
+logger = logging.getLogger(__name__)
+
+# Expired rows are purged once every this many writes
+_PURGE_EVERY = 1000
+
+# SQLite busy timeout; checks run on the event loop, so never wait long for another worker's write lock
+_BUSY_TIMEOUT_SECONDS = 0.05
+
+# A request allowed because the database was locked is logged at most once per this many seconds
+_BUSY_LOG_INTERVAL_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gcra (
+    key TEXT PRIMARY KEY,
+    tat REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def gcra_update(tat: float, now: float, period: float, limit: int, cost: int = 1) -> Tuple[bool, float]:
+    """
+    Generic Cell Rate Algorithm step
+    
+    Each request pushes the theoretical arrival time (TAT) forward by one
+    emission interval (period / limit); a request is allowed while the TAT
+    stays within one period of now, which permits bursts of up to `limit`.
+    Returns (allowed, new_tat); new_tat equals tat when denied.
+    """
+    emission_interval = period / limit
+    new_tat = max(tat, now) + cost * emission_interval
+    if new_tat - now > period:
+        return False, tat
+    return True, new_tat
+
+
+class SQLiteStorage(Storage):
+    """
+    limits storage on a local SQLite WAL database
+    
+    URI: sqlite:///relative/path.db or sqlite:////absolute/path.db
+    Every read-modify-write runs in a BEGIN IMMEDIATE transaction, so workers
+    sharing the file never lose updates. GCRA checks that cannot take the write
+    lock within _BUSY_TIMEOUT_SECONDS are allowed (counted in busy_allowed).
+    """
+    
+    STORAGE_SCHEME = ["sqlite"]
+    
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = uri.split("://", 1)[1]
+        self.path = path[1:] if path.startswith("/") else path
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = None
+        self._memory: Dict[str, float] = {}  # Fallback GCRA state
+        self.busy_allowed = 0
+        self._busy_logged_at = 0.0
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        except Exception as e:
+            logger.warning(f"⚠️ Rate limit storage falling back to per-process memory ({self.path}): {e}")
+    
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+    
+    def _write(self, statements):
+        """Run (sql, params) pairs in one immediate transaction; returns the last cursor"""
+        cursor = None
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in statements:
+                cursor = self._conn.execute(sql, params)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return cursor
+    
+    def _maybe_purge(self, now: float):
+        self._writes += 1
+        if self._writes % _PURGE_EVERY:
+            return
+        if self._conn is None:
+            self._memory = {key: tat for key, tat in self._memory.items() if tat >= now}
+            return
+        try:
+            self._write([
+                ("DELETE FROM gcra WHERE tat < ?", (now,)),
+                ("DELETE FROM counters WHERE expires_at < ?", (now,)),
+            ])
+        except sqlite3.OperationalError as e:
+            # Busy: a later write purges instead
+            logger.debug(f"Rate limit purge skipped: {e}")
+    
+    def _allow_busy(self, key: str, now: float, error: Exception) -> Tuple[bool, float]:
+        """Fail open when another worker holds the write lock past the busy timeout"""
+        self.busy_allowed += 1
+        if now - self._busy_logged_at >= _BUSY_LOG_INTERVAL_SECONDS:
+            self._busy_logged_at = now
+            logger.warning(f"⚠️ Rate limit storage busy, allowing request ({key}; {self.busy_allowed} allowed so far): {error}")
+        return True, now
+    
+    # ----- GCRA -----
+    
+    def gcra_acquire(self, key: str, period: float, limit: int, cost: int = 1) -> Tuple[bool, float]:
+        """Atomically apply one GCRA step; returns (allowed, tat after the step)"""
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                allowed, tat = gcra_update(self._memory.get(key, now), now, period, limit, cost)
+                self._memory[key] = tat
+                self._maybe_purge(now)
+                return allowed, tat
+            
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                return self._allow_busy(key, now, e)
+            try:
+                row = self._conn.execute("SELECT tat FROM gcra WHERE key = ?", (key,)).fetchone()
+                allowed, tat = gcra_update(row[0] if row else now, now, period, limit, cost)
+                if allowed:
+                    self._conn.execute("INSERT OR REPLACE INTO gcra (key, tat) VALUES (?, ?)", (key, tat))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._maybe_purge(now)
+            return allowed, tat
+    
+    def gcra_peek(self, key: str) -> float:
+        """Current theoretical arrival time for a key (now if idle)"""
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                return max(self._memory.get(key, now), now)
+            row = self._conn.execute("SELECT tat FROM gcra WHERE key = ?", (key,)).fetchone()
+        return max(row[0], now) if row else now
+    
+    # ----- Fixed-window counters (limits Storage interface) -----
+    
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                raise sqlite3.OperationalError("rate limit database unavailable")
+            self._write([
+                ("DELETE FROM counters WHERE key = ? AND expires_at <= ?", (key, now)),
+                (
+                    "INSERT INTO counters (key, value, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",
+                    (key, amount, now + expiry),
+                ),
+            ])
+            row = self._conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()
+            self._maybe_purge(now)
+        return row[0] if row else amount
+    
+    def get(self, key: str) -> int:
+        with self._lock:
+            if self._conn is None:
+                return 0
+            row = self._conn.execute(
+                "SELECT value FROM counters WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else 0
+    
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            if self._conn is None:
+                return time.time()
+            row = self._conn.execute("SELECT expires_at FROM counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else time.time()
+    
+    def check(self) -> bool:
+        return self._conn is not None
+    
+    def reset(self) -> int:
+        with self._lock:
+            if self._conn is None:
+                cleared = len(self._memory)
+                self._memory.clear()
+                return cleared
+            cursor = self._write([("DELETE FROM gcra", ()), ("DELETE FROM counters", ())])
+            return cursor.rowcount
+    
+    def clear(self, key: str) -> None:
+        with self._lock:
+            if self._conn is None:
+                self._memory.pop(key, None)
+                return
+            self._write([
+                ("DELETE FROM gcra WHERE key = ?", (key,)),
+                ("DELETE FROM counters WHERE key = ?", (key,)),
+            ])
+
+
+class GCRARateLimiter(RateLimiter):
+    """
+    GCRA strategy: "N per period" allows bursts of N and refills one slot every period/N
+    
+    Unlike fixed windows there is no boundary at which 2N requests can pass.
+    Requires a storage implementing gcra_acquire/gcra_peek (SQLiteStorage).
+    """
+    
+    def hit(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        allowed, _ = self.storage.gcra_acquire(item.key_for(*identifiers), item.get_expiry(), item.amount, cost)
+        return allowed
+    
+    def test(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        tat = self.storage.gcra_peek(item.key_for(*identifiers))
+        allowed, _ = gcra_update(tat, time.time(), item.get_expiry(), item.amount, cost)
+        return allowed
+    
+    def get_window_stats(self, item: RateLimitItem, *identifiers: str) -> WindowStats:
+        now = time.time()
+        period = item.get_expiry()
+        tat = self.storage.gcra_peek(item.key_for(*identifiers))
+        remaining = math.floor((period - (tat - now)) / (period / item.amount))
+        return WindowStats(tat, max(0, min(item.amount, remaining)))
+
+
+# Make "gcra" selectable through Limiter(strategy="gcra")
+STRATEGIES["gcra"] = GCRARateLimiter
@@ -4,11 +4,16 @@ Implements JWT validation, rate limiting, and admin authentication
 """
 
 import jwt
+import hashlib
 import logging
 import re
 import html
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from fastapi import HTTPException, status, Request, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -18,15 +23,13 @@ from pydantic import BaseModel
 
 from .config import settings
 from .database import get_database, Database
+from . import rate_limit  # noqa: F401 - registers the "sqlite" storage and "gcra" strategy
 
 logger = logging.getLogger(__name__)
 
 # HTTP Bearer for JWT tokens
 security = HTTPBearer(auto_error=False)
 
-# Rate Limiter Setup
-limiter = Limiter(key_func=get_remote_address)
-
 # INPUT VALIDATION FUNCTIONS
 def validate_input_length(value: str, max_length: int, field_name: str) -> str:
     """
@@ -123,6 +126,99 @@ class AuthUser(BaseModel):
         return self.app_metadata.get("role") == "admin" or \
                self.user_metadata.get("role") == "admin"
 
+@dataclass
+class VerifiedToken:
+    """Cached result of a successful token verification"""
+    expires_at: float
+    claims: Dict[str, Any]
+    user: Optional[AuthUser] = None
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified JWT claims, keyed by SHA-256 of the token
+    
+    - Entries expire at the token's own `exp`, so a cached token is never
+      accepted past the point where jwt.decode would reject it
+    - Rejected tokens are remembered for a short time (negative cache) so
+      clients retrying a bad token don't cost a full verification each time
+    - Raw tokens are never stored
+    """
+    
+    def __init__(self, max_entries: int = 10000, negative_ttl_seconds: float = 30.0, max_ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_ttl_seconds = max_ttl_seconds  # Cap for tokens without `exp`
+        
+        self._verified: "OrderedDict[bytes, VerifiedToken]" = OrderedDict()
+        self._rejected: "OrderedDict[bytes, Tuple[float, int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+    
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, key: bytes) -> Optional[VerifiedToken]:
+        """Cached verification for a token digest; raises the cached rejection if any"""
+        now = time.time()
+        with self._lock:
+            entry = self._verified.get(key)
+            if entry is not None:
+                if now < entry.expires_at:
+                    self._verified.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                del self._verified[key]
+            
+            rejection = self._rejected.get(key)
+            if rejection is not None:
+                if now < rejection[0]:
+                    self.negative_hits += 1
+                    raise HTTPException(status_code=rejection[1], detail=rejection[2])
+                del self._rejected[key]
+            
+            self.misses += 1
+            return None
+    
+    def put(self, key: bytes, claims: Dict[str, Any]) -> VerifiedToken:
+        exp = claims.get("exp")
+        ceiling = time.time() + self.max_ttl_seconds
+        entry = VerifiedToken(expires_at=min(float(exp), ceiling) if exp else ceiling, claims=claims)
+        with self._lock:
+            self._verified[key] = entry
+            self._verified.move_to_end(key)
+            while len(self._verified) > self.max_entries:
+                self._verified.popitem(last=False)
+        return entry
+    
+    def reject(self, key: bytes, status_code: int, detail: str):
+        with self._lock:
+            self._rejected[key] = (time.time() + self.negative_ttl_seconds, status_code, detail)
+            self._rejected.move_to_end(key)
+            while len(self._rejected) > self.max_entries:
+                self._rejected.popitem(last=False)
+    
+    def clear(self):
+        """Drop everything (e.g. after rotating the JWT secret)"""
+        with self._lock:
+            self._verified.clear()
+            self._rejected.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.negative_hits
+        return {
+            "verified_entries": len(self._verified),
+            "rejected_entries": len(self._rejected),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+        }
+
 class JWTValidator:
     """Secure JWT validation for Supabase tokens"""
     
@@ -130,6 +226,10 @@ class JWTValidator:
         # Get JWT secret from settings - CRITICAL: Must be set for production
         self.jwt_secret = getattr(settings, 'supabase_jwt_secret', None)
         self.algorithm = "HS256"  # Supabase uses HS256
+        self.cache = VerifiedTokenCache(
+            max_entries=settings.JWT_CACHE_MAX_ENTRIES,
+            negative_ttl_seconds=settings.JWT_NEGATIVE_CACHE_SECONDS
+        )
         
         # Log warning if JWT secret is missing
         if not self.jwt_secret:
@@ -139,7 +239,26 @@ class JWTValidator:
     def validate_token(self, token: str) -> Dict[str, Any]:
         """
         Validate JWT token with proper signature verification
+        
+        Verified claims are cached by token digest until the token expires,
+        so repeat requests with the same token skip decoding and HMAC checks.
         """
+        return self._verify(token).claims
+    
+    def authenticate(self, token: str) -> AuthUser:
+        """Validate a token and return its (cached) AuthUser"""
+        entry = self._verify(token)
+        if entry.user is None:
+            claims = entry.claims
+            entry.user = AuthUser(
+                id=claims.get("sub"),
+                email=claims.get("email") or "unknown@example.com",
+                user_metadata=claims.get("user_metadata") or {},
+                app_metadata=claims.get("app_metadata") or {}
+            )
+        return entry.user
+    
+    def _verify(self, token: str) -> VerifiedToken:
         if not token:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -154,6 +273,23 @@ class JWTValidator:
                 detail="Authentication service misconfigured"
             )
         
+        key = self.cache.digest(token)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            payload = self._decode(token)
+        except HTTPException as e:
+            # Only auth failures are cached; service errors are retried
+            if e.status_code == status.HTTP_401_UNAUTHORIZED:
+                self.cache.reject(key, e.status_code, e.detail)
+            raise
+        
+        return self.cache.put(key, payload)
+    
+    def _decode(self, token: str) -> Dict[str, Any]:
+        """Full signature and claim verification (uncached)"""
         try:
             # SECURE: Always verify signature in production
             payload = jwt.decode(
@@ -184,6 +320,8 @@ class JWTValidator:
             
             return payload
             
+        except HTTPException:
+            raise
         except jwt.ExpiredSignatureError:
             logger.warning("Token has expired")
             raise HTTPException(
@@ -206,6 +344,28 @@ class JWTValidator:
 # Global JWT validator instance
 jwt_validator = JWTValidator()
 
+def get_rate_limit_key(request: Request) -> str:
+    """
+    Rate limit bucket for a request: the authenticated user ID, or the client
+    address for anonymous requests (token checks hit the verified-token cache)
+    """
+    authorization = request.headers.get("authorization", "")
+    if authorization[:7].lower() == "bearer ":
+        try:
+            return f"user:{jwt_validator.authenticate(authorization[7:].strip()).id}"
+        except HTTPException:
+            pass
+    return f"ip:{get_remote_address(request)}"
+
+# Rate Limiter Setup - the single limiter shared by all routers; state lives in
+# RATE_LIMIT_STORAGE_URI so every worker on the host enforces the same budget
+limiter = Limiter(
+    key_func=get_rate_limit_key,
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    enabled=settings.RATE_LIMIT_ENABLED
+)
+
 async def get_current_user_secure(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Database = Depends(get_database)
@@ -220,18 +380,7 @@ async def get_current_user_secure(
         )
     
     try:
-        token = credentials.credentials
-        payload = jwt_validator.validate_token(token)
-        
-        user_id = payload.get("sub")
-        email = payload.get("email")
-        
-        return AuthUser(
-            id=user_id,
-            email=email or "unknown@example.com",
-            user_metadata=payload.get("user_metadata", {}),
-            app_metadata=payload.get("app_metadata", {})
-        )
+        return jwt_validator.authenticate(credentials.credentials)
         
     except HTTPException:
         raise
@@ -242,6 +391,22 @@ async def get_current_user_secure(
             detail="Authentication service error"
         )
 
+def _user_dict(auth_user: AuthUser) -> Dict[str, Any]:
+    """Plain user dict shape used by the routers"""
+    return {
+        "id": auth_user.id,
+        "email": auth_user.email,
+        "tech_role": auth_user.user_metadata.get("tech_role", "user"),
+        "name": auth_user.user_metadata.get("name", "User"),
+        "is_admin": auth_user.is_admin
+    }
+
+async def verify_token(token: str) -> Dict[str, Any]:
+    """
+    Validate a raw JWT (e.g. a WebSocket query parameter) and return the user dict
+    """
+    return _user_dict(jwt_validator.authenticate(token))
+
 async def get_current_user_with_fallback(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -254,13 +419,7 @@ async def get_current_user_with_fallback(
         # Try secure authentication first
         if credentials:
             auth_user = await get_current_user_secure(credentials, db)
-            return {
-                "id": auth_user.id,
-                "email": auth_user.email,
-                "tech_role": auth_user.user_metadata.get("tech_role", "user"),
-                "name": auth_user.user_metadata.get("name", "User"),
-                "is_admin": auth_user.is_admin
-            }
+            return _user_dict(auth_user)
     except HTTPException as e:
         # Only use fallback for 401 errors in development
         if e.status_code != status.HTTP_401_UNAUTHORIZED:
@@ -311,7 +470,7 @@ async def verify_admin_access_with_fallback(
     """
     try:
         if credentials:
-            auth_user = await get_current_user_secure(credentials)
+            auth_user = jwt_validator.authenticate(credentials.credentials)
             if not auth_user.is_admin:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,154 @@
+"""
+Shared Tokenizer for PulseCheck
+One tiktoken encoding per process plus a bounded token-count memo
+
+Features:
+- The encoding is loaded lazily on first use and shared by every TokenManager
+- Counts are memoized by a 128-bit content hash (LRU, TOKEN_COUNT_CACHE_SIZE entries),
+  so the same entry text is encoded once however many contexts it appears in
+- count_many() counts a list of texts in one call, encoding only the misses; a large miss
+  set goes through tiktoken's threaded batch encoder, a few misses are encoded inline
+- tiktoken is pinned in requirements.txt; without it counts fall back to ~4 characters
+  per token and the memo is bypassed (nothing worth caching)
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+    tiktoken = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+# encode_ordinary_batch spins up a ThreadPoolExecutor per call; below this many misses
+# encoding them one by one on the calling thread is cheaper
+BATCH_ENCODE_MIN_TEXTS = 16
+
+
+def content_key(text: str) -> bytes:
+    """Memo key for a text: blake2b digest, far cheaper than BPE encoding"""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class Tokenizer:
+    """
+    Process-wide token counter
+    
+    Thread-safe: the encoding is created once under a lock, and the memo is an
+    OrderedDict guarded by its own lock (encoding itself runs outside it).
+    """
+    
+    def __init__(self, model: str = DEFAULT_MODEL, cache_size: int = 4096):
+        self.model = model
+        self.cache_size = cache_size
+        self._encoder = None
+        self._encoder_loaded = False
+        self._encoder_lock = threading.Lock()
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def encoder(self):
+        """tiktoken encoding, loaded on first use (None when tiktoken is unavailable)"""
+        if not self._encoder_loaded:
+            with self._encoder_lock:
+                if not self._encoder_loaded:
+                    self._encoder = self._load_encoder()
+                    self._encoder_loaded = True
+        return self._encoder
+    
+    def _load_encoder(self):
+        if not TIKTOKEN_AVAILABLE:
+            logger.info("ℹ️ tiktoken not installed, estimating tokens as characters / 4")
+            return None
+        try:
+            return tiktoken.encoding_for_model(self.model)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load tiktoken encoding for {self.model}, estimating tokens: {e}")
+            return None
+    
+    def count(self, text: Optional[str]) -> int:
+        """Tokens in text (memoized)"""
+        if not text:
+            return 0
+        return self.count_many([text])[0]
+    
+    def count_many(self, texts: Sequence[Optional[str]]) -> List[int]:
+        """Tokens for each text, in order; only cache misses are encoded"""
+        encoder = self.encoder
+        if encoder is None:
+            return [len(text) // 4 if text else 0 for text in texts]
+        
+        counts = [0] * len(texts)
+        missing: Dict[bytes, List[int]] = {}
+        with self._cache_lock:
+            for index, text in enumerate(texts):
+                if not text:
+                    continue
+                key = content_key(text)
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.setdefault(key, []).append(index)
+                else:
+                    self._cache.move_to_end(key)
+                    counts[index] = cached
+                    self.hits += 1
+        
+        if missing:
+            keys = list(missing)
+            batch = [texts[missing[key][0]] for key in keys]
+            try:
+                # encode_ordinary: user text may contain special-token strings like <|endoftext|>
+                if len(batch) >= BATCH_ENCODE_MIN_TEXTS:
+                    encoded = [len(tokens) for tokens in encoder.encode_ordinary_batch(batch)]
+                else:
+                    encoded = [len(encoder.encode_ordinary(text)) for text in batch]
+            except Exception:
+                encoded = [len(text) // 4 for text in batch]
+            
+            with self._cache_lock:
+                for key, tokens in zip(keys, encoded):
+                    for index in missing[key]:
+                        counts[index] = tokens
+                    self._cache[key] = tokens
+                    self.misses += 1
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        
+        return counts
+    
+    def clear(self) -> None:
+        """Drop memoized counts and reset hit/miss stats"""
+        with self._cache_lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model,
+            "tiktoken": self.encoder is not None,
+            "cached_counts": len(self._cache),
+            "cache_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Global tokenizer instance
+tokenizer = Tokenizer(cache_size=settings.TOKEN_COUNT_CACHE_SIZE)
@@ -5,10 +5,16 @@ This module provides centralized utility functions to prevent code duplication
 and ensure consistent handling of common operations across the application.
 """
 
-from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, datetime, timezone, tzinfo
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional
 import logging
 
+from pydantic import TypeAdapter, ValidationError
+
 logger = logging.getLogger(__name__)
 
 
@@ -76,6 +82,192 @@ class DateTimeUtils:
                     entry[field] = entry[field].replace(tzinfo=timezone.utc)
         
         return entry
+    
+    @staticmethod
+    def parse_timestamp(value: Any) -> Optional[datetime]:
+        """
+        Parse an ISO string or datetime into a timezone-aware datetime.
+        
+        Naive values are treated as UTC (how Supabase timestamps are stored).
+        
+        Args:
+            value: ISO 8601 string (with or without 'Z'), datetime, or None
+            
+        Returns:
+            Aware datetime, or None when the value is missing or unparseable
+        """
+        if value is None:
+            return None
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                return None
+        if not isinstance(value, datetime):
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class EntryTimeline:
+    """
+    Pre-parsed created_at columns for a list of journal entries.
+    
+    Built once per request and handed to every analyzer that needs entry times,
+    so each timestamp is parsed a single time instead of once per analyzer (and
+    once per comparison in pairwise loops). Values live in compact parallel
+    arrays sorted by time: epoch seconds, local date ordinal, weekday (0=Monday)
+    and hour, all in `tz`.
+    
+    Accepts JournalEntryResponse models or raw Supabase row dicts. Entries with
+    a missing or unparseable created_at are left out; `entries[i]` lines up with
+    index i of every column.
+    """
+    
+    __slots__ = ("tz", "entries", "epoch", "ordinal", "weekday", "hour")
+    
+    def __init__(self, entries: Optional[Iterable[Any]] = None, tz: tzinfo = timezone.utc):
+        self.tz = tz
+        self.entries: List[Any] = []
+        self.epoch = array("d")
+        self.ordinal = array("l")
+        self.weekday = array("b")
+        self.hour = array("b")
+        
+        parsed = []
+        for entry in entries or ():
+            created_at = entry.get("created_at") if isinstance(entry, dict) else getattr(entry, "created_at", None)
+            moment = DateTimeUtils.parse_timestamp(created_at)
+            if moment is not None:
+                parsed.append((moment.timestamp(), moment.astimezone(tz), entry))
+        
+        parsed.sort(key=lambda item: item[0])
+        for epoch, local, entry in parsed:
+            self.entries.append(entry)
+            self.epoch.append(epoch)
+            self.ordinal.append(local.toordinal())
+            self.weekday.append(local.weekday())
+            self.hour.append(local.hour)
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def datetime_at(self, index: int) -> datetime:
+        """created_at of entries[index] as an aware datetime in the timeline's tz."""
+        return datetime.fromtimestamp(self.epoch[index], self.tz)
+    
+    def date_at(self, index: int) -> date:
+        """Local calendar date of entries[index]."""
+        return date.fromordinal(self.ordinal[index])
+    
+    def latest(self) -> Optional[datetime]:
+        """Most recent created_at, or None for an empty timeline."""
+        return self.datetime_at(len(self) - 1) if self.entries else None
+    
+    def index_range(self, start: datetime, end: datetime) -> range:
+        """Indices of entries with start <= created_at <= end (binary search on the sorted epochs)."""
+        return range(
+            bisect_left(self.epoch, start.timestamp()),
+            bisect_right(self.epoch, end.timestamp()),
+        )
+    
+    def between(self, start: datetime, end: datetime) -> "EntryTimeline":
+        """Sub-timeline for [start, end], sharing the already-parsed columns."""
+        window = self.index_range(start, end)
+        subset = EntryTimeline(tz=self.tz)
+        subset.entries = self.entries[window.start:window.stop]
+        subset.epoch = self.epoch[window.start:window.stop]
+        subset.ordinal = self.ordinal[window.start:window.stop]
+        subset.weekday = self.weekday[window.start:window.stop]
+        subset.hour = self.hour[window.start:window.stop]
+        return subset
+    
+    def within_hours(self, index: int, hours: float) -> range:
+        """Indices of entries whose created_at is within `hours` of entries[index] (includes index)."""
+        center = self.epoch[index]
+        window = hours * 3600
+        return range(bisect_left(self.epoch, center - window), bisect_right(self.epoch, center + window))
+    
+    def hour_counts(self) -> Counter:
+        """Entries per local hour of day."""
+        return Counter(self.hour)
+    
+    def weekday_counts(self) -> Counter:
+        """Entries per weekday (0=Monday)."""
+        return Counter(self.weekday)
+    
+    def span_days(self) -> int:
+        """Whole days between the first and last entry."""
+        if len(self) < 2:
+            return 0
+        return int((self.epoch[-1] - self.epoch[0]) // 86400)
+    
+    def daily_streak(self, today: Optional[date] = None) -> int:
+        """Consecutive local days with at least one entry, counting back from today."""
+        if today is None:
+            today = datetime.now(self.tz).date()
+        days = set(self.ordinal)
+        current = today.toordinal()
+        streak = 0
+        while current in days:
+            streak += 1
+            current -= 1
+        return streak
+
+
+class JournalEntryConverter:
+    """Bulk conversion of journal_entries rows into JournalEntryResponse models."""
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _list_adapter() -> TypeAdapter:
+        # Built once: constructing the validator is far more expensive than using it
+        from app.models.journal import JournalEntryResponse
+        return TypeAdapter(List[JournalEntryResponse])
+    
+    @staticmethod
+    def from_rows(rows: Optional[List[Dict[str, Any]]], skip_invalid: bool = False) -> List[Any]:
+        """
+        Validate many rows in a single pydantic-core call.
+        
+        Replaces the per-row `ensure_updated_at(entry); JournalEntryResponse(**entry)`
+        loop: updated_at is defaulted in place and the whole list is validated at
+        once, avoiding per-row kwargs unpacking and model __init__ overhead.
+        
+        Args:
+            rows: Dictionaries as returned by Supabase (may be None)
+            skip_invalid: Drop rows that fail validation instead of raising
+            
+        Returns:
+            List of JournalEntryResponse models in row order
+        """
+        if not rows:
+            return []
+        
+        for row in rows:
+            DateTimeUtils.ensure_updated_at(row)
+        
+        adapter = JournalEntryConverter._list_adapter()
+        try:
+            return adapter.validate_python(rows)
+        except ValidationError:
+            if not skip_invalid:
+                raise
+        
+        # Slow path only when some row is bad: keep the valid ones
+        entries = []
+        for row in rows:
+            try:
+                entries.extend(adapter.validate_python([row]))
+            except ValidationError as e:
+                logger.warning(f"Skipping invalid journal entry {row.get('id')}: {e.error_count()} validation errors")
+        return entries
+    
+    @staticmethod
+    def from_row(row: Dict[str, Any]) -> Any:
+        """Single-row equivalent of from_rows (raises on invalid data)."""
+        return JournalEntryConverter.from_rows([row])[0]
 
 
 class SupabaseQueryUtils:
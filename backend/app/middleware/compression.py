@@ -0,0 +1,42 @@
+"""
+Compression Middleware
+GZip for regular responses that leaves Server-Sent Events uncompressed
+"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Streams whose chunks must reach the client as soon as they are written
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream",)
+
+
+class SSEAwareGZipResponder(GZipResponder):
+    """GZipResponder that passes streaming media types through untouched"""
+    
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            await super().send_with_gzip(message)
+            if content_type.startswith(UNCOMPRESSED_MEDIA_TYPES):
+                # Reuse the already-encoded passthrough: every body chunk is sent as is
+                self.content_encoding_set = True
+            return
+        await super().send_with_gzip(message)
+
+
+class SSEAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that skips text/event-stream
+    
+    Starlette's GZip (0.27) compresses streamed bodies without flushing, so SSE
+    frames sit in the compressor until enough bytes pile up and the client sees
+    nothing, heartbeats included. Event streams are sent uncompressed instead.
+    """
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = SSEAwareGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
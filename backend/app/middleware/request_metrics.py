@@ -0,0 +1,56 @@
+"""
+Request Metrics Middleware
+Records API response times into the persistent metrics store
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics_store import metrics_store
+
+# Probes and uptime checks would drown the real traffic
+EXCLUDED_PATHS = {"/health", "/health-fast", "/ready"}
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request to its response start
+    
+    Time to the first response message is recorded (not the full body), so
+    streamed responses such as SSE are measured by how fast they started.
+    Each sample is one api_response_time point tagged with the status class;
+    predictive monitoring reads these hourly rollups for latency trends.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("path") in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        recorded = False
+        
+        def record(status_code: int):
+            nonlocal recorded
+            recorded = True
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics_store.record("api_response_time", elapsed_ms, {"status": f"{status_code // 100}xx"})
+            
+            from app.core.monitoring import monitor
+            monitor.record_request_time(elapsed_ms)
+        
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and not recorded:
+                record(message["status"])
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not recorded:
+                record(500)
+            raise
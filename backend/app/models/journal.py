@@ -138,4 +138,50 @@ class AIReplyResponse(BaseModel):
 # AI Replies List Response
 class AIRepliesResponse(BaseModel):
     """Schema for list of AI replies"""
-    replies: List[AIReplyResponse] 
\ No newline at end of file
+    replies: List[AIReplyResponse]
+
+# Delta Sync Schemas
+class SyncTombstone(BaseModel):
+    """A row deleted since the client's cursor"""
+    table: str
+    id: str
+    journal_entry_id: Optional[str] = None
+    deleted_at: datetime
+
+class JournalSyncResponse(BaseModel):
+    """Rows created, updated or deleted since a sync cursor"""
+    journal_entries: List[Dict[str, Any]]
+    ai_insights: List[Dict[str, Any]]
+    ai_reactions: List[Dict[str, Any]]
+    ai_user_replies: List[Dict[str, Any]]
+    deleted: List[SyncTombstone]
+    cursor: str
+    has_more: bool
+    server_time: datetime
+
+# Batch Request Schemas
+BATCH_OPERATIONS = ("entry", "ai-insights", "all-ai-insights", "reactions", "replies")
+MAX_BATCH_OPERATIONS = 50
+
+class BatchOperation(BaseModel):
+    """One sub-request of POST /journal/batch, mirroring a GET /entries/{entry_id}/... endpoint"""
+    op: str = Field(..., pattern="^(entry|ai-insights|all-ai-insights|reactions|replies)$")
+    entry_id: str = Field(..., min_length=1, max_length=64)
+    id: Optional[str] = Field(None, max_length=64)  # Client label echoed back in the result
+
+class BatchRequest(BaseModel):
+    """Sub-requests answered together under one authentication and rate limit check"""
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+class BatchOperationResult(BaseModel):
+    """Outcome of one sub-request; data has the shape of the matching GET endpoint"""
+    id: Optional[str] = None
+    op: str
+    entry_id: str
+    status: int
+    data: Optional[Any] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    """Results in request order"""
+    results: List[BatchOperationResult]
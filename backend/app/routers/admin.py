@@ -8,19 +8,19 @@ Enhanced with deployment tracking and version verification
 from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from typing import Optional
 from datetime import date, datetime, timedelta, timezone
+import asyncio
 import os
 import subprocess
 from app.core.database import get_database, Database
-from app.services.cost_optimization import CostOptimizationService
+from app.core.json_response import FastJSONResponse
+from app.services.cost_optimization import cost_optimizer
 
-router = APIRouter()
+# Admin payloads (exports, analytics) are large: render them with orjson
+router = APIRouter(default_response_class=FastJSONResponse)
 
 # Secure admin authentication
 from app.core.security import verify_admin, limiter
 
-# Cost optimization service instance
-cost_optimizer = CostOptimizationService()
-
 @router.get("/debug/deployment/version")
 async def get_deployment_version():
     """
@@ -92,11 +92,11 @@ async def get_enhanced_deployment_health():
     Enhanced health check with deployment-specific validation
     """
     try:
-        from app.services.ai_debugging_service import AIDebuggingService
+        from app.core.health_collector import health_collector
         
-        # Run enhanced health check
-        debug_service = AIDebuggingService()
-        health = await debug_service.run_full_health_check()
+        # Latest enhanced health check from the health collector (refreshed on demand)
+        snapshot = await health_collector.get_or_refresh("ai_debugger")
+        health = await health_collector.get_value("ai_debugger")
         
         # Convert to serializable format
         health_data = {
@@ -115,6 +115,7 @@ async def get_enhanced_deployment_health():
                 "last_check": health.last_check.isoformat(),
                 "deployment_discrepancies": len([i for i in health.issues if i.type.value == "deployment_discrepancy"])
             },
+            "snapshot": snapshot.metadata(),
             "critical_issues": [
                 {
                     "type": issue.type.value,
@@ -420,19 +421,20 @@ async def export_beta_data(
         
         export_data = result.data if result.data else []
         
+        # Raw Supabase rows are already JSON-safe: skip jsonable_encoder
         if format.lower() == "csv":
-            return {
+            return FastJSONResponse({
                 "format": "csv_structure",
                 "data": export_data,
                 "note": "CSV conversion would be implemented here"
-            }
+            })
         else:
-            return {
+            return FastJSONResponse({
                 "format": "json",
                 "period_days": days_back,
                 "record_count": len(export_data),
                 "data": export_data
-            }
+            })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error exporting data: {str(e)}")
@@ -447,7 +449,8 @@ async def get_cost_optimization_metrics(
     Get comprehensive cost optimization metrics and performance stats
     """
     try:
-        metrics = cost_optimizer.get_cost_metrics()
+        # Includes the response cache status (SQLite scans): off the event loop
+        metrics = await asyncio.to_thread(cost_optimizer.get_cost_metrics)
         
         return {
             "status": "success",
@@ -486,46 +489,32 @@ async def get_cache_status(
     Get detailed cache status and performance metrics
     """
     try:
-        cache_size = len(cost_optimizer.response_cache)
-        
-        # Calculate cache statistics
-        if cost_optimizer.response_cache:
-            cache_entries = list(cost_optimizer.response_cache.values())
-            avg_usage = sum(entry.usage_count for entry in cache_entries) / len(cache_entries)
-            oldest_entry = min(cache_entries, key=lambda x: x.created_at)
-            newest_entry = max(cache_entries, key=lambda x: x.created_at)
-            
-            # Group by model used
-            model_distribution = {}
-            complexity_distribution = {}
-            
-            for entry in cache_entries:
-                model = entry.model_used
-                complexity = entry.complexity
-                
-                model_distribution[model] = model_distribution.get(model, 0) + 1
-                complexity_distribution[complexity] = complexity_distribution.get(complexity, 0) + 1
-        else:
-            avg_usage = 0
-            oldest_entry = newest_entry = None
-            model_distribution = {}
-            complexity_distribution = {}
+        # Combined view of this worker's in-memory tier and the shared disk tier (SQLite reads: off the event loop)
+        status = await asyncio.to_thread(cost_optimizer.response_cache.get_status)
+        cache_size = status["total_entries"]
+        capacity = status["disk"]["max_entries"] if status["disk"]["enabled"] else status["l1"]["max_entries"]
         
         return {
             "cache_status": {
                 "total_entries": cache_size,
-                "max_capacity": cost_optimizer.max_cache_size,
-                "utilization_percent": round((cache_size / cost_optimizer.max_cache_size) * 100, 2),
-                "average_usage_per_entry": round(avg_usage, 2),
-                "ttl_hours": cost_optimizer.cache_ttl_hours
+                "max_capacity": capacity,
+                "utilization_percent": round((cache_size / capacity) * 100, 2),
+                "average_usage_per_entry": status["average_usage_per_entry"],
+                "ttl_hours": cost_optimizer.cache_ttl_hours,
+                "hit_rate": status["hit_rate"]
+            },
+            "cache_tiers": {
+                "memory": status["l1"],
+                "disk": status["disk"],
+                "misses": status["misses"]
             },
             "cache_distribution": {
-                "by_model": model_distribution,
-                "by_complexity": complexity_distribution
+                "by_model": status["by_model"],
+                "by_complexity": status["by_complexity"]
             },
             "cache_timeline": {
-                "oldest_entry": oldest_entry.created_at.isoformat() if oldest_entry else None,
-                "newest_entry": newest_entry.created_at.isoformat() if newest_entry else None
+                "oldest_entry": status["oldest_entry"],
+                "newest_entry": status["newest_entry"]
             },
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
@@ -541,8 +530,7 @@ async def clear_response_cache(
     Clear the response cache (for testing or maintenance)
     """
     try:
-        cache_size_before = len(cost_optimizer.response_cache)
-        cost_optimizer.response_cache.clear()
+        cache_size_before = await asyncio.to_thread(cost_optimizer.clear_cache)
         
         return {
             "status": "success",
@@ -1,24 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 import logging
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional
 from app.core.database import get_database, Database
-from app.core.security import get_current_user, get_current_user_with_fallback
+from app.core.security import get_current_user, get_current_user_with_fallback, limiter
+from app.core.json_response import FastJSONResponse
+from app.core.projections import ENTRY_EXISTS, ENTRY_LISTING, ENTRY_TIMELINE, INSIGHT_EXISTS, PROFILE_EXISTS
 import asyncio
 import json
 
 # Setup
-router = APIRouter(prefix="/api/v1/admin", tags=["admin_monitoring"])
-limiter = Limiter(key_func=get_remote_address)
+router = APIRouter(prefix="/api/v1/admin", tags=["admin_monitoring"], default_response_class=FastJSONResponse)
 logger = logging.getLogger(__name__)
 
-# Add rate limit exceeded handler
-router.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 @router.get("/comprehensive-logs/{user_id}")
 @limiter.limit("10/minute")
 async def get_comprehensive_user_logs(
@@ -118,7 +113,8 @@ async def get_comprehensive_user_logs(
         
         logger.info(f"🔥 Admin comprehensive logs generated for user {user_id}")
         
-        return comprehensive_logs
+        # Full user history can be large: skip jsonable_encoder
+        return FastJSONResponse(comprehensive_logs)
         
     except Exception as e:
         logger.error(f"Failed to get comprehensive logs for user {user_id}: {e}")
@@ -251,7 +247,8 @@ async def system_debugging_interface(
             
             for table in tables:
                 try:
-                    result = client.table(table).select("*", count="exact").execute()
+                    # count is exact regardless of the limit; one row is enough for the sample
+                    result = client.table(table).select("*", count="exact").limit(1).execute()
                     table_stats[table] = {
                         "total_records": result.count if hasattr(result, 'count') else len(result.data) if result.data else 0,
                         "status": "accessible",
@@ -355,7 +352,7 @@ async def trigger_immediate_ai_for_user(
         client = db.get_service_client()
         
         # Get user's most recent journal entry
-        recent_entry = client.table("journal_entries").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(1).execute()
+        recent_entry = ENTRY_LISTING.execute(ENTRY_LISTING.select(client).eq("user_id", user_id).order("created_at", desc=True).limit(1))
         
         if not recent_entry.data:
             raise HTTPException(status_code=404, detail=f"No journal entries found for user {user_id}")
@@ -364,7 +361,7 @@ async def trigger_immediate_ai_for_user(
         entry_id = entry["id"]
         
         # Check if AI response already exists
-        existing_ai = client.table("ai_insights").select("*").eq("journal_entry_id", entry_id).execute()
+        existing_ai = INSIGHT_EXISTS.execute(INSIGHT_EXISTS.select(client).eq("journal_entry_id", entry_id))
         
         # Trigger immediate AI response via scheduler
         try:
@@ -429,14 +426,15 @@ async def get_admin_monitoring_dashboard(
         client = db.get_service_client()
         
         # Get overview statistics
-        total_users = client.table("profiles").select("*", count="exact").execute()
-        total_entries = client.table("journal_entries").select("*", count="exact").execute()
-        total_ai_responses = client.table("ai_insights").select("*", count="exact").execute()
+        # Exact counts with a one-row body instead of every row of every table
+        total_users = PROFILE_EXISTS.execute(PROFILE_EXISTS.select(client, count="exact").limit(1))
+        total_entries = ENTRY_EXISTS.execute(ENTRY_EXISTS.select(client, count="exact").limit(1))
+        total_ai_responses = INSIGHT_EXISTS.execute(INSIGHT_EXISTS.select(client, count="exact").limit(1))
         
         # Get recent activity (last 24 hours)
         recent_cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
-        recent_entries = client.table("journal_entries").select("*").gte("created_at", recent_cutoff.isoformat()).execute()
-        recent_ai = client.table("ai_insights").select("*").gte("created_at", recent_cutoff.isoformat()).execute()
+        recent_entries = ENTRY_TIMELINE.execute(ENTRY_TIMELINE.select(client).gte("created_at", recent_cutoff.isoformat()))
+        recent_ai = INSIGHT_EXISTS.execute(INSIGHT_EXISTS.select(client).gte("created_at", recent_cutoff.isoformat()))
         
         # Calculate metrics
         ai_response_rate = (len(recent_ai.data) / len(recent_entries.data) * 100) if recent_entries.data else 0
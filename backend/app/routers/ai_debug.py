@@ -11,6 +11,7 @@ from datetime import datetime
 from ..core.security import limiter
 from ..services.ai_debugging_service import ai_debugger, SystemHealth, Issue
 from ..services.service_initialization_validator import service_validator
+from ..core.health_collector import health_collector
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai-debug", tags=["ai-debugging"])
@@ -27,12 +28,13 @@ async def run_health_check(request: Request):
     - Verification steps for each issue
     """
     try:
-        logger.info("🔍 Running AI health check...")
-        health = await ai_debugger.run_full_health_check()
+        snapshot = await health_collector.get_or_refresh("ai_debugger")
+        health = await health_collector.get_value("ai_debugger")
         
         return {
             "status": "success",
             "timestamp": health.last_check.isoformat(),
+            "snapshot": snapshot.metadata(),
             "system_health": {
                 "frontend": health.frontend_status,
                 "backend": health.backend_status,
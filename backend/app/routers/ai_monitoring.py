@@ -392,6 +392,7 @@ async def trigger_ai_response(
     try:
         from app.services.adaptive_ai_service import AdaptiveAIService
         from app.models.journal import JournalEntryResponse
+        from app.core.utils import JournalEntryConverter
         
         client = db.get_service_client()
         
@@ -419,7 +420,7 @@ async def trigger_ai_response(
         
         # Get user's journal history for context
         history_result = client.table("journal_entries").select("*").eq("user_id", journal_entry.user_id).order("created_at", desc=True).limit(10).execute()
-        journal_history = [JournalEntryResponse(**entry) for entry in history_result.data] if history_result.data else []
+        journal_history = JournalEntryConverter.from_rows(history_result.data)
         
         # Generate AI response
         ai_response = await adaptive_ai.generate_adaptive_response(
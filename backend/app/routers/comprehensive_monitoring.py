@@ -14,6 +14,7 @@ import statistics
 
 from app.core.database import get_database, Database
 from app.core.monitoring import monitor
+from app.core.health_collector import health_collector
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/comprehensive-monitoring", tags=["Comprehensive Monitoring"])
@@ -311,8 +312,8 @@ class ComprehensiveMonitoringSystem:
     async def _check_system_health(self) -> Dict[str, Any]:
         """Check current system health"""
         try:
-            # Get current health from monitoring system
-            health_check = monitor.check_system_health()
+            # Latest health snapshot from the background collector
+            health_check = await health_collector.get_value("system_health")
             
             return {
                 "overall_status": health_check.overall_status,
@@ -522,16 +523,18 @@ async def run_complete_analysis(
 
 @router.get("/quick-health-check")
 async def quick_health_check():
-    """Quick health check for immediate status"""
+    """Quick health check for immediate status (served from the background health snapshot)"""
     try:
-        health_status = monitor.check_system_health()
+        snapshot = await health_collector.get_or_refresh("system_health")
+        health_status = await health_collector.get_value("system_health")
         
         return {
             "status": health_status.overall_status,
             "timestamp": datetime.utcnow().isoformat(),
             "components": health_status.components,
             "alerts": health_status.alerts,
-            "quick_check": True
+            "quick_check": True,
+            "snapshot": snapshot.metadata()
         }
         
     except Exception as e:
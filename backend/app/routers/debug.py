@@ -16,6 +16,7 @@ import importlib
 
 from ..core.security import limiter
 from ..core.database import Database, get_database
+from ..core.json_response import FastJSONResponse
 
 # Try to import middleware, fallback if not available
 try:
@@ -125,7 +126,7 @@ except ImportError as e:
 import sys
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["debugging"])
+router = APIRouter(tags=["debugging"], default_response_class=FastJSONResponse)
 
 @router.get("/summary")
 @limiter.limit("20/minute")
@@ -1769,12 +1770,12 @@ async def get_claude_debugging_context(
         print(f"✅ Claude debugging context generated successfully: {context['claude_debug_session']['session_id']}")
         sys.stdout.flush()
         
-        return {
+        return FastJSONResponse({
             "status": "success",
             "optimized_for": "Claude Sonnet",
             "debug_efficiency": "single_call_complete_context",
             "context": context
-        }
+        })
         
     except Exception as e:
         error_msg = f"❌ Error in Claude debugging context: {str(e)}"
@@ -3,12 +3,13 @@ Debugging Router
 AI-Optimized debugging endpoints for system diagnostics and self-healing
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import Dict, Any
 import logging
 
 from app.services.debugging_service import debugging_service, DiagnosticReport
 from app.core.database import get_database
+from app.core.health_collector import health_collector
 from app.models.common import StandardResponse
 
 logger = logging.getLogger(__name__)
@@ -30,11 +31,21 @@ async def get_system_health():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/diagnostics", response_model=DiagnosticReport)
-async def run_diagnostics():
-    """Run comprehensive system diagnostics with auto-fix capabilities"""
+async def run_diagnostics(response: Response, auto_fix: bool = False):
+    """
+    Comprehensive system diagnostics with auto-fix capabilities
+    
+    Returns the health collector's cached read-only report (refreshed on demand)
+    with its age in X-Health-Snapshot-Age; auto_fix=true runs a fresh pass that
+    also applies the auto-fixes.
+    """
     try:
-        logger.info("Running comprehensive diagnostics")
-        report = await debugging_service.run_comprehensive_diagnostics()
+        if auto_fix:
+            logger.info("Running comprehensive diagnostics with auto-fixes")
+            return await debugging_service.run_comprehensive_diagnostics()
+        snapshot = await health_collector.get_or_refresh("comprehensive_diagnostics")
+        report = await health_collector.get_value("comprehensive_diagnostics")
+        response.headers["X-Health-Snapshot-Age"] = f"{snapshot.age_seconds:.2f}"
         return report
     except Exception as e:
         logger.error(f"Diagnostics failed: {e}")
@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, WebSocket, WebSocketDisconnect
+from typing import List, Optional, Set
 import uuid
 from datetime import datetime, timezone
 import logging
 import json
 import asyncio
 from fastapi import status
+from fastapi.responses import StreamingResponse
 
 from app.models.journal import (
     JournalEntryCreate, JournalEntryResponse, JournalEntriesResponse,
-    JournalStats, JournalEntryUpdate, AIFeedbackCreate, AIReplyCreate, AIReplyResponse, AIRepliesResponse
+    JournalStats, JournalEntryUpdate, AIFeedbackCreate, AIReplyCreate, AIReplyResponse, AIRepliesResponse,
+    JournalSyncResponse, BatchRequest, BatchResponse, BatchOperationResult
 )
 from app.models.ai_insights import PulseResponse, AIAnalysisResponse, AIInsightResponse, StructuredAIPersonaResponse, MultiPersonaStructuredResponse
 from app.services.pulse_ai import PulseAI
@@ -18,11 +20,22 @@ from app.services.user_pattern_analyzer import UserPatternAnalyzer
 from app.services.weekly_summary_service import WeeklySummaryService, SummaryType
 from app.services.structured_ai_service import StructuredAIService
 from app.services.streaming_ai_service import StreamingAIService
+from app.services.stream_relay import SSE_HEARTBEAT, sse_message, sse_retry, stream_relay
 from app.services.async_multi_persona_service import AsyncMultiPersonaService
 from app.services.ai_response_probability_service import AIResponseProbabilityService, ResponseType
+from app.services.journal_sync_service import JournalSyncService, InvalidSyncCursor, DEFAULT_SYNC_LIMIT, MAX_SYNC_LIMIT
+from app.services.journal_repository import JournalEntryRepository
+from app.services.request_deadline import DeadlineExceeded, deadline_after, request_deadline
+from app.core.config import settings
 from app.core.database import get_database, Database
 from app.core.security import get_current_user, get_current_user_with_fallback, limiter, validate_input_length, sanitize_user_input
-from app.core.utils import DateTimeUtils
+from app.core.utils import DateTimeUtils, JournalEntryConverter
+from app.core.json_response import FastJSONResponse
+from app.core.http_cache import make_etag, etag_matches, not_modified, set_cache_headers, table_version, CACHE_CONTROL_SHORT
+from app.core.async_logging import truncate_for_log
+from app.core.projections import (
+    ENTRY_AI_CONTEXT, ENTRY_LISTING, ENTRY_STATS, INSIGHT_AI_CONTEXT, REACTION_LISTING, REPLY_LISTING,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -75,12 +88,124 @@ def get_adaptive_ai_service(db: Database = Depends(get_database)):
 def get_structured_ai_service():
     return StructuredAIService()
 
-def get_streaming_ai_service():
-    return StreamingAIService()
+def get_streaming_ai_service(db: Database = Depends(get_database)):
+    return StreamingAIService(db)
 
 def get_async_multi_persona_service():
     return AsyncMultiPersonaService()
 
+# Response shaping shared by the single-resource endpoints and /batch
+def _ai_insight_payload(ai_insight: dict) -> dict:
+    """Public fields of one ai_insights row"""
+    return {
+        "id": ai_insight["id"],
+        "journal_entry_id": ai_insight["journal_entry_id"],
+        "ai_response": ai_insight["ai_response"],
+        "persona_used": ai_insight["persona_used"],
+        "topic_flags": ai_insight["topic_flags"],
+        "confidence_score": ai_insight["confidence_score"],
+        "created_at": ai_insight["created_at"]
+    }
+
+def _all_ai_insights_payload(ai_insights: List[dict]) -> dict:
+    """All persona insights for an entry (rows in created_at order)"""
+    if not ai_insights:
+        return {"insights": [], "message": "No AI insights found for this entry"}
+    
+    # Transform the data to include persona-specific information
+    insights = []
+    for ai_insight in ai_insights:
+        insight = _ai_insight_payload(ai_insight)
+        insight["topic_flags"] = insight["topic_flags"] or []
+        insights.append(insight)
+    
+    return {
+        "insights": insights,
+        "total_personas": len(insights),
+        "personas_responded": list(set(i["persona_used"] for i in insights))
+    }
+
+def _ai_insight_row(entry_id: str, user_id: str, ai_response: AIInsightResponse) -> dict:
+    """ai_insights row for a generated persona response"""
+    return {
+        "id": str(uuid.uuid4()),
+        "journal_entry_id": entry_id,
+        "user_id": user_id,
+        "ai_response": ai_response.insight,
+        "persona_used": ai_response.persona_used,
+        "topic_flags": ai_response.topic_flags,
+        "confidence_score": ai_response.confidence_score,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+# Replies that missed the request deadline, stored after the response went out
+_late_ai_tasks: Set[asyncio.Task] = set()
+
+def _schedule_late_ai_response(
+    late_response: asyncio.Future,
+    service_client,
+    journal_entry: JournalEntryResponse,
+    persona: str
+) -> None:
+    """Store the entry's reply in ai_insights once the completion that missed the deadline arrives"""
+    task = asyncio.create_task(_deliver_late_ai_response(late_response, service_client, journal_entry, persona))
+    _late_ai_tasks.add(task)
+    task.add_done_callback(_late_ai_tasks.discard)
+
+async def _deliver_late_ai_response(
+    late_response: asyncio.Future,
+    service_client,
+    journal_entry: JournalEntryResponse,
+    persona: str
+) -> None:
+    try:
+        # The same completion the request gave up on (no second request); no deadline applies
+        ai_response = await late_response
+        row = _ai_insight_row(journal_entry.id, journal_entry.user_id, ai_response)
+        await asyncio.to_thread(lambda: service_client.table("ai_insights").insert(row).execute())
+        logger.info(f"📬 Delivered late {persona} response for entry {journal_entry.id}")
+    except Exception as e:
+        logger.error(f"Failed to deliver late AI response for entry {journal_entry.id}: {e}")
+
+def _reactions_payload(reactions: List[dict], user_id: str) -> dict:
+    """Reaction counts per insight, AI persona likes and the caller's own reactions"""
+    # Group reactions by insight_id
+    reactions_by_insight = {}
+    user_reactions = {}
+    
+    for reaction in reactions:
+        insight_id = reaction["ai_insight_id"]
+        
+        # Track user's own reactions separately
+        if reaction["user_id"] == user_id and reaction["reaction_by"] == "user":
+            user_reactions[insight_id] = reaction["reaction_type"]
+        
+        # Group all reactions by insight
+        if insight_id not in reactions_by_insight:
+            reactions_by_insight[insight_id] = {
+                "helpful": 0,
+                "not_helpful": 0,
+                "like": 0,
+                "love": 0,
+                "insightful": 0,
+                "ai_likes": []
+            }
+        
+        if reaction["reaction_by"] == "user":
+            reactions_by_insight[insight_id][reaction["reaction_type"]] += 1
+        else:
+            # AI persona reactions
+            reactions_by_insight[insight_id]["ai_likes"].append({
+                "persona": reaction["reaction_by"],
+                "type": reaction["reaction_type"]
+            })
+    
+    return {
+        "reactions_by_insight": reactions_by_insight,
+        "user_reactions": user_reactions,
+        "total_reactions": len(reactions)
+    }
+
 @router.get("/test")
 async def test_journal_router():
     """Test endpoint to verify router is working"""
@@ -258,6 +383,8 @@ async def create_journal_entry(
     This is the core MVP endpoint - where users submit their daily wellness check-ins
     Now includes automatic AI persona commenting for better user engagement
     """
+    # The AI reply gets what is left of AI_INTERACTIVE_DEADLINE_MS after the entry is stored
+    ai_deadline = deadline_after(settings.AI_INTERACTIVE_DEADLINE_MS)
     try:
         # Input validation and sanitization
         logger.info(f"Creating journal entry for user {current_user.get('id', 'unknown')}")
@@ -301,7 +428,7 @@ async def create_journal_entry(
             "updated_at": datetime.now(timezone.utc).isoformat()
         }
         
-        logger.info(f"Journal entry data prepared: {entry_data}")
+        logger.debug("Journal entry data prepared: %s", truncate_for_log(entry_data))
         
         # Insert into Supabase using sync client
         result = client.table("journal_entries").insert(entry_data).execute()
@@ -313,14 +440,14 @@ async def create_journal_entry(
         
         # Convert to response model (map database column names to model field names)
         created_entry = result.data[0]
-        logger.info(f"Creating JournalEntryResponse from: {created_entry}")
+        logger.debug("Creating JournalEntryResponse from: %s", truncate_for_log(created_entry))
         
         try:
             journal_entry_response = JournalEntryResponse(**created_entry)
-            logger.info(f"JournalEntryResponse created successfully")
+            logger.debug("JournalEntryResponse created successfully")
         except Exception as model_error:
             logger.error(f"Failed to create JournalEntryResponse: {model_error}")
-            logger.error(f"Data from database: {created_entry}")
+            logger.error("Data from database: %s", truncate_for_log(created_entry))
             raise
         
         # 🔥 FIXED: Generate ONE AI persona response after journal creation
@@ -339,12 +466,10 @@ async def create_journal_entry(
                 return journal_entry_response
             
             # Get journal history for context (last 5 entries) 
-            history_result = service_client.table("journal_entries").select("*").eq("user_id", current_user["id"]).order("created_at", desc=True).limit(5).execute()
-            journal_history = []
-            if history_result.data:
-                for entry in history_result.data[1:]:  # Skip the current entry
-                    entry = DateTimeUtils.ensure_updated_at(entry)
-                    journal_history.append(JournalEntryResponse(**entry))
+            history_result = ENTRY_AI_CONTEXT.execute(
+                ENTRY_AI_CONTEXT.select(service_client).eq("user_id", current_user["id"]).order("created_at", desc=True).limit(5)
+            )
+            journal_history = JournalEntryConverter.from_rows((history_result.data or [])[1:])  # Skip the current entry
             
             # Select ONE optimal persona based on content
             content_lower = journal_entry_response.content.lower()
@@ -364,24 +489,32 @@ async def create_journal_entry(
             
             # Generate AI response from the selected persona
             try:
-                ai_response = await adaptive_ai.generate_adaptive_response(
-                    user_id=current_user["id"],
-                    journal_entry=journal_entry_response,
-                    journal_history=journal_history,
-                    persona=selected_persona
-                )
+                # Deliver-later keeps a completion that misses the deadline running instead of cancelling it
+                with request_deadline(ai_deadline, keep_late=settings.AI_DEADLINE_DELIVER_LATER):
+                    ai_response = await adaptive_ai.generate_adaptive_response(
+                        user_id=current_user["id"],
+                        journal_entry=journal_entry_response,
+                        journal_history=journal_history,
+                        persona=selected_persona
+                    )
+                
+                if settings.AI_DEADLINE_DELIVER_LATER and (ai_response.metadata or {}).get("deadline_exceeded"):
+                    # Return the entry now; the real reply is stored (and picked up by the client) when it arrives
+                    logger.info(f"⏰ AI response for entry {journal_entry_response.id} missed the deadline, delivering later")
+                    late_response = adaptive_ai.take_late_response(journal_entry_response.id)
+                    if late_response is None:
+                        # No completion was in flight (the deadline expired between attempts): generate one
+                        late_response = asyncio.ensure_future(adaptive_ai.generate_adaptive_response(
+                            user_id=current_user["id"],
+                            journal_entry=journal_entry_response,
+                            journal_history=journal_history,
+                            persona=selected_persona
+                        ))
+                    _schedule_late_ai_response(late_response, service_client, journal_entry_response, selected_persona)
+                    return journal_entry_response
                 
                 # Store AI response in database
-                ai_insight_data = {
-                    "id": str(uuid.uuid4()),
-                    "journal_entry_id": journal_entry_response.id,
-                    "user_id": current_user["id"],
-                    "ai_response": ai_response.insight,
-                    "persona_used": ai_response.persona_used,
-                    "topic_flags": ai_response.topic_flags,
-                    "confidence_score": ai_response.confidence_score,
-                    "created_at": datetime.now(timezone.utc).isoformat()
-                }
+                ai_insight_data = _ai_insight_row(journal_entry_response.id, current_user["id"], ai_response)
                 
                 # Insert AI response into ai_insights table using service role
                 ai_result = service_client.table("ai_insights").insert(ai_insight_data).execute()
@@ -452,6 +585,7 @@ async def create_journal_entry(
 @limiter.limit("30/minute")  # Rate limit AI insights requests
 async def get_ai_insights_for_entry(
     request: Request,  # Required for rate limiter
+    response: Response,
     entry_id: str,
     db: Database = Depends(get_database),
     current_user: dict = Depends(get_current_user_with_fallback)
@@ -473,15 +607,12 @@ async def get_ai_insights_for_entry(
         
         ai_insight = result.data[0]
         
-        return {
-            "id": ai_insight["id"],
-            "journal_entry_id": ai_insight["journal_entry_id"],
-            "ai_response": ai_insight["ai_response"],
-            "persona_used": ai_insight["persona_used"],
-            "topic_flags": ai_insight["topic_flags"],
-            "confidence_score": ai_insight["confidence_score"],
-            "created_at": ai_insight["created_at"]
-        }
+        etag = make_etag("ai-insight", current_user["id"], entry_id, ai_insight["id"], ai_insight.get("updated_at") or ai_insight["created_at"])
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
+        
+        return _ai_insight_payload(ai_insight)
         
     except HTTPException:
         raise
@@ -506,12 +637,15 @@ async def get_pulse_response(
     - Cost tracking and analytics
     - Personalized responses based on history
     """
+    ai_deadline = deadline_after(settings.AI_INTERACTIVE_DEADLINE_MS)
     try:
         # Get the database client
         client = db.get_client()
         
         # Get the journal entry
-        result = client.table("journal_entries").select("*").eq("id", entry_id).eq("user_id", current_user["id"]).single().execute()
+        result = ENTRY_LISTING.execute(
+            ENTRY_LISTING.select(client).eq("id", entry_id).eq("user_id", current_user["id"]).single()
+        )
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Journal entry not found")
@@ -522,11 +656,12 @@ async def get_pulse_response(
             
         journal_entry = JournalEntryResponse(**entry_data)
         
-        # Use beta-optimized AI response generation
-        pulse_response, success, error_message = await pulse_ai.generate_beta_optimized_response(
-            user_id=current_user["id"],
-            journal_entry=journal_entry
-        )
+        # Use beta-optimized AI response generation (smart fallback once the deadline expires)
+        with request_deadline(ai_deadline):
+            pulse_response, success, error_message = await pulse_ai.generate_beta_optimized_response(
+                user_id=current_user["id"],
+                journal_entry=journal_entry
+            )
         
         if not success and error_message == "Rate limit exceeded":
             # Return rate limit response with specific status code
@@ -666,6 +801,7 @@ async def submit_reaction(
 @limiter.limit("60/minute")  # Rate limit reaction queries
 async def get_reactions(
     request: Request,  # Required for rate limiter
+    response: Response,
     entry_id: str,
     db: Database = Depends(get_database),
     current_user: dict = Depends(get_current_user_with_fallback)
@@ -677,46 +813,17 @@ async def get_reactions(
         # Use authenticated client to respect RLS
         client = db.get_client()
         
-        # Get all reactions for this entry
-        reactions_result = client.table("ai_reactions").select("*").eq("journal_entry_id", entry_id).execute()
-        
-        # Group reactions by insight_id
-        reactions_by_insight = {}
-        user_reactions = {}
+        # Conditional GET: a count + max(updated_at) probe decides before fetching and aggregating
+        version = table_version(client, "ai_reactions", {"journal_entry_id": entry_id})
+        etag = make_etag("reactions", current_user["id"], entry_id, *version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
         
-        if reactions_result.data:
-            for reaction in reactions_result.data:
-                insight_id = reaction["ai_insight_id"]
-                
-                # Track user's own reactions separately
-                if reaction["user_id"] == current_user["id"] and reaction["reaction_by"] == "user":
-                    user_reactions[insight_id] = reaction["reaction_type"]
-                
-                # Group all reactions by insight
-                if insight_id not in reactions_by_insight:
-                    reactions_by_insight[insight_id] = {
-                        "helpful": 0,
-                        "not_helpful": 0,
-                        "like": 0,
-                        "love": 0,
-                        "insightful": 0,
-                        "ai_likes": []
-                    }
-                
-                if reaction["reaction_by"] == "user":
-                    reactions_by_insight[insight_id][reaction["reaction_type"]] += 1
-                else:
-                    # AI persona reactions
-                    reactions_by_insight[insight_id]["ai_likes"].append({
-                        "persona": reaction["reaction_by"],
-                        "type": reaction["reaction_type"]
-                    })
+        # Get all reactions for this entry
+        reactions_result = REACTION_LISTING.execute(REACTION_LISTING.select(client).eq("journal_entry_id", entry_id))
         
-        return {
-            "reactions_by_insight": reactions_by_insight,
-            "user_reactions": user_reactions,
-            "total_reactions": len(reactions_result.data) if reactions_result.data else 0
-        }
+        return _reactions_payload(reactions_result.data or [], current_user["id"])
         
     except Exception as e:
         logger.error(f"Error fetching reactions: {str(e)}")
@@ -776,7 +883,7 @@ async def submit_ai_reply(
         # 🚀 NEW: Trigger AI response to user's comment
         try:
             # Check if there's already an AI response from the proactive scheduler
-            existing_ai_responses = service_client.table("ai_insights").select("*").eq("journal_entry_id", entry_id).execute()
+            existing_ai_responses = INSIGHT_AI_CONTEXT.execute(INSIGHT_AI_CONTEXT.select(service_client).eq("journal_entry_id", entry_id))
             
             # If there are already AI responses from the proactive scheduler, don't create duplicates
             if existing_ai_responses.data:
@@ -799,7 +906,7 @@ async def submit_ai_reply(
             multi_persona_service = MultiPersonaService(db)
             
             # Get existing replies to avoid duplicate responses
-            existing_replies = service_client.table("ai_user_replies").select("*").eq("journal_entry_id", entry_id).order("created_at").execute()
+            existing_replies = REPLY_LISTING.execute(REPLY_LISTING.select(service_client).eq("journal_entry_id", entry_id).order("created_at"))
             
             # Check if an AI persona should respond to this comment
             selected_persona = await multi_persona_service.should_persona_respond_to_comment(
@@ -812,13 +919,13 @@ async def submit_ai_reply(
             
             if selected_persona:
                 # Get the journal entry for context
-                journal_result = service_client.table("journal_entries").select("*").eq("id", entry_id).single().execute()
+                journal_result = ENTRY_LISTING.execute(ENTRY_LISTING.select(service_client).eq("id", entry_id).single())
                 
                 if journal_result.data:
                     journal_entry = JournalEntryResponse(**journal_result.data)
                     
                     # Get previous AI responses for context
-                    ai_responses = service_client.table("ai_insights").select("*").eq("journal_entry_id", entry_id).execute()
+                    ai_responses = INSIGHT_AI_CONTEXT.execute(INSIGHT_AI_CONTEXT.select(service_client).eq("journal_entry_id", entry_id))
                     previous_ai_text = ""
                     if ai_responses.data:
                         for resp in ai_responses.data:
@@ -886,6 +993,7 @@ Keep it brief and friendly - this is a back-and-forth conversation, not a full a
 @limiter.limit("60/minute")  # Rate limit reply retrieval
 async def get_ai_replies(
     request: Request,  # Required for rate limiter
+    response: Response,
     entry_id: str,
     db: Database = Depends(get_database),
     current_user: dict = Depends(get_current_user_with_fallback)
@@ -922,8 +1030,17 @@ async def get_ai_replies(
         if not entry_result.data:
             raise HTTPException(status_code=404, detail="Journal entry not found")
         
+        # Conditional GET: skip fetching and serializing replies the client already has
+        version = table_version(client, "ai_user_replies", {"journal_entry_id": entry_id, "user_id": current_user["id"]})
+        etag = make_etag("replies", current_user["id"], entry_id, *version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
+        
         # ONLY get user replies - NOT AI insights
-        replies_result = client.table("ai_user_replies").select("*").eq("journal_entry_id", entry_id).eq("user_id", current_user["id"]).order("created_at", desc=False).execute()
+        replies_result = REPLY_LISTING.execute(
+            REPLY_LISTING.select(client).eq("journal_entry_id", entry_id).eq("user_id", current_user["id"]).order("created_at", desc=False)
+        )
         
         # Convert to response format
         replies = []
@@ -964,7 +1081,7 @@ async def get_ai_analysis(
         client = db.get_client()
         
         # Get the journal entry
-        result = client.table("journal_entries").select("*").eq("id", entry_id).eq("user_id", current_user["id"]).single().execute()
+        result = ENTRY_LISTING.execute(ENTRY_LISTING.select(client).eq("id", entry_id).eq("user_id", current_user["id"]).single())
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Journal entry not found")
@@ -978,15 +1095,10 @@ async def get_ai_analysis(
         # Get user history if requested (simplified for beta)
         user_history = None
         if include_history:
-            history_result = client.table("journal_entries").select("*").eq("user_id", current_user["id"]).order("created_at", desc=True).limit(5).execute()
+            history_result = ENTRY_AI_CONTEXT.execute(ENTRY_AI_CONTEXT.select(client).eq("user_id", current_user["id"]).order("created_at", desc=True).limit(5))
             
             if history_result.data:
-                user_history = []
-                for entry in history_result.data:
-                    # Ensure updated_at field exists for each history entry
-                    entry = DateTimeUtils.ensure_updated_at(entry)
-                    
-                    user_history.append(JournalEntryResponse(**entry))
+                user_history = JournalEntryConverter.from_rows(history_result.data)
 
         # Generate analysis
         analysis_response = await pulse_ai.get_comprehensive_analysis(
@@ -1006,6 +1118,7 @@ async def get_ai_analysis(
 @limiter.limit("60/minute")  # Rate limit entry retrieval
 async def get_journal_entries(
     request: Request,
+    response: Response,
     page: int = 1,
     per_page: int = 10,
     db: Database = Depends(get_database),
@@ -1043,9 +1156,13 @@ async def get_journal_entries(
         # Calculate offset
         offset = (page - 1) * per_page
         
-        # Get total count first
-        count_result = client.table("journal_entries").select("id", count="exact").eq("user_id", current_user["id"]).execute()
-        total = count_result.count if count_result.count else 0
+        # Total count and newest change in one probe; with the insights probe this versions every page
+        total, entries_updated_at = table_version(client, "journal_entries", {"user_id": current_user["id"]})
+        insights_version = table_version(client, "ai_insights", {"user_id": current_user["id"]})
+        etag = make_etag("entries", current_user["id"], page, per_page, total, entries_updated_at, *insights_version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
         
         # If no entries, return empty response
         if total == 0:
@@ -1070,42 +1187,13 @@ async def get_journal_entries(
                 has_prev=page > 1
             )
         
-        # Get entries with pagination - use proper range
-        result = client.table("journal_entries").select("*").eq("user_id", current_user["id"]).order("created_at", desc=True).range(offset, offset + per_page - 1).execute()
+        # Entries with their AI insights embedded, in one request (total is already known)
+        rows, _ = JournalEntryRepository(client).get_entries_with_insights(
+            current_user["id"], offset, per_page, insights_desc=True, with_total=False
+        )
         
-        # Convert to response models and handle missing updated_at field
-        entries = []
-        if result.data:
-            # Get all entry IDs for batch fetching AI insights
-            entry_ids = [entry['id'] for entry in result.data]
-            
-            # Fetch AI insights for all entries at once
-            ai_insights_result = client.table("ai_insights").select("*").eq("user_id", current_user["id"]).in_("journal_entry_id", entry_ids).order("created_at", desc=True).execute()
-            
-            # Group AI insights by journal entry ID
-            ai_insights_by_entry = {}
-            if ai_insights_result.data:
-                for insight in ai_insights_result.data:
-                    entry_id = insight['journal_entry_id']
-                    if entry_id not in ai_insights_by_entry:
-                        ai_insights_by_entry[entry_id] = []
-                    ai_insights_by_entry[entry_id].append({
-                        'id': insight['id'],
-                        'ai_response': insight['ai_response'],
-                        'persona_used': insight['persona_used'],
-                        'topic_flags': insight.get('topic_flags', []),
-                        'confidence_score': insight.get('confidence_score', 0.8),
-                        'created_at': insight['created_at']
-                    })
-            
-            for entry in result.data:
-                # Ensure updated_at field exists. This is the critical fix.
-                entry = DateTimeUtils.ensure_updated_at(entry)
-                
-                # Add AI insights to the entry
-                entry['ai_insights'] = ai_insights_by_entry.get(entry['id'], [])
-                
-                entries.append(JournalEntryResponse(**entry))
+        # Validate the page in one call (handles missing updated_at)
+        entries = JournalEntryConverter.from_rows(rows)
 
         return JournalEntriesResponse(
             entries=entries,
@@ -1149,8 +1237,10 @@ async def get_journal_stats(
             # Fallback to service role client
             client = db.get_client()
         
-        # Get all user entries for stats calculation
-        result = client.table("journal_entries").select("*").eq("user_id", current_user["id"]).order("created_at", desc=True).execute()
+        # Only the three levels and created_at are needed for stats
+        result = ENTRY_STATS.execute(
+            ENTRY_STATS.select(client).eq("user_id", current_user["id"]).order("created_at", desc=True)
+        )
         
         entries = result.data if result.data else []
         
@@ -1195,10 +1285,143 @@ async def get_journal_stats(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating journal stats: {str(e)}")
 
+@router.get("/sync", response_model=JournalSyncResponse)
+@limiter.limit("60/minute")  # Rate limit delta sync polling
+async def sync_journal(
+    request: Request,  # Required for rate limiter
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_SYNC_LIMIT,
+    db: Database = Depends(get_database),
+    current_user: dict = Depends(get_current_user_with_fallback)
+):
+    """
+    Delta sync for mobile clients
+    
+    Returns journal_entries, ai_insights, ai_reactions and ai_user_replies rows
+    created or updated since `cursor`, plus tombstones for deleted rows, and a new
+    cursor to store. Omit `cursor` for a full sync. Keep calling while has_more is
+    true. A 410 means the cursor cannot be resumed: drop local data and resync.
+    """
+    try:
+        if limit < 1 or limit > MAX_SYNC_LIMIT:
+            limit = DEFAULT_SYNC_LIMIT
+        
+        # Service role client; the sync service scopes every query to the caller
+        sync_service = JournalSyncService(db.get_service_client())
+        return await sync_service.get_changes(current_user["id"], cursor=cursor, limit=limit)
+        
+    except InvalidSyncCursor as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=f"Sync cursor rejected, full resync required: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error syncing journal: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error syncing journal: {str(e)}")
+
+# Table each batch operation reads; operations sharing a table share one query
+_BATCH_OP_TABLES = {
+    "entry": "journal_entries",
+    "ai-insights": "ai_insights",
+    "all-ai-insights": "ai_insights",
+    "reactions": "ai_reactions",
+    "replies": "ai_user_replies",
+}
+
+@router.post("/batch", response_model=BatchResponse)
+@limiter.limit("30/minute")  # One hit per batch; operations are capped by BatchRequest
+async def batch_journal_requests(
+    request: Request,  # Required for rate limiter
+    batch: BatchRequest,
+    db: Database = Depends(get_database),
+    current_user: dict = Depends(get_current_user_with_fallback)
+):
+    """
+    Answer several per-entry GETs in one round-trip
+    
+    Each operation mirrors an endpoint: entry -> /entries/{id}, ai-insights,
+    all-ai-insights, reactions and replies -> /entries/{id}/<op>. The token is
+    validated once, every table is queried once for all requested entries (in
+    parallel), and each result carries its own status so one missing entry does
+    not fail the batch.
+    """
+    try:
+        user_id = current_user["id"]
+        service_client = db.get_service_client()
+        entry_ids = list(dict.fromkeys(operation.entry_id for operation in batch.operations))
+        
+        def fetch_rows(table: str) -> List[dict]:
+            query = service_client.table(table).select("*")
+            if table == "journal_entries":
+                return query.eq("user_id", user_id).in_("id", entry_ids).execute().data or []
+            # Reactions are readable by entry (AI personas react too); ownership is enforced below
+            if table != "ai_reactions":
+                query = query.eq("user_id", user_id)
+            return query.in_("journal_entry_id", entry_ids).order("created_at").execute().data or []
+        
+        # Entries are always needed to check ownership
+        tables = ["journal_entries"] + sorted({_BATCH_OP_TABLES[operation.op] for operation in batch.operations} - {"journal_entries"})
+        fetched = await asyncio.gather(*(asyncio.to_thread(fetch_rows, table) for table in tables), return_exceptions=True)
+        rows_by_table = dict(zip(tables, fetched))
+        
+        if isinstance(rows_by_table["journal_entries"], Exception):
+            raise rows_by_table["journal_entries"]
+        entries = {entry["id"]: entry for entry in rows_by_table.pop("journal_entries")}
+        
+        # Group child rows by entry, keeping created_at order
+        children = {}
+        for table, rows in rows_by_table.items():
+            if isinstance(rows, Exception):
+                logger.error(f"Batch query on {table} failed: {str(rows)}")
+                children[table] = rows
+                continue
+            grouped = {}
+            for row in rows:
+                grouped.setdefault(row["journal_entry_id"], []).append(row)
+            children[table] = grouped
+        
+        results = []
+        for operation in batch.operations:
+            result = BatchOperationResult(id=operation.id, op=operation.op, entry_id=operation.entry_id, status=200)
+            results.append(result)
+            
+            entry = entries.get(operation.entry_id)
+            if entry is None:
+                result.status, result.error = 404, "Journal entry not found"
+                continue
+            
+            if operation.op == "entry":
+                result.data = JournalEntryResponse(**DateTimeUtils.ensure_updated_at(dict(entry)))
+                continue
+            
+            grouped = children[_BATCH_OP_TABLES[operation.op]]
+            if isinstance(grouped, Exception):
+                result.status, result.error = 500, f"Error fetching {operation.op}: {str(grouped)}"
+                continue
+            rows = grouped.get(operation.entry_id, [])
+            
+            if operation.op == "ai-insights":
+                if rows:
+                    result.data = _ai_insight_payload(rows[-1])
+                else:
+                    result.status, result.error = 404, "No AI insights found for this journal entry"
+            elif operation.op == "all-ai-insights":
+                result.data = _all_ai_insights_payload(rows)
+            elif operation.op == "reactions":
+                result.data = _reactions_payload(rows, user_id)
+            elif operation.op == "replies":
+                result.data = AIRepliesResponse(replies=[AIReplyResponse(**reply) for reply in rows])
+        
+        logger.info(f"Batch for user {user_id}: {len(batch.operations)} operations over {len(entry_ids)} entries in {len(tables)} queries")
+        
+        return BatchResponse(results=results)
+        
+    except Exception as e:
+        logger.error(f"Error processing journal batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error processing batch: {str(e)}")
+
 @router.get("/entries/{entry_id}", response_model=JournalEntryResponse)
 @limiter.limit("100/minute")  # Rate limit individual entry requests
 async def get_journal_entry(
     request: Request,  # Required for rate limiter
+    response: Response,
     entry_id: str,
     db: Database = Depends(get_database),
     current_user: dict = Depends(get_current_user_with_fallback)
@@ -1224,7 +1447,7 @@ async def get_journal_entry(
             # Fallback to service role client
             client = db.get_client()
             
-        result = client.table("journal_entries").select("*").eq("id", entry_id).eq("user_id", current_user["id"]).single().execute()
+        result = ENTRY_LISTING.execute(ENTRY_LISTING.select(client).eq("id", entry_id).eq("user_id", current_user["id"]).single())
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Journal entry not found")
@@ -1232,6 +1455,11 @@ async def get_journal_entry(
         # Ensure updated_at field exists before creating response
         entry_data = result.data
         entry_data = DateTimeUtils.ensure_updated_at(entry_data)
+        
+        etag = make_etag("entry", current_user["id"], entry_id, entry_data["updated_at"])
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
             
         return JournalEntryResponse(**entry_data)
         
@@ -1382,11 +1610,14 @@ async def get_adaptive_ai_response(
     - Structured responses with rich metadata (structured=true)
     - Streaming responses with typing indicators (streaming=true)
     - Multi-persona concurrent processing (multi_persona=true)
+    
+    Multi-persona and standard responses are bounded by AI_INTERACTIVE_DEADLINE_MS.
     """
+    ai_deadline = deadline_after(settings.AI_INTERACTIVE_DEADLINE_MS)
     try:
         # Get the journal entry
         client = db.get_client()
-        result = client.table("journal_entries").select("*").eq("id", entry_id).eq("user_id", current_user["id"]).single().execute()
+        result = ENTRY_LISTING.execute(ENTRY_LISTING.select(client).eq("id", entry_id).eq("user_id", current_user["id"]).single())
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Journal entry not found")
@@ -1397,12 +1628,8 @@ async def get_adaptive_ai_response(
         journal_entry = JournalEntryResponse(**entry_data)
         
         # Get journal history for context
-        history_result = client.table("journal_entries").select("*").eq("user_id", current_user["id"]).order("created_at", desc=True).limit(10).execute()
-        journal_history = []
-        if history_result.data:
-            for entry in history_result.data:
-                entry = DateTimeUtils.ensure_updated_at(entry)
-                journal_history.append(JournalEntryResponse(**entry))
+        history_result = ENTRY_AI_CONTEXT.execute(ENTRY_AI_CONTEXT.select(client).eq("user_id", current_user["id"]).order("created_at", desc=True).limit(10))
+        journal_history = JournalEntryConverter.from_rows(history_result.data)
         
         # Multi-persona concurrent processing
         if multi_persona:
@@ -1411,12 +1638,24 @@ async def get_adaptive_ai_response(
             else:
                 personas = [persona]
             
-            multi_response = await async_multi_persona.generate_concurrent_persona_responses(
-                journal_entry=journal_entry,
-                personas=personas,
-                use_natural_timing=True,
-                max_concurrent=4
-            )
+            try:
+                with request_deadline(ai_deadline):
+                    multi_response = await async_multi_persona.generate_concurrent_persona_responses(
+                        journal_entry=journal_entry,
+                        personas=personas,
+                        use_natural_timing=True,
+                        max_concurrent=4
+                    )
+            except DeadlineExceeded:
+                # Out of time: one persona's smart fallback instead of a 500
+                logger.warning(f"⏰ Multi-persona response for entry {entry_id} missed the deadline, serving smart fallback")
+                with request_deadline(ai_deadline):
+                    return await adaptive_ai.generate_adaptive_response(
+                        user_id=current_user["id"],
+                        journal_entry=journal_entry,
+                        journal_history=journal_history,
+                        persona=personas[0]
+                    )
             
             # Convert to frontend-compatible format (array of AI insights)
             compatible_insights = []
@@ -1516,12 +1755,13 @@ async def get_adaptive_ai_response(
             return standard_response
         
         # Standard adaptive response (backward compatibility)
-        response = await adaptive_ai.generate_adaptive_response(
-            user_id=current_user["id"],
-            journal_entry=journal_entry,
-            journal_history=journal_history,
-            persona=persona
-        )
+        with request_deadline(ai_deadline):
+            response = await adaptive_ai.generate_adaptive_response(
+                user_id=current_user["id"],
+                journal_entry=journal_entry,
+                journal_history=journal_history,
+                persona=persona
+            )
         
         return response
         
@@ -1610,6 +1850,7 @@ async def get_ai_debug_summary(
 @limiter.limit("20/minute")  # Rate limit weekly summary requests
 async def get_weekly_summary(
     request: Request,  # Required for rate limiter
+    response: Response,
     week_offset: int = 0,  # 0 = current week, 1 = last week, etc.
     summary_type: str = "comprehensive",  # "wellness", "productivity", "emotional", "comprehensive"
     db: Database = Depends(get_database),
@@ -1633,16 +1874,22 @@ async def get_weekly_summary(
         from datetime import timedelta
         cutoff_date = (datetime.now(timezone.utc) - timedelta(weeks=3)).isoformat()
         
-        result = client.table("journal_entries").select("*").eq("user_id", current_user["id"]).gte("created_at", cutoff_date).order("created_at", desc=False).execute()
+        # Conditional GET: the summary is a pure function of these entries and today's week window
+        version = table_version(client, "journal_entries", {"user_id": current_user["id"]}, gte={"created_at": cutoff_date})
+        etag = make_etag(
+            "weekly-summary", current_user["id"], week_offset, summary_type.lower(),
+            datetime.now(timezone.utc).date(), *version
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag, CACHE_CONTROL_SHORT)
+        set_cache_headers(response, etag, CACHE_CONTROL_SHORT)
+        
+        result = ENTRY_LISTING.execute(
+            ENTRY_LISTING.select(client).eq("user_id", current_user["id"]).gte("created_at", cutoff_date).order("created_at", desc=False)
+        )
         
         # Convert to response models
-        journal_entries = []
-        if result.data:
-            for entry in result.data:
-                # Ensure updated_at field exists
-                entry = DateTimeUtils.ensure_updated_at(entry)
-                
-                journal_entries.append(JournalEntryResponse(**entry))
+        journal_entries = JournalEntryConverter.from_rows(result.data)
         
         # Initialize weekly summary service
         summary_service = WeeklySummaryService()
@@ -1796,12 +2043,61 @@ async def test_create_journal_entry(
     
     return response
 
+async def _forward_stream(websocket: WebSocket, chunks) -> bool:
+    """
+    Send every chunk of a stream; False when the client left (or cancelled) first
+    
+    A receive task runs alongside the sends, so a disconnect or a {"type": "cancel"}
+    message stops the stream (and the upstream OpenAI request) right away instead of at
+    the next failed send. Each send is awaited, so the server's write buffer applies
+    backpressure, and a client that stalls for STREAM_SEND_TIMEOUT_SECONDS is dropped.
+    """
+    async def send_all():
+        try:
+            async for chunk in chunks:
+                async with asyncio.timeout(settings.STREAM_SEND_TIMEOUT_SECONDS):
+                    await websocket.send_json(chunk.to_dict())
+        finally:
+            await chunks.aclose()
+    
+    async def watch_client():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                try:
+                    if json.loads(message.get("text") or "{}").get("type") == "cancel":
+                        return
+                except (ValueError, AttributeError):
+                    continue
+        except Exception:
+            return
+    
+    sender = asyncio.create_task(send_all())
+    watcher = asyncio.create_task(watch_client())
+    done, _ = await asyncio.wait({sender, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    if sender in done:
+        watcher.cancel()
+        await asyncio.gather(watcher, return_exceptions=True)
+        try:
+            sender.result()
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ Streaming client stalled, dropping connection")
+            return False
+        return True
+    
+    sender.cancel()
+    await asyncio.gather(sender, return_exceptions=True)
+    return False
+
 @router.websocket("/entries/{entry_id}/stream")
 async def stream_ai_response(
     websocket: WebSocket,
     entry_id: str,
     persona: str = "auto",
     token: Optional[str] = None,  # JWT token for authentication
+    pacing: str = "client",  # "client": pass-through frames + pacing profile; "server": typing delays applied here
     streaming_ai: StreamingAIService = Depends(get_streaming_ai_service),
     db: Database = Depends(get_database)
 ):
@@ -1809,9 +2105,9 @@ async def stream_ai_response(
     WebSocket endpoint for real-time streaming AI responses
     
     Features:
-    - Live typing indicators with persona-specific timing
-    - Real-time response streaming
-    - Cancellation support
+    - Deltas forwarded as they arrive, coalesced into small frames
+    - Typing feel applied by the client from the pacing profile (or server-side with pacing=server)
+    - Cancellation on disconnect or a {"type": "cancel"} message
     - Natural conversation flow
     """
     await websocket.accept()
@@ -1841,7 +2137,7 @@ async def stream_ai_response(
         
         # Get the journal entry and verify ownership
         client = db.get_client()
-        result = client.table("journal_entries").select("*").eq("id", entry_id).eq("user_id", user_id).single().execute()
+        result = ENTRY_LISTING.execute(ENTRY_LISTING.select(client).eq("id", entry_id).eq("user_id", user_id).single())
         
         if not result.data:
             await websocket.send_json({
@@ -1855,35 +2151,27 @@ async def stream_ai_response(
         entry_data = DateTimeUtils.ensure_updated_at(entry_data)
             
         journal_entry = JournalEntryResponse(**entry_data)
+        server_paced = pacing == "server"
         
         # Send initial connection confirmation
         await websocket.send_json({
             "type": "connected",
             "entry_id": entry_id,
             "persona": persona,
+            "pacing": "server" if server_paced else "client",
+            "pacing_profile": None if server_paced else streaming_ai.get_pacing_profile(persona),
             "message": f"Connected for streaming {persona} response"
         })
         
         # Start streaming response
-        async for chunk in streaming_ai.stream_persona_response(
-            journal_entry=journal_entry,
-            persona=persona,
-            user_id=user_id
-        ):
-            await websocket.send_json({
-                "type": chunk.chunk_type,
-                "content": chunk.content,
-                "persona": chunk.persona,
-                "timestamp": chunk.timestamp.isoformat(),
-                "is_final": chunk.is_final,
-                "metadata": chunk.metadata
-            })
-            
-            # Small delay for natural typing rhythm
-            if chunk.chunk_type == "typing":
-                await asyncio.sleep(0.1)
-            elif chunk.chunk_type == "content":
-                await asyncio.sleep(0.05)
+        if server_paced:
+            chunks = streaming_ai.stream_ai_response(journal_entry=journal_entry, persona=persona)
+        else:
+            chunks = streaming_ai.stream_frames(journal_entry=journal_entry, persona=persona)
+        
+        if not await _forward_stream(websocket, chunks):
+            logger.info(f"Streaming client left before completion for entry {entry_id}")
+            return
         
         # Send completion signal
         await websocket.send_json({
@@ -1908,6 +2196,66 @@ async def stream_ai_response(
         except:
             pass  # Connection may already be closed
 
+@router.get("/entries/{entry_id}/stream/sse")
+@limiter.limit("30/minute")  # Reconnects count too
+async def stream_ai_response_sse(
+    request: Request,
+    entry_id: str,
+    persona: str = "auto",
+    token: Optional[str] = None,  # JWT for EventSource, which cannot send headers
+    streaming_ai: StreamingAIService = Depends(get_streaming_ai_service),
+    db: Database = Depends(get_database)
+):
+    """
+    Server-Sent Events variant of the streaming endpoint (same frames as the WebSocket)
+    
+    Features:
+    - Plain HTTP (text/event-stream), multiplexed over HTTP/2, no connection upgrade
+    - Resume: a reconnect with Last-Event-ID replays missed frames from a short server-side buffer
+    - Heartbeat comments every STREAM_SSE_HEARTBEAT_SECONDS keep proxies from closing idle streams
+    - 204 once a finished stream has been fully delivered, which stops EventSource reconnecting
+    """
+    authorization = request.headers.get("authorization", "")
+    raw_token = token or (authorization[7:] if authorization.lower().startswith("bearer ") else None)
+    if not raw_token:
+        raise HTTPException(status_code=401, detail="Authentication token required")
+    try:
+        from app.core.security import verify_token
+        user_id = (await verify_token(raw_token))["id"]
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid authentication token")
+    
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("lastEventId") or ""
+    resume_from = int(last_event_id) if last_event_id.isdigit() else 0
+    stream_key = f"{user_id}:{entry_id}:{persona}"
+    
+    relayed = stream_relay.find(stream_key, resume=resume_from > 0)
+    created = relayed is None
+    if created:
+        # Nothing to resume or join: check the entry, then start generating
+        client = db.get_client()
+        result = ENTRY_LISTING.execute(ENTRY_LISTING.select(client).eq("id", entry_id).eq("user_id", user_id).limit(1))
+        if not result.data:
+            raise HTTPException(status_code=404, detail="Journal entry not found or access denied")
+        journal_entry = JournalEntryResponse(**DateTimeUtils.ensure_updated_at(result.data[0]))
+        relayed = stream_relay.start(stream_key, streaming_ai.stream_frames(journal_entry=journal_entry, persona=persona))
+    elif relayed.done and resume_from >= relayed.last_id:
+        return Response(status_code=204)
+    
+    async def events():
+        yield sse_retry(settings.STREAM_SSE_RETRY_MS)
+        if created and resume_from:
+            # The buffered stream is gone: the client must discard what it has
+            yield sse_message({"type": "restart", "persona": persona})
+        async for event in relayed.follow(0 if created else resume_from, settings.STREAM_SSE_HEARTBEAT_SECONDS):
+            yield SSE_HEARTBEAT if event is None else event.encode()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/debug/enable-ai-for-user")
 async def enable_ai_for_user(
     user_data: dict,  # {"user_id": "...", "enable": true}
@@ -2052,45 +2400,29 @@ async def get_all_ai_insights_for_entry(
         # Get all AI insights for this entry
         result = service_client.table("ai_insights").select("*").eq("journal_entry_id", entry_id).eq("user_id", current_user["id"]).order("created_at").execute()
         
-        if not result.data:
-            return {"insights": [], "message": "No AI insights found for this entry"}
-        
-        # Transform the data to include persona-specific information
-        insights = []
-        for ai_insight in result.data:
-            insights.append({
-                "id": ai_insight["id"],
-                "journal_entry_id": ai_insight["journal_entry_id"],
-                "ai_response": ai_insight["ai_response"],
-                "persona_used": ai_insight["persona_used"],
-                "topic_flags": ai_insight["topic_flags"] or [],
-                "confidence_score": ai_insight["confidence_score"],
-                "created_at": ai_insight["created_at"]
-            })
-        
-        return {
-            "insights": insights,
-            "total_personas": len(insights),
-            "personas_responded": list(set(i["persona_used"] for i in insights))
-        }
+        return _all_ai_insights_payload(result.data or [])
         
     except Exception as e:
         logger.error(f"Error retrieving all AI insights: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error retrieving AI insights: {str(e)}")
 
-@router.get("/all-entries-with-ai-insights")
+@router.get("/all-entries-with-ai-insights", response_class=FastJSONResponse)
 @limiter.limit("30/minute")
 async def get_all_entries_with_ai_insights(
     request: Request,
     page: int = 1,
     per_page: int = 30,
+    include_reactions: bool = False,
+    include_reply_counts: bool = False,
     db: Database = Depends(get_database),
     current_user: dict = Depends(get_current_user_with_fallback)
 ):
     """
     Get all journal entries with their AI insights included
     
-    This endpoint fetches journal entries and their associated AI responses in one call
+    This endpoint fetches journal entries and their associated AI responses in one call.
+    include_reactions adds a `reactions` summary per entry (same shape as /entries/{id}/reactions)
+    and include_reply_counts adds `reply_count`, still in the same database round-trip.
     """
     try:
         # Use service role client
@@ -2105,60 +2437,26 @@ async def get_all_entries_with_ai_insights(
         # Calculate pagination
         offset = (page - 1) * per_page
         
-        # Get total count first (using same pattern as working endpoint)
-        count_result = service_client.table("journal_entries").select("id", count="exact").eq("user_id", current_user["id"]).execute()
-        total_count = count_result.count if count_result.count else 0
+        # Count, entries and embedded insights (plus optional reactions / reply counts) in one request
+        entries_with_insights, total_count = JournalEntryRepository(service_client).get_entries_with_insights(
+            current_user["id"], offset, per_page,
+            include_reactions=include_reactions,
+            include_reply_counts=include_reply_counts,
+        )
         
-        # If no entries, return empty response
-        if total_count == 0:
-            return {"entries": [], "page": page, "per_page": per_page, "total": 0}
-        
-        # Get journal entries with pagination
-        entries_result = service_client.table("journal_entries").select("*").eq("user_id", current_user["id"]).order("created_at", desc=True).range(offset, offset + per_page - 1).execute()
-        
-        if not entries_result.data:
-            return {"entries": [], "page": page, "per_page": per_page, "total": total_count}
-        
-        # Get all entry IDs
-        entry_ids = [entry["id"] for entry in entries_result.data]
-        
-        # Get all AI insights for these entries in one query (fix .in syntax)
-        insights_result = service_client.table("ai_insights").select("*").in_("journal_entry_id", entry_ids).eq("user_id", current_user["id"]).order("created_at").execute()
-        
-        # Group insights by journal entry ID
-        insights_by_entry = {}
-        if insights_result.data:
-            for insight in insights_result.data:
-                entry_id = insight["journal_entry_id"]
-                if entry_id not in insights_by_entry:
-                    insights_by_entry[entry_id] = []
-                insights_by_entry[entry_id].append({
-                    "id": insight["id"],
-                    "ai_response": insight["ai_response"],
-                    "persona_used": insight["persona_used"],
-                    "topic_flags": insight["topic_flags"] or [],
-                    "confidence_score": insight["confidence_score"],
-                    "created_at": insight["created_at"]
-                })
-        
-        # Combine entries with their AI insights
-        entries_with_insights = []
-        for entry in entries_result.data:
+        for entry in entries_with_insights:
             # Handle missing updated_at field (same as working endpoint)
-            entry = DateTimeUtils.ensure_updated_at(entry)
-            
-            entry_data = {
-                **entry,
-                "ai_insights": insights_by_entry.get(entry["id"], [])
-            }
-            entries_with_insights.append(entry_data)
+            DateTimeUtils.ensure_updated_at(entry)
+            if include_reactions:
+                entry["reactions"] = _reactions_payload(entry.pop("ai_reactions", []), current_user["id"])
         
-        return {
+        # Large page of raw rows: render with orjson and skip jsonable_encoder
+        return FastJSONResponse({
             "entries": entries_with_insights,
             "page": page,
             "per_page": per_page,
             "total": total_count
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error retrieving entries with AI insights: {str(e)}")
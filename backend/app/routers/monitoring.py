@@ -3,16 +3,20 @@ AI-Optimized Monitoring Router for PulseCheck
 Handles frontend error logging, system monitoring, and AI debugging endpoints
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, Query, status
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import asyncio
 import logging
+import time
 
 from app.core.monitoring import (
     monitor, log_error, ErrorSeverity, ErrorCategory,
     get_ai_debugging_context
 )
+from app.core.health_collector import health_collector
+from app.core.metrics_store import metrics_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["monitoring"])
@@ -151,12 +155,16 @@ async def log_frontend_error(request: FrontendErrorRequest):
         )
 
 @router.get("/health", response_model=SystemHealthResponse)
-async def get_system_health():
+async def get_system_health(response: Response):
     """
     Get current system health status with AI-optimized metrics
+    
+    Served from the background health collector; snapshot age is in X-Health-Snapshot-Age.
     """
     try:
-        health = monitor.check_system_health()
+        snapshot = await health_collector.get_or_refresh("system_health")
+        health = await health_collector.get_value("system_health")
+        response.headers["X-Health-Snapshot-Age"] = f"{snapshot.age_seconds:.2f}"
         
         return SystemHealthResponse(
             overall_status=health.overall_status,
@@ -175,6 +183,58 @@ async def get_system_health():
             detail="Failed to get system health"
         )
 
+@router.get("/health/snapshots")
+async def get_health_snapshots():
+    """
+    Freshness of every background health probe (age, interval, last error)
+    """
+    return {
+        **health_collector.get_overview(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/metrics/history")
+async def get_metric_history(
+    name: str = Query(..., description="Metric name, e.g. api_response_time or errors"),
+    hours: float = Query(24, gt=0, le=24 * 90, description="How far back to read"),
+    resolution: str = Query("auto", description="1m, 1h or auto"),
+    tags: Optional[str] = Query(None, description="Exact series as k=v,k=v (omit to sum all series)")
+):
+    """
+    Persisted 1-minute / 1-hour rollups (count, sum, avg, min, max) for a metric
+    """
+    if resolution not in ("1m", "1h", "auto"):
+        raise HTTPException(status_code=400, detail="resolution must be '1m', '1h' or 'auto'")
+    
+    tag_filter = None
+    if tags is not None:
+        try:
+            tag_filter = dict(pair.split("=", 1) for pair in tags.split(",") if pair)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="tags must be formatted as k=v,k=v")
+    
+    start = time.time() - hours * 3600
+    points = await asyncio.to_thread(metrics_store.query, name, start, None, resolution, tag_filter)
+    return {
+        "name": name,
+        "hours": hours,
+        "resolution": resolution,
+        "tags": tag_filter,
+        "points": points,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/metrics/catalog")
+async def get_metric_catalog():
+    """
+    Metric series available in the persistent store
+    """
+    return {
+        "store": metrics_store.get_status(),
+        "metrics": await asyncio.to_thread(metrics_store.list_metrics),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @router.get("/errors", response_model=ErrorSummaryResponse)
 async def get_error_summary(hours: int = 24):
     """
@@ -342,7 +402,7 @@ async def record_ai_debugging_attempt(
     """
     try:
         # Find the error
-        error = next((e for e in monitor.errors if e.error_id == error_id), None)
+        error = monitor.get_error(error_id)
         if not error:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -9,10 +9,12 @@ import asyncio
 from datetime import datetime, timedelta
 import logging
 import statistics
+import time
 from collections import defaultdict, Counter
 
 from app.core.database import get_database, Database
 from app.core.monitoring import monitor
+from app.core.metrics_store import metrics_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/predictive-monitoring", tags=["Predictive Monitoring"])
@@ -28,21 +30,19 @@ class PredictiveAnalytics:
     async def analyze_error_trends(self, hours_back: int = 72) -> Dict[str, Any]:
         """Analyze error trends to predict future issues"""
         try:
-            # Get recent error data from monitoring system
-            error_summary = monitor.get_error_summary(hours_back)
+            # Get hourly error rates for trend analysis (persisted history)
+            hourly_errors = await self._get_hourly_error_distribution(hours_back)
             
             # Analyze error rate trends
             error_trend_analysis = {
-                "current_error_rate": error_summary.get("error_rate", 0),
+                "current_error_rate": hourly_errors[-1] if hourly_errors else 0,
                 "error_trend": "stable",  # Will be calculated
                 "predicted_issues": [],
                 "risk_level": "low",
-                "recommendations": []
+                "recommendations": [],
+                "hours_of_history": len(hourly_errors)
             }
             
-            # Get hourly error rates for trend analysis
-            hourly_errors = self._get_hourly_error_distribution(error_summary)
-            
             if len(hourly_errors) >= 24:  # Need at least 24 hours of data
                 # Calculate trend
                 recent_errors = hourly_errors[-12:]  # Last 12 hours
@@ -90,9 +90,6 @@ class PredictiveAnalytics:
     async def analyze_performance_trends(self, hours_back: int = 48) -> Dict[str, Any]:
         """Analyze performance trends to predict degradation"""
         try:
-            # Get performance data from monitoring
-            performance_data = monitor.get_performance_summary(hours_back)
-            
             performance_analysis = {
                 "current_avg_response_time": 0,
                 "performance_trend": "stable",
@@ -101,12 +98,13 @@ class PredictiveAnalytics:
                 "recommendations": []
             }
             
-            # Simulate performance analysis (in real implementation, get from monitoring)
-            # This would analyze actual response time data
-            current_response_times = [200, 250, 300, 280, 320, 290, 310]  # Example data
+            # Hourly response time rollups; "current" is the last 6 hours
+            hourly_response = await self._load_hourly("api_response_time", hours_back)
+            performance_analysis["hours_of_history"] = len(hourly_response)
             
-            if current_response_times:
-                current_avg = statistics.mean(current_response_times)
+            if hourly_response:
+                recent = hourly_response[-6:]
+                current_avg = sum(p["sum"] for p in recent) / sum(p["count"] for p in recent)
                 performance_analysis["current_avg_response_time"] = current_avg
                 
                 # Check for performance degradation
@@ -134,13 +132,13 @@ class PredictiveAnalytics:
             logger.error(f"Performance trend analysis failed: {e}")
             return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
     
-    async def predict_system_capacity(self) -> Dict[str, Any]:
+    async def predict_system_capacity(self, hours_back: int = 48) -> Dict[str, Any]:
         """Predict system capacity issues"""
         try:
             capacity_analysis = {
                 "database_connections": {"current": 45, "max": 100, "predicted_exhaustion": None},
-                "memory_usage": {"current_percent": 65, "trend": "stable", "predicted_exhaustion": None},
-                "storage_usage": {"current_percent": 40, "trend": "growing", "predicted_exhaustion": None},
+                "memory_usage": await self._get_resource_trend("system_memory_usage", hours_back),
+                "storage_usage": await self._get_resource_trend("system_disk_usage", hours_back),
                 "api_rate_limits": {"current_usage": 1200, "limit": 5000, "predicted_exhaustion": None},
                 "overall_risk": "low",
                 "recommendations": []
@@ -158,7 +156,7 @@ class PredictiveAnalytics:
                 )
             
             # Analyze memory usage
-            memory_percent = capacity_analysis["memory_usage"]["current_percent"]
+            memory_percent = capacity_analysis["memory_usage"]["current_percent"] or 0
             if memory_percent > 80:
                 capacity_analysis["memory_usage"]["predicted_exhaustion"] = "2-4 hours"
                 capacity_analysis["overall_risk"] = "high"
@@ -188,14 +186,27 @@ class PredictiveAnalytics:
                 "recommendations": []
             }
             
-            # Get recent system metrics (simulated - would be real data)
+            # Compare each hour in the window against the median of the preceding week
+            baseline_hours = hours_back + 7 * 24
+            hourly_errors = await self._load_hourly("errors", baseline_hours)
+            hourly_response = await self._load_hourly("api_response_time", baseline_hours)
+            window_start = (int(time.time() // 3600) - hours_back) * 3600
+            
+            error_baseline = max(1, statistics.median(
+                [p["count"] for p in hourly_errors if p["bucket"] < window_start] or [1]
+            ))
+            response_baseline = statistics.median(
+                [p["avg"] for p in hourly_response if p["bucket"] < window_start] or [0]
+            )
+            
             recent_metrics = {
                 "error_spikes": [
-                    {"timestamp": "2025-01-30T14:30:00Z", "error_count": 45, "baseline": 5},
-                    {"timestamp": "2025-01-30T15:15:00Z", "error_count": 38, "baseline": 5}
+                    {"timestamp": p["timestamp"], "error_count": p["count"], "baseline": error_baseline}
+                    for p in hourly_errors if p["bucket"] >= window_start
                 ],
                 "response_time_spikes": [
-                    {"timestamp": "2025-01-30T16:00:00Z", "avg_response_ms": 2500, "baseline": 300}
+                    {"timestamp": p["timestamp"], "avg_response_ms": round(p["avg"], 1), "baseline": response_baseline}
+                    for p in hourly_response if p["bucket"] >= window_start and response_baseline
                 ],
                 "unusual_patterns": []
             }
@@ -237,13 +248,50 @@ class PredictiveAnalytics:
             logger.error(f"Anomaly detection failed: {e}")
             return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
     
-    def _get_hourly_error_distribution(self, error_summary: Dict[str, Any]) -> List[float]:
-        """Extract hourly error rates from error summary"""
-        # This would extract real hourly error rates from monitoring data
-        # For now, simulate some data
-        import random
-        base_rate = error_summary.get("error_rate", 0.05)
-        return [base_rate + random.uniform(-0.02, 0.02) for _ in range(48)]
+    async def _load_hourly(self, name: str, hours_back: int) -> List[Dict[str, Any]]:
+        """Hourly rollups for a metric from the persistent metrics store"""
+        start = time.time() - hours_back * 3600
+        return await asyncio.to_thread(metrics_store.query, name, start, None, "1h")
+    
+    async def _get_hourly_error_distribution(self, hours_back: int) -> List[float]:
+        """Hourly error rates (errors per request), oldest first, from the first hour with data"""
+        errors = {p["bucket"]: p["count"] for p in await self._load_hourly("errors", hours_back)}
+        requests = {p["bucket"]: p["count"] for p in await self._load_hourly("api_response_time", hours_back)}
+        if not errors and not requests:
+            return []
+        
+        first_hour = min(list(errors) + list(requests))
+        current_hour = int(time.time() // 3600) * 3600
+        return [
+            errors.get(hour, 0) / max(requests.get(hour, 0), 1)
+            for hour in range(first_hour, current_hour + 1, 3600)
+        ]
+    
+    async def _get_resource_trend(self, name: str, hours_back: int) -> Dict[str, Any]:
+        """Current level, trend and projected exhaustion of a 0-1 resource gauge"""
+        points = await self._load_hourly(name, hours_back)
+        if not points:
+            return {"current_percent": None, "trend": "unknown", "predicted_exhaustion": None}
+        
+        values = [p["avg"] * 100 for p in points]
+        current = values[-1]
+        slope = statistics.linear_regression(range(len(values)), values).slope if len(values) >= 2 else 0.0
+        
+        trend = "stable"
+        predicted_exhaustion = None
+        if slope > 0.1:
+            trend = "growing"
+            predicted_exhaustion = f"{(100 - current) / slope:.0f} hours"
+        elif slope < -0.1:
+            trend = "shrinking"
+        
+        return {
+            "current_percent": round(current, 1),
+            "trend": trend,
+            "growth_percent_per_hour": round(slope, 3),
+            "predicted_exhaustion": predicted_exhaustion,
+            "hours_of_history": len(values)
+        }
 
 # Initialize analytics
 predictive_analytics = PredictiveAnalytics()
@@ -260,7 +308,7 @@ async def run_comprehensive_predictive_analysis(
         error_trends, performance_trends, capacity_prediction, anomaly_detection = await asyncio.gather(
             predictive_analytics.analyze_error_trends(hours_back),
             predictive_analytics.analyze_performance_trends(hours_back),
-            predictive_analytics.predict_system_capacity(),
+            predictive_analytics.predict_system_capacity(hours_back),
             predictive_analytics.detect_anomalies(24)  # Anomalies use 24h window
         )
         
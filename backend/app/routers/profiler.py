@@ -0,0 +1,92 @@
+"""
+Profiler API Router
+Admin-only control and export for the always-on sampling profiler
+"""
+
+from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import PlainTextResponse
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+
+from app.core.profiler import profiler
+from app.core.security import verify_admin
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["profiler"])
+
+@router.get("/status")
+async def get_profiler_status(
+    admin: dict = Depends(verify_admin)
+):
+    """
+    Get profiler state, sample counts and measured overhead
+    """
+    return {
+        "status": "success",
+        "profiler": profiler.get_status(),
+        "top_frames": profiler.get_top_frames(10),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+@router.post("/start")
+async def start_profiler(
+    sample_hz: Optional[float] = Query(None, ge=1, le=1000, description="Sampling rate in Hz"),
+    admin: dict = Depends(verify_admin)
+):
+    """
+    Start sampling all thread stacks
+    """
+    return {
+        "status": "success",
+        "profiler": profiler.start(sample_hz),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+@router.post("/stop")
+async def stop_profiler(
+    admin: dict = Depends(verify_admin)
+):
+    """
+    Stop sampling (collected stacks are kept for export)
+    """
+    return {
+        "status": "success",
+        "profiler": profiler.stop(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+@router.post("/reset")
+async def reset_profiler(
+    admin: dict = Depends(verify_admin)
+):
+    """
+    Discard all collected samples
+    """
+    profiler.reset()
+    return {
+        "status": "success",
+        "message": "Profiler samples cleared",
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+@router.get("/export")
+async def export_profile(
+    format: str = Query("collapsed", description="collapsed or speedscope"),
+    admin: dict = Depends(verify_admin)
+):
+    """
+    Export aggregated stacks
+
+    - collapsed: text, one "frame;frame;frame count" line per stack (flamegraph.pl, speedscope)
+    - speedscope: JSON file loadable at https://www.speedscope.app
+    """
+    if format == "collapsed":
+        return PlainTextResponse(
+            profiler.export_collapsed(),
+            headers={"Content-Disposition": "attachment; filename=pulsecheck.collapsed.txt"}
+        )
+    if format == "speedscope":
+        return profiler.export_speedscope()
+
+    raise HTTPException(status_code=400, detail="format must be 'collapsed' or 'speedscope'")
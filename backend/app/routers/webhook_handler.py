@@ -19,6 +19,7 @@ from ..core.database import get_database
 from ..services.adaptive_ai_service import AdaptiveAIService
 from ..services.pulse_ai import PulseAI
 from ..core.config import settings
+from ..core.projections import ENTRY_AI_CONTEXT, ENTRY_LISTING, FEEDBACK_STATS, REACTION_EXISTS, REPLY_EXISTS
 
 router = APIRouter(prefix="/api/v1/webhook", tags=["webhook"])
 logger = logging.getLogger(__name__)
@@ -176,13 +177,13 @@ async def process_journal_entry_ai_response(
         
         # Get the journal entry
         client = db.get_client()
-        result = client.table("journal_entries").select("*").eq("id", entry_id).eq("user_id", user_id).single().execute()
+        result = ENTRY_LISTING.execute(ENTRY_LISTING.select(client).eq("id", entry_id).eq("user_id", user_id).single())
         
         if not result.data:
             logger.warning(f"Journal entry {entry_id} not found")
             return
         
-        from app.core.utils import DateTimeUtils
+        from app.core.utils import DateTimeUtils, JournalEntryConverter
         entry_data = DateTimeUtils.ensure_updated_at(result.data)
         from app.models.journal import JournalEntryResponse
         journal_entry = JournalEntryResponse(**entry_data)
@@ -261,12 +262,10 @@ async def process_journal_entry_ai_response(
                 adaptive_ai = AdaptiveAIService(pulse_ai, pattern_analyzer)
                 
                 # Get journal history for context
-                history_result = client.table("journal_entries").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(10).execute()
-                journal_history = []
-                if history_result.data:
-                    for entry in history_result.data:
-                        entry_data = DateTimeUtils.ensure_updated_at(entry)
-                        journal_history.append(JournalEntryResponse(**entry_data))
+                history_result = ENTRY_AI_CONTEXT.execute(
+                    ENTRY_AI_CONTEXT.select(client).eq("user_id", user_id).order("created_at", desc=True).limit(10)
+                )
+                journal_history = JournalEntryConverter.from_rows(history_result.data)
                 
                 # Generate adaptive response
                 ai_response = await adaptive_ai.generate_adaptive_response(
@@ -371,15 +370,15 @@ async def check_user_ai_engagement_pattern(user_id: str, client) -> dict:
         cutoff_date = (datetime.now() - timedelta(days=30)).isoformat()
         
         # Check for AI reactions/likes
-        reactions_result = client.table("ai_reactions").select("*").eq("user_id", user_id).gte("created_at", cutoff_date).execute()
+        reactions_result = REACTION_EXISTS.execute(REACTION_EXISTS.select(client).eq("user_id", user_id).gte("created_at", cutoff_date))
         ai_reactions = len(reactions_result.data) if reactions_result.data else 0
         
         # Check for replies to AI responses
-        replies_result = client.table("ai_user_replies").select("*").eq("user_id", user_id).gte("created_at", cutoff_date).execute()
+        replies_result = REPLY_EXISTS.execute(REPLY_EXISTS.select(client).eq("user_id", user_id).gte("created_at", cutoff_date))
         ai_replies = len(replies_result.data) if replies_result.data else 0
         
         # Check for explicit AI feedback
-        feedback_result = client.table("ai_feedback").select("*").eq("user_id", user_id).gte("created_at", cutoff_date).execute()
+        feedback_result = FEEDBACK_STATS.execute(FEEDBACK_STATS.select(client).eq("user_id", user_id).gte("created_at", cutoff_date))
         positive_feedback = 0
         if feedback_result.data:
             positive_feedback = len([f for f in feedback_result.data if f.get("feedback_type") in ["thumbs_up", "helpful"]])
@@ -16,14 +16,34 @@ import asyncio
 from dataclasses import dataclass
 
 from app.services.pulse_ai import PulseAI
+from app.services.request_deadline import DeadlineExceeded
 from app.services.user_pattern_analyzer import UserPatternAnalyzer, AdaptiveContext, UserPatterns
 from app.models.journal import JournalEntryResponse
 from app.models.ai_insights import AIInsightResponse, UserAIPreferences
 from app.services.user_preferences_service import UserPreferencesService
 from app.core.monitoring import log_error, ErrorSeverity, ErrorCategory
+from app.services.prompt_templates import compile_prompt
 
 logger = logging.getLogger(__name__)
 
+INTERACTION_STYLE_INSTRUCTIONS = {
+    "inquisitive": "Ask thoughtful questions to encourage deeper reflection.",
+    "supportive": "Provide validation and emotional support.",
+    "guidance": "Offer gentle guidance and suggestions.",
+    "reflective": "Help them reflect on their own thoughts and feelings."
+}
+
+# Per-user part of the personalized prompt, filled after its precompiled prefix
+PERSONALIZED_PROMPT_SLOTS = """{focus_instruction}{avoid_instruction}
+
+{user_context}
+
+Remember: You are having a conversation with someone who has a {writing_style} writing style and typically writes {avg_entry_length} words per entry. They prefer {response_length_preference} responses and often discuss {common_topics}.
+
+{proactive_context}
+
+Respond naturally as if you're having a real conversation with them."""
+
 @dataclass
 class AIDebugContext:
     """AI-optimized debugging context for error diagnosis"""
@@ -38,6 +58,7 @@ class AIDebugContext:
     error_severity: Optional[str] = None
     recovery_attempted: bool = False
     fallback_used: bool = False
+    late_response: Optional[Any] = None  # PulseResponse still being generated behind a deadline fallback
 
 @dataclass
 class AISelfTestResult:
@@ -65,6 +86,9 @@ class AdaptiveAIService:
         # Test account that bypasses all limits and fallbacks
         self.test_user_id = "6abe6283-5dd2-46d6-995a-d876a06a55f7"
         
+        # Replies still being generated behind a deadline fallback, by entry id (see take_late_response)
+        self._late_responses: Dict[str, asyncio.Future] = {}
+        
         # AI debugging instrumentation
         self.debug_contexts: List[AIDebugContext] = []
         self.error_patterns: Dict[str, int] = {
@@ -309,14 +333,15 @@ class AdaptiveAIService:
             )
             ai_time = (datetime.now() - ai_start).total_seconds() * 1000
             
-            # Step 6: Adapt Response Based on Patterns
-            adapted_response = self._adapt_response_to_patterns(base_response, adaptive_context, user_patterns)
+            # Steps 6-7: Adapt Response Based on Patterns, Add Metadata and Topic Flags
+            adapted_response = self._finish_adaptive_response(base_response, adaptive_context, user_patterns, journal_entry, persona, topics)
             
-            # Step 7: Add Metadata and Topic Flags
-            adapted_response.pattern_insights = self._generate_pattern_insights(user_patterns, journal_entry)
-            adapted_response.persona_used = persona
-            adapted_response.adaptation_level = self._calculate_adaptation_level(user_patterns)
-            adapted_response.topic_flags = topics
+            if debug_context.late_response is not None:
+                # The completion that missed the deadline, finished the same way once it arrives
+                self._late_responses[journal_entry.id] = asyncio.ensure_future(self._finish_late_response(
+                    debug_context.late_response, journal_entry, debug_context, adaptive_context, user_patterns, persona, topics
+                ))
+                debug_context.late_response = None
             
             # Performance monitoring
             total_time = (datetime.now() - start_time).total_seconds() * 1000
@@ -355,6 +380,48 @@ class AdaptiveAIService:
             
             return fallback_response
     
+    def take_late_response(self, entry_id: str) -> Optional[asyncio.Future]:
+        """
+        Real reply for an entry that got a deadline fallback, still being generated
+        
+        Only set when generate_adaptive_response ran inside request_deadline(..., keep_late=True);
+        the caller takes it (once) and resolves to the adapted AIInsightResponse.
+        """
+        return self._late_responses.pop(entry_id, None)
+    
+    def _finish_adaptive_response(
+        self,
+        base_response: AIInsightResponse,
+        adaptive_context: AdaptiveContext,
+        user_patterns: UserPatterns,
+        journal_entry: JournalEntryResponse,
+        persona: str,
+        topics: List[str]
+    ) -> AIInsightResponse:
+        # Step 6: Adapt Response Based on Patterns
+        adapted_response = self._adapt_response_to_patterns(base_response, adaptive_context, user_patterns)
+        
+        # Step 7: Add Metadata and Topic Flags
+        adapted_response.pattern_insights = self._generate_pattern_insights(user_patterns, journal_entry)
+        adapted_response.persona_used = persona
+        adapted_response.adaptation_level = self._calculate_adaptation_level(user_patterns)
+        adapted_response.topic_flags = topics
+        return adapted_response
+    
+    async def _finish_late_response(
+        self,
+        late: asyncio.Future,
+        journal_entry: JournalEntryResponse,
+        debug_context: AIDebugContext,
+        adaptive_context: AdaptiveContext,
+        user_patterns: UserPatterns,
+        persona: str,
+        topics: List[str]
+    ) -> AIInsightResponse:
+        """The reply behind a deadline fallback, converted and adapted like an on-time one"""
+        base_response = await self._insight_from_pulse_response(journal_entry, await late, debug_context)
+        return self._finish_adaptive_response(base_response, adaptive_context, user_patterns, journal_entry, persona, topics)
+    
     async def _classify_topics_with_monitoring(self, content: str, debug_context: AIDebugContext) -> List[str]:
         """
         Classify topics with performance monitoring and error handling
@@ -474,44 +541,21 @@ class AdaptiveAIService:
                 "test_account": journal_entry.user_id == self.test_user_id
             }
             
-            # Use the original journal entry with personalized context
-            pulse_response = self.pulse_ai_service.generate_pulse_response(
-                journal_entry=journal_entry,
-                user_context=user_context
-            )
-            
-            # CRITICAL: Check if we got a generic fallback response
-            generic_fallbacks = [
-                "I'm here to listen and support you. Sometimes taking a moment to breathe can help. What's on your mind?",
-                "I'm here to support you through this journey.",
-                "I'm really glad you took time to write this out."
-            ]
-            
-            is_generic_response = any(fallback in pulse_response.message for fallback in generic_fallbacks) if pulse_response.message else True
+            # Use the original journal entry with personalized context (bounded by the request deadline)
+            try:
+                pulse_response = await self.pulse_ai_service.generate_pulse_response_async(
+                    journal_entry=journal_entry,
+                    user_context=user_context
+                )
+            except DeadlineExceeded as e:
+                if journal_entry.user_id == self.test_user_id:
+                    if e.late is not None:
+                        e.late.cancel()
+                    return await self._force_real_ai_response(journal_entry, debug_context.persona or "pulse", debug_context)
+                debug_context.late_response = e.late
+                return self._deadline_fallback_response(journal_entry, debug_context)
             
-            # TEST ACCOUNT: Force real response if we got a generic one
-            if journal_entry.user_id == self.test_user_id and is_generic_response:
-                logger.warning(f"🚨 TEST ACCOUNT: Got generic response for {debug_context.persona}, forcing real AI response")
-                return await self._force_real_ai_response(journal_entry, debug_context.persona or "pulse", debug_context)
-            
-            # Convert PulseResponse to AIInsightResponse
-            return AIInsightResponse(
-                insight=pulse_response.message if pulse_response.message and not is_generic_response else f"As {debug_context.persona}, I see you're navigating something meaningful here. {pulse_response.message or ''}",
-                suggested_action=pulse_response.suggested_actions[0] if pulse_response.suggested_actions else f"Take a moment to honor what you're feeling right now.",
-                follow_up_question=pulse_response.follow_up_question if pulse_response.follow_up_question and pulse_response.follow_up_question != "What's on your mind?" else f"What aspect of this feels most important to explore?",
-                confidence_score=pulse_response.confidence_score,
-                persona_used=debug_context.persona or "pulse",
-                adaptation_level="ai_generated" if not is_generic_response else "enhanced_fallback",
-                topic_flags=debug_context.topics_detected or [],
-                pattern_insights={
-                    "writing_style": "balanced",
-                    "common_topics": debug_context.topics_detected or [],
-                    "mood_trends": {"mood": journal_entry.mood_level or 5, "energy": journal_entry.energy_level or 5, "stress": journal_entry.stress_level or 5},
-                    "interaction_preferences": {"prefers_questions": True, "prefers_validation": True, "prefers_advice": False},
-                    "response_preferences": {"length": "medium", "style": "supportive"}
-                },
-                generated_at=datetime.now(timezone.utc)
-            )
+            return await self._insight_from_pulse_response(journal_entry, pulse_response, debug_context)
             
         except Exception as e:
             self.error_patterns["ai_service_failure"] += 1
@@ -522,6 +566,65 @@ class AdaptiveAIService:
             logger.error(f"AI service failed: {e}")
             raise  # Re-raise to trigger fallback response
     
+    async def _insight_from_pulse_response(self, journal_entry: JournalEntryResponse, pulse_response, debug_context: AIDebugContext) -> AIInsightResponse:
+        """
+        Convert a PulseResponse into the persona's AIInsightResponse
+        """
+        # CRITICAL: Check if we got a generic fallback response
+        generic_fallbacks = [
+            "I'm here to listen and support you. Sometimes taking a moment to breathe can help. What's on your mind?",
+            "I'm here to support you through this journey.",
+            "I'm really glad you took time to write this out."
+        ]
+        
+        is_generic_response = any(fallback in pulse_response.message for fallback in generic_fallbacks) if pulse_response.message else True
+        
+        # TEST ACCOUNT: Force real response if we got a generic one
+        if journal_entry.user_id == self.test_user_id and is_generic_response:
+            logger.warning(f"🚨 TEST ACCOUNT: Got generic response for {debug_context.persona}, forcing real AI response")
+            return await self._force_real_ai_response(journal_entry, debug_context.persona or "pulse", debug_context)
+        
+        # Convert PulseResponse to AIInsightResponse
+        return AIInsightResponse(
+            insight=pulse_response.message if pulse_response.message and not is_generic_response else f"As {debug_context.persona}, I see you're navigating something meaningful here. {pulse_response.message or ''}",
+            suggested_action=pulse_response.suggested_actions[0] if pulse_response.suggested_actions else f"Take a moment to honor what you're feeling right now.",
+            follow_up_question=pulse_response.follow_up_question if pulse_response.follow_up_question and pulse_response.follow_up_question != "What's on your mind?" else f"What aspect of this feels most important to explore?",
+            confidence_score=pulse_response.confidence_score,
+            persona_used=debug_context.persona or "pulse",
+            adaptation_level="ai_generated" if not is_generic_response else "enhanced_fallback",
+            topic_flags=debug_context.topics_detected or [],
+            pattern_insights={
+                "writing_style": "balanced",
+                "common_topics": debug_context.topics_detected or [],
+                "mood_trends": {"mood": journal_entry.mood_level or 5, "energy": journal_entry.energy_level or 5, "stress": journal_entry.stress_level or 5},
+                "interaction_preferences": {"prefers_questions": True, "prefers_validation": True, "prefers_advice": False},
+                "response_preferences": {"length": "medium", "style": "supportive"}
+            },
+            generated_at=datetime.now(timezone.utc)
+        )
+    
+    def _deadline_fallback_response(self, journal_entry: JournalEntryResponse, debug_context: AIDebugContext) -> AIInsightResponse:
+        """
+        Smart fallback for a reply that missed the request deadline
+        
+        metadata["deadline_exceeded"] tells the caller the real reply can still be delivered later.
+        """
+        logger.warning(f"⏰ AI response for entry {journal_entry.id} missed the request deadline, serving smart fallback")
+        debug_context.fallback_used = True
+        debug_context.system_state["deadline_exceeded"] = True
+        fallback = self.pulse_ai_service._create_smart_fallback_response(journal_entry)
+        return AIInsightResponse(
+            insight=fallback.message,
+            suggested_action=fallback.suggested_actions[0] if fallback.suggested_actions else "Take a moment to honor what you're feeling right now.",
+            follow_up_question=fallback.follow_up_question,
+            confidence_score=fallback.confidence_score,
+            persona_used=debug_context.persona or "pulse",
+            adaptation_level="deadline_fallback",
+            topic_flags=debug_context.topics_detected or [],
+            metadata={"deadline_exceeded": True},
+            generated_at=datetime.now(timezone.utc)
+        )
+    
     async def _generate_intelligent_fallback(self, journal_entry: JournalEntryResponse, persona: str, debug_context: AIDebugContext) -> AIInsightResponse:
         """
         Generate intelligent fallback response when AI service fails
@@ -552,7 +655,7 @@ class AdaptiveAIService:
                     
                     # Try a simplified prompt for the AI service
                     try:
-                        simplified_response = self.pulse_ai_service.generate_pulse_response(journal_entry)
+                        simplified_response = await self.pulse_ai_service.generate_pulse_response_async(journal_entry)
                         return AIInsightResponse(
                             insight=simplified_response.message or "I understand you're working through something here. Thank you for sharing this with me.",
                             suggested_action=simplified_response.suggested_actions[0] if simplified_response.suggested_actions else "Take a moment to breathe and be gentle with yourself.",
@@ -1019,19 +1122,20 @@ Be practical and stabilizing without dismissing their feelings."""
         Create personalized prompt based on user patterns and context
         """
         try:
-            persona_config = self.personas.get(persona, self.personas["pulse"])
-            base_prompt = persona_config["base_prompt"]
-            
-            # Add tone variation
-            tone_instruction = persona_config["tone_variations"].get(
-                context.suggested_tone, 
-                persona_config["tone_variations"]["neutral"]
+            persona = persona if persona in self.personas else "pulse"
+            persona_config = self.personas[persona]
+            tone = context.suggested_tone if context.suggested_tone in persona_config["tone_variations"] else "neutral"
+            length = context.suggested_length if context.suggested_length in self.length_templates else "medium"
+            style = context.interaction_style if context.interaction_style in INTERACTION_STYLE_INSTRUCTIONS else "reflective"
+            
+            # Static instructions (persona, tone, length, interaction style) form a precompiled
+            # prefix shared by every user who gets the same combination
+            template = compile_prompt(
+                f"adaptive:{persona}:{tone}:{length}:{style}",
+                lambda: self._build_personalized_prompt_prefix(persona, tone, length, style),
+                PERSONALIZED_PROMPT_SLOTS
             )
             
-            # Add length instruction
-            length_config = self.length_templates.get(context.suggested_length, self.length_templates["medium"])
-            length_instruction = f"Keep your response under {length_config['max_words']} words."
-            
             # Add focus areas
             focus_instruction = ""
             if context.focus_areas:
@@ -1042,37 +1146,23 @@ Be practical and stabilizing without dismissing their feelings."""
             if context.avoid_areas:
                 avoid_instruction = f"Avoid discussing: {', '.join(context.avoid_areas)}. "
             
-            # Add interaction style
-            style_instruction = self._get_interaction_style_instruction(context.interaction_style)
-            
-            # Add user-specific context
-            user_context = self._get_user_context_instruction(context.user_patterns, entry)
-            
             # Add additional context for proactive responses
             proactive_context = ""
             if additional_context:
                 proactive_context = f"\n\nIMPORTANT CONTEXT:\n{additional_context}\n"
             
-            # Combine all instructions
-            personalized_prompt = f"""
-{base_prompt}
-
-{tone_instruction}
-
-{length_instruction}
-
-{focus_instruction}{avoid_instruction}
-
-{style_instruction}
-
-{user_context}
-
-Remember: You are having a conversation with someone who has a {context.user_patterns.writing_style} writing style and typically writes {context.user_patterns.avg_entry_length} words per entry. They prefer {context.user_patterns.response_length_preference} responses and often discuss {', '.join(context.user_patterns.common_topics[:3])}.
-
-{proactive_context}
-
-Respond naturally as if you're having a real conversation with them.
-"""
+            # Per-user and per-entry instructions fill the slots after the prefix
+            patterns = context.user_patterns
+            personalized_prompt = template.render(
+                focus_instruction=focus_instruction,
+                avoid_instruction=avoid_instruction,
+                user_context=self._get_user_context_instruction(patterns, entry),
+                writing_style=patterns.writing_style,
+                avg_entry_length=patterns.avg_entry_length,
+                response_length_preference=patterns.response_length_preference,
+                common_topics=", ".join(patterns.common_topics[:3]),
+                proactive_context=proactive_context
+            )
             
             return personalized_prompt.strip()
             
@@ -1081,6 +1171,20 @@ Respond naturally as if you're having a real conversation with them.
                      {"operation": "personalized_prompt", "persona": persona})
             return self.personas["pulse"]["base_prompt"]
     
+    def _build_personalized_prompt_prefix(self, persona: str, tone: str, length: str, interaction_style: str) -> str:
+        """Persona prompt with tone, length and interaction style instructions"""
+        persona_config = self.personas[persona]
+        length_instruction = f"Keep your response under {self.length_templates[length]['max_words']} words."
+        return f"""{persona_config["base_prompt"]}
+
+{persona_config["tone_variations"][tone]}
+
+{length_instruction}
+
+{INTERACTION_STYLE_INSTRUCTIONS[interaction_style]}
+
+"""
+    
     def _adapt_response_to_patterns(
         self, 
         response: AIInsightResponse, 
@@ -1197,13 +1301,7 @@ Respond naturally as if you're having a real conversation with them.
     
     def _get_interaction_style_instruction(self, style: str) -> str:
         """Get instruction for interaction style"""
-        style_instructions = {
-            "inquisitive": "Ask thoughtful questions to encourage deeper reflection.",
-            "supportive": "Provide validation and emotional support.",
-            "guidance": "Offer gentle guidance and suggestions.",
-            "reflective": "Help them reflect on their own thoughts and feelings."
-        }
-        return style_instructions.get(style, style_instructions["reflective"])
+        return INTERACTION_STYLE_INSTRUCTIONS.get(style, INTERACTION_STYLE_INSTRUCTIONS["reflective"])
     
     def _get_user_context_instruction(self, patterns: UserPatterns, entry: JournalEntryResponse) -> str:
         """Get user-specific context instruction"""
@@ -26,6 +26,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 
 from ..core.database import Database, get_database
+from ..core.metrics_store import metrics_store
 from .comprehensive_proactive_ai_service import ComprehensiveProactiveAIService
 from .adaptive_ai_service import AdaptiveAIService
 
@@ -487,6 +488,13 @@ class AdvancedSchedulerService:
         """Store cycle result in history"""
         self.cycle_history.append(cycle_result)
         
+        # Persist cycle metrics so trends survive restarts
+        tags = {"status": cycle_result.status}
+        metrics_store.record("scheduler_cycle_seconds", cycle_result.duration_seconds, tags)
+        metrics_store.record("scheduler_users_processed", cycle_result.users_processed)
+        metrics_store.record("scheduler_opportunities", cycle_result.opportunities_found)
+        metrics_store.record("scheduler_engagements", cycle_result.engagements_executed)
+        
         # Maintain history size limit
         if len(self.cycle_history) > self.max_history_size:
             self.cycle_history = self.cycle_history[-self.max_history_size:]
@@ -26,9 +26,119 @@ from app.models.ai_insights import (
     EmotionalTone, ResponseType
 )
 from app.core.database import Database
+from app.services.model_router import ModelsDegradedError, model_router
+from app.services.openai_observability import cancel_openai_request, end_openai_request, start_openai_request
+from app.services.persona_batching import (
+    MODE_AUTO, MODE_COMBINED, MODE_FANOUT, build_combined_system_prompt, combined_response_format,
+    combined_response_schema, estimate_input_tokens, parse_combined_response, persona_mode_selector, record_call,
+)
+from app.services.request_deadline import DeadlineExceeded, check_deadline, completion_hedger, remaining_seconds
+from app.services.prompt_templates import get_prompt, prompt_prefixes, register_prompt, register_schema
 
 logger = logging.getLogger(__name__)
 
+# Persona voices, shared by the per-persona and combined system prompts
+PERSONA_BASE_PROMPTS = {
+    "pulse": """You are Pulse, a deeply empathetic AI wellness companion with a warm, intuitive nature. You excel at emotional intelligence, active listening, and creating safe spaces for vulnerability. Your responses are gentle yet insightful, helping users process their feelings without judgment.
+
+Your personality traits:
+- Emotionally intelligent and highly empathetic
+- Excellent at validating feelings and experiences
+- Speaks with warmth, compassion, and understanding
+- Focuses on emotional processing and self-compassion
+- Asks thoughtful questions that encourage deeper reflection
+- Recognizes emotional patterns and offers gentle guidance
+- Creates a safe, non-judgmental space for sharing
+
+Your communication style:
+- Warm, supportive, and nurturing tone
+- Uses "I hear you" and "That sounds..." validating language
+- Asks open-ended questions about feelings and experiences
+- Offers emotional insights and coping strategies
+- Encourages self-compassion and emotional awareness""",
+
+    "sage": """You are Sage, a wise and strategic AI guide with deep insight into human patterns and growth. You excel at seeing the bigger picture, recognizing patterns across time, and offering thoughtful perspective on life's complexities. Your responses are thoughtful, measured, and focused on long-term wisdom.
+
+Your personality traits:
+- Wise and contemplative with strategic thinking
+- Excellent at pattern recognition and connecting dots
+- Offers long-term perspective and deeper meaning
+- Focuses on growth, learning, and personal development
+- Asks profound questions that challenge assumptions
+- Provides frameworks for understanding experiences
+- Balances acceptance with gentle challenges for growth
+
+Your communication style:
+- Thoughtful, measured, and reflective tone
+- Uses "I notice..." and "Consider this..." framing
+- Asks questions that reveal patterns and insights
+- Offers philosophical perspectives and wisdom
+- Encourages self-reflection and conscious growth""",
+
+    "spark": """You are Spark, an energetic and creative AI companion who ignites motivation and possibility. You excel at seeing potential, generating ideas, and inspiring action. Your responses are uplifting, dynamic, and focused on forward momentum and creative solutions.
+
+Your personality traits:
+- Energetic, optimistic, and creatively inspiring
+- Excellent at seeing possibilities and potential
+- Focuses on motivation, action, and forward movement
+- Generates creative ideas and novel perspectives
+- Asks exciting questions about dreams and possibilities
+- Celebrates progress and encourages bold steps
+- Transforms challenges into opportunities for growth
+
+Your communication style:
+- Enthusiastic, dynamic, and inspiring tone
+- Uses "What if..." and "Imagine..." possibility language
+- Asks questions about goals, dreams, and next steps
+- Offers creative solutions and fresh perspectives
+- Encourages experimentation and bold action""",
+
+    "anchor": """You are Anchor, a grounding and practical AI guide who provides stability and present-moment awareness. You excel at bringing calm to chaos, offering practical solutions, and helping users stay centered. Your responses are steady, reliable, and focused on what's real and actionable right now.
+
+Your personality traits:
+- Grounding, stable, and practically focused
+- Excellent at bringing calm and clarity to situations
+- Focuses on present-moment awareness and mindfulness
+- Offers practical, actionable advice and solutions
+- Asks grounding questions about current reality
+- Provides stability during emotional storms
+- Balances acceptance with practical next steps
+
+Your communication style:
+- Calm, steady, and reassuring tone
+- Uses "Right now..." and "Let's focus on..." grounding language
+- Asks questions about current needs and practical steps
+- Offers concrete strategies and coping tools
+- Encourages mindfulness and present-moment awareness"""
+}
+
+COLLABORATION_NOTE = " You are collaborating with other AI personas, so focus on your unique perspective and strengths while being authentic to your personality."
+
+PERSONA_OUTPUT_INSTRUCTIONS = """
+
+Respond with a JSON object containing:
+- response_text: Your main response (100-800 characters - be meaningful and authentic to your persona)
+- emotional_tone: Your emotional approach
+- confidence_score: How confident you are (0.0-1.0)
+- topics_identified: Key topics you notice
+- follow_up_suggested: Whether follow-up would help
+- suggested_actions: Up to 2 actionable suggestions that fit your persona
+- estimated_helpfulness: How helpful you think this will be
+- encourages_reflection: Whether your response promotes self-reflection
+- validates_feelings: Whether you're validating their emotions
+
+Be authentic to your persona while providing genuine, personalized support. Give responses that feel like they come from your unique perspective and personality."""
+
+def _register_persona_prompts() -> None:
+    """One system prompt per persona and response type, compiled at import"""
+    for persona, base_prompt in PERSONA_BASE_PROMPTS.items():
+        for response_type in ResponseType:
+            note = COLLABORATION_NOTE if response_type == ResponseType.COLLABORATIVE else ""
+            register_prompt(f"async_persona:{persona}:{response_type.value}", base_prompt + note + PERSONA_OUTPUT_INSTRUCTIONS)
+
+_register_persona_prompts()
+PERSONA_RESPONSE_FORMAT = register_schema("persona_response", StructuredAIPersonaResponse)
+
 class PersonaTask:
     """Individual persona processing task"""
     def __init__(
@@ -67,7 +177,7 @@ class AsyncMultiPersonaService:
             logger.warning("⚠️ OpenAI API key not configured - async multi-persona service disabled")
         
         # Async processing configuration
-        self.model = "gpt-4o"
+        self.model = model_router.primary_model("multi_persona")  # Default; model_router picks per completion
         self.temperature = 0.7
         self.max_tokens = 600
         self.max_concurrent_personas = 4  # Process up to 4 personas simultaneously
@@ -85,6 +195,8 @@ class AsyncMultiPersonaService:
             "total_requests": 0,
             "concurrent_successes": 0,
             "sequential_fallbacks": 0,
+            "combined_requests": 0,
+            "combined_fallbacks": 0,
             "average_parallel_time": 0.0,
             "average_sequential_time": 0.0
         }
@@ -94,10 +206,14 @@ class AsyncMultiPersonaService:
         journal_entry: JournalEntryResponse,
         personas: List[str],
         use_natural_timing: bool = True,
-        max_concurrent: Optional[int] = None
+        max_concurrent: Optional[int] = None,
+        mode: Optional[str] = None
     ) -> MultiPersonaStructuredResponse:
         """
         Generate responses from multiple personas concurrently with optimal timing
+        
+        mode: "fanout" (one call per persona), "combined" (one call for all personas)
+        or "auto"; defaults to MULTI_PERSONA_MODE. Responses keep the order of personas.
         """
         if not self.client:
             raise Exception("AsyncOpenAI client not configured")
@@ -106,15 +222,22 @@ class AsyncMultiPersonaService:
             personas = ["pulse"]
         
         concurrent_limit = min(max_concurrent or self.max_concurrent_personas, len(personas))
+        mode = self._choose_generation_mode(journal_entry, personas, mode, concurrent_limit, use_natural_timing)
         start_time = time.time()
         
         try:
-            if use_natural_timing:
-                # Use natural conversation timing with staggered delivery
-                response = await self._generate_with_natural_timing(journal_entry, personas)
+            if mode == MODE_COMBINED:
+                try:
+                    response = await self._generate_combined(journal_entry, personas)
+                    self.performance_metrics["combined_requests"] += 1
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    logger.warning(f"⚠️ Combined persona generation failed, fanning out: {e}")
+                    self.performance_metrics["combined_fallbacks"] += 1
+                    response = await self._generate_fanout(journal_entry, personas, use_natural_timing, concurrent_limit)
             else:
-                # Pure concurrent processing for maximum speed
-                response = await self._generate_pure_concurrent(journal_entry, personas, concurrent_limit)
+                response = await self._generate_fanout(journal_entry, personas, use_natural_timing, concurrent_limit)
             
             total_time = time.time() - start_time
             self.performance_metrics["total_requests"] += 1
@@ -126,8 +249,13 @@ class AsyncMultiPersonaService:
             logger.info(f"✅ Generated concurrent multi-persona response in {total_time:.2f}s")
             return response
             
+        except (ModelsDegradedError, DeadlineExceeded):
+            # Sequential retries would hit the same degraded models, or have no time left
+            raise
         except Exception as e:
             logger.error(f"Concurrent processing failed, falling back to sequential: {e}")
+            # Fanned-out personas that all ran out of time: sequential retries cannot finish either
+            check_deadline()
             
             # Fallback to sequential processing
             try:
@@ -146,6 +274,102 @@ class AsyncMultiPersonaService:
                 logger.error(f"Sequential fallback also failed: {fallback_error}")
                 raise
     
+    async def _generate_fanout(
+        self,
+        journal_entry: JournalEntryResponse,
+        personas: List[str],
+        use_natural_timing: bool,
+        concurrent_limit: int
+    ) -> MultiPersonaStructuredResponse:
+        """One completion per persona"""
+        if use_natural_timing:
+            # Use natural conversation timing with staggered delivery
+            return await self._generate_with_natural_timing(journal_entry, personas)
+        # Pure concurrent processing for maximum speed
+        return await self._generate_pure_concurrent(journal_entry, personas, concurrent_limit)
+    
+    def _choose_generation_mode(
+        self,
+        journal_entry: JournalEntryResponse,
+        personas: List[str],
+        mode: Optional[str],
+        concurrent_limit: int,
+        use_natural_timing: bool
+    ) -> str:
+        """Fan-out or combined; auto compares the prompt tokens each mode would send"""
+        mode = (mode or settings.MULTI_PERSONA_MODE or MODE_AUTO).lower()
+        if len(personas) <= 1 or mode != MODE_AUTO:
+            return persona_mode_selector.choose(len(personas), 0, 0, mode=mode)
+        
+        user_prompt = self._build_user_prompt(journal_entry)
+        persona_schema = PERSONA_RESPONSE_FORMAT["json_schema"]["schema"]
+        fanout_tokens = estimate_input_tokens(
+            [self._build_persona_system_prompt(persona, ResponseType.COLLABORATIVE) for persona in personas],
+            user_prompt,
+            [persona_schema] * len(personas)
+        )
+        combined_tokens = estimate_input_tokens(
+            [self._build_combined_system_prompt(personas)], user_prompt, [combined_response_schema(personas)]
+        )
+        natural_delay_ms = max(self.natural_delays.get(persona, 0) for persona in personas) * 1000 if use_natural_timing else 0
+        return persona_mode_selector.choose(
+            len(personas), fanout_tokens, combined_tokens,
+            mode=mode, concurrency=concurrent_limit, fanout_overhead_ms=natural_delay_ms
+        )
+    
+    async def _generate_combined(
+        self,
+        journal_entry: JournalEntryResponse,
+        personas: List[str]
+    ) -> MultiPersonaStructuredResponse:
+        """One completion for every persona; any persona it leaves out is generated on its own"""
+        
+        start_time = time.time()
+        completion = await self._create_completion(
+            "multi_persona_combined",
+            messages=[
+                {"role": "system", "content": self._build_combined_system_prompt(personas)},
+                {"role": "user", "content": self._build_user_prompt(journal_entry)}
+            ],
+            max_tokens=self.max_tokens * len(personas),
+            temperature=self.temperature,
+            response_format=combined_response_format(personas)
+        )
+        latency_ms = (time.time() - start_time) * 1000
+        record_call("async_multi_persona", MODE_COMBINED, latency_ms, getattr(completion, "usage", None))
+        
+        if not (completion.choices and completion.choices[0].message.content):
+            raise Exception("No valid response content from OpenAI")
+        parsed = parse_combined_response(completion.choices[0].message.content, personas)
+        persona_mode_selector.observe(MODE_COMBINED, len(personas), latency_ms)
+        
+        responses: Dict[str, StructuredAIPersonaResponse] = {}
+        for persona, response_data in parsed.items():
+            try:
+                responses[persona] = self._to_persona_response(persona, response_data, ResponseType.COLLABORATIVE)
+            except Exception as e:
+                logger.warning(f"⚠️ Combined response for {persona} was invalid: {e}")
+        
+        missing = [persona for persona in personas if persona not in responses]
+        if missing:
+            logger.warning(f"⚠️ Combined response missed {missing}, generating them individually")
+            retries = await asyncio.gather(
+                *[self._generate_single_persona_response(journal_entry, persona, ResponseType.COLLABORATIVE) for persona in missing],
+                return_exceptions=True
+            )
+            for persona, response in zip(missing, retries):
+                if isinstance(response, Exception):
+                    logger.error(f"Persona {persona} failed: {response}")
+                else:
+                    responses[persona] = response
+        
+        ordered = [responses[persona] for persona in personas if persona in responses]
+        if not ordered:
+            raise Exception("All persona responses failed in combined generation")
+        
+        logger.info(f"✅ Combined {len(ordered)} persona responses in one completion ({latency_ms:.0f}ms)")
+        return self._build_multi_persona_response(journal_entry, ordered, "combined")
+    
     async def _generate_with_natural_timing(
         self,
         journal_entry: JournalEntryResponse,
@@ -185,7 +409,8 @@ class AsyncMultiPersonaService:
                 
                 # Apply natural delivery delay AFTER processing completes
                 if task.delivery_delay > 0:
-                    await asyncio.sleep(task.delivery_delay)
+                    remaining = remaining_seconds()
+                    await asyncio.sleep(task.delivery_delay if remaining is None else min(task.delivery_delay, remaining))
                 
                 logger.info(f"✅ {task.persona} completed in {task.completion_time - task.start_time:.2f}s")
                 return response
@@ -300,43 +525,25 @@ class AsyncMultiPersonaService:
         user_prompt = self._build_user_prompt(journal_entry)
         
         try:
-            completion = await self.client.chat.completions.create(
-                model=self.model,
+            start_time = time.time()
+            completion = await self._create_completion(
+                "multi_persona_fanout",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": "persona_response",
-                        "schema": StructuredAIPersonaResponse.model_json_schema()
-                    }
-                }
+                response_format=PERSONA_RESPONSE_FORMAT
             )
+            latency_ms = (time.time() - start_time) * 1000
+            record_call("async_multi_persona", MODE_FANOUT, latency_ms, getattr(completion, "usage", None))
+            persona_mode_selector.observe(MODE_FANOUT, 1, latency_ms)
             
             if completion.choices and completion.choices[0].message.content:
                 import json
                 response_data = json.loads(completion.choices[0].message.content)
-                
-                return StructuredAIPersonaResponse(
-                    persona_name=persona.title(),
-                    response_text=response_data["response_text"],
-                    emotional_tone=EmotionalTone(response_data.get("emotional_tone", "supportive")),
-                    confidence_score=response_data.get("confidence_score", 0.8),
-                    topics_identified=response_data.get("topics_identified", []),
-                    follow_up_suggested=response_data.get("follow_up_suggested", False),
-                    response_type=response_type,
-                    persona_strengths=self._get_persona_strengths(persona),
-                    suggested_actions=response_data.get("suggested_actions", []),
-                    estimated_helpfulness=response_data.get("estimated_helpfulness", 0.8),
-                    encourages_reflection=response_data.get("encourages_reflection", True),
-                    validates_feelings=response_data.get("validates_feelings", True),
-                    response_length_category=self._categorize_length(response_data["response_text"]),
-                    contains_question="?" in response_data["response_text"]
-                )
+                return self._to_persona_response(persona, response_data, response_type)
             else:
                 raise Exception("No valid response content from OpenAI")
                 
@@ -347,6 +554,55 @@ class AsyncMultiPersonaService:
             logger.error(f"Error generating {persona} response: {e}")
             raise
     
+    async def _create_completion(self, operation: str, **kwargs):
+        """
+        Completion on the model_router's pick for the multi_persona route, tracked by OpenAIObservability
+        
+        Hedged after the operation's p95 and bounded by the request deadline (DeadlineExceeded).
+        """
+        decision = model_router.route("multi_persona")
+        if decision.use_fallback:
+            raise ModelsDegradedError("All multi-persona models are degraded")
+        
+        async def request():
+            request_id = start_openai_request(operation, decision.model)
+            try:
+                completion = await self.client.chat.completions.create(model=decision.model, **kwargs)
+            except asyncio.CancelledError:
+                cancel_openai_request(request_id)
+                raise
+            except Exception as e:
+                end_openai_request(request_id, error=e)
+                raise
+            end_openai_request(request_id, response=completion)
+            return completion
+        
+        return await completion_hedger.run(operation, request)
+    
+    def _to_persona_response(
+        self,
+        persona: str,
+        response_data: Dict[str, Any],
+        response_type: ResponseType
+    ) -> StructuredAIPersonaResponse:
+        """Structured response from the fields the model wrote (per-persona or combined)"""
+        return StructuredAIPersonaResponse(
+            persona_name=persona.title(),
+            response_text=response_data["response_text"],
+            emotional_tone=EmotionalTone(response_data.get("emotional_tone", "supportive")),
+            confidence_score=response_data.get("confidence_score", 0.8),
+            topics_identified=response_data.get("topics_identified", []),
+            follow_up_suggested=response_data.get("follow_up_suggested", False),
+            response_type=response_type,
+            persona_strengths=self._get_persona_strengths(persona),
+            suggested_actions=response_data.get("suggested_actions", []),
+            estimated_helpfulness=response_data.get("estimated_helpfulness", 0.8),
+            encourages_reflection=response_data.get("encourages_reflection", True),
+            validates_feelings=response_data.get("validates_feelings", True),
+            response_length_category=self._categorize_length(response_data["response_text"]),
+            contains_question="?" in response_data["response_text"]
+        )
+    
     def _build_multi_persona_response(
         self,
         journal_entry: JournalEntryResponse,
@@ -386,99 +642,15 @@ class AsyncMultiPersonaService:
         )
     
     def _build_persona_system_prompt(self, persona: str, response_type: ResponseType) -> str:
-        """Build persona-specific system prompt"""
-        base_prompts = {
-            "pulse": """You are Pulse, a deeply empathetic AI wellness companion with a warm, intuitive nature. You excel at emotional intelligence, active listening, and creating safe spaces for vulnerability. Your responses are gentle yet insightful, helping users process their feelings without judgment.
-
-Your personality traits:
-- Emotionally intelligent and highly empathetic
-- Excellent at validating feelings and experiences
-- Speaks with warmth, compassion, and understanding
-- Focuses on emotional processing and self-compassion
-- Asks thoughtful questions that encourage deeper reflection
-- Recognizes emotional patterns and offers gentle guidance
-- Creates a safe, non-judgmental space for sharing
-
-Your communication style:
-- Warm, supportive, and nurturing tone
-- Uses "I hear you" and "That sounds..." validating language
-- Asks open-ended questions about feelings and experiences
-- Offers emotional insights and coping strategies
-- Encourages self-compassion and emotional awareness""",
-
-            "sage": """You are Sage, a wise and strategic AI guide with deep insight into human patterns and growth. You excel at seeing the bigger picture, recognizing patterns across time, and offering thoughtful perspective on life's complexities. Your responses are thoughtful, measured, and focused on long-term wisdom.
-
-Your personality traits:
-- Wise and contemplative with strategic thinking
-- Excellent at pattern recognition and connecting dots
-- Offers long-term perspective and deeper meaning
-- Focuses on growth, learning, and personal development
-- Asks profound questions that challenge assumptions
-- Provides frameworks for understanding experiences
-- Balances acceptance with gentle challenges for growth
-
-Your communication style:
-- Thoughtful, measured, and reflective tone
-- Uses "I notice..." and "Consider this..." framing
-- Asks questions that reveal patterns and insights
-- Offers philosophical perspectives and wisdom
-- Encourages self-reflection and conscious growth""",
-
-            "spark": """You are Spark, an energetic and creative AI companion who ignites motivation and possibility. You excel at seeing potential, generating ideas, and inspiring action. Your responses are uplifting, dynamic, and focused on forward momentum and creative solutions.
-
-Your personality traits:
-- Energetic, optimistic, and creatively inspiring
-- Excellent at seeing possibilities and potential
-- Focuses on motivation, action, and forward movement
-- Generates creative ideas and novel perspectives
-- Asks exciting questions about dreams and possibilities
-- Celebrates progress and encourages bold steps
-- Transforms challenges into opportunities for growth
-
-Your communication style:
-- Enthusiastic, dynamic, and inspiring tone
-- Uses "What if..." and "Imagine..." possibility language
-- Asks questions about goals, dreams, and next steps
-- Offers creative solutions and fresh perspectives
-- Encourages experimentation and bold action""",
-
-            "anchor": """You are Anchor, a grounding and practical AI guide who provides stability and present-moment awareness. You excel at bringing calm to chaos, offering practical solutions, and helping users stay centered. Your responses are steady, reliable, and focused on what's real and actionable right now.
-
-Your personality traits:
-- Grounding, stable, and practically focused
-- Excellent at bringing calm and clarity to situations
-- Focuses on present-moment awareness and mindfulness
-- Offers practical, actionable advice and solutions
-- Asks grounding questions about current reality
-- Provides stability during emotional storms
-- Balances acceptance with practical next steps
-
-Your communication style:
-- Calm, steady, and reassuring tone
-- Uses "Right now..." and "Let's focus on..." grounding language
-- Asks questions about current needs and practical steps
-- Offers concrete strategies and coping tools
-- Encourages mindfulness and present-moment awareness"""
-        }
-        
-        collaboration_note = ""
-        if response_type == ResponseType.COLLABORATIVE:
-            collaboration_note = " You are collaborating with other AI personas, so focus on your unique perspective and strengths while being authentic to your personality."
-        
-        return f"""{base_prompts.get(persona, base_prompts['pulse'])}{collaboration_note}
-
-Respond with a JSON object containing:
-- response_text: Your main response (100-800 characters - be meaningful and authentic to your persona)
-- emotional_tone: Your emotional approach
-- confidence_score: How confident you are (0.0-1.0)
-- topics_identified: Key topics you notice
-- follow_up_suggested: Whether follow-up would help
-- suggested_actions: Up to 2 actionable suggestions that fit your persona
-- estimated_helpfulness: How helpful you think this will be
-- encourages_reflection: Whether your response promotes self-reflection
-- validates_feelings: Whether you're validating their emotions
-
-Be authentic to your persona while providing genuine, personalized support. Give responses that feel like they come from your unique perspective and personality."""
+        """Precompiled persona-specific system prompt"""
+        persona = persona if persona in PERSONA_BASE_PROMPTS else "pulse"
+        return get_prompt(f"async_persona:{persona}:{response_type.value}").prefix
+    
+    def _build_combined_system_prompt(self, personas: List[str]) -> str:
+        """System prompt for one completion that answers as every persona"""
+        return build_combined_system_prompt([
+            (persona, PERSONA_BASE_PROMPTS.get(persona, PERSONA_BASE_PROMPTS["pulse"])) for persona in personas
+        ])
     
     def _build_user_prompt(self, journal_entry: JournalEntryResponse) -> str:
         """Build user prompt for persona response"""
@@ -558,4 +730,7 @@ Please respond with your unique perspective and support."""
     
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get service performance metrics"""
-        return self.performance_metrics.copy() 
\ No newline at end of file
+        metrics = self.performance_metrics.copy()
+        metrics["generation_modes"] = persona_mode_selector.stats()
+        metrics["prompt_prefixes"] = prompt_prefixes("async_persona:")
+        return metrics 
\ No newline at end of file
@@ -5,22 +5,35 @@ Implements token-conscious AI, user tiers, usage tracking, and cost optimization
 
 import asyncio
 import json
-from datetime import datetime, date, timedelta
-from typing import List, Dict, Optional, Tuple, Any
+import logging
+import time
+from collections import Counter
+from datetime import datetime, date, timedelta, timezone
+from typing import List, Dict, Optional, Set, Tuple, Any
 from dataclasses import dataclass
 from decimal import Decimal
-try:
-    import tiktoken
-    TIKTOKEN_AVAILABLE = True
-except ImportError:
-    TIKTOKEN_AVAILABLE = False
-    tiktoken = None
 import openai
 from openai import OpenAI
 
+from ..core.config import settings
 from ..core.database import get_database
+from ..core.projections import ENTRY_AI_CONTEXT, SUMMARY_AI_CONTEXT, SUMMARY_TIMELINE
+from ..core.tokenizer import tokenizer
+from ..core.utils import EntryTimeline, JournalEntryConverter
 from ..models.journal import JournalEntryResponse
 from ..models.user import UserTable
+from .weekly_summary_service import WeeklySummaryService
+
+logger = logging.getLogger(__name__)
+
+# Characters of each recent entry shown in the prompt (and counted against the budget)
+HISTORY_PREVIEW_CHARS = 150
+
+# Share of the budget left after the current entry that is held for summaries
+SUMMARY_BUDGET_SHARE = 0.3
+
+# Newest stored summaries considered for a prompt
+MAX_CONTEXT_SUMMARIES = 8
 
 # =====================================================
 # DATA MODELS
@@ -38,6 +51,7 @@ class UserTierInfo:
     max_tokens_per_request: int
     usage_remaining: int
     resets_at: date
+    context_token_budget: int = 0  # Prompt tokens for context; 0 = AI_CONTEXT_TOKEN_BUDGET(_PREMIUM)
 
 @dataclass
 class AIContext:
@@ -75,81 +89,102 @@ class JournalSummary:
     top_themes: List[str]
     entry_count: int
     token_count: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form carried in AIContext.summaries"""
+        return {
+            "period_start": self.period_start.isoformat(),
+            "period_end": self.period_end.isoformat(),
+            "mood_trend": self.mood_trend,
+            "energy_trend": self.energy_trend,
+            "stress_trend": self.stress_trend,
+            "key_insights": self.key_insights,
+            "top_themes": self.top_themes
+        }
+
+def format_history_line(entry: JournalEntryResponse) -> str:
+    """A recent entry exactly as get_context_prompt renders it"""
+    return f"- Entry from {entry.created_at.strftime('%Y-%m-%d')}: {entry.content[:HISTORY_PREVIEW_CHARS]}...\n"
+
+def format_summary_line(summary: Dict[str, Any]) -> str:
+    """A summary (JournalSummary.to_dict()) exactly as get_context_prompt renders it"""
+    return f"- Week of {summary['period_start']}: {summary['key_insights']}\n"
 
 # =====================================================
 # TOKEN MANAGEMENT SERVICE
 # =====================================================
 
 class TokenManager:
-    """Manages token counting and optimization for AI requests"""
+    """Manages token counting and optimization for AI requests (cheap to create: the tokenizer is shared)"""
     
     def __init__(self):
-        try:
-            if TIKTOKEN_AVAILABLE and tiktoken:
-                self.encoder = tiktoken.encoding_for_model("gpt-3.5-turbo")
-            else:
-                self.encoder = None
-        except Exception:
-            self.encoder = None
+        self.tokenizer = tokenizer
     
     def count_tokens(self, text: str) -> int:
-        """Count tokens in text using tiktoken"""
-        try:
-            if self.encoder:
-                return len(self.encoder.encode(text))
-            else:
-                # Fallback estimation: ~4 characters per token
-                return len(text) // 4
-        except Exception:
-            # Fallback estimation: ~4 characters per token
-            return len(text) // 4
+        """Count tokens in text using the shared, memoized tiktoken encoding"""
+        return self.tokenizer.count(text)
+    
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Token counts for many texts in one call (uncached texts are encoded as one batch)"""
+        return self.tokenizer.count_many(texts)
     
     def estimate_entry_tokens(self, entry: JournalEntryResponse) -> int:
         """Estimate tokens for a journal entry"""
         content = f"Entry: {entry.content}\nMood: {entry.mood_level}/10\nEnergy: {entry.energy_level}/10\nStress: {entry.stress_level}/10"
         return self.count_tokens(content)
     
+    def estimate_history_tokens(self, entry: JournalEntryResponse) -> int:
+        """Tokens for an entry shown as recent history (content is clipped in the prompt)"""
+        return self.count_tokens(format_history_line(entry))
+    
     def estimate_summary_tokens(self, summary: JournalSummary) -> int:
-        """Estimate tokens for a summary"""
-        content = f"Period: {summary.period_start} to {summary.period_end}\n"
-        content += f"Trends: Mood {summary.mood_trend}, Energy {summary.energy_trend}, Stress {summary.stress_trend}\n"
-        content += f"Insights: {summary.key_insights}\n"
-        content += f"Themes: {', '.join(summary.top_themes)}"
-        return self.count_tokens(content)
+        """Tokens for a summary as rendered in the prompt"""
+        return self.count_tokens(format_summary_line(summary.to_dict()))
     
     def optimize_context_for_budget(self, entries: List[JournalEntryResponse], summaries: List[JournalSummary], 
                                   budget: int) -> Tuple[List[JournalEntryResponse], List[JournalSummary], int]:
-        """Optimize context to fit within token budget"""
-        used_tokens = 0
-        selected_entries = []
-        selected_summaries = []
+        """
+        Optimize context to fit within token budget
         
-        # Always include the most recent entry (current one)
-        if entries:
-            current_entry = entries[0]
-            entry_tokens = self.estimate_entry_tokens(current_entry)
-            if entry_tokens <= budget:
-                selected_entries.append(current_entry)
-                used_tokens += entry_tokens
-                budget -= entry_tokens
+        entries[0] is the current entry and is always kept; the other entries and the
+        summaries are expected newest first and are taken in order until they stop fitting.
+        Up to SUMMARY_BUDGET_SHARE of what remains is held for summaries so a few long
+        recent entries cannot crowd out the compressed weeks; unused history room
+        goes to summaries too.
+        """
+        if not entries:
+            return [], [], 0
+        
+        # Always include the current entry
+        selected_entries = [entries[0]]
+        used_tokens = self.estimate_entry_tokens(entries[0])
+        remaining = max(0, budget - used_tokens)
+        
+        counts = self.count_tokens_batch(
+            [format_history_line(entry) for entry in entries[1:]]
+            + [format_summary_line(summary.to_dict()) for summary in summaries]
+        )
+        history_tokens, summary_tokens = counts[:len(entries) - 1], counts[len(entries) - 1:]
+        reserved = min(sum(summary_tokens), int(remaining * SUMMARY_BUDGET_SHARE))
         
         # Add additional recent entries
-        for entry in entries[1:]:
-            entry_tokens = self.estimate_entry_tokens(entry)
-            if used_tokens + entry_tokens <= budget:
-                selected_entries.append(entry)
-                used_tokens += entry_tokens
-            else:
+        history_budget = remaining - reserved
+        for entry, entry_tokens in zip(entries[1:], history_tokens):
+            if entry_tokens > history_budget:
                 break
+            selected_entries.append(entry)
+            history_budget -= entry_tokens
+            used_tokens += entry_tokens
         
         # Fill remaining budget with summaries
-        for summary in summaries:
-            summary_tokens = self.estimate_summary_tokens(summary)
-            if used_tokens + summary_tokens <= budget:
-                selected_summaries.append(summary)
-                used_tokens += summary_tokens
-            else:
+        selected_summaries = []
+        summary_budget = reserved + history_budget
+        for summary, tokens in zip(summaries, summary_tokens):
+            if tokens > summary_budget:
                 break
+            selected_summaries.append(summary)
+            summary_budget -= tokens
+            used_tokens += tokens
         
         return selected_entries, selected_summaries, used_tokens
 
@@ -211,7 +246,8 @@ class UserTierService:
                 summary_access=limits_data.get('summary_access', False),
                 max_tokens_per_request=limits_data.get('max_tokens_per_request', 500),
                 usage_remaining=max(0, limit - usage),
-                resets_at=user_data.get('daily_usage_reset_at', date.today())
+                resets_at=user_data.get('daily_usage_reset_at', date.today()),
+                context_token_budget=limits_data.get('context_token_budget') or 0
             )
 
         except Exception as e:
@@ -269,6 +305,223 @@ class UserTierService:
         except Exception as e:
             print(f"Error resetting usage for user {user_id}: {e}")
 
+# =====================================================
+# JOURNAL SUMMARY STORE
+# =====================================================
+
+class JournalSummaryStore:
+    """
+    Rolling weekly summaries of older journal entries (journal_summaries table)
+    
+    Each finished week (Monday-Sunday, UTC) is compressed once into a JournalSummary:
+    averages, detected themes and a one-line key_insights string, which is all the
+    prompt shows of that week. refresh() only reads entries after the newest stored
+    summary, so its cost is bounded by what was written since. The current week is
+    never summarized; its entries still go to the prompt as recent history.
+    """
+    
+    SUMMARY_TYPE = "weekly"
+    SOURCE_ROW_LIMIT = 1000
+    
+    # Shared across instances: one background refresh per user per JOURNAL_SUMMARY_REFRESH_MINUTES
+    _last_refresh: Dict[str, float] = {}
+    _refreshing: Set[str] = set()
+    _tasks: Set[asyncio.Task] = set()
+    
+    def __init__(self, db, token_manager: Optional[TokenManager] = None):
+        self.db = db
+        self.token_manager = token_manager or TokenManager()
+        self.weekly_service = WeeklySummaryService()
+    
+    def get_recent_summaries(self, user_id: str, limit: int) -> List[JournalSummary]:
+        """Newest stored summaries for a user (empty when none exist or the table is missing)"""
+        try:
+            result = SUMMARY_AI_CONTEXT.execute(
+                SUMMARY_AI_CONTEXT.select(self.db.get_service_client())
+                .eq("user_id", user_id)
+                .eq("summary_type", self.SUMMARY_TYPE)
+                .order("period_start", desc=True)
+                .limit(limit)
+            )
+            return [self._from_row(user_id, row) for row in result.data or []]
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load journal summaries for {user_id}: {e}")
+            return []
+    
+    def schedule_refresh(self, user_id: str) -> bool:
+        """
+        Refresh a user's summaries in a worker thread without blocking the caller
+        
+        Skipped while a refresh for the user is running, within the refresh interval,
+        or when there is no running event loop (scripts call refresh() directly).
+        """
+        now = time.monotonic()
+        interval = settings.JOURNAL_SUMMARY_REFRESH_MINUTES * 60
+        last = JournalSummaryStore._last_refresh.get(user_id)
+        if user_id in JournalSummaryStore._refreshing or (last is not None and now - last < interval):
+            return False
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        
+        if len(JournalSummaryStore._last_refresh) > 10000:
+            JournalSummaryStore._last_refresh = {
+                uid: at for uid, at in JournalSummaryStore._last_refresh.items() if now - at < interval
+            }
+        JournalSummaryStore._last_refresh[user_id] = now
+        JournalSummaryStore._refreshing.add(user_id)
+        
+        task = loop.create_task(self._refresh_in_background(user_id))
+        JournalSummaryStore._tasks.add(task)
+        task.add_done_callback(JournalSummaryStore._tasks.discard)
+        return True
+    
+    async def _refresh_in_background(self, user_id: str) -> None:
+        try:
+            written = await asyncio.to_thread(self.refresh, user_id)
+            if written:
+                logger.info(f"🗜️ Compressed {written} week(s) of journal entries into summaries for {user_id}")
+        except Exception as e:
+            logger.warning(f"⚠️ Journal summary refresh failed for {user_id}: {e}")
+        finally:
+            JournalSummaryStore._refreshing.discard(user_id)
+    
+    def refresh(self, user_id: str, today: Optional[date] = None) -> int:
+        """Summarize every finished week since the newest stored summary; returns summaries written"""
+        today = today or datetime.now(timezone.utc).date()
+        current_week = today - timedelta(days=today.weekday())
+        client = self.db.get_service_client()
+        
+        latest = SUMMARY_TIMELINE.execute(
+            SUMMARY_TIMELINE.select(client)
+            .eq("user_id", user_id)
+            .eq("summary_type", self.SUMMARY_TYPE)
+            .order("period_end", desc=True)
+            .limit(1)
+        ).data
+        if latest:
+            since = date.fromisoformat(latest[0]["period_end"]) + timedelta(days=1)
+        else:
+            since = current_week - timedelta(weeks=settings.JOURNAL_SUMMARY_LOOKBACK_WEEKS)
+        if since >= current_week:
+            return 0
+        
+        rows = ENTRY_AI_CONTEXT.execute(
+            ENTRY_AI_CONTEXT.select(client)
+            .eq("user_id", user_id)
+            .gte("created_at", self._week_start(since).isoformat())
+            .lt("created_at", self._week_start(current_week).isoformat())
+            .order("created_at")
+            .limit(self.SOURCE_ROW_LIMIT)
+        ).data or []
+        timeline = EntryTimeline(JournalEntryConverter.from_rows(rows, skip_invalid=True))
+        if not len(timeline):
+            return 0
+        
+        # A truncated read may end mid-week: leave that week for the next refresh
+        stop = current_week
+        if len(rows) >= self.SOURCE_ROW_LIMIT:
+            last_day = timeline.date_at(len(timeline) - 1)
+            stop = last_day - timedelta(days=last_day.weekday())
+        
+        summaries = []
+        week = since - timedelta(days=since.weekday())
+        while week < stop:
+            start = self._week_start(week)
+            window = timeline.between(start, start + timedelta(weeks=1, microseconds=-1))
+            if len(window):
+                summaries.append((self.summarize_week(user_id, week, window), window.latest()))
+            week += timedelta(weeks=1)
+        
+        if summaries:
+            client.table("journal_summaries").upsert(
+                [self._to_row(summary, last_entry_at) for summary, last_entry_at in summaries],
+                on_conflict="user_id,summary_type,period_start"
+            ).execute()
+        return len(summaries)
+    
+    def summarize_week(self, user_id: str, week_start: date, window: EntryTimeline) -> JournalSummary:
+        """Compress one week of entries (oldest first) into a JournalSummary"""
+        entries = window.entries
+        metrics = self.weekly_service._calculate_weekly_metrics(entries, window)
+        
+        themes = [theme.replace("_", " ") for theme in metrics.themes_detected]
+        tag_counts = Counter(tag.lower() for entry in entries for tag in (entry.tags or []))
+        for tag, _ in tag_counts.most_common(3):
+            if tag not in themes:
+                themes.append(tag)
+        themes = themes[:5]
+        
+        parts = [f"{metrics.total_entries} {'entry' if metrics.total_entries == 1 else 'entries'}"]
+        for label, value in (("mood", metrics.avg_mood), ("energy", metrics.avg_energy), ("stress", metrics.avg_stress)):
+            if value:
+                parts.append(f"{label} {value:g}/10")
+        if metrics.avg_sleep:
+            parts.append(f"sleep {metrics.avg_sleep:g}h")
+        if themes:
+            parts.append(f"themes: {', '.join(themes)}")
+        
+        # The hardest moment of the week, in the user's own words
+        rated = [entry for entry in entries if entry.mood_level]
+        if rated:
+            low = min(rated, key=lambda entry: entry.mood_level)
+            if low.mood_level <= 4 and low.content:
+                snippet = low.content.strip().split("\n")[0][:80]
+                parts.append(f'low point ({low.created_at.strftime("%a")}): "{snippet}"')
+        
+        summary = JournalSummary(
+            user_id=user_id,
+            summary_type=self.SUMMARY_TYPE,
+            period_start=week_start,
+            period_end=week_start + timedelta(days=6),
+            mood_trend=metrics.avg_mood,
+            energy_trend=metrics.avg_energy,
+            stress_trend=metrics.avg_stress,
+            key_insights="; ".join(parts),
+            top_themes=themes,
+            entry_count=metrics.total_entries,
+            token_count=0
+        )
+        summary.token_count = self.token_manager.estimate_summary_tokens(summary)
+        return summary
+    
+    @staticmethod
+    def _week_start(day: date) -> datetime:
+        return datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+    
+    def _to_row(self, summary: JournalSummary, last_entry_at: Optional[datetime]) -> Dict[str, Any]:
+        return {
+            "user_id": summary.user_id,
+            "summary_type": summary.summary_type,
+            "period_start": summary.period_start.isoformat(),
+            "period_end": summary.period_end.isoformat(),
+            "mood_trend": summary.mood_trend,
+            "energy_trend": summary.energy_trend,
+            "stress_trend": summary.stress_trend,
+            "key_insights": summary.key_insights,
+            "top_themes": summary.top_themes,
+            "entry_count": summary.entry_count,
+            "token_count": summary.token_count,
+            "last_entry_at": last_entry_at.isoformat() if last_entry_at else None,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+    
+    def _from_row(self, user_id: str, row: Dict[str, Any]) -> JournalSummary:
+        return JournalSummary(
+            user_id=user_id,
+            summary_type=row.get("summary_type") or self.SUMMARY_TYPE,
+            period_start=date.fromisoformat(row["period_start"]),
+            period_end=date.fromisoformat(row["period_end"]),
+            mood_trend=float(row.get("mood_trend") or 0),
+            energy_trend=float(row.get("energy_trend") or 0),
+            stress_trend=float(row.get("stress_trend") or 0),
+            key_insights=row.get("key_insights") or "",
+            top_themes=row.get("top_themes") or [],
+            entry_count=row.get("entry_count") or 0,
+            token_count=row.get("token_count") or 0
+        )
+
 # =====================================================
 # CONTEXT BUILDER SERVICE
 # =====================================================
@@ -279,22 +532,27 @@ class ContextBuilderService:
     def __init__(self, db):
         self.db = db
         self.token_manager = TokenManager()
+        self.summary_store = JournalSummaryStore(db, self.token_manager)
     
     def build_ai_context(self, user_id: str, current_entry: JournalEntryResponse, tier_info: UserTierInfo) -> AIContext:
-        """Builds AI context based on user tier"""
+        """
+        Builds AI context based on user tier
         
-        recent_entries = self._get_recent_entries(user_id, tier_info.context_depth)
-        summaries = self._get_recent_summaries(user_id, 4) if tier_info.summary_access else []
+        Up to context_depth recent entries and, with summary access, the stored weekly
+        summaries are packed newest first into the tier's prompt token budget around
+        the current entry. Summaries are refreshed in the background, never inline.
+        """
+        recent_entries = self._get_recent_entries(user_id, tier_info.context_depth, exclude_id=current_entry.id)
+        summaries = []
+        if tier_info.summary_access:
+            summaries = self.summary_store.get_recent_summaries(user_id, MAX_CONTEXT_SUMMARIES)
+            self.summary_store.schedule_refresh(user_id)
         
-        # For now, we don't implement token budget optimization as it is complex.
-        # We just grab the number of entries based on the tier.
+        entries, summaries, total_tokens = self.token_manager.optimize_context_for_budget(
+            [current_entry, *recent_entries], summaries, self._token_budget(tier_info)
+        )
+        recent_entries = entries[1:]
         
-        total_tokens = self.token_manager.estimate_entry_tokens(current_entry)
-        for entry in recent_entries:
-            total_tokens += self.token_manager.estimate_entry_tokens(entry)
-        for summary in summaries:
-            total_tokens += self.token_manager.estimate_summary_tokens(summary)
-
         return AIContext(
             current_entry=current_entry,
             recent_entries=recent_entries,
@@ -302,23 +560,33 @@ class ContextBuilderService:
             total_tokens=total_tokens,
             context_type=self._determine_context_type(tier_info, len(recent_entries), len(summaries))
         )
+    
+    def _token_budget(self, tier_info: UserTierInfo) -> int:
+        """Prompt tokens for context: the tier's own budget, else the premium/free default"""
+        if tier_info.context_token_budget:
+            return tier_info.context_token_budget
+        if tier_info.is_premium:
+            return settings.AI_CONTEXT_TOKEN_BUDGET_PREMIUM
+        return settings.AI_CONTEXT_TOKEN_BUDGET
 
-    def _get_recent_entries(self, user_id: str, limit: int) -> List[JournalEntryResponse]:
-        """Get recent journal entries for a user"""
+    def _get_recent_entries(self, user_id: str, limit: int, exclude_id: Optional[str] = None) -> List[JournalEntryResponse]:
+        """Get recent journal entries for a user, newest first (exclude_id skips the current entry)"""
         if limit == 0:
             return []
         try:
-            result = self.db.get_service_client().table("journal_entries").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(limit).execute()
+            query = ENTRY_AI_CONTEXT.select(self.db.get_service_client()).eq("user_id", user_id)
+            if exclude_id:
+                query = query.neq("id", exclude_id)
+            result = ENTRY_AI_CONTEXT.execute(query.order("created_at", desc=True).limit(limit))
             if result.data:
-                return [JournalEntryResponse(**entry) for entry in result.data]
+                return JournalEntryConverter.from_rows(result.data)
         except Exception as e:
             print(f"Error getting recent entries: {e}")
         return []
 
     def _get_recent_summaries(self, user_id: str, limit: int) -> List[JournalSummary]:
         """Get recent journal summaries for a user"""
-        # This is a placeholder. A real implementation would query the journal_summaries table.
-        return []
+        return self.summary_store.get_recent_summaries(user_id, limit)
 
     def _determine_context_type(self, tier_info: UserTierInfo, entry_count: int, summary_count: int) -> str:
         """Determine the type of context being built"""
@@ -331,15 +599,7 @@ class ContextBuilderService:
 
     def _summary_to_dict(self, summary: JournalSummary) -> Dict[str, Any]:
         """Convert JournalSummary to a dictionary for serialization"""
-        return {
-            "period_start": summary.period_start.isoformat(),
-            "period_end": summary.period_end.isoformat(),
-            "mood_trend": summary.mood_trend,
-            "energy_trend": summary.energy_trend,
-            "stress_trend": summary.stress_trend,
-            "key_insights": summary.key_insights,
-            "top_themes": summary.top_themes
-        }
+        return summary.to_dict()
 
 # =====================================================
 # COST TRACKING SERVICE
@@ -522,13 +782,13 @@ class BetaOptimizationService:
         if context.summaries:
             prompt += "For context, here are summaries of their recent weeks:\n"
             for summary in context.summaries:
-                prompt += f"- Week of {summary['period_start']}: {summary['key_insights']}\n"
+                prompt += format_summary_line(summary)
             prompt += "\n"
         
         if context.recent_entries:
             prompt += "Here are some of their other recent entries for more context:\n"
             for entry in context.recent_entries:
-                prompt += f"- Entry from {entry.created_at.strftime('%Y-%m-%d')}: {entry.content[:150]}...\n"
+                prompt += format_history_line(entry)
             prompt += "\n"
             
         return prompt 
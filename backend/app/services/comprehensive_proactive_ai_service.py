@@ -22,6 +22,8 @@ import json
 import hashlib
 
 from ..core.database import Database, get_database
+from ..core.utils import DateTimeUtils, EntryTimeline, JournalEntryConverter
+from ..core.projections import ENTRY_AI_CONTEXT, ENTRY_LISTING, ENTRY_TIMELINE, INSIGHT_AI_CONTEXT, INSIGHT_TIMELINE
 from ..models.journal import JournalEntryResponse
 from ..services.adaptive_ai_service import AdaptiveAIService
 from ..services.async_multi_persona_service import AsyncMultiPersonaService
@@ -168,12 +170,12 @@ class ComprehensiveProactiveAIService:
             try:
                 entries_result = await asyncio.wait_for(
                     asyncio.to_thread(
-                        lambda: client.table("journal_entries")
-                        .select("*")
-                        .eq("user_id", user_id)
-                        .gte("created_at", cutoff_date)
-                        .order("created_at", desc=True)
-                        .execute()
+                        lambda: ENTRY_TIMELINE.execute(
+                            ENTRY_TIMELINE.select(client)
+                            .eq("user_id", user_id)
+                            .gte("created_at", cutoff_date)
+                            .order("created_at", desc=True)
+                        )
                     ),
                     timeout=10.0  # 10 second timeout
                 )
@@ -185,11 +187,11 @@ class ComprehensiveProactiveAIService:
             try:
                 ai_interactions_result = await asyncio.wait_for(
                     asyncio.to_thread(
-                        lambda: client.table("ai_insights")
-                        .select("*")
-                        .eq("user_id", user_id)
-                        .gte("created_at", cutoff_date)
-                        .execute()
+                        lambda: INSIGHT_TIMELINE.execute(
+                            INSIGHT_TIMELINE.select(client)
+                            .eq("user_id", user_id)
+                            .gte("created_at", cutoff_date)
+                        )
                     ),
                     timeout=10.0  # 10 second timeout
                 )
@@ -201,11 +203,12 @@ class ComprehensiveProactiveAIService:
             journal_entries = entries_result.data or []
             ai_interactions = ai_interactions_result.data or []
             
-            last_journal = datetime.fromisoformat(journal_entries[0]["created_at"].replace('Z', '+00:00')) if journal_entries else None
+            journal_timeline = EntryTimeline(journal_entries)
+            last_journal = journal_timeline.latest()
             last_ai_interaction = datetime.fromisoformat(ai_interactions[0]["created_at"].replace('Z', '+00:00')) if ai_interactions else None
             
             # Calculate streaks and counts
-            daily_streak = self._calculate_daily_streak(journal_entries)
+            daily_streak = self._calculate_daily_streak(journal_timeline)
             weekly_count = len(journal_entries)
             
             # Calculate engagement score (0-10)
@@ -337,7 +340,9 @@ class ComprehensiveProactiveAIService:
             
             # ✅ FIXED: Get only REAL journal entries, not AI responses
             # First get all journal entries
-            entries_result = client.table("journal_entries").select("*").eq("user_id", user_id).gte("created_at", cutoff_date).order("created_at", desc=True).execute()
+            entries_result = ENTRY_LISTING.execute(
+                ENTRY_LISTING.select(client).eq("user_id", user_id).gte("created_at", cutoff_date).order("created_at", desc=True)
+            )
             
             if not entries_result.data:
                 logger.info(f"❌ No journal entries found for user {user_id} in last 7 days")
@@ -363,28 +368,17 @@ class ComprehensiveProactiveAIService:
             for entry_data in real_entries_data:
                 logger.info(f"  📅 Entry {entry_data['id']}: created {entry_data['created_at']}")
             
-            # Convert database entries to JournalEntryResponse objects with proper datetime handling
-            entries = []
+            # Ensure numeric fields are integers (datetimes and updated_at are handled by the converter)
             for entry_data in real_entries_data:
-                # Handle datetime conversion for fields that might be strings
-                if 'updated_at' not in entry_data or entry_data['updated_at'] is None:
-                    entry_data['updated_at'] = entry_data.get('created_at', datetime.now().isoformat())
-                
-                # Convert string datetimes to datetime objects if needed
-                if isinstance(entry_data.get('created_at'), str):
-                    entry_data['created_at'] = datetime.fromisoformat(entry_data['created_at'].replace('Z', '+00:00'))
-                if isinstance(entry_data.get('updated_at'), str):
-                    entry_data['updated_at'] = datetime.fromisoformat(entry_data['updated_at'].replace('Z', '+00:00'))
-                
-                # Ensure numeric fields are integers
                 for field in ['mood_level', 'energy_level', 'stress_level']:
                     if field in entry_data and entry_data[field] is not None:
                         try:
                             entry_data[field] = int(entry_data[field])
                         except (ValueError, TypeError):
                             entry_data[field] = 5  # Default to neutral
-                
-                entries.append(JournalEntryResponse(**entry_data))
+            
+            # Convert database entries to JournalEntryResponse objects in one validation pass
+            entries = JournalEntryConverter.from_rows(real_entries_data)
             
             # Get existing AI responses
             ai_responses = await self._get_existing_ai_responses(user_id, [entry.id for entry in entries])
@@ -475,23 +469,28 @@ class ComprehensiveProactiveAIService:
         logger.info(f"📊 Final result: Generated {len(opportunities)} opportunities for entry {entry.id}")
         return opportunities
     
-    def _find_related_entries(self, entry: JournalEntryResponse, all_entries: List[JournalEntryResponse]) -> List[JournalEntryResponse]:
+    def _find_related_entries(self, entry: JournalEntryResponse, all_entries: List[JournalEntryResponse],
+                              timeline: Optional[EntryTimeline] = None) -> List[JournalEntryResponse]:
         """Find entries related to the current entry based on keywords and topics"""
         related = []
         entry_topics = self._classify_entry_topics(entry.content)
-        entry_time = datetime.fromisoformat(entry.created_at.replace('Z', '+00:00'))
+        entry_time = DateTimeUtils.parse_timestamp(entry.created_at)
+        if entry_time is None:
+            return related
+        
+        # Pass a shared timeline when calling this for several entries of the same list
+        if timeline is None:
+            timeline = EntryTimeline(all_entries)
         
-        for other_entry in all_entries:
+        # Only consider entries within pattern analysis window (binary search on pre-parsed times)
+        window_hours = self.timing_configs["pattern_analysis_window"]
+        window = timeline.index_range(entry_time - timedelta(hours=window_hours), entry_time + timedelta(hours=window_hours))
+        
+        for index in window:
+            other_entry = timeline.entries[index]
             if other_entry.id == entry.id:
                 continue
                 
-            other_time = datetime.fromisoformat(other_entry.created_at.replace('Z', '+00:00'))
-            time_diff = abs((entry_time - other_time).total_seconds() / 3600)  # Hours
-            
-            # Only consider entries within pattern analysis window
-            if time_diff > self.timing_configs["pattern_analysis_window"]:
-                continue
-                
             other_topics = self._classify_entry_topics(other_entry.content)
             
             # Check for topic overlap
@@ -663,7 +662,9 @@ class ComprehensiveProactiveAIService:
             # CRITICAL: Use service role client to bypass RLS for AI operations
             client = self.db.get_service_client()
             # ✅ FIXED: Use new threading fields to filter only AI responses
-            responses_result = client.table("ai_insights").select("*").eq("user_id", user_id).in_("journal_entry_id", entry_ids).eq("is_ai_response", True).execute()
+            responses_result = INSIGHT_AI_CONTEXT.execute(
+                INSIGHT_AI_CONTEXT.select(client).eq("user_id", user_id).in_("journal_entry_id", entry_ids).eq("is_ai_response", True)
+            )
             
             responses_by_entry = {}
             if responses_result.data:
@@ -679,26 +680,13 @@ class ComprehensiveProactiveAIService:
             logger.error(f"Error getting existing AI responses: {e}")
             return {}
     
-    def _calculate_daily_streak(self, journal_entries: List[Dict]) -> int:
-        """Calculate daily journaling streak"""
-        if not journal_entries:
+    def _calculate_daily_streak(self, journal_entries) -> int:
+        """Calculate daily journaling streak from today backwards (accepts rows or a prebuilt EntryTimeline)"""
+        timeline = journal_entries if isinstance(journal_entries, EntryTimeline) else EntryTimeline(journal_entries)
+        if not timeline:
             return 0
         
-        # Sort entries by date
-        entries_by_date = {}
-        for entry in journal_entries:
-            entry_date = datetime.fromisoformat(entry["created_at"].replace('Z', '+00:00')).date()
-            entries_by_date[entry_date] = True
-        
-        # Calculate streak from today backwards
-        current_date = datetime.now(timezone.utc).date()
-        streak = 0
-        
-        while current_date in entries_by_date:
-            streak += 1
-            current_date -= timedelta(days=1)
-        
-        return streak
+        return timeline.daily_streak(datetime.now(timezone.utc).date())
     
     def _calculate_engagement_score(self, daily_streak: int, weekly_count: int, ai_interactions: int) -> float:
         """Calculate overall engagement score (0-10)"""
@@ -721,7 +709,7 @@ class ComprehensiveProactiveAIService:
             # Get the journal entry
             # CRITICAL: Use service role client to bypass RLS for AI operations
             client = self.db.get_service_client()
-            entry_result = client.table("journal_entries").select("*").eq("id", opportunity.entry_id).single().execute()
+            entry_result = ENTRY_LISTING.execute(ENTRY_LISTING.select(client).eq("id", opportunity.entry_id).single())
             
             if not entry_result.data:
                 logger.warning(f"Entry {opportunity.entry_id} not found for proactive engagement")
@@ -730,8 +718,10 @@ class ComprehensiveProactiveAIService:
             entry = JournalEntryResponse(**entry_result.data)
             
             # Get user's journal history for context
-            history_result = client.table("journal_entries").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(10).execute()
-            journal_history = [JournalEntryResponse(**e) for e in history_result.data] if history_result.data else []
+            history_result = ENTRY_AI_CONTEXT.execute(
+                ENTRY_AI_CONTEXT.select(client).eq("user_id", user_id).order("created_at", desc=True).limit(10)
+            )
+            journal_history = JournalEntryConverter.from_rows(history_result.data)
             
             # Generate comprehensive AI response context
             comprehensive_context = f"""
@@ -857,7 +847,7 @@ Reference patterns you've noticed if relevant.
             
             # CRITICAL: Use service role client to bypass RLS for AI operations
             client = self.db.get_service_client()
-            entry_result = client.table("journal_entries").select("*").eq("id", entry_id).single().execute()
+            entry_result = ENTRY_LISTING.execute(ENTRY_LISTING.select(client).eq("id", entry_id).single())
             
             if not entry_result.data:
                 logger.warning(f"Entry {entry_id} not found for concurrent multi-persona engagement")
@@ -866,8 +856,10 @@ Reference patterns you've noticed if relevant.
             entry = JournalEntryResponse(**entry_result.data)
             
             # Get user's journal history for context
-            history_result = client.table("journal_entries").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(10).execute()
-            journal_history = [JournalEntryResponse(**e) for e in history_result.data] if history_result.data else []
+            history_result = ENTRY_AI_CONTEXT.execute(
+                ENTRY_AI_CONTEXT.select(client).eq("user_id", user_id).order("created_at", desc=True).limit(10)
+            )
+            journal_history = JournalEntryConverter.from_rows(history_result.data)
             
             # Extract personas and prepare concurrent processing
             personas = [opp.persona for opp in opportunities]
@@ -1369,7 +1361,7 @@ Reference patterns you've noticed if relevant.
             
             # Get entry details
             client = self.db.get_service_client()
-            entry_result = client.table("journal_entries").select("*").eq("id", entry_id).execute()
+            entry_result = ENTRY_LISTING.execute(ENTRY_LISTING.select(client).eq("id", entry_id))
             
             if not entry_result.data:
                 logger.warning(f"Entry {entry_id} not found for collaborative check")
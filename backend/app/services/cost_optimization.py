@@ -11,7 +11,11 @@ from dataclasses import dataclass
 from enum import Enum
 import logging
 
+from app.core.config import settings
 from app.core.monitoring import log_error, ErrorSeverity, ErrorCategory
+from app.services.model_router import model_router
+from app.services.response_cache_store import CacheEntry, ResponseCacheStore, response_cache_store
+from app.services.similarity_cache import NearDuplicateIndex, mood_band, normalize_text, shingle_hashes
 
 logger = logging.getLogger(__name__)
 
@@ -37,18 +41,14 @@ class CostMetrics:
     cache_misses: int = 0
     fallback_used: int = 0
     cost_savings: float = 0.0
+    similarity_lookups: int = 0  # Exact-key misses checked against the near-duplicate index
+    similarity_hits: int = 0
+    similarity_excluded: int = 0  # Requests kept out of similarity reuse (safety, low mood, too short)
+    similarity_tokens_saved: int = 0
+    similarity_cost_saved: float = 0.0
     daily_limit: float = 5.0  # $5 daily limit
     monthly_limit: float = 100.0  # $100 monthly limit
 
-@dataclass
-class CacheEntry:
-    """Cache entry for AI responses"""
-    response: Dict[str, Any]
-    created_at: datetime
-    usage_count: int = 0
-    model_used: str = ""
-    complexity: str = ""
-
 class CostOptimizationService:
     """
     Cost Optimization Service for AI requests
@@ -60,15 +60,22 @@ class CostOptimizationService:
     - Fallback responses when limits exceeded
     """
     
-    def __init__(self):
+    def __init__(self, response_cache: ResponseCacheStore = response_cache_store):
         # Cost tracking
         self.daily_metrics = CostMetrics()
         self.monthly_metrics = CostMetrics()
         
-        # Response cache (in-memory for now, could be Redis in production)
-        self.response_cache: Dict[str, CacheEntry] = {}
-        self.cache_ttl_hours = 24  # Cache TTL in hours
-        self.max_cache_size = 1000  # Maximum cache entries
+        # Response cache: per-worker LRU in front of a SQLite file shared by all workers (survives deploys)
+        self.response_cache = response_cache
+        self.cache_ttl_hours = settings.RESPONSE_CACHE_TTL_HOURS  # Default TTL per entry
+        self.max_cache_size = self.response_cache.l1_max_entries  # In-memory entries per worker
+        
+        # Near-duplicate lookup over the in-memory entries (same persona, mood band and, by default, user)
+        self.similarity_index = NearDuplicateIndex(
+            threshold=settings.SIMILARITY_CACHE_THRESHOLD,
+            min_chars=settings.SIMILARITY_CACHE_MIN_CHARS
+        )
+        self.response_cache.attach(self._index_cache_entry, self.similarity_index.remove)
         
         # Cost limits (configurable)
         self.daily_cost_limit = 5.0  # $5 per day
@@ -164,7 +171,9 @@ class CostOptimizationService:
             "content": request_data.get("journal_content", "")[:200],  # First 200 chars
             "persona": request_data.get("persona", "pulse"),
             "mood": request_data.get("response_preferences", {}).get("mood_level", 5),
-            "complexity": self.classify_request_complexity(request_data).value
+            "complexity": self.classify_request_complexity(request_data).value,
+            # Same scope as near-duplicate reuse: replies are personalized, so by default never shared across users
+            "user_id": request_data.get("user_id") if settings.SIMILARITY_CACHE_SCOPE == "user" else None
         }
         
         key_string = json.dumps(key_data, sort_keys=True)
@@ -175,54 +184,142 @@ class CostOptimizationService:
         Get cached response if available and not expired
         """
         try:
-            if cache_key not in self.response_cache:
+            entry = self._get_entry(cache_key)
+            return entry.response if entry else None
+            
+        except Exception as e:
+            log_error(e, ErrorSeverity.LOW, ErrorCategory.SYSTEM, {
+                "operation": "get_cached_response",
+                "cache_key": cache_key[:8]
+            })
+            return None
+    
+    def _get_entry(self, cache_key: str) -> Optional[CacheEntry]:
+        entry = self.response_cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        # Update usage count (written behind with the entry)
+        entry.usage_count += 1
+        self.response_cache.touch(cache_key, entry)
+        self.daily_metrics.cache_hits += 1
+        
+        logger.info(f"Cache hit for key {cache_key[:8]}... (used {entry.usage_count} times)")
+        
+        return entry
+    
+    def find_similar_response(self, request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Cached response for this request or a near-duplicate of it
+        
+        Tries the exact key first, then the LSH index of the request's partition.
+        Entries with crisis language, very low mood or too little text always miss.
+        """
+        try:
+            partition = self._similarity_partition(request_data)
+            if partition is None:
                 return None
             
-            entry = self.response_cache[cache_key]
+            cached = self.get_cached_response(self.generate_cache_key(request_data))
+            if cached is not None or not settings.SIMILARITY_CACHE_ENABLED:
+                return cached
             
-            # Check if expired
-            if datetime.now(timezone.utc) - entry.created_at > timedelta(hours=self.cache_ttl_hours):
-                del self.response_cache[cache_key]
+            self.daily_metrics.similarity_lookups += 1
+            match = self.similarity_index.find(partition, request_data.get("journal_content", ""))
+            if match is None:
                 return None
             
-            # Update usage count
-            entry.usage_count += 1
-            self.daily_metrics.cache_hits += 1
+            similar_key, similarity = match
+            entry = self._get_entry(similar_key)
+            if entry is None:
+                self.similarity_index.remove(similar_key)
+                return None
             
-            logger.info(f"Cache hit for key {cache_key[:8]}... (used {entry.usage_count} times)")
+            self.daily_metrics.similarity_hits += 1
+            self.daily_metrics.similarity_tokens_saved += entry.tokens_used
+            self.daily_metrics.similarity_cost_saved += (entry.tokens_used / 1000) * self._model_cost(entry.model_used)
+            logger.info(f"🔁 Near-duplicate cache hit ({similarity:.2f} similar) for key {similar_key[:8]}...")
             
             return entry.response
             
         except Exception as e:
             log_error(e, ErrorSeverity.LOW, ErrorCategory.SYSTEM, {
-                "operation": "get_cached_response",
-                "cache_key": cache_key[:8]
+                "operation": "find_similar_response"
             })
             return None
     
+    def _similarity_partition(self, request_data: Dict[str, Any], count_exclusion: bool = True) -> Optional[str]:
+        """Index partition for a request, or None when it must not take part in similarity reuse"""
+        content = request_data.get("journal_content", "")
+        mood_level = request_data.get("response_preferences", {}).get("mood_level")
+        user_id = request_data.get("user_id")
+        
+        if self.similarity_index.exclusion_reason(content, mood_level) or (
+            settings.SIMILARITY_CACHE_SCOPE == "user" and not user_id
+        ):
+            if count_exclusion:
+                self.daily_metrics.similarity_excluded += 1
+            return None
+        
+        partition = f"{request_data.get('persona', 'pulse')}:{mood_band(mood_level)}"
+        if settings.SIMILARITY_CACHE_SCOPE == "user":
+            partition = f"{partition}:{user_id}"
+        return partition
+    
+    def _model_cost(self, model_used: str) -> float:
+        for model, cost in self.model_costs.items():
+            if model.value == model_used:
+                return cost
+        return 0.0
+    
+    def _index_cache_entry(self, cache_key: str, entry: CacheEntry) -> None:
+        """Mirror entries entering the in-memory tier (new, promoted from disk or from another worker)"""
+        if entry.similarity_partition and entry.shingles:
+            self.similarity_index.add_shingles(cache_key, entry.similarity_partition, entry.shingles)
+        else:
+            self.similarity_index.remove(cache_key)
+    
     def cache_response(
         self, 
         cache_key: str, 
         response: Dict[str, Any], 
         model_used: str,
-        complexity: RequestComplexity
+        complexity: RequestComplexity,
+        request_data: Optional[Dict[str, Any]] = None,
+        tokens_used: int = 0,
+        ttl_hours: Optional[float] = None
     ) -> None:
         """
         Cache AI response
+        
+        Pass request_data to make the response reusable for near-duplicate requests
+        (find_similar_response), and tokens_used to report what each reuse saves;
+        requests that find_similar_response would never serve are not stored.
+        ttl_hours overrides cache_ttl_hours for this entry.
         """
         try:
-            # Clean cache if too large
-            if len(self.response_cache) >= self.max_cache_size:
-                self._clean_cache()
+            # Exclusions were counted by the lookup that came before this store
+            partition = self._similarity_partition(request_data, count_exclusion=False) if request_data is not None else None
+            if request_data is not None and partition is None:
+                return
             
-            # Cache the response
-            self.response_cache[cache_key] = CacheEntry(
+            created_at = datetime.now(timezone.utc)
+            entry = CacheEntry(
                 response=response,
-                created_at=datetime.now(timezone.utc),
+                created_at=created_at,
                 model_used=model_used,
-                complexity=complexity.value
+                complexity=complexity.value,
+                tokens_used=tokens_used,
+                expires_at=created_at + timedelta(hours=ttl_hours if ttl_hours is not None else self.cache_ttl_hours)
             )
             
+            if partition is not None and settings.SIMILARITY_CACHE_ENABLED:
+                entry.similarity_partition = partition
+                entry.shingles = shingle_hashes(normalize_text(request_data.get("journal_content", "")))
+            
+            # Stored in memory now, on disk with the next write-behind flush
+            self.response_cache.put(cache_key, entry)
+            
             self.daily_metrics.cache_misses += 1
             
             logger.info(f"Cached response for key {cache_key[:8]}... using {model_used}")
@@ -236,37 +333,28 @@ class CostOptimizationService:
     def _clean_cache(self) -> None:
         """
         Clean old cache entries
+        
+        The in-memory tier evicts by LRU on insert; this purges expired rows and trims
+        the disk tier (also run periodically by the cache's maintenance loop).
         """
         try:
-            current_time = datetime.now(timezone.utc)
-            expired_keys = []
-            
-            for key, entry in self.response_cache.items():
-                if current_time - entry.created_at > timedelta(hours=self.cache_ttl_hours):
-                    expired_keys.append(key)
-            
-            for key in expired_keys:
-                del self.response_cache[key]
-            
-            # If still too large, remove least used entries
-            if len(self.response_cache) >= self.max_cache_size:
-                sorted_entries = sorted(
-                    self.response_cache.items(),
-                    key=lambda x: (x[1].usage_count, x[1].created_at)
-                )
-                
-                # Remove bottom 20%
-                remove_count = len(sorted_entries) // 5
-                for key, _ in sorted_entries[:remove_count]:
-                    del self.response_cache[key]
-            
-            logger.info(f"Cache cleaned: {len(expired_keys)} expired entries removed")
+            removed = self.response_cache.purge()
+            logger.info(f"Cache cleaned: {removed} expired or least recently used entries removed")
             
         except Exception as e:
             log_error(e, ErrorSeverity.MEDIUM, ErrorCategory.SYSTEM, {
                 "operation": "_clean_cache"
             })
     
+    def clear_cache(self) -> int:
+        """
+        Clear both cache tiers for every worker; returns entries removed
+        """
+        removed = self.response_cache.clear()
+        self.similarity_index.clear()
+        logger.info(f"🧹 Response cache cleared ({removed} entries)")
+        return removed
+    
     def check_cost_limits(self, estimated_cost: float = 0.0, user_id: str = None) -> Tuple[bool, str]:
         """
         Check if request would exceed cost limits
@@ -316,6 +404,10 @@ class CostOptimizationService:
     ) -> Tuple[AIModel, str]:
         """
         Select optimal AI model based on complexity and cost constraints
+        
+        Models that model_router reports as degraded (latency over the default SLO,
+        error or 429 rate too high) are skipped: GPT-4o sheds to GPT-4o-mini, and
+        GPT-4o-mini to the fallback.
         Returns: (model, reason)
         """
         try:
@@ -329,9 +421,12 @@ class CostOptimizationService:
                     # Check if user has premium HIGH interaction level (gets best models)
                     user_prefs = supabase.table("user_ai_preferences").select("ai_interaction_level").eq("user_id", user_id).execute()
                     
-                    if user_prefs.data and user_prefs.data[0].get("ai_interaction_level") == "HIGH":
-                        # Premium HIGH users always get the best model
-                        preferred_model = self.complexity_rules[complexity]["preferred_model"]
+                    preferred_model = self.complexity_rules[complexity]["preferred_model"]
+                    if (
+                        user_prefs.data and user_prefs.data[0].get("ai_interaction_level") == "HIGH"
+                        and not model_router.is_degraded(preferred_model.value)
+                    ):
+                        # Premium HIGH users always get the best model (unless it is degraded)
                         logger.info(f"Premium HIGH user {user_id} getting premium model: {preferred_model.value}")
                         return preferred_model, f"Premium HIGH - using {preferred_model.value} for {complexity.value} request"
                         
@@ -347,19 +442,24 @@ class CostOptimizationService:
             
             # Check if we can afford the preferred model
             can_proceed, reason = self.check_cost_limits(estimated_cost, user_id)
+            degraded = can_proceed and model_router.is_degraded(preferred_model.value)
             
-            if can_proceed:
+            if can_proceed and not degraded:
                 return preferred_model, f"Using {preferred_model.value} for {complexity.value} request"
             
-            # Try cheaper alternative
+            # Try cheaper (and faster) alternative
             if preferred_model == AIModel.GPT_4O:
                 mini_cost = (estimated_tokens / 1000) * self.model_costs[AIModel.GPT_4O_MINI]
                 can_proceed_mini, _ = self.check_cost_limits(mini_cost, user_id)
                 
-                if can_proceed_mini:
+                if can_proceed_mini and not model_router.is_degraded(AIModel.GPT_4O_MINI.value):
+                    if degraded:
+                        return AIModel.GPT_4O_MINI, f"Using GPT-4o-mini while {preferred_model.value} is degraded"
                     return AIModel.GPT_4O_MINI, "Using GPT-4o-mini for cost optimization"
             
             # Fall back to free responses
+            if degraded or can_proceed:
+                return AIModel.FALLBACK, "Using fallback while AI models are degraded"
             return AIModel.FALLBACK, f"Using fallback due to cost limits: {reason}"
             
         except Exception as e:
@@ -446,6 +546,9 @@ class CostOptimizationService:
     def get_cost_metrics(self) -> Dict[str, Any]:
         """
         Get current cost metrics and optimization stats
+        
+        Blocking: includes the response cache status (SQLite scans), so async callers
+        run it in a worker thread.
         """
         try:
             cache_hit_rate = 0.0
@@ -454,6 +557,12 @@ class CostOptimizationService:
                     self.daily_metrics.cache_hits + self.daily_metrics.cache_misses
                 ) * 100
             
+            cache_status = self.response_cache.get_status()
+            
+            similarity_hit_rate = 0.0
+            if self.daily_metrics.similarity_lookups > 0:
+                similarity_hit_rate = self.daily_metrics.similarity_hits / self.daily_metrics.similarity_lookups * 100
+            
             return {
                 "daily_metrics": {
                     "total_requests": self.daily_metrics.total_requests,
@@ -472,7 +581,14 @@ class CostOptimizationService:
                     "monthly_remaining": max(0, self.monthly_cost_limit - self.monthly_metrics.total_cost)
                 },
                 "optimization": {
-                    "cache_size": len(self.response_cache),
+                    "cache_size": cache_status["total_entries"],
+                    "cache_tiers": {
+                        "l1_entries": cache_status["l1"]["entries"],
+                        "l1_hits": cache_status["l1"]["hits"],
+                        "disk_enabled": cache_status["disk"]["enabled"],
+                        "disk_hits": cache_status["disk"]["hits"],
+                        "misses": cache_status["misses"]
+                    },
                     "cache_efficiency": round(cache_hit_rate, 2),
                     "fallback_usage": round(
                         (self.daily_metrics.fallback_used / max(1, self.daily_metrics.total_requests)) * 100, 2
@@ -480,6 +596,18 @@ class CostOptimizationService:
                     "average_cost_per_request": round(
                         self.daily_metrics.total_cost / max(1, self.daily_metrics.total_requests), 4
                     )
+                },
+                "similarity_cache": {
+                    "enabled": settings.SIMILARITY_CACHE_ENABLED,
+                    "threshold": self.similarity_index.threshold,
+                    "scope": settings.SIMILARITY_CACHE_SCOPE,
+                    "indexed_entries": len(self.similarity_index),
+                    "lookups": self.daily_metrics.similarity_lookups,
+                    "hits": self.daily_metrics.similarity_hits,
+                    "hit_rate": round(similarity_hit_rate, 2),
+                    "excluded": self.daily_metrics.similarity_excluded,
+                    "tokens_saved": self.daily_metrics.similarity_tokens_saved,
+                    "cost_saved": round(self.daily_metrics.similarity_cost_saved, 4)
                 }
             }
             
@@ -500,4 +628,8 @@ class CostOptimizationService:
         except Exception as e:
             log_error(e, ErrorSeverity.MEDIUM, ErrorCategory.SYSTEM, {
                 "operation": "reset_daily_metrics"
-            }) 
\ No newline at end of file
+            }) 
+
+
+# Global cost optimization instance (the one mirroring response_cache_store into its similarity index)
+cost_optimizer = CostOptimizationService()
@@ -154,8 +154,8 @@ class DebuggingService:
                 error_message=str(e)
             )
     
-    async def run_comprehensive_diagnostics(self) -> DiagnosticReport:
-        """Run comprehensive system diagnostics"""
+    async def run_comprehensive_diagnostics(self, apply_auto_fixes: bool = True) -> DiagnosticReport:
+        """Run comprehensive system diagnostics (apply_auto_fixes=False for a read-only report)"""
         start_time = time.time()
         
         # Run health checks
@@ -171,7 +171,7 @@ class DebuggingService:
         recommendations = self._generate_recommendations(health_results, active_issues)
         
         # Attempt auto-fixes
-        auto_fixes = await self._attempt_auto_fixes(active_issues)
+        auto_fixes = await self._attempt_auto_fixes(active_issues) if apply_auto_fixes else []
         
         # Determine overall health
         overall_health = self._determine_overall_health(health_results)
@@ -0,0 +1,195 @@
+"""
+Journal Entry Repository for PulseCheck
+Reads journal entries together with their AI insights, reactions and reply counts in one round-trip
+
+Strategies, tried in order; a fallback is remembered for STRATEGY_RETRY_SECONDS, then
+the better strategy is tried again (e.g. once a pending migration has been applied):
+1. PostgREST resource embedding over the journal_entry_id foreign keys, with
+   projected columns and an exact count on the same request
+2. get_journal_entries_with_embeds() RPC (migration 20250706000000) for
+   schemas where PostgREST cannot resolve the embedding
+3. The original multi-query path (entries, then in_(entry_ids) per child table)
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+from app.core.projections import (
+    ENTRY_COLUMNS, ENTRY_EMBEDDED, ENTRY_LISTING, INSIGHT_COLUMNS, INSIGHT_LISTING, REACTION_COLUMNS, REACTION_LISTING,
+    REPLY_EXISTS, record_response_size,
+)
+
+logger = logging.getLogger(__name__)
+
+EMBED_RPC = "get_journal_entries_with_embeds"
+
+STRATEGY_EMBED = "embed"
+STRATEGY_RPC = "rpc"
+STRATEGY_QUERIES = "queries"
+
+# PostgREST/Postgres codes meaning the schema cannot serve a strategy: relationship not
+# found or ambiguous, RPC function not found, undefined function
+SCHEMA_ERROR_CODES = {"PGRST200", "PGRST201", "PGRST202", "42883"}
+
+# How long a fallback sticks before the preferred strategy is probed again
+STRATEGY_RETRY_SECONDS = 300
+
+
+class JournalEntryRepository:
+    """Entry pages with children attached; every query is scoped to the given user_id"""
+    
+    # Shared across instances: the strategy that last worked, and until when (time.monotonic())
+    # to keep skipping the better ones that failed on the schema
+    _strategy: Optional[str] = None
+    _strategy_expires_at: float = 0.0
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def get_entries_with_insights(self, user_id: str, offset: int, limit: int,
+                                  include_reactions: bool = False, include_reply_counts: bool = False,
+                                  insights_desc: bool = False, with_total: bool = True) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        One page of journal_entries (newest first) with children embedded
+        
+        Each row gets `ai_insights` (projected, ordered by created_at), plus
+        `ai_reactions` (raw rows) and `reply_count` when requested.
+        Returns (rows, total entries for the user); pass with_total=False when
+        the caller already knows the total (the total may then be None).
+        """
+        strategies = [STRATEGY_EMBED, STRATEGY_RPC, STRATEGY_QUERIES]
+        if JournalEntryRepository._strategy and time.monotonic() < JournalEntryRepository._strategy_expires_at:
+            strategies = strategies[strategies.index(JournalEntryRepository._strategy):]
+        
+        fetchers = {
+            STRATEGY_EMBED: self._fetch_embedded,
+            STRATEGY_RPC: self._fetch_rpc,
+            STRATEGY_QUERIES: self._fetch_with_queries,
+        }
+        for strategy in strategies:
+            try:
+                rows, total = fetchers[strategy](user_id, offset, limit, include_reactions,
+                                                 include_reply_counts, insights_desc, with_total)
+            except APIError as e:
+                # Schema-level rejections only (unknown relationship/function); timeouts,
+                # RLS and data errors propagate instead of demoting the strategy
+                if strategy == STRATEGY_QUERIES or e.code not in SCHEMA_ERROR_CODES:
+                    raise
+                logger.warning(f"⚠️ Journal {strategy} read unavailable ({e.code}), falling back: {e.message}")
+                continue
+            
+            if JournalEntryRepository._strategy != strategy:
+                logger.info(f"📚 Journal entry reads using {strategy} strategy")
+            JournalEntryRepository._strategy = strategy
+            if strategy != strategies[0]:
+                # Fell back on this call: skip the failed strategies for a while, then re-probe
+                JournalEntryRepository._strategy_expires_at = time.monotonic() + STRATEGY_RETRY_SECONDS
+            elif strategy == STRATEGY_EMBED:
+                JournalEntryRepository._strategy_expires_at = float("inf")
+            return rows, total
+    
+    def _fetch_embedded(self, user_id: str, offset: int, limit: int, include_reactions: bool,
+                        include_reply_counts: bool, insights_desc: bool, with_total: bool) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Single PostgREST request; the !journal_entry_id hints keep ai_reactions unambiguous"""
+        embeds = [f"ai_insights!journal_entry_id({INSIGHT_COLUMNS})"]
+        if include_reactions:
+            embeds.append(f"ai_reactions!journal_entry_id({REACTION_COLUMNS})")
+        if include_reply_counts:
+            embeds.append("ai_user_replies!journal_entry_id(count)")
+        
+        result = self.client.table("journal_entries")\
+            .select(",".join([ENTRY_COLUMNS, *embeds]), count="exact" if with_total else None)\
+            .eq("user_id", user_id)\
+            .eq("ai_insights.user_id", user_id)\
+            .order("created_at", desc=True)\
+            .order("created_at", desc=insights_desc, foreign_table="ai_insights")\
+            .range(offset, offset + limit - 1)\
+            .execute()
+        
+        rows = result.data or []
+        record_response_size(ENTRY_EMBEDDED, rows)
+        for row in rows:
+            row["ai_insights"] = [self._insight(insight) for insight in row.get("ai_insights") or []]
+            if include_reply_counts:
+                counts = row.pop("ai_user_replies", None) or [{}]
+                row["reply_count"] = counts[0].get("count", 0)
+        return rows, (result.count or 0) if with_total else None
+    
+    def _fetch_rpc(self, user_id: str, offset: int, limit: int, include_reactions: bool,
+                   include_reply_counts: bool, insights_desc: bool, with_total: bool) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Same page built server-side as one jsonb document: {"total": n, "entries": [...]}"""
+        result = self.client.rpc(EMBED_RPC, {
+            "p_user_id": user_id,
+            "p_limit": limit,
+            "p_offset": offset,
+            "p_include_reactions": include_reactions,
+            "p_include_reply_counts": include_reply_counts,
+            "p_insights_desc": insights_desc,
+        }).execute()
+        
+        payload = result.data or {}
+        rows = payload.get("entries") or []
+        record_response_size(ENTRY_EMBEDDED, rows)
+        for row in rows:
+            row["ai_insights"] = [self._insight(insight) for insight in row.get("ai_insights") or []]
+        return rows, payload.get("total", 0)
+    
+    def _fetch_with_queries(self, user_id: str, offset: int, limit: int, include_reactions: bool,
+                            include_reply_counts: bool, insights_desc: bool, with_total: bool) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Pre-embedding behaviour: entries with count, then one in_() query per child table"""
+        result = ENTRY_LISTING.execute(
+            ENTRY_LISTING.select(self.client, count="exact" if with_total else None)
+            .eq("user_id", user_id)
+            .order("created_at", desc=True)
+            .range(offset, offset + limit - 1)
+        )
+        rows = result.data or []
+        total = (result.count or 0) if with_total else None
+        if not rows:
+            return [], total
+        
+        entry_ids = [row["id"] for row in rows]
+        insights = INSIGHT_LISTING.execute(
+            INSIGHT_LISTING.select(self.client)
+            .eq("user_id", user_id)
+            .in_("journal_entry_id", entry_ids)
+            .order("created_at", desc=insights_desc)
+        ).data or []
+        insights_by_entry: Dict[str, List[Dict[str, Any]]] = {}
+        for insight in insights:
+            insights_by_entry.setdefault(insight["journal_entry_id"], []).append(self._insight(insight))
+        
+        reactions_by_entry: Dict[str, List[Dict[str, Any]]] = {}
+        if include_reactions:
+            reactions = self.client.table("ai_reactions").select(f"{REACTION_COLUMNS},journal_entry_id")\
+                .in_("journal_entry_id", entry_ids)\
+                .execute().data or []
+            record_response_size(REACTION_LISTING, reactions)
+            for reaction in reactions:
+                reactions_by_entry.setdefault(reaction.pop("journal_entry_id"), []).append(reaction)
+        
+        reply_counts: Dict[str, int] = {}
+        if include_reply_counts:
+            replies = self.client.table("ai_user_replies").select("journal_entry_id")\
+                .in_("journal_entry_id", entry_ids)\
+                .execute().data or []
+            record_response_size(REPLY_EXISTS, replies)
+            for reply in replies:
+                reply_counts[reply["journal_entry_id"]] = reply_counts.get(reply["journal_entry_id"], 0) + 1
+        
+        for row in rows:
+            row["ai_insights"] = insights_by_entry.get(row["id"], [])
+            if include_reactions:
+                row["ai_reactions"] = reactions_by_entry.get(row["id"], [])
+            if include_reply_counts:
+                row["reply_count"] = reply_counts.get(row["id"], 0)
+        return rows, total
+    
+    @staticmethod
+    def _insight(insight: Dict[str, Any]) -> Dict[str, Any]:
+        """Null topic_flags become [] in place (embedded rows are already projected)"""
+        insight["topic_flags"] = insight.get("topic_flags") or []
+        return insight
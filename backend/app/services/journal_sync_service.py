@@ -0,0 +1,263 @@
+"""
+Journal Delta Sync Service for PulseCheck
+Returns only the rows a mobile client has not seen yet, keyed by an opaque cursor
+
+Features:
+- Keyset pagination on (updated_at, id) per table: no OFFSET scans
+- updated_at is stamped by the database (clock_timestamp() on insert and update), but a
+  row can commit after a later-stamped row was already synced; every page therefore
+  re-reads SYNC_OVERLAP_SECONDS below the watermark and skips (id, updated_at) pairs the
+  client already has, so late commits are delivered instead of skipped forever
+- The skip list is capped at MAX_SYNC_LIMIT pairs: after a burst (bulk import, batch edit)
+  the scan floor moves up to the newest delivered timestamp instead of listing every pair
+- Tombstones from sync_tombstones (AFTER DELETE triggers), paged the same way on deleted_at
+- Cursor is base64url JSON bound to the user; clients must treat it as opaque
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.utils import DateTimeUtils
+
+logger = logging.getLogger(__name__)
+
+CURSOR_VERSION = 2
+
+# Tables a client mirrors; every one is filtered by the entry owner's user_id
+SYNC_TABLES = ("journal_entries", "ai_insights", "ai_reactions", "ai_user_replies")
+
+TOMBSTONE_TABLE = "sync_tombstones"
+
+DEFAULT_SYNC_LIMIT = 200
+MAX_SYNC_LIMIT = 500
+
+# Longest a write may take to commit after its timestamp was taken (well above the
+# statement timeout of PostgREST requests)
+SYNC_OVERLAP_SECONDS = 30
+
+# (highest timestamp delivered, [(id, timestamp) delivered within the overlap window],
+#  scan floor above the overlap window after a burst or None)
+Watermark = Tuple[str, List[Tuple[str, str]], Optional[str]]
+
+
+class InvalidSyncCursor(ValueError):
+    """Cursor is malformed, from another version or from another user; client must resync from scratch"""
+
+
+def _user_tag(user_id: str) -> str:
+    return hashlib.sha256(user_id.encode()).hexdigest()[:12]
+
+
+def _parse_timestamp(value: str) -> datetime:
+    # PostgREST trims trailing zeros from fractional seconds, so compare parsed values
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _scan_floor(watermark: Watermark) -> datetime:
+    """Lowest timestamp the next page re-reads: the overlap window, unless a burst moved it up"""
+    ts, _, pinned = watermark
+    floor = _parse_timestamp(ts) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+    if pinned and _parse_timestamp(pinned) > floor:
+        return _parse_timestamp(pinned)
+    return floor
+
+
+def encode_sync_cursor(user_id: str, watermarks: Dict[str, Watermark], tombstones: Optional[Watermark]) -> str:
+    """
+    Serialize sync position
+    
+    watermarks maps table -> (highest updated_at delivered, (id, updated_at) pairs
+    delivered within the overlap window below it, scan floor after a burst or None);
+    tombstones is the same for sync_tombstones on deleted_at (None when no deletion
+    has been seen yet).
+    """
+    
+    def entry(watermark: Watermark) -> list:
+        ts, seen, pinned = watermark
+        return [ts, [list(pair) for pair in seen]] + ([pinned] if pinned else [])
+    
+    payload = {
+        "v": CURSOR_VERSION,
+        "u": _user_tag(user_id),
+        "t": {table: entry(watermark) for table, watermark in watermarks.items()},
+        "d": entry(tombstones) if tombstones else None,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str, user_id: str) -> Tuple[Dict[str, Watermark], Optional[Watermark]]:
+    """Inverse of encode_sync_cursor; raises InvalidSyncCursor"""
+    
+    def watermark(value) -> Watermark:
+        # The scan floor is only written after a burst
+        ts, seen, pinned = value if len(value) == 3 else (*value, None)
+        _parse_timestamp(str(ts))
+        if pinned is not None:
+            _parse_timestamp(str(pinned))
+        return str(ts), [(str(row_id), str(row_ts)) for row_id, row_ts in seen], str(pinned) if pinned else None
+    
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload.get("v") != CURSOR_VERSION:
+            raise InvalidSyncCursor("Unsupported cursor version")
+        if payload.get("u") != _user_tag(user_id):
+            raise InvalidSyncCursor("Cursor belongs to a different user")
+        watermarks = {
+            table: watermark(value)
+            for table, value in payload.get("t", {}).items()
+            if table in SYNC_TABLES
+        }
+        tombstones = payload.get("d")
+        return watermarks, watermark(tombstones) if tombstones else None
+    except InvalidSyncCursor:
+        raise
+    except Exception as e:
+        raise InvalidSyncCursor(f"Malformed cursor: {e}")
+
+
+class JournalSyncService:
+    """Builds delta pages for GET /journal/sync"""
+    
+    def __init__(self, client):
+        # Service role client; every query is explicitly scoped to the caller's user_id
+        self.client = client
+    
+    def _fetch_changes(self, table: str, user_id: str, since: Optional[Watermark], limit: int,
+                       column: str = "updated_at") -> Tuple[List[Dict[str, Any]], bool, Optional[Watermark]]:
+        """
+        One keyset page of rows changed at or after the table's overlap window
+        
+        The scan starts SYNC_OVERLAP_SECONDS below the watermark; rows the client
+        already has (same id and timestamp) are skipped, so late commits are picked
+        up and nothing repeats across pages. When more than MAX_SYNC_LIMIT pairs fall
+        in the window, the scan floor moves up to the newest delivered timestamp and
+        only the pairs stamped there are kept, so the cursor and the read size stay
+        bounded; a late commit stamped inside such a burst is then not picked up.
+        Returns (rows, has_more, new watermark).
+        """
+        seen = set(since[1]) if since else set()
+        query = self.client.table(table).select("*").eq("user_id", user_id)
+        if since:
+            query = query.gte(column, _scan_floor(since).isoformat())
+        result = query.order(column).order("id").limit(limit + len(seen) + 1).execute()
+        
+        rows = [row for row in (result.data or []) if (str(row["id"]), row[column]) not in seen]
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if not rows:
+            return [], False, since
+        
+        # Late rows sort before the watermark, so the high mark is not always the last row
+        high = rows[-1][column]
+        if since and _parse_timestamp(since[0]) > _parse_timestamp(high):
+            high = since[0]
+        # A floor pinned by an earlier burst lapses once the overlap window passes it
+        pinned = since[2] if since else None
+        overlap_floor = _parse_timestamp(high) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+        if pinned and _parse_timestamp(pinned) <= overlap_floor:
+            pinned = None
+        floor = _scan_floor((high, [], pinned))
+        delivered = list(seen) + [(str(row["id"]), row[column]) for row in rows]
+        window = [pair for pair in delivered if _parse_timestamp(pair[1]) >= floor]
+        if len(window) > MAX_SYNC_LIMIT:
+            # Burst inside the overlap: stop re-reading below the newest delivered
+            # timestamp (rows sharing it are all kept, or the next page would repeat them)
+            pinned, floor = high, _parse_timestamp(high)
+            window = [pair for pair in window if _parse_timestamp(pair[1]) >= floor]
+            logger.info(f"🔄 Sync window for {table} capped at {high} ({len(delivered)} rows in the overlap)")
+        return rows, has_more, (high, window, pinned)
+    
+    def _fetch_tombstones(self, user_id: str, since: Optional[Watermark],
+                          limit: int) -> Tuple[List[Dict[str, Any]], bool, Optional[Watermark]]:
+        """Deletions recorded after the cursor; returns (tombstones, has_more, new tombstone watermark)"""
+        try:
+            rows, has_more, watermark = self._fetch_changes(TOMBSTONE_TABLE, user_id, since, limit, column="deleted_at")
+        except Exception as e:
+            logger.warning(f"⚠️ Sync tombstones unavailable (is the sync migration applied?): {e}")
+            return [], False, since
+        
+        tombstones = [
+            {
+                "table": row["table_name"],
+                "id": row["row_id"],
+                "journal_entry_id": row.get("journal_entry_id"),
+                "deleted_at": row["deleted_at"],
+            }
+            for row in rows
+        ]
+        return tombstones, has_more, watermark
+    
+    def _latest_tombstone(self, user_id: str) -> Optional[Watermark]:
+        """Starting point for a full sync: a fresh client has nothing to delete"""
+        try:
+            result = self.client.table(TOMBSTONE_TABLE).select("id, deleted_at")\
+                .eq("user_id", user_id)\
+                .order("deleted_at", desc=True)\
+                .order("id", desc=True)\
+                .limit(1)\
+                .execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Sync tombstones unavailable (is the sync migration applied?): {e}")
+            return None
+        if not result.data:
+            return None
+        row = result.data[0]
+        return row["deleted_at"], [(str(row["id"]), row["deleted_at"])], None
+    
+    async def get_changes(self, user_id: str, cursor: Optional[str] = None,
+                          limit: int = DEFAULT_SYNC_LIMIT) -> Dict[str, Any]:
+        """
+        Everything that changed for user_id since cursor (a full sync when cursor is None)
+        
+        Each table is paged independently up to `limit` rows; when has_more is
+        true the client should call again immediately with the returned cursor.
+        Raises InvalidSyncCursor for cursors it cannot resume from.
+        """
+        if cursor:
+            watermarks, tombstones = decode_sync_cursor(cursor, user_id)
+            deletion_task = asyncio.to_thread(self._fetch_tombstones, user_id, tombstones, limit)
+        else:
+            # Read the tombstone head before scanning rows, so a delete racing the
+            # scan is still delivered on the next call
+            watermarks = {}
+            full_sync_tombstones = await asyncio.to_thread(self._latest_tombstone, user_id)
+            deletion_task = asyncio.sleep(0, result=([], False, full_sync_tombstones))
+        
+        # The Supabase client is synchronous; run the independent table scans side by side
+        change_tasks = [
+            asyncio.to_thread(self._fetch_changes, table, user_id, watermarks.get(table), limit)
+            for table in SYNC_TABLES
+        ]
+        results = await asyncio.gather(*change_tasks, deletion_task)
+        
+        response: Dict[str, Any] = {}
+        new_watermarks: Dict[str, Watermark] = {}
+        has_more = False
+        for table, (rows, table_has_more, watermark) in zip(SYNC_TABLES, results[:-1]):
+            if table == "journal_entries":
+                rows = [DateTimeUtils.ensure_updated_at(row) for row in rows]
+            response[table] = rows
+            has_more = has_more or table_has_more
+            if watermark:
+                new_watermarks[table] = watermark
+        
+        deleted, tombstones_have_more, new_tombstones = results[-1]
+        has_more = has_more or tombstones_have_more
+        
+        change_count = sum(len(response[table]) for table in SYNC_TABLES) + len(deleted)
+        logger.info(f"🔄 Sync for user {user_id}: {change_count} changes (full={cursor is None}, has_more={has_more})")
+        
+        response.update({
+            "deleted": deleted,
+            "cursor": encode_sync_cursor(user_id, new_watermarks, new_tombstones),
+            "has_more": has_more,
+            "server_time": datetime.now(timezone.utc).isoformat(),
+        })
+        return response
@@ -0,0 +1,234 @@
+"""
+Latency-Aware Model Routing for PulseCheck
+Picks the model for each completion from live latency, error and 429 rates
+
+OpenAIObservability reports every tracked request here; per model the router keeps
+exponentially weighted moving averages (EWMA) of latency, server-side errors and 429s.
+Each route (pulse, multi_persona) has a latency SLO and a list of allowed models:
+- The cheapest allowed model that is within the SLO and error limits is used
+- A degraded model still gets one probe request per MODEL_ROUTING_PROBE_SECONDS,
+  so it can recover without traffic being forced onto it
+- When every allowed model is degraded the route sheds to its faster shed_to models
+  (lowest EWMA latency first), and with none left the caller serves its smart fallback
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from openai._exceptions import (
+    APIConnectionError, APIStatusError, APITimeoutError, InternalServerError, RateLimitError
+)
+
+from app.core.config import settings
+from app.core.metrics_store import metrics_store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelHealth:
+    """EWMA view of one model (rates are fractions of requests)"""
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    samples: int = 0
+    last_observed_at: float = 0.0
+    last_probe_at: float = 0.0
+
+
+@dataclass(frozen=True)
+class RouteConfig:
+    name: str
+    models: Tuple[str, ...]
+    slo_ms: float
+    shed_to: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    route: str
+    model: Optional[str]  # None: serve the fallback response
+    reason: str  # within_slo, probe, shed, fallback or disabled
+    
+    @property
+    def use_fallback(self) -> bool:
+        return self.model is None
+
+
+class ModelsDegradedError(Exception):
+    """Every model a route may use is degraded; the caller should serve its fallback"""
+
+
+def is_server_side_error(error: Exception) -> bool:
+    """Errors that say something about the model's health (not about the request)"""
+    if isinstance(error, (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _model_list(value: str) -> Tuple[str, ...]:
+    return tuple(model.strip() for model in value.split(",") if model.strip())
+
+
+class ModelRouter:
+    """Per-model EWMA health plus route selection (thread-safe)"""
+    
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        min_samples: int = 3,
+        max_error_rate: float = 0.25,
+        max_rate_limit_rate: float = 0.1,
+        probe_interval_seconds: float = 30.0,
+        default_slo_ms: float = 10000.0,
+    ):
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.max_rate_limit_rate = max_rate_limit_rate
+        self.probe_interval_seconds = probe_interval_seconds
+        self.default_slo_ms = default_slo_ms
+        self.enabled = True
+        self.prices: Dict[str, Dict[str, float]] = {}  # model -> {"input", "output"} per 1K tokens
+        
+        self._routes: Dict[str, RouteConfig] = {}
+        self._health: Dict[str, ModelHealth] = {}
+        self._decisions: Dict[Tuple[str, str, str], int] = {}
+        self._lock = threading.Lock()
+    
+    def register_route(self, name: str, models: Sequence[str], slo_ms: float, shed_to: Sequence[str] = ()) -> RouteConfig:
+        route = RouteConfig(name, tuple(models), slo_ms, tuple(model for model in shed_to if model not in models))
+        self._routes[name] = route
+        return route
+    
+    def primary_model(self, route: str) -> str:
+        """First configured model of a route (what it uses when routing is disabled)"""
+        return self._routes[route].models[0]
+    
+    # ----- Observations -----
+    
+    def observe(self, model: str, latency_ms: float, error: Optional[Exception] = None) -> None:
+        """Fold one finished request into the model's EWMAs"""
+        failed = error is not None and is_server_side_error(error)
+        if error is not None and not failed:
+            # Bad requests, auth and content errors do not reflect on the model
+            return
+        rate_limited = isinstance(error, RateLimitError)
+        with self._lock:
+            health = self._health.setdefault(model, ModelHealth())
+            if health.samples == 0:
+                health.latency_ms = latency_ms
+                health.error_rate = 1.0 if failed else 0.0
+                health.rate_limit_rate = 1.0 if rate_limited else 0.0
+            else:
+                alpha = self.alpha
+                health.latency_ms += alpha * (latency_ms - health.latency_ms)
+                health.error_rate += alpha * ((1.0 if failed else 0.0) - health.error_rate)
+                health.rate_limit_rate += alpha * ((1.0 if rate_limited else 0.0) - health.rate_limit_rate)
+            health.samples += 1
+            health.last_observed_at = time.time()
+    
+    def is_degraded(self, model: str, slo_ms: Optional[float] = None) -> bool:
+        with self._lock:
+            return self._degraded_locked(model, slo_ms if slo_ms is not None else self.default_slo_ms)
+    
+    def _degraded_locked(self, model: str, slo_ms: float) -> bool:
+        health = self._health.get(model)
+        if health is None or health.samples < self.min_samples:
+            return False
+        return (
+            health.latency_ms > slo_ms
+            or health.error_rate > self.max_error_rate
+            or health.rate_limit_rate > self.max_rate_limit_rate
+        )
+    
+    # ----- Routing -----
+    
+    def route(self, name: str) -> RouteDecision:
+        """Model for the next request on a route"""
+        route = self._routes[name]
+        if not self.enabled:
+            return RouteDecision(name, route.models[0], "disabled")
+        
+        now = time.time()
+        with self._lock:
+            decision = None
+            for model in sorted(route.models, key=self._price):
+                if not self._degraded_locked(model, route.slo_ms):
+                    decision = RouteDecision(name, model, "within_slo")
+                    break
+                health = self._health[model]
+                if now - health.last_probe_at >= self.probe_interval_seconds:
+                    health.last_probe_at = now
+                    decision = RouteDecision(name, model, "probe")
+                    break
+            
+            if decision is None:
+                healthy = [model for model in route.shed_to if not self._degraded_locked(model, route.slo_ms)]
+                if healthy:
+                    fastest = min(healthy, key=lambda model: self._health[model].latency_ms if model in self._health else 0.0)
+                    decision = RouteDecision(name, fastest, "shed")
+                else:
+                    decision = RouteDecision(name, None, "fallback")
+            
+            key = (name, decision.model or "fallback", decision.reason)
+            self._decisions[key] = self._decisions.get(key, 0) + 1
+        
+        if decision.reason != "within_slo":
+            logger.warning(f"🔀 Route {name}: {decision.reason} -> {decision.model or 'smart fallback'}")
+        metrics_store.record("model_route", 1, {"route": name, "model": decision.model or "fallback", "reason": decision.reason})
+        return decision
+    
+    def _price(self, model: str) -> float:
+        price = self.prices.get(model)
+        return price["input"] + price["output"] if price else float("inf")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Model health, route configuration and decision counts"""
+        with self._lock:
+            models = {
+                model: {
+                    "ewma_latency_ms": round(health.latency_ms, 1),
+                    "error_rate": round(health.error_rate, 3),
+                    "rate_limit_rate": round(health.rate_limit_rate, 3),
+                    "samples": health.samples,
+                    "degraded": self._degraded_locked(model, self.default_slo_ms),
+                }
+                for model, health in self._health.items()
+            }
+            routes = {
+                name: {
+                    "models": list(route.models),
+                    "shed_to": list(route.shed_to),
+                    "slo_ms": route.slo_ms,
+                    "degraded": [model for model in route.models if self._degraded_locked(model, route.slo_ms)],
+                }
+                for name, route in self._routes.items()
+            }
+            decisions: List[Dict[str, Any]] = [
+                {"route": route, "model": model, "reason": reason, "count": count}
+                for (route, model, reason), count in sorted(self._decisions.items())
+            ]
+        return {"enabled": self.enabled, "models": models, "routes": routes, "decisions": decisions}
+
+
+# Global router instance
+model_router = ModelRouter(
+    alpha=settings.MODEL_ROUTING_EWMA_ALPHA,
+    min_samples=settings.MODEL_ROUTING_MIN_SAMPLES,
+    max_error_rate=settings.MODEL_ROUTING_MAX_ERROR_RATE,
+    max_rate_limit_rate=settings.MODEL_ROUTING_MAX_RATE_LIMIT_RATE,
+    probe_interval_seconds=settings.MODEL_ROUTING_PROBE_SECONDS,
+    default_slo_ms=settings.MODEL_ROUTING_DEFAULT_SLO_MS,
+)
+model_router.enabled = settings.MODEL_ROUTING_ENABLED
+model_router.register_route("pulse", _model_list(settings.PULSE_AI_MODELS), settings.PULSE_AI_LATENCY_SLO_MS)
+model_router.register_route(
+    "multi_persona",
+    _model_list(settings.MULTI_PERSONA_MODELS),
+    settings.MULTI_PERSONA_LATENCY_SLO_MS,
+    shed_to=_model_list(settings.MULTI_PERSONA_SHED_MODELS),
+)
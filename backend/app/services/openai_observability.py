@@ -23,6 +23,9 @@ from openai._exceptions import (
 
 from app.core.observability import observability, capture_error
 from app.core.config import settings
+from app.core.metrics_store import metrics_store
+from app.services.model_router import model_router
+from app.services.request_deadline import completion_hedger
 
 logger = logging.getLogger(__name__)
 
@@ -112,6 +115,19 @@ class OpenAIObservability:
             duration_ms=duration_ms
         )
         
+        # Persist latency, token and cost history
+        tags = {"model": metrics.model, "operation": metrics.operation}
+        metrics_store.record("openai_request_ms", duration_ms, tags)
+        if error:
+            metrics_store.record("openai_errors", 1, tags)
+        if metrics.tokens_used:
+            metrics_store.record("openai_tokens", metrics.tokens_used, tags)
+        if metrics.cost_estimate:
+            metrics_store.record("openai_cost_usd", metrics.cost_estimate, tags)
+        
+        # Feed latency-aware model routing
+        model_router.observe(metrics.model, duration_ms, error)
+        
         # Clean up
         del self.active_requests[request_id]
         
@@ -120,6 +136,14 @@ class OpenAIObservability:
         else:
             logger.info(f"✅ OpenAI request completed: {metrics.operation} in {duration_ms:.1f}ms")
     
+    def cancel_request(self, request_id: str):
+        """Drop a request its caller cancelled (hedge loser, expired deadline): not an error, not fed to routing"""
+        metrics = self.active_requests.pop(request_id, None)
+        if metrics is None:
+            return
+        metrics_store.record("openai_cancelled", 1, {"model": metrics.model, "operation": metrics.operation})
+        logger.info(f"🛑 OpenAI request cancelled: {metrics.operation} after {(time.time() - metrics.start_time) * 1000:.1f}ms")
+    
     def _handle_openai_error(self, metrics: OpenAIRequestMetrics, error: Exception):
         """Handle and categorize OpenAI errors"""
         metrics.error = str(error)
@@ -230,11 +254,14 @@ class OpenAIObservability:
         return {
             "active_requests": len(self.active_requests),
             "cost_estimates_available": list(self.cost_estimates.keys()),
+            "model_routing": model_router.snapshot(),
+            "hedging": completion_hedger.snapshot(),
             "monitoring_status": "active"
         }
 
 # Global instance
 openai_observability = OpenAIObservability()
+model_router.prices = openai_observability.cost_estimates
 
 # Convenience functions for easy integration
 def start_openai_request(operation: str, model: str, **kwargs) -> str:
@@ -245,6 +272,10 @@ def end_openai_request(request_id: str, response: Any = None, error: Exception =
     """End tracking an OpenAI request"""
     openai_observability.end_request(request_id, response, error)
 
+def cancel_openai_request(request_id: str):
+    """Stop tracking an OpenAI request its caller cancelled"""
+    openai_observability.cancel_request(request_id)
+
 def get_openai_usage_summary() -> Dict[str, Any]:
     """Get OpenAI usage summary"""
     return openai_observability.get_usage_summary()
@@ -0,0 +1,230 @@
+"""
+Combined Multi-Persona Generation for PulseCheck
+One completion that answers as several personas, and the auto choice between it and fan-out
+
+Fan-out (one call per persona) repeats the journal entry, the output instructions and
+the JSON schema in every request. Combined mode sends them once: a single system
+prompt holds every persona's voice and the model returns {"responses": [...]} with
+one item per persona, in the requested order.
+
+The trade-off is latency. Fan-out calls run in parallel, so they finish in about the
+time of one persona. One combined completion writes every persona's text serially.
+PersonaModeSelector weighs both: it takes combined when its expected extra latency
+is worth the input tokens it saves (MULTI_PERSONA_MS_PER_1K_TOKENS) and fits the
+MULTI_PERSONA_LATENCY_BUDGET_MS budget.
+"""
+
+import json
+import logging
+import math
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.metrics_store import metrics_store
+from app.core.tokenizer import tokenizer
+from app.models.ai_insights import EmotionalTone
+
+logger = logging.getLogger(__name__)
+
+MODE_FANOUT = "fanout"
+MODE_COMBINED = "combined"
+MODE_AUTO = "auto"
+MODES = (MODE_FANOUT, MODE_COMBINED, MODE_AUTO)
+
+COMBINED_SCHEMA_NAME = "multi_persona_responses"
+
+# Fields the model writes for each persona; everything else is filled in server-side
+PERSONA_ITEM_PROPERTIES: Dict[str, Any] = {
+    "response_text": {"type": "string"},
+    "emotional_tone": {"type": "string", "enum": [tone.value for tone in EmotionalTone]},
+    "confidence_score": {"type": "number"},
+    "topics_identified": {"type": "array", "items": {"type": "string"}},
+    "follow_up_suggested": {"type": "boolean"},
+    "suggested_actions": {"type": "array", "items": {"type": "string"}},
+    "estimated_helpfulness": {"type": "number"},
+    "encourages_reflection": {"type": "boolean"},
+    "validates_feelings": {"type": "boolean"},
+}
+
+
+def combined_response_schema(personas: Sequence[str]) -> Dict[str, Any]:
+    """JSON schema for {"responses": [{persona, ...persona fields}]} (OpenAI needs an object at the root)"""
+    return combined_response_format(personas)["json_schema"]["schema"]
+
+
+def combined_response_format(personas: Sequence[str]) -> Dict[str, Any]:
+    """response_format argument for chat.completions.create (shared per persona list: do not mutate)"""
+    return _combined_response_format(tuple(personas))
+
+
+@lru_cache(maxsize=64)
+def _combined_response_format(personas: Tuple[str, ...]) -> Dict[str, Any]:
+    item = {
+        "type": "object",
+        "properties": {"persona": {"type": "string", "enum": list(personas)}, **PERSONA_ITEM_PROPERTIES},
+        "required": ["persona", "response_text", "emotional_tone", "confidence_score", "topics_identified"],
+        "additionalProperties": False,
+    }
+    schema = {
+        "type": "object",
+        "properties": {
+            "responses": {"type": "array", "items": item, "minItems": len(personas), "maxItems": len(personas)}
+        },
+        "required": ["responses"],
+        "additionalProperties": False,
+    }
+    return {"type": "json_schema", "json_schema": {"name": COMBINED_SCHEMA_NAME, "schema": schema}}
+
+
+def build_combined_system_prompt(persona_voices: Sequence[Tuple[str, str]]) -> str:
+    """
+    One system prompt for every persona
+    
+    persona_voices: (persona key, description of that persona's voice) in response order.
+    Compiled once per persona list, so repeated requests send a byte-identical prompt.
+    """
+    return _combined_system_prompt(tuple(tuple(voice) for voice in persona_voices))
+
+
+@lru_cache(maxsize=64)
+def _combined_system_prompt(persona_voices: Tuple[Tuple[str, str], ...]) -> str:
+    names = ", ".join(persona for persona, _ in persona_voices)
+    voices = "\n\n".join(f"### {persona}\n{voice.strip()}" for persona, voice in persona_voices)
+    return f"""You write the replies of several AI wellness companions to the same journal entry. Each companion answers independently, in its own voice, from its own strengths; do not let them repeat each other or refer to each other's replies.
+
+{voices}
+
+Respond with a JSON object {{"responses": [...]}} containing exactly one item per companion, in this order: {names}.
+Each item has:
+- persona: the companion's key
+- response_text: that companion's reply (100-800 characters, authentic to its voice)
+- emotional_tone: one of {", ".join(tone.value for tone in EmotionalTone)}
+- confidence_score: 0.0-1.0
+- topics_identified: key topics noticed in the entry
+- follow_up_suggested, encourages_reflection, validates_feelings: true/false
+- suggested_actions: up to 2 actionable suggestions that fit the companion
+- estimated_helpfulness: 0.0-1.0"""
+
+
+def parse_combined_response(content: str, personas: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    persona -> response data from a combined completion
+    
+    Items are matched by their persona key, falling back to position when the key is
+    missing or unknown. Personas without a usable item are absent from the result so
+    the caller can regenerate just those.
+    """
+    data = json.loads(content)
+    items = data.get("responses") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise ValueError("Combined persona response has no responses array")
+    
+    wanted = list(personas)
+    parsed: Dict[str, Dict[str, Any]] = {}
+    for position, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get("response_text"):
+            continue
+        persona = str(item.get("persona") or "").lower()
+        if persona not in wanted and position < len(wanted):
+            persona = wanted[position]
+        if persona in wanted and persona not in parsed:
+            parsed[persona] = item
+    return parsed
+
+
+class PersonaModeSelector:
+    """
+    Chooses fan-out or combined generation for a multi-persona request
+    
+    Latency is tracked as an EWMA per mode: fan-out as the latency of one persona
+    call, combined as latency per persona written (its output is serial). The
+    priors are used until a mode has been observed.
+    """
+    
+    ALPHA = 0.2
+    PRIOR_FANOUT_MS = 4000.0
+    PRIOR_COMBINED_PER_PERSONA_MS = 2500.0
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fanout_ms = self.PRIOR_FANOUT_MS
+        self.combined_per_persona_ms = self.PRIOR_COMBINED_PER_PERSONA_MS
+        self.observations = {MODE_FANOUT: 0, MODE_COMBINED: 0}
+        self.decisions = {MODE_FANOUT: 0, MODE_COMBINED: 0}
+    
+    def observe(self, mode: str, persona_count: int, latency_ms: float, concurrency: int = 4) -> None:
+        """Fold one completed multi-persona generation into the latency estimates"""
+        if persona_count < 1 or mode not in self.observations:
+            return
+        with self._lock:
+            if mode == MODE_FANOUT:
+                sample = latency_ms / math.ceil(persona_count / max(1, concurrency))
+                self.fanout_ms += self.ALPHA * (sample - self.fanout_ms)
+            else:
+                sample = latency_ms / persona_count
+                self.combined_per_persona_ms += self.ALPHA * (sample - self.combined_per_persona_ms)
+            self.observations[mode] += 1
+    
+    def expected_latency_ms(self, mode: str, persona_count: int, concurrency: int = 4) -> float:
+        if mode == MODE_FANOUT:
+            return self.fanout_ms * math.ceil(persona_count / max(1, concurrency))
+        return self.combined_per_persona_ms * persona_count
+    
+    def choose(self, persona_count: int, fanout_input_tokens: int, combined_input_tokens: int,
+               mode: Optional[str] = None, concurrency: int = 4, fanout_overhead_ms: float = 0.0) -> str:
+        """
+        MODE_FANOUT or MODE_COMBINED; an explicit mode (or MULTI_PERSONA_MODE) wins over auto
+        
+        fanout_overhead_ms is latency fan-out adds on top of its calls (natural timing delays).
+        """
+        mode = (mode or settings.MULTI_PERSONA_MODE or MODE_AUTO).lower()
+        if persona_count <= 1:
+            return MODE_FANOUT
+        if mode in (MODE_FANOUT, MODE_COMBINED):
+            return mode
+        
+        fanout_ms = self.expected_latency_ms(MODE_FANOUT, persona_count, concurrency) + fanout_overhead_ms
+        combined_ms = self.expected_latency_ms(MODE_COMBINED, persona_count, concurrency)
+        saved_tokens = fanout_input_tokens - combined_input_tokens
+        worth_it = combined_ms - fanout_ms <= saved_tokens / 1000 * settings.MULTI_PERSONA_MS_PER_1K_TOKENS
+        choice = MODE_COMBINED if worth_it and combined_ms <= settings.MULTI_PERSONA_LATENCY_BUDGET_MS else MODE_FANOUT
+        
+        with self._lock:
+            self.decisions[choice] += 1
+        return choice
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fanout_call_ms": round(self.fanout_ms, 1),
+            "combined_per_persona_ms": round(self.combined_per_persona_ms, 1),
+            "observations": dict(self.observations),
+            "decisions": dict(self.decisions),
+        }
+
+
+def estimate_input_tokens(system_prompts: Sequence[str], user_prompt: str, schemas: Sequence[Dict[str, Any]]) -> int:
+    """Prompt tokens for a set of calls: each call sends one system prompt, the user prompt and one schema"""
+    texts = [*system_prompts, *(json.dumps(schema) for schema in schemas)]
+    return sum(tokenizer.count_many(texts)) + tokenizer.count(user_prompt) * len(system_prompts)
+
+
+def record_call(service: str, mode: str, latency_ms: float, usage: Any = None) -> None:
+    """Latency and prompt/completion tokens of one OpenAI call made for multi-persona generation"""
+    if metrics_store.disabled:
+        return
+    tags = {"service": service, "mode": mode}
+    metrics_store.record("multi_persona_call_ms", latency_ms, tags)
+    if usage is not None:
+        metrics_store.record("multi_persona_prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0, tags)
+        metrics_store.record("multi_persona_completion_tokens", getattr(usage, "completion_tokens", 0) or 0, tags)
+        # Prompt tokens served from the provider's prefix cache (reported by newer API versions)
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = details.get("cached_tokens") if isinstance(details, dict) else getattr(details, "cached_tokens", None)
+        if cached is not None:
+            metrics_store.record("multi_persona_cached_prompt_tokens", cached, tags)
+
+
+# Global selector: latency estimates are shared by every service instance in the process
+persona_mode_selector = PersonaModeSelector()
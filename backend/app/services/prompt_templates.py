@@ -0,0 +1,105 @@
+"""
+Prompt Template Registry for PulseCheck
+System prompts and JSON schemas compiled once at import, with only per-entry slots filled per call
+
+Services register their persona / response-type prompts here when their module is
+imported (at startup, since routers import them), instead of rebuilding long strings
+from dict lookups on every request. Each template is split into:
+- prefix: fixed text, byte-identical across calls, so OpenAI's automatic prompt
+  caching can reuse it (caching matches on the longest identical prompt prefix)
+- slots: a str.format suffix for the per-user / per-entry parts, always placed last
+
+JSON schemas are generated once per model and served as ready response_format dicts.
+Prompts whose prefix combines several static choices (adaptive tone x length x style)
+are compiled on first use with compile_prompt() and reused from then on.
+prompt_prefixes() lists every prefix with a stable hash for monitoring cache reuse.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A fixed prefix plus an optional format string for per-call slots"""
+    key: str
+    prefix: str
+    slots: str = ""
+    prefix_hash: str = field(init=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "prefix_hash", hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()[:16])
+    
+    def render(self, **values: Any) -> str:
+        """Prefix followed by the slots filled with values (just the prefix when there are none)"""
+        if not self.slots:
+            return self.prefix
+        return self.prefix + self.slots.format(**values)
+
+
+# key -> PromptTemplate
+PROMPTS: Dict[str, PromptTemplate] = {}
+
+# schema name -> ready-to-send response_format
+RESPONSE_FORMATS: Dict[str, Dict[str, Any]] = {}
+
+
+def register_prompt(key: str, prefix: str, slots: str = "") -> PromptTemplate:
+    template = PromptTemplate(key, prefix, slots)
+    PROMPTS[key] = template
+    return template
+
+
+def compile_prompt(key: str, build_prefix: Callable[[], str], slots: str = "") -> PromptTemplate:
+    """Registered template for key, building and registering it on first use"""
+    template = PROMPTS.get(key)
+    if template is None:
+        template = register_prompt(key, build_prefix(), slots)
+    return template
+
+
+def get_prompt(key: str) -> PromptTemplate:
+    """Registered template; raises KeyError naming the missing key"""
+    try:
+        return PROMPTS[key]
+    except KeyError:
+        raise KeyError(f"No prompt template registered for {key}")
+
+
+def register_schema(name: str, model: Type[BaseModel]) -> Dict[str, Any]:
+    """Generate a model's JSON schema once and keep it as a json_schema response_format"""
+    RESPONSE_FORMATS[name] = {
+        "type": "json_schema",
+        "json_schema": {"name": name, "schema": model.model_json_schema()},
+    }
+    return RESPONSE_FORMATS[name]
+
+
+def get_response_format(name: str) -> Dict[str, Any]:
+    """Registered response_format (shared: do not mutate)"""
+    try:
+        return RESPONSE_FORMATS[name]
+    except KeyError:
+        raise KeyError(f"No JSON schema registered for {name}")
+
+
+def get_schema(name: str) -> Dict[str, Any]:
+    return get_response_format(name)["json_schema"]["schema"]
+
+
+def prompt_prefixes(prefix_filter: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Every registered prefix with its hash and size (for checking cache-friendly reuse)"""
+    return {
+        key: {"hash": template.prefix_hash, "chars": len(template.prefix), "has_slots": bool(template.slots)}
+        for key, template in sorted(PROMPTS.items())
+        if prefix_filter is None or key.startswith(prefix_filter)
+    }
+
+
+def schema_sizes() -> Dict[str, int]:
+    """Serialized size of each registered schema, which every structured call sends"""
+    return {name: len(json.dumps(response_format)) for name, response_format in RESPONSE_FORMATS.items()}
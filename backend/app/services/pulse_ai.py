@@ -1,5 +1,6 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from typing import List, Dict, Any, Optional, Tuple
+import asyncio
 import json
 import logging
 from datetime import datetime, timedelta
@@ -21,8 +22,11 @@ from app.models.ai_insights import (
 )
 from .beta_optimization import BetaOptimizationService, AIContext
 from app.services.openai_observability import (
-    start_openai_request, end_openai_request, get_openai_usage_summary
+    start_openai_request, end_openai_request, cancel_openai_request, get_openai_usage_summary
 )
+from app.services.cost_optimization import cost_optimizer
+from app.services.model_router import model_router
+from app.services.request_deadline import DeadlineExceeded, completion_hedger, remaining_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +46,7 @@ class PulseAI:
     def __init__(self, db=None):
         # Initialize OpenAI client only if API key is available
         self.client = None
+        self.async_client = None  # Interactive paths (hedged, deadline-bounded)
         self.api_key_configured = False
         
         # Check for OpenAI API key in multiple places
@@ -55,11 +60,13 @@ class PulseAI:
         if openai_api_key:
             try:
                 self.client = OpenAI(api_key=openai_api_key)
+                self.async_client = AsyncOpenAI(api_key=openai_api_key)
                 self.api_key_configured = True
                 logger.info("✅ OpenAI client initialized successfully")
             except Exception as e:
                 logger.error(f"❌ Failed to initialize OpenAI client: {e}")
                 self.client = None
+                self.async_client = None
                 self.api_key_configured = False
         else:
             logger.warning("⚠️ OPENAI_API_KEY not configured - AI features will use fallback responses")
@@ -72,7 +79,7 @@ class PulseAI:
         # Cost optimization settings
         self.max_tokens = 250  # Reduced from 500 for cost efficiency
         self.temperature = 0.6  # Slightly lower for more consistent responses
-        self.model = "gpt-3.5-turbo"  # Cost-optimized model
+        self.model = model_router.primary_model("pulse")  # Default; model_router picks per request
         
         # Pulse personality configuration - optimized for GPT-3.5-turbo
         self.personality_prompt = self._load_personality_prompt()
@@ -316,7 +323,10 @@ Remember: You're checking in like a caring friend who genuinely knows them, not
         """
         if not self.beta_service:
             # Fallback to standard response if beta service not available
-            response = self.generate_pulse_response(journal_entry)
+            try:
+                response = await self.generate_pulse_response_async(journal_entry)
+            except DeadlineExceeded:
+                return self._create_smart_fallback_response(journal_entry), False, "AI response deadline exceeded"
             return response, True, None
         
         try:
@@ -341,29 +351,44 @@ Remember: You're checking in like a caring friend who genuinely knows them, not
             start_time = time.time()
             prompt = self._build_context_aware_prompt(context, tier_info)
             
-            # Retry logic with exponential backoff
+            # Retry logic with exponential backoff (re-routed per attempt, so failures can shed the model)
             last_error = None
+            model = self.model
             for attempt in range(self.max_retries):
+                decision = model_router.route("pulse")
+                if decision.use_fallback:
+                    return self._create_smart_fallback_response(journal_entry), False, "All AI models degraded"
+                model = decision.model
                 try:
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=[
-                            {"role": "system", "content": self.personality_prompt},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=min(self.max_tokens, tier_info.max_tokens_per_request),
-                        temperature=self.temperature
+                    # Hedged and bounded by the request deadline
+                    response = await completion_hedger.run(
+                        "pulse_beta_response",
+                        lambda: self._create_completion_async(
+                            "pulse_beta_response",
+                            model=model,
+                            messages=[
+                                {"role": "system", "content": self.personality_prompt},
+                                {"role": "user", "content": prompt}
+                            ],
+                            max_tokens=min(self.max_tokens, tier_info.max_tokens_per_request),
+                            temperature=self.temperature
+                        )
                     )
                     
                     # If we get here, the request was successful
                     break
                     
+                except DeadlineExceeded:
+                    logger.warning("⏰ Request deadline expired, serving smart fallback")
+                    return self._create_smart_fallback_response(journal_entry), False, "AI response deadline exceeded"
                 except Exception as e:
                     last_error = e
                     logger.warning(f"OpenAI request attempt {attempt + 1} failed: {e}")
                     
                     if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
+                        delay = self._backoff_seconds(attempt)  # Exponential backoff, within the deadline
+                        remaining = remaining_seconds()
+                        await asyncio.sleep(delay if remaining is None else min(delay, remaining))
                     else:
                         # All retries failed, use fallback
                         logger.error(f"All {self.max_retries} OpenAI requests failed")
@@ -401,7 +426,7 @@ Remember: You're checking in like a caring friend who genuinely knows them, not
                 journal_entry_id=journal_entry.id,
                 prompt_tokens=response.usage.prompt_tokens if hasattr(response, 'usage') else context.total_tokens,
                 response_tokens=response.usage.completion_tokens if hasattr(response, 'usage') else len(pulse_message) // 4,
-                model_used=self.model,
+                model_used=model,
                 response_time_ms=response_time_ms,
                 confidence_score=pulse_response.confidence_score,
                 context_type=context.context_type,
@@ -439,28 +464,26 @@ Remember: You're checking in like a caring friend who genuinely knows them, not
     ) -> PulseResponse:
         """
         Generate cost-optimized Pulse AI response to a journal entry
+        
+        Blocking; interactive paths use generate_pulse_response_async. No new attempt is
+        started once the request deadline (if any) has expired.
         """
         try:
             # TEST ACCOUNT: Never use fallbacks for test account
-            is_test_account = (hasattr(journal_entry, 'user_id') and journal_entry.user_id == self.test_user_id) or \
-                             (user_context and user_context.get("test_account", False))
+            is_test_account = self._is_test_account(journal_entry, user_context)
             
             if is_test_account:
                 logger.info(f"🚀 TEST ACCOUNT: Forcing real AI response for test account")
             
+            # Same entry (or a near-duplicate of it) answered before: reuse that reply
+            cache_request = self._cache_request(journal_entry, user_context, is_test_account)
+            cached = self._cached_pulse_response(cache_request)
+            if cached is not None:
+                return cached
+            
             # Check if OpenAI is configured
             if not self.client:
-                logger.warning("OpenAI client not available, using fallback response")
-                if is_test_account:
-                    logger.error("🚨 TEST ACCOUNT: OpenAI client not available - this is a configuration error!")
-                    return PulseResponse(
-                        message="⚠️ TEST ACCOUNT ERROR: OpenAI client not configured. Please check API key settings.",
-                        confidence_score=0.0,
-                        response_time_ms=0,
-                        follow_up_question="Is the OpenAI API key configured correctly?",
-                        suggested_actions=["Check OpenAI API key configuration"]
-                    )
-                return self._create_smart_fallback_response(journal_entry)
+                return self._client_unavailable_response(journal_entry, is_test_account)
             
             # Create backup before processing
             backup_id = self._create_backup({
@@ -468,49 +491,27 @@ Remember: You're checking in like a caring friend who genuinely knows them, not
                 "user_context": user_context
             }, "pulse_response")
             
-            # Build efficient prompt
-            prompt = self._build_efficient_prompt(journal_entry, user_context)
+            messages = self._build_pulse_messages(journal_entry, user_context)
             
             # Generate response with retry logic
             start_time = time.time()
             last_error = None
             
-            # Determine which system prompt to use
-            system_prompt = self.personality_prompt  # Default Pulse personality
-            user_prompt = prompt  # The journal entry content
-            
-            # If we have a personalized prompt from multi-persona system, use it as system prompt
-            if user_context and "personalized_prompt" in user_context:
-                persona = user_context.get("persona", "pulse")
-                logger.info(f"Using personalized system prompt for {persona} persona")
-                
-                # Extract the persona-specific prompt as system prompt
-                system_prompt = user_context["personalized_prompt"]
-                
-                # Build simpler user prompt with just the journal content
-                mood_word = self._mood_to_word(journal_entry.mood_level)
-                energy_word = self._energy_to_word(journal_entry.energy_level)
-                stress_word = self._stress_to_word(journal_entry.stress_level)
-                
-                user_prompt = f"""Today's check-in:
-{journal_entry.content}
-
-Mood: {mood_word} ({journal_entry.mood_level}/10)
-Energy: {energy_word} ({journal_entry.energy_level}/10)
-Stress: {stress_word} ({journal_entry.stress_level}/10)"""
-                
-                topics = user_context.get("topics", [])
-                if topics:
-                    user_prompt += f"\nTopics: {', '.join(topics)}"
-            
             for attempt in range(self.max_retries):
+                remaining = remaining_seconds()
+                if remaining is not None and remaining <= 0 and not is_test_account:
+                    logger.warning("⏰ Request deadline expired, serving smart fallback")
+                    return self._create_smart_fallback_response(journal_entry)
+                # Re-routed per attempt, so failures can shed the model (test account always gets a model)
+                decision = model_router.route("pulse")
+                if decision.use_fallback and not is_test_account:
+                    return self._create_smart_fallback_response(journal_entry)
+                model = decision.model or self.model
                 try:
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
+                    response = self._create_completion(
+                        "pulse_response",
+                        model=model,
+                        messages=messages,
                         max_tokens=self.max_tokens,
                         temperature=self.temperature
                     )
@@ -523,89 +524,329 @@ Stress: {stress_word} ({journal_entry.stress_level}/10)"""
                     logger.warning(f"OpenAI request attempt {attempt + 1} failed: {e}")
                     
                     if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
+                        time.sleep(self._backoff_seconds(attempt))  # Exponential backoff
                     else:
-                        # All retries failed, use fallback
-                        logger.error(f"All {self.max_retries} OpenAI requests failed")
-                        if is_test_account:
-                            logger.error("🚨 TEST ACCOUNT: All OpenAI retries failed - this should not happen!")
-                            return PulseResponse(
-                                message=f"⚠️ TEST ACCOUNT ERROR: All {self.max_retries} OpenAI API attempts failed. Last error: {str(last_error)}",
-                                confidence_score=0.0,
-                                response_time_ms=0,
-                                follow_up_question="Should we check the OpenAI API status?",
-                                suggested_actions=["Check OpenAI API status", "Verify API key and usage limits"]
-                            )
-                        return self._create_smart_fallback_response(journal_entry)
+                        return self._retries_exhausted_response(journal_entry, is_test_account, last_error)
             
             response_time_ms = int((time.time() - start_time) * 1000)
+            return self._finish_pulse_response(response, response_time_ms, journal_entry, is_test_account, model, cache_request)
             
-            # Robustly check OpenAI response
-            pulse_message = None
-            try:
-                if response and hasattr(response, 'choices') and response.choices and hasattr(response.choices[0], 'message') and hasattr(response.choices[0].message, 'content'):
-                    pulse_message = response.choices[0].message.content
-            except Exception as e:
-                logger.error(f"Malformed OpenAI response: {e}")
-                pulse_message = None
+        except Exception as e:
+            return self._generation_error_response(journal_entry, user_context, e)
+    
+    async def generate_pulse_response_async(
+        self,
+        journal_entry: JournalEntryResponse,
+        user_context: Optional[Dict[str, Any]] = None
+    ) -> PulseResponse:
+        """
+        generate_pulse_response for interactive paths: non-blocking and bounded by the request deadline
+        
+        Each attempt is hedged after the pulse_response p95 (see request_deadline).
+        Raises DeadlineExceeded when the deadline expires first, so the caller decides
+        between _create_smart_fallback_response now and delivering the real reply later
+        (under keep_late, its .late resolves to this attempt's PulseResponse).
+        """
+        try:
+            is_test_account = self._is_test_account(journal_entry, user_context)
             
-            if not pulse_message or not isinstance(pulse_message, str) or len(pulse_message.strip()) < 10:
-                logger.error(f"OpenAI returned empty or invalid message: {pulse_message}")
-                if is_test_account:
-                    logger.error("🚨 TEST ACCOUNT: OpenAI returned empty/invalid response - this should not happen!")
-                    return PulseResponse(
-                        message=f"⚠️ TEST ACCOUNT ERROR: OpenAI returned empty/invalid response: '{pulse_message}'",
-                        confidence_score=0.0,
-                        response_time_ms=0,
-                        follow_up_question="Should we investigate the OpenAI response format?",
-                        suggested_actions=["Check OpenAI API response format", "Verify request parameters"]
-                    )
-                return self._create_smart_fallback_response(journal_entry)
+            cache_request = self._cache_request(journal_entry, user_context, is_test_account)
+            if cache_request is not None:
+                # An in-memory miss reads the cache's SQLite tier: keep it off the event loop
+                cached = await asyncio.to_thread(self._cached_pulse_response, cache_request)
+                if cached is not None:
+                    return cached
             
-            # Content safety check
-            is_safe, issue_type, problematic_content = self._check_content_safety(pulse_message)
-            if not is_safe:
-                logger.warning(f"Content safety issue detected: {issue_type} - {problematic_content}")
-                if is_test_account:
-                    logger.warning("🚀 TEST ACCOUNT: Content safety issue detected but allowing for testing purposes")
-                    # For test account, log the issue but don't block the response
-                else:
-                    return self._create_smart_fallback_response(journal_entry)
+            if not self.async_client:
+                return self._client_unavailable_response(journal_entry, is_test_account)
             
-            # Parse and return response
-            pulse_response = self._parse_pulse_response(pulse_message, response_time_ms)
+            self._create_backup({
+                "journal_entry": journal_entry.dict() if hasattr(journal_entry, 'dict') else str(journal_entry),
+                "user_context": user_context
+            }, "pulse_response")
+            
+            messages = self._build_pulse_messages(journal_entry, user_context)
+            
+            start_time = time.time()
+            last_error = None
             
-            # Track usage for cost monitoring
-            if hasattr(response, 'usage'):
-                self._track_usage(response.usage.total_tokens)
+            for attempt in range(self.max_retries):
+                decision = model_router.route("pulse")
+                if decision.use_fallback and not is_test_account:
+                    return self._create_smart_fallback_response(journal_entry)
+                model = decision.model or self.model
+                try:
+                    response = await completion_hedger.run(
+                        "pulse_response",
+                        lambda: self._create_completion_async(
+                            "pulse_response",
+                            model=model,
+                            messages=messages,
+                            max_tokens=self.max_tokens,
+                            temperature=self.temperature
+                        )
+                    )
+                    break
+                    
+                except DeadlineExceeded as e:
+                    if e.late is not None:
+                        e.late = asyncio.ensure_future(
+                            self._finish_late_completion(e.late, start_time, journal_entry, is_test_account, model, cache_request)
+                        )
+                    raise
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"OpenAI request attempt {attempt + 1} failed: {e}")
+                    
+                    if attempt < self.max_retries - 1:
+                        # Backoff never outlasts the deadline; the next attempt then raises DeadlineExceeded
+                        delay = self._backoff_seconds(attempt)
+                        remaining = remaining_seconds()
+                        await asyncio.sleep(delay if remaining is None else min(delay, remaining))
+                    else:
+                        return self._retries_exhausted_response(journal_entry, is_test_account, last_error)
             
-            return pulse_response
+            response_time_ms = int((time.time() - start_time) * 1000)
+            return self._finish_pulse_response(response, response_time_ms, journal_entry, is_test_account, model, cache_request)
             
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            return self._generation_error_response(journal_entry, user_context, e)
+    
+    async def _finish_late_completion(
+        self,
+        late: asyncio.Future,
+        start_time: float,
+        journal_entry: JournalEntryResponse,
+        is_test_account: bool,
+        model: str,
+        cache_request: Optional[Dict[str, Any]]
+    ) -> PulseResponse:
+        """_finish_pulse_response for a completion that outlived the request deadline"""
+        response = await late
+        response_time_ms = int((time.time() - start_time) * 1000)
+        return self._finish_pulse_response(response, response_time_ms, journal_entry, is_test_account, model, cache_request)
+    
+    def _is_test_account(self, journal_entry: JournalEntryResponse, user_context: Optional[Dict[str, Any]]) -> bool:
+        return bool(
+            (hasattr(journal_entry, 'user_id') and journal_entry.user_id == self.test_user_id) or
+            (user_context and user_context.get("test_account", False))
+        )
+    
+    def _backoff_seconds(self, attempt: int) -> float:
+        return self.retry_delay * (2 ** attempt)
+    
+    def _cache_request(
+        self,
+        journal_entry: JournalEntryResponse,
+        user_context: Optional[Dict[str, Any]],
+        is_test_account: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Request data for cost_optimizer's response cache (None: the test account always gets a fresh completion)"""
+        if is_test_account or not settings.RESPONSE_CACHE_ENABLED:
+            return None
+        user_id = getattr(journal_entry, 'user_id', None)
+        return {
+            "journal_content": journal_entry.content,
+            "persona": (user_context or {}).get("persona") or "pulse",
+            "user_id": str(user_id) if user_id else None,
+            "response_preferences": {"mood_level": journal_entry.mood_level}
+        }
+    
+    def _cached_pulse_response(self, cache_request: Optional[Dict[str, Any]]) -> Optional[PulseResponse]:
+        """Cached reply to this entry or a near-duplicate of it (crisis, very low mood and short entries always miss)"""
+        if cache_request is None:
+            return None
+        start_time = time.time()
+        cached = cost_optimizer.find_similar_response(cache_request)
+        if cached is None:
+            return None
+        try:
+            return PulseResponse(**{**cached, "response_time_ms": int((time.time() - start_time) * 1000)})
         except Exception as e:
-            logger.error(f"Error in pulse response generation: {e}")
+            logger.warning(f"⚠️ Ignoring unreadable cached Pulse response: {e}")
+            return None
+    
+    def _build_pulse_messages(
+        self,
+        journal_entry: JournalEntryResponse,
+        user_context: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, str]]:
+        """System and user messages for a Pulse response"""
+        # Build efficient prompt
+        prompt = self._build_efficient_prompt(journal_entry, user_context)
+        
+        # Determine which system prompt to use
+        system_prompt = self.personality_prompt  # Default Pulse personality
+        user_prompt = prompt  # The journal entry content
+        
+        # If we have a personalized prompt from multi-persona system, use it as system prompt
+        if user_context and "personalized_prompt" in user_context:
+            persona = user_context.get("persona", "pulse")
+            logger.info(f"Using personalized system prompt for {persona} persona")
             
-            # Create backup of error state
-            self._create_backup({
-                "error": str(e),
-                "journal_entry": str(journal_entry),
-                "timestamp": datetime.now().isoformat()
-            }, "pulse_response_error")
+            # Extract the persona-specific prompt as system prompt
+            system_prompt = user_context["personalized_prompt"]
+            
+            # Build simpler user prompt with just the journal content
+            mood_word = self._mood_to_word(journal_entry.mood_level)
+            energy_word = self._energy_to_word(journal_entry.energy_level)
+            stress_word = self._stress_to_word(journal_entry.stress_level)
             
-            # Check if this is test account
-            is_test_account = (hasattr(journal_entry, 'user_id') and journal_entry.user_id == self.test_user_id) or \
-                             (user_context and user_context.get("test_account", False))
+            user_prompt = f"""Today's check-in:
+{journal_entry.content}
+
+Mood: {mood_word} ({journal_entry.mood_level}/10)
+Energy: {energy_word} ({journal_entry.energy_level}/10)
+Stress: {stress_word} ({journal_entry.stress_level}/10)"""
             
+            topics = user_context.get("topics", [])
+            if topics:
+                user_prompt += f"\nTopics: {', '.join(topics)}"
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _client_unavailable_response(self, journal_entry: JournalEntryResponse, is_test_account: bool) -> PulseResponse:
+        logger.warning("OpenAI client not available, using fallback response")
+        if is_test_account:
+            logger.error("🚨 TEST ACCOUNT: OpenAI client not available - this is a configuration error!")
+            return PulseResponse(
+                message="⚠️ TEST ACCOUNT ERROR: OpenAI client not configured. Please check API key settings.",
+                confidence_score=0.0,
+                response_time_ms=0,
+                follow_up_question="Is the OpenAI API key configured correctly?",
+                suggested_actions=["Check OpenAI API key configuration"]
+            )
+        return self._create_smart_fallback_response(journal_entry)
+    
+    def _retries_exhausted_response(self, journal_entry: JournalEntryResponse, is_test_account: bool, last_error: Optional[Exception]) -> PulseResponse:
+        # All retries failed, use fallback
+        logger.error(f"All {self.max_retries} OpenAI requests failed")
+        if is_test_account:
+            logger.error("🚨 TEST ACCOUNT: All OpenAI retries failed - this should not happen!")
+            return PulseResponse(
+                message=f"⚠️ TEST ACCOUNT ERROR: All {self.max_retries} OpenAI API attempts failed. Last error: {str(last_error)}",
+                confidence_score=0.0,
+                response_time_ms=0,
+                follow_up_question="Should we check the OpenAI API status?",
+                suggested_actions=["Check OpenAI API status", "Verify API key and usage limits"]
+            )
+        return self._create_smart_fallback_response(journal_entry)
+    
+    def _finish_pulse_response(
+        self,
+        response,
+        response_time_ms: int,
+        journal_entry: JournalEntryResponse,
+        is_test_account: bool,
+        model: Optional[str] = None,
+        cache_request: Optional[Dict[str, Any]] = None
+    ) -> PulseResponse:
+        """Validate, safety-check and parse a completion into a PulseResponse (cached when cache_request is given)"""
+        # Robustly check OpenAI response
+        pulse_message = None
+        try:
+            if response and hasattr(response, 'choices') and response.choices and hasattr(response.choices[0], 'message') and hasattr(response.choices[0].message, 'content'):
+                pulse_message = response.choices[0].message.content
+        except Exception as e:
+            logger.error(f"Malformed OpenAI response: {e}")
+            pulse_message = None
+        
+        if not pulse_message or not isinstance(pulse_message, str) or len(pulse_message.strip()) < 10:
+            logger.error(f"OpenAI returned empty or invalid message: {pulse_message}")
             if is_test_account:
-                logger.error("🚨 TEST ACCOUNT: Exception in pulse response generation - this should not happen!")
+                logger.error("🚨 TEST ACCOUNT: OpenAI returned empty/invalid response - this should not happen!")
                 return PulseResponse(
-                    message=f"⚠️ TEST ACCOUNT ERROR: Exception in response generation: {str(e)}",
+                    message=f"⚠️ TEST ACCOUNT ERROR: OpenAI returned empty/invalid response: '{pulse_message}'",
                     confidence_score=0.0,
                     response_time_ms=0,
-                    follow_up_question="Should we investigate this error?",
-                    suggested_actions=["Check system logs", "Verify configuration"]
+                    follow_up_question="Should we investigate the OpenAI response format?",
+                    suggested_actions=["Check OpenAI API response format", "Verify request parameters"]
                 )
-            
-            return self._emergency_fallback(journal_entry, str(e))
+            return self._create_smart_fallback_response(journal_entry)
+        
+        # Content safety check
+        is_safe, issue_type, problematic_content = self._check_content_safety(pulse_message)
+        if not is_safe:
+            logger.warning(f"Content safety issue detected: {issue_type} - {problematic_content}")
+            if is_test_account:
+                logger.warning("🚀 TEST ACCOUNT: Content safety issue detected but allowing for testing purposes")
+                # For test account, log the issue but don't block the response
+            else:
+                return self._create_smart_fallback_response(journal_entry)
+        
+        # Parse and return response
+        pulse_response = self._parse_pulse_response(pulse_message, response_time_ms)
+        
+        # Track usage for cost monitoring
+        tokens_used = 0
+        if hasattr(response, 'usage'):
+            tokens_used = response.usage.total_tokens
+            self._track_usage(tokens_used)
+        
+        if cache_request is not None:
+            # Only replies that passed validation and the safety check reach the cache
+            cost_optimizer.cache_response(
+                cost_optimizer.generate_cache_key(cache_request),
+                pulse_response.dict(),
+                model or self.model,
+                cost_optimizer.classify_request_complexity(cache_request),
+                request_data=cache_request,
+                tokens_used=tokens_used
+            )
+        
+        return pulse_response
+    
+    def _generation_error_response(self, journal_entry: JournalEntryResponse, user_context: Optional[Dict[str, Any]], e: Exception) -> PulseResponse:
+        logger.error(f"Error in pulse response generation: {e}")
+        
+        # Create backup of error state
+        self._create_backup({
+            "error": str(e),
+            "journal_entry": str(journal_entry),
+            "timestamp": datetime.now().isoformat()
+        }, "pulse_response_error")
+        
+        if self._is_test_account(journal_entry, user_context):
+            logger.error("🚨 TEST ACCOUNT: Exception in pulse response generation - this should not happen!")
+            return PulseResponse(
+                message=f"⚠️ TEST ACCOUNT ERROR: Exception in response generation: {str(e)}",
+                confidence_score=0.0,
+                response_time_ms=0,
+                follow_up_question="Should we investigate this error?",
+                suggested_actions=["Check system logs", "Verify configuration"]
+            )
+        
+        return self._emergency_fallback(journal_entry, str(e))
+    
+    def _create_completion(self, operation: str, **kwargs):
+        """chat.completions.create tracked by OpenAIObservability (which feeds model routing)"""
+        request_id = start_openai_request(operation, kwargs["model"])
+        try:
+            response = self.client.chat.completions.create(**kwargs)
+        except Exception as e:
+            end_openai_request(request_id, error=e)
+            raise
+        end_openai_request(request_id, response=response)
+        return response
+    
+    async def _create_completion_async(self, operation: str, **kwargs):
+        """_create_completion on the async client; a cancelled request (hedge loser, deadline) is not an error"""
+        request_id = start_openai_request(operation, kwargs["model"])
+        try:
+            response = await self.async_client.chat.completions.create(**kwargs)
+        except asyncio.CancelledError:
+            cancel_openai_request(request_id)
+            raise
+        except Exception as e:
+            end_openai_request(request_id, error=e)
+            raise
+        end_openai_request(request_id, response=response)
+        return response
     
     def _force_generate_for_test_account(self, journal_entry: JournalEntryResponse, user_context: Optional[Dict[str, Any]] = None) -> PulseResponse:
         """
@@ -667,18 +908,12 @@ Stress: {stress_word} ({journal_entry.stress_level}/10)"""
             )
     
     def _build_context_aware_prompt(self, context: AIContext, tier_info) -> str:
-        """Build context-aware prompt for beta-optimized responses"""
+        """Build context-aware prompt for beta-optimized responses (already packed to the tier's token budget)"""
         try:
-            return f"""User Journal Entry: {context.current_entry_text}
-
-User Context: {context.user_context_summary}
-
-Previous Patterns: {context.pattern_summary}
-
-Generate a supportive, personalized response as Pulse. Focus on the user's current state and patterns."""
+            return self.beta_service.get_context_prompt(context)
         except Exception as e:
             logger.error(f"Error building context-aware prompt: {e}")
-            return f"User Journal Entry: {context.current_entry_text if context else 'No content available'}"
+            return self._build_efficient_prompt(context.current_entry if context else None)
     
     def _build_efficient_prompt(
         self, 
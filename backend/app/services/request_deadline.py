@@ -0,0 +1,289 @@
+"""
+Request Deadlines and Hedged Completions for Interactive AI Paths
+
+An interactive endpoint sets one deadline (request_deadline); a ContextVar carries it
+through AdaptiveAIService, PulseAI and AsyncMultiPersonaService, so every completion
+on the way is bounded by the time the request has left.
+
+Completions run through completion_hedger.run(operation, call) (latency is tracked per operation):
+- When the first request is still pending after the operation's p95 latency
+  (AI_HEDGE_MIN_DELAY_MS at least), a duplicate is sent; the first reply wins and
+  the other request is cancelled
+- Hedges are paid from a budget of AI_HEDGE_MAX_RATIO per primary request: firing at
+  the p95 adds ~5% requests, and never more than the ratio
+- At the deadline the pending requests are cancelled and DeadlineExceeded is raised;
+  callers serve their smart fallback. Inside request_deadline(..., keep_late=True)
+  they keep running instead and DeadlineExceeded.late resolves to the first reply,
+  so delivering the real reply later does not pay for a second completion
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional, Set, TypeVar
+
+from app.core.config import settings
+from app.core.metrics_store import metrics_store
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Absolute deadline on the time.monotonic() clock; None means unbounded
+_deadline: ContextVar[Optional[float]] = ContextVar("ai_request_deadline", default=None)
+# Hand completions still running at the deadline to the caller (DeadlineExceeded.late) instead of cancelling them
+_keep_late: ContextVar[bool] = ContextVar("ai_keep_late_completions", default=False)
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline expired before a completion arrived"""
+    
+    def __init__(self, message: str = "", late: Optional[asyncio.Future] = None):
+        super().__init__(message)
+        self.late = late  # The still-running completion (keep_late only); whoever catches this owns it
+
+
+def deadline_after(timeout_ms: float) -> Optional[float]:
+    """Deadline timeout_ms from now (None when timeout_ms is 0, i.e. disabled)"""
+    if timeout_ms <= 0:
+        return None
+    return time.monotonic() + timeout_ms / 1000
+
+
+@contextmanager
+def request_deadline(deadline: Optional[float], keep_late: bool = False) -> Iterator[None]:
+    """
+    Bound the AI calls made in this context by deadline (an earlier outer deadline still wins)
+    
+    With keep_late, completions still running at the deadline are not cancelled but
+    handed on through DeadlineExceeded.late (for callers that deliver the reply later).
+    """
+    current = _deadline.get()
+    if current is not None and (deadline is None or current < deadline):
+        deadline = current
+    token = _deadline.set(deadline)
+    keep_late_token = _keep_late.set(keep_late or _keep_late.get())
+    try:
+        yield
+    finally:
+        _keep_late.reset(keep_late_token)
+        _deadline.reset(token)
+
+
+def remaining_seconds() -> Optional[float]:
+    """Time left before the current deadline (None without one, never negative)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def check_deadline() -> None:
+    remaining = remaining_seconds()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded("AI request deadline expired")
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Losers may fail after the winner returned; keep asyncio from logging "never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+async def _first_success(tasks: Set[asyncio.Task]) -> Any:
+    """Result of the first task to succeed (the others are cancelled); raises the last error when all fail"""
+    pending = set(tasks)
+    last_error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    last_error = asyncio.CancelledError()
+                elif task.exception() is None:
+                    return task.result()
+                else:
+                    last_error = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+    raise last_error
+
+
+class CompletionHedger:
+    """Per-operation latency windows, the hedge budget and the deadline-bounded hedged call"""
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        min_delay_ms: float = 1000.0,
+        min_samples: int = 20,
+        max_ratio: float = 0.1,
+        window: int = 200,
+        max_budget: float = 5.0,
+    ):
+        self.enabled = enabled
+        self.min_delay_ms = min_delay_ms
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.window = window
+        self.max_budget = max_budget  # Hedges that may be saved up while traffic is healthy
+        
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._budget = 0.0
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+    
+    # ----- Latency windows -----
+    
+    def observe(self, operation: str, latency_ms: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(operation, deque(maxlen=self.window)).append(latency_ms)
+    
+    def p95_ms(self, operation: str) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies.get(operation, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[math.ceil(0.95 * len(samples)) - 1]
+    
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        """Seconds to wait before hedging a request (None: do not hedge)"""
+        if not self.enabled:
+            return None
+        p95 = self.p95_ms(operation)
+        if p95 is None:
+            return None
+        return max(p95, self.min_delay_ms) / 1000
+    
+    # ----- Budget and counters -----
+    
+    def _earn_hedge(self) -> None:
+        with self._lock:
+            self._budget = min(self.max_budget, self._budget + self.max_ratio)
+    
+    def _spend_hedge(self) -> bool:
+        with self._lock:
+            if self._budget < 1.0:
+                return False
+            self._budget -= 1.0
+            return True
+    
+    def _count(self, operation: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(operation, {})
+            counts[outcome] = counts.get(outcome, 0) + 1
+        if outcome != "requests":
+            metrics_store.record("ai_hedge", 1, {"operation": operation, "outcome": outcome})
+    
+    # ----- Hedged call -----
+    
+    async def run(self, operation: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await call() within the current deadline, hedging it once after the operation's p95
+        
+        call must start a new request each time it is invoked. Returns the first
+        successful reply, raises the last error when every request failed, and raises
+        DeadlineExceeded (after cancelling the requests, or with them as .late under
+        keep_late) when the deadline expires first.
+        """
+        check_deadline()
+        self._earn_hedge()
+        self._count(operation, "requests")
+        
+        started: Dict[asyncio.Task, float] = {}
+        
+        def launch() -> asyncio.Task:
+            task = asyncio.ensure_future(call())
+            task.add_done_callback(_retrieve_exception)
+            started[task] = time.monotonic()
+            return task
+        
+        pending: Set[asyncio.Task] = {launch()}
+        hedge_delay = self.hedge_delay(operation)
+        last_error: Optional[BaseException] = None
+        scope = asyncio.timeout(remaining_seconds())
+        try:
+            async with scope:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending,
+                        timeout=hedge_delay if len(started) == 1 else None,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    if not done:
+                        # The first request is past the operation's p95
+                        hedge_delay = None
+                        if self._spend_hedge():
+                            self._count(operation, "hedged")
+                            logger.info(f"⏱️ Hedging slow {operation} completion after {(time.monotonic() - min(started.values())) * 1000:.0f}ms")
+                            pending.add(launch())
+                        else:
+                            self._count(operation, "budget_exhausted")
+                        continue
+                    
+                    for task in done:
+                        error = task.exception()
+                        if error is None:
+                            now = time.monotonic()
+                            self.observe(operation, (now - started[task]) * 1000)
+                            for loser in pending:
+                                # Cancelled while still running: a lower bound of its latency
+                                self.observe(operation, (now - started[loser]) * 1000)
+                            if len(started) > 1:
+                                self._count(operation, "hedge_won" if task is not next(iter(started)) else "primary_won")
+                            return task.result()
+                        last_error = error
+                    # A failed request is not hedged; the caller's retry loop decides
+                    hedge_delay = None
+        except TimeoutError:
+            if not scope.expired():
+                raise
+            self._count(operation, "deadline_exceeded")
+            late = None
+            if _keep_late.get() and pending:
+                # Same requests, still running: the caller delivers whichever finishes first
+                late = asyncio.ensure_future(_first_success(pending))
+                late.add_done_callback(_retrieve_exception)
+                pending = set()
+                self._count(operation, "kept_late")
+            raise DeadlineExceeded(f"{operation} completion did not finish before the request deadline", late=late) from None
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Hedge configuration, budget, p95 per operation and outcome counts"""
+        operations = {}
+        for operation in list(self._latencies.keys() | self._counts.keys()):
+            p95 = self.p95_ms(operation)
+            with self._lock:
+                counts = dict(self._counts.get(operation, {}))
+                samples = len(self._latencies.get(operation, ()))
+            operations[operation] = {
+                "p95_ms": round(p95, 1) if p95 is not None else None,
+                "samples": samples,
+                "hedge_delay_ms": round(max(p95, self.min_delay_ms), 1) if p95 is not None and self.enabled else None,
+                **counts,
+            }
+        return {
+            "enabled": self.enabled,
+            "max_ratio": self.max_ratio,
+            "budget": round(self._budget, 2),
+            "operations": operations,
+        }
+
+
+# Global hedger instance
+completion_hedger = CompletionHedger(
+    enabled=settings.AI_HEDGE_ENABLED,
+    min_delay_ms=settings.AI_HEDGE_MIN_DELAY_MS,
+    min_samples=settings.AI_HEDGE_MIN_SAMPLES,
+    max_ratio=settings.AI_HEDGE_MAX_RATIO,
+)
@@ -0,0 +1,496 @@
+"""
+Persistent AI Response Cache for PulseCheck
+In-memory LRU (L1) in front of a SQLite file shared by all workers on the host
+
+Features:
+- get() checks L1, then SQLite (a primary-key read), and promotes disk hits into L1
+- put() and usage updates only touch L1; a background task writes them behind in batches
+- Every entry carries its own expires_at; expired rows are purged on the maintenance loop
+- Both tiers are bounded: L1 evicts least recently used entries, the disk tier trims
+  rows by last use once it grows past RESPONSE_CACHE_DISK_MAX_ENTRIES
+- Rows written by other workers are pulled into L1 on the next maintenance pass, and
+  clear() bumps a shared generation so every worker drops its L1
+- Without a usable database file the cache keeps working as L1 only
+
+Entries never store journal text: near-duplicate lookups persist only shingle hashes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.json_response import dumps
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS response_cache (
+    key TEXT PRIMARY KEY,
+    response BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    usage_count INTEGER NOT NULL,
+    model_used TEXT NOT NULL,
+    complexity TEXT NOT NULL,
+    tokens_used INTEGER NOT NULL,
+    similarity_partition TEXT,
+    shingles BLOB,
+    writer TEXT NOT NULL,
+    written_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS response_cache_expires_at ON response_cache (expires_at);
+CREATE INDEX IF NOT EXISTS response_cache_written_at ON response_cache (written_at);
+CREATE TABLE IF NOT EXISTS cache_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "key, response, created_at, expires_at, last_used_at, usage_count, model_used, "
+    "complexity, tokens_used, similarity_partition, shingles"
+)
+
+
+@dataclass
+class CacheEntry:
+    """Cache entry for AI responses"""
+    response: Dict[str, Any]
+    created_at: datetime
+    usage_count: int = 0
+    model_used: str = ""
+    complexity: str = ""
+    tokens_used: int = 0
+    expires_at: Optional[datetime] = None
+    similarity_partition: Optional[str] = None  # Set when the entry is reusable for near-duplicates
+    shingles: Optional[FrozenSet[int]] = None
+    last_used_at: float = 0.0
+    
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return self.expires_at is not None and (now or datetime.now(timezone.utc)) >= self.expires_at
+
+
+def _to_row(key: str, entry: CacheEntry, writer: str, written_at: float) -> Tuple:
+    expires_at = entry.expires_at.timestamp() if entry.expires_at else float("inf")
+    shingles = array("Q", sorted(entry.shingles)).tobytes() if entry.shingles else None
+    return (
+        key, dumps(entry.response), entry.created_at.timestamp(), expires_at, entry.last_used_at or written_at,
+        entry.usage_count, entry.model_used, entry.complexity, entry.tokens_used,
+        entry.similarity_partition, shingles, writer, written_at,
+    )
+
+
+def _from_row(row: Tuple) -> Tuple[str, CacheEntry]:
+    key, response, created_at, expires_at, last_used_at, usage_count, model_used, complexity, tokens_used, partition, shingles = row
+    return key, CacheEntry(
+        response=json.loads(response),
+        created_at=datetime.fromtimestamp(created_at, timezone.utc),
+        usage_count=usage_count,
+        model_used=model_used,
+        complexity=complexity,
+        tokens_used=tokens_used,
+        expires_at=datetime.fromtimestamp(expires_at, timezone.utc) if expires_at != float("inf") else None,
+        similarity_partition=partition,
+        shingles=frozenset(array("Q", shingles)) if shingles else None,
+        last_used_at=last_used_at,
+    )
+
+
+class ResponseCacheStore:
+    """
+    Two-tier response cache: bounded LRU in memory, SQLite on disk
+    
+    on_load / on_evict are called as entries enter and leave L1, so in-memory
+    structures built on the cache (the near-duplicate index) can mirror it; one
+    listener per store, registered with attach().
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        l1_max_entries: int = 1000,
+        disk_max_entries: int = 50000,
+        flush_interval_seconds: float = 2.0,
+    ):
+        self.path = path
+        self.l1_max_entries = l1_max_entries
+        self.disk_max_entries = disk_max_entries
+        self.flush_interval_seconds = flush_interval_seconds
+        self.on_load: Optional[Callable[[str, CacheEntry], None]] = None
+        self.on_evict: Optional[Callable[[str], None]] = None
+        
+        self._l1: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._pending: Dict[str, Optional[CacheEntry]] = {}  # None marks a delete
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._writer = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._generation = 0
+        self._synced_until = time.time()
+        self.disabled = False
+        
+        # Bookkeeping for status
+        self.l1_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.l1_evictions = 0
+        self.rows_flushed = 0
+        self.last_flush_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+    
+    def attach(self, on_load: Callable[[str, CacheEntry], None], on_evict: Callable[[str], None]) -> None:
+        """Register the L1 listener; a second one would silently stop the first from mirroring the cache"""
+        if self.on_load is not None or self.on_evict is not None:
+            raise RuntimeError(f"Response cache {self.path} already has an L1 listener")
+        self.on_load = on_load
+        self.on_evict = on_evict
+    
+    # ----- Request path -----
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Live entry for key from L1 or disk (expired entries are dropped)
+        
+        Blocking: an L1 miss reads SQLite, so async callers run it in a worker thread.
+        """
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is not None:
+                if entry.is_expired():
+                    self._drop_locked(key)
+                    self.misses += 1
+                    return None
+                self._l1.move_to_end(key)
+                self.l1_hits += 1
+                return entry
+            if key in self._pending:
+                # Deleted here but not yet flushed
+                self.misses += 1
+                return None
+        
+        entry = self._read(key)
+        if entry is None or entry.is_expired():
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._insert_locked(key, entry)
+        return entry
+    
+    def put(self, key: str, entry: CacheEntry) -> None:
+        entry.last_used_at = time.time()
+        with self._lock:
+            self._insert_locked(key, entry)
+            if self._conn is not None:
+                self._pending[key] = entry
+    
+    def touch(self, key: str, entry: CacheEntry) -> None:
+        """Persist an entry's usage_count / last use on the next flush"""
+        entry.last_used_at = time.time()
+        with self._lock:
+            if self._conn is not None and self._pending.get(key, entry) is not None:
+                self._pending[key] = entry
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._drop_locked(key)
+            if self._conn is not None:
+                self._pending[key] = None
+    
+    def clear(self) -> int:
+        """Remove every entry from both tiers for all workers; returns entries removed"""
+        removed = 0
+        with self._lock:
+            removed = len(self._l1)
+            for key in list(self._l1):
+                self._drop_locked(key)
+            self._pending.clear()
+        if self._conn is None:
+            return removed
+        with self._db_lock:
+            with self._conn:
+                removed = max(removed, self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0])
+                self._conn.execute("DELETE FROM response_cache")
+                self._conn.execute(
+                    "INSERT INTO cache_meta (key, value) VALUES ('generation', 1) "
+                    "ON CONFLICT (key) DO UPDATE SET value = value + 1"
+                )
+                self._generation = self._conn.execute("SELECT value FROM cache_meta WHERE key = 'generation'").fetchone()[0]
+        return removed
+    
+    def l1_entries(self) -> List[Tuple[str, CacheEntry]]:
+        with self._lock:
+            return list(self._l1.items())
+    
+    def _insert_locked(self, key: str, entry: CacheEntry) -> None:
+        previous = self._l1.get(key)
+        self._l1[key] = entry
+        self._l1.move_to_end(key)
+        if previous is not entry and self.on_load:
+            self.on_load(key, entry)
+        while len(self._l1) > self.l1_max_entries:
+            evicted, _ = self._l1.popitem(last=False)
+            self.l1_evictions += 1
+            if self.on_evict:
+                self.on_evict(evicted)
+    
+    def _drop_locked(self, key: str) -> None:
+        if self._l1.pop(key, None) is not None and self.on_evict:
+            self.on_evict(key)
+    
+    # ----- Storage -----
+    
+    def _open(self) -> bool:
+        if self.disabled:
+            return False
+        with self._db_lock:
+            if self._conn is not None:
+                return True
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(_SCHEMA)
+                row = conn.execute("SELECT value FROM cache_meta WHERE key = 'generation'").fetchone()
+                self._generation = row[0] if row else 0
+                self._conn = conn
+                return True
+            except Exception as e:
+                self.disabled = True
+                self.last_error = str(e)
+                logger.warning(f"⚠️ Response cache disk tier disabled, cannot open {self.path}: {e}")
+                return False
+    
+    def _read(self, key: str) -> Optional[CacheEntry]:
+        if self._conn is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._conn.execute(f"SELECT {_COLUMNS} FROM response_cache WHERE key = ?", (key,)).fetchone()
+        except Exception as e:
+            self.last_error = str(e)
+            return None
+        return _from_row(row)[1] if row else None
+    
+    def flush(self) -> int:
+        """Write pending inserts, usage updates and deletes to SQLite; returns rows written"""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        
+        now = time.time()
+        upserts = [_to_row(key, entry, self._writer, now) for key, entry in pending.items() if entry is not None]
+        deletes = [(key,) for key, entry in pending.items() if entry is None]
+        try:
+            with self._db_lock:
+                with self._conn:
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO response_cache ({_COLUMNS}, writer, written_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        upserts,
+                    )
+                    self._conn.executemany("DELETE FROM response_cache WHERE key = ?", deletes)
+        except Exception as e:
+            # Keep the writes for the next flush unless newer ones replaced them
+            with self._lock:
+                for key, entry in pending.items():
+                    self._pending.setdefault(key, entry)
+            self.last_error = str(e)
+            raise
+        
+        self.rows_flushed += len(upserts) + len(deletes)
+        self.last_flush_at = now
+        return len(upserts) + len(deletes)
+    
+    def sync(self) -> int:
+        """Apply other workers' clears and pull their new rows into L1; returns rows pulled"""
+        if self._conn is None:
+            return 0
+        now = time.time()
+        with self._db_lock:
+            row = self._conn.execute("SELECT value FROM cache_meta WHERE key = 'generation'").fetchone()
+            generation = row[0] if row else 0
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM response_cache "
+                "WHERE written_at >= ? AND writer != ? AND expires_at > ? ORDER BY written_at DESC LIMIT ?",
+                (self._synced_until, self._writer, now, self.l1_max_entries),
+            ).fetchall()
+        
+        with self._lock:
+            if generation != self._generation:
+                self._generation = generation
+                for key in list(self._l1):
+                    self._drop_locked(key)
+            for row in reversed(rows):
+                key, entry = _from_row(row)
+                if key not in self._pending:
+                    self._insert_locked(key, entry)
+        self._synced_until = now
+        return len(rows)
+    
+    def purge(self) -> int:
+        """Delete expired rows and trim the disk tier by last use; returns rows deleted"""
+        if self._conn is None:
+            return 0
+        with self._db_lock:
+            with self._conn:
+                deleted = self._conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+                total = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+                if total > self.disk_max_entries:
+                    # Trim to 90% so the next few inserts do not trim again
+                    excess = total - int(self.disk_max_entries * 0.9)
+                    deleted += self._conn.execute(
+                        "DELETE FROM response_cache WHERE key IN "
+                        "(SELECT key FROM response_cache ORDER BY last_used_at LIMIT ?)",
+                        (excess,),
+                    ).rowcount
+        return deleted
+    
+    def warm(self) -> int:
+        """Load the most recently used live rows into L1 (after a restart); returns rows loaded"""
+        if self._conn is None:
+            return 0
+        with self._db_lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM response_cache WHERE expires_at > ? ORDER BY last_used_at DESC LIMIT ?",
+                (time.time(), self.l1_max_entries),
+            ).fetchall()
+        with self._lock:
+            for row in reversed(rows):
+                key, entry = _from_row(row)
+                self._insert_locked(key, entry)
+        return len(rows)
+    
+    # ----- Background maintenance -----
+    
+    async def start(self):
+        """Open the database, warm L1 and start the write-behind loop"""
+        if self._task:
+            return
+        if await asyncio.to_thread(self._open):
+            loaded = await asyncio.to_thread(self.warm)
+            logger.info(f"✅ Response cache started ({self.path}, {loaded} entries warmed)")
+        self._task = asyncio.create_task(self._maintenance_loop())
+    
+    async def stop(self):
+        """Stop the loop and write whatever is still pending"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            logger.warning(f"⚠️ Final response cache flush failed: {e}")
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    async def _maintenance_loop(self):
+        passes = 0
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await asyncio.to_thread(self.flush)
+                await asyncio.to_thread(self.sync)
+                passes += 1
+                if passes % 30 == 0:
+                    await asyncio.to_thread(self.purge)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"⚠️ Response cache maintenance failed: {e}")
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Combined view of both tiers (flushes first so disk counts include this worker's writes)"""
+        try:
+            self.flush()
+        except Exception:
+            pass
+        
+        with self._lock:
+            l1_entries = list(self._l1.values())
+            pending = len(self._pending)
+        lookups = self.l1_hits + self.disk_hits + self.misses
+        status: Dict[str, Any] = {
+            "l1": {
+                "entries": len(l1_entries),
+                "max_entries": self.l1_max_entries,
+                "hits": self.l1_hits,
+                "evictions": self.l1_evictions,
+            },
+            "disk": {
+                "enabled": self._conn is not None,
+                "path": self.path,
+                "max_entries": self.disk_max_entries,
+                "hits": self.disk_hits,
+                "rows_flushed": self.rows_flushed,
+                "pending_writes": pending,
+                "last_flush_at": datetime.fromtimestamp(self.last_flush_at, timezone.utc).isoformat() if self.last_flush_at else None,
+                "last_error": self.last_error,
+            },
+            "misses": self.misses,
+            "hit_rate": round((self.l1_hits + self.disk_hits) / lookups * 100, 2) if lookups else 0.0,
+        }
+        
+        if self._conn is not None:
+            with self._db_lock:
+                count, avg_usage, oldest, newest = self._conn.execute(
+                    "SELECT COUNT(*), AVG(usage_count), MIN(created_at), MAX(created_at) "
+                    "FROM response_cache WHERE expires_at > ?",
+                    (time.time(),),
+                ).fetchone()
+                by_model = dict(self._conn.execute(
+                    "SELECT model_used, COUNT(*) FROM response_cache WHERE expires_at > ? GROUP BY model_used", (time.time(),)
+                ).fetchall())
+                by_complexity = dict(self._conn.execute(
+                    "SELECT complexity, COUNT(*) FROM response_cache WHERE expires_at > ? GROUP BY complexity", (time.time(),)
+                ).fetchall())
+        else:
+            live = [entry for entry in l1_entries if not entry.is_expired()]
+            count = len(live)
+            avg_usage = sum(entry.usage_count for entry in live) / count if count else 0
+            oldest = min((entry.created_at.timestamp() for entry in live), default=None)
+            newest = max((entry.created_at.timestamp() for entry in live), default=None)
+            by_model, by_complexity = {}, {}
+            for entry in live:
+                by_model[entry.model_used] = by_model.get(entry.model_used, 0) + 1
+                by_complexity[entry.complexity] = by_complexity.get(entry.complexity, 0) + 1
+        
+        status.update({
+            "total_entries": count,
+            "average_usage_per_entry": round(avg_usage or 0, 2),
+            "by_model": by_model,
+            "by_complexity": by_complexity,
+            "oldest_entry": datetime.fromtimestamp(oldest, timezone.utc).isoformat() if oldest else None,
+            "newest_entry": datetime.fromtimestamp(newest, timezone.utc).isoformat() if newest else None,
+        })
+        return status
+
+
+# Global response cache instance
+response_cache_store = ResponseCacheStore(
+    path=settings.RESPONSE_CACHE_DB_PATH,
+    l1_max_entries=settings.RESPONSE_CACHE_L1_MAX_ENTRIES,
+    disk_max_entries=settings.RESPONSE_CACHE_DISK_MAX_ENTRIES,
+    flush_interval_seconds=settings.RESPONSE_CACHE_FLUSH_INTERVAL_SECONDS,
+)
+response_cache_store.disabled = not settings.RESPONSE_CACHE_PERSIST_ENABLED
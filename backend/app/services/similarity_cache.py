@@ -0,0 +1,166 @@
+"""
+Near-Duplicate Lookup for the AI Response Cache
+MinHash signatures over normalized journal text, indexed with LSH banding
+
+Two entries match when the Jaccard similarity of their word shingles reaches
+SIMILARITY_CACHE_THRESHOLD. Lookups never scan the whole cache:
+- Each text gets a MinHash signature (NUM_PERMUTATIONS minimums of salted shingle hashes)
+- The signature is cut into bands; entries sharing any band are candidates
+  (16 bands x 4 rows: pairs at Jaccard 0.7 share a band with probability ~0.99)
+- Candidates are verified with the exact Jaccard of their shingle sets
+
+Entries are partitioned by persona and mood band (and by user unless
+SIMILARITY_CACHE_SCOPE=global), so a reply is only reused in the same context.
+Fully local: hashing only, no embedding API.
+"""
+
+import hashlib
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 2
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+
+# Fixed salts so signatures are stable across processes and deploys
+_PERMUTATIONS: List[Tuple[int, int]] = [
+    (
+        int.from_bytes(hashlib.blake2b(b"a%d" % i, digest_size=8).digest(), "big") % (_MERSENNE_PRIME - 1) + 1,
+        int.from_bytes(hashlib.blake2b(b"b%d" % i, digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERMUTATIONS)
+]
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Entries that must always get a fresh, individual reply
+SAFETY_EXCLUSION_PATTERNS = re.compile(
+    r"\b(suicid\w*|kill (myself|me)|end (it all|my life)|self[- ]?harm|hurt(ing)? myself|"
+    r"cutting|overdose|want to die|don'?t want to (live|be here)|abuse[ds]?|assault\w*|emergency)\b"
+)
+
+
+def normalize_text(text: str) -> List[str]:
+    """Lowercased word tokens without punctuation"""
+    return _WORD.findall(text.lower())
+
+
+def shingle_hashes(tokens: List[str]) -> FrozenSet[int]:
+    """64-bit hashes of the word shingles (single words when the text is shorter)"""
+    if len(tokens) < SHINGLE_SIZE:
+        grams = tokens
+    else:
+        grams = [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+    return frozenset(int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "big") for gram in grams)
+
+
+def minhash_signature(shingles: FrozenSet[int]) -> Tuple[int, ...]:
+    if not shingles:
+        return tuple([_MAX_HASH] * NUM_PERMUTATIONS)
+    return tuple(min((a * x + b) % _MERSENNE_PRIME for x in shingles) for a, b in _PERMUTATIONS)
+
+
+def jaccard(left: FrozenSet[int], right: FrozenSet[int]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def mood_band(mood_level: Optional[int]) -> str:
+    if mood_level is None:
+        return "unknown"
+    if mood_level <= 3:
+        return "low"
+    if mood_level <= 6:
+        return "mid"
+    return "high"
+
+
+class NearDuplicateIndex:
+    """
+    LSH index from cache keys to MinHash signatures, partitioned by context
+    
+    Thread-safe; holds shingle sets for exact verification, so size it with the cache
+    it indexes (remove() keys that the cache evicts).
+    """
+    
+    def __init__(self, threshold: float = 0.7, min_chars: int = 40):
+        self.threshold = threshold
+        self.min_chars = min_chars
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[str]] = defaultdict(set)
+        self._entries: Dict[str, Tuple[str, Tuple[int, ...], FrozenSet[int]]] = {}
+    
+    def exclusion_reason(self, content: str, mood_level: Optional[int]) -> Optional[str]:
+        """Why an entry must not be served from (or stored in) the similarity cache"""
+        if len(content.strip()) < self.min_chars:
+            return "too_short"
+        if mood_level is not None and mood_level <= 2:
+            return "low_mood"
+        if SAFETY_EXCLUSION_PATTERNS.search(content.lower()):
+            return "safety"
+        return None
+    
+    def add(self, key: str, partition: str, content: str) -> FrozenSet[int]:
+        """Index content under key; returns its shingle hashes (for add_shingles after a reload)"""
+        shingles = shingle_hashes(normalize_text(content))
+        self.add_shingles(key, partition, shingles)
+        return shingles
+    
+    def add_shingles(self, key: str, partition: str, shingles: FrozenSet[int]) -> None:
+        signature = minhash_signature(shingles)
+        with self._lock:
+            self._remove_locked(key)
+            self._entries[key] = (partition, signature, shingles)
+            for band, rows in self._bands(signature):
+                self._buckets[(partition, band, rows)].add(key)
+    
+    def find(self, partition: str, content: str) -> Optional[Tuple[str, float]]:
+        """(cache key, Jaccard similarity) of the closest entry at or above the threshold"""
+        shingles = shingle_hashes(normalize_text(content))
+        signature = minhash_signature(shingles)
+        with self._lock:
+            candidates: Set[str] = set()
+            for band, rows in self._bands(signature):
+                candidates |= self._buckets.get((partition, band, rows), set())
+            best: Optional[Tuple[str, float]] = None
+            for key in candidates:
+                similarity = jaccard(shingles, self._entries[key][2])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (key, similarity)
+        return best
+    
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._remove_locked(key)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _remove_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        partition, signature, _ = entry
+        for band, rows in self._bands(signature):
+            bucket = self._buckets.get((partition, band, rows))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[(partition, band, rows)]
+    
+    @staticmethod
+    def _bands(signature: Tuple[int, ...]):
+        for band in range(BANDS):
+            yield band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
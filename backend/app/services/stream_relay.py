@@ -0,0 +1,163 @@
+"""
+Resumable AI Response Streams for PulseCheck
+Short-lived server-side event buffer behind the SSE endpoint
+
+The relay runs each stream's generator in a background task, so generation does not
+depend on any one HTTP connection, and numbers its events from 1. Events are kept
+until STREAM_RESUME_TTL_SECONDS after the stream finishes:
+- A client reconnecting with Last-Event-ID gets the events it missed, then the live ones
+- A second request for a stream that is still running attaches to it instead of
+  starting another OpenAI call
+- A stream nobody has listened to for STREAM_RESUME_GRACE_SECONDS is cancelled
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.json_response import dumps
+
+logger = logging.getLogger(__name__)
+
+SSE_HEARTBEAT = b": heartbeat\n\n"
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """One buffered event: its id and JSON payload"""
+    id: int
+    data: bytes
+    
+    def encode(self) -> bytes:
+        return b"id: %d\ndata: %s\n\n" % (self.id, self.data)
+
+
+def sse_message(payload: Dict[str, Any]) -> bytes:
+    """An event without an id (not part of the resumable sequence)"""
+    return b"data: %s\n\n" % dumps(payload)
+
+
+def sse_retry(milliseconds: int) -> bytes:
+    return b"retry: %d\n\n" % milliseconds
+
+
+class RelayedStream:
+    """Events of one stream plus the bookkeeping that decides when it can go"""
+    
+    def __init__(self, key: str, max_events: int):
+        self.key = key
+        self.max_events = max_events
+        self.events: List[StreamEvent] = []
+        self.first_id = 1  # id of events[0]; older events were dropped at max_events
+        self.last_id = 0
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self.subscribers = 0
+        self.last_detached = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+    
+    def publish(self, payload: Dict[str, Any]) -> None:
+        self.last_id += 1
+        self.events.append(StreamEvent(self.last_id, dumps(payload)))
+        if len(self.events) > self.max_events:
+            del self.events[0]
+            self.first_id += 1
+        self._notify()
+    
+    def finish(self) -> None:
+        self.done = True
+        self.finished_at = time.monotonic()
+        self._notify()
+    
+    def _notify(self) -> None:
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+    
+    async def follow(self, last_event_id: int, heartbeat_seconds: float) -> AsyncGenerator[Optional[StreamEvent], None]:
+        """
+        Events after last_event_id, then live events until the stream ends
+        
+        Yields None when heartbeat_seconds pass without an event.
+        """
+        self.subscribers += 1
+        try:
+            next_id = max(last_event_id + 1, self.first_id)
+            while True:
+                wakeup = self._wakeup
+                while next_id <= self.last_id:
+                    if next_id < self.first_id:
+                        next_id = self.first_id
+                    event = self.events[next_id - self.first_id]
+                    next_id += 1
+                    yield event
+                if self.done:
+                    return
+                try:
+                    async with asyncio.timeout(heartbeat_seconds):
+                        await wakeup.wait()
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.subscribers -= 1
+            self.last_detached = time.monotonic()
+
+
+class StreamRelay:
+    """Process-wide registry of resumable streams, keyed by caller-chosen stream keys"""
+    
+    def __init__(self):
+        self._streams: Dict[str, RelayedStream] = {}
+    
+    def find(self, key: str, resume: bool = False) -> Optional[RelayedStream]:
+        """The running stream for key, or its finished one when resuming (None: start a new one)"""
+        self._expire()
+        stream = self._streams.get(key)
+        if stream is not None and (resume or not stream.done):
+            return stream
+        return None
+    
+    def start(self, key: str, chunks: AsyncGenerator[Any, None]) -> RelayedStream:
+        """Relay chunks (objects with to_dict()) under key, replacing any finished stream"""
+        stream = RelayedStream(key, settings.STREAM_RESUME_MAX_EVENTS)
+        stream.task = asyncio.create_task(self._run(stream, chunks))
+        self._streams[key] = stream
+        return stream
+    
+    async def _run(self, stream: RelayedStream, chunks: AsyncGenerator[Any, None]) -> None:
+        try:
+            async for chunk in chunks:
+                stream.publish(chunk.to_dict())
+                if stream.subscribers == 0 and time.monotonic() - stream.last_detached > settings.STREAM_RESUME_GRACE_SECONDS:
+                    logger.info(f"🔌 No listeners for stream {stream.key}, cancelling")
+                    stream.publish({"type": "cancelled", "content": "", "is_final": True, "metadata": {"message": "No listeners"}})
+                    break
+        except Exception as e:
+            logger.error(f"❌ Relayed stream {stream.key} failed: {e}")
+            stream.publish({"type": "error", "content": "", "is_final": True, "metadata": {"error": str(e)}})
+        finally:
+            await chunks.aclose()
+            stream.finish()
+    
+    def _expire(self) -> None:
+        now = time.monotonic()
+        expired = [
+            key for key, stream in self._streams.items()
+            if stream.done and now - stream.finished_at > settings.STREAM_RESUME_TTL_SECONDS
+        ]
+        for key in expired:
+            del self._streams[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "streams": len(self._streams),
+            "running": sum(1 for stream in self._streams.values() if not stream.done),
+            "subscribers": sum(stream.subscribers for stream in self._streams.values()),
+        }
+
+
+# Global relay instance
+stream_relay = StreamRelay()
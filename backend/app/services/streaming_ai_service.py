@@ -24,9 +24,52 @@ from app.core.config import settings
 from app.models.journal import JournalEntryResponse
 from app.models.ai_insights import EmotionalTone, ResponseType
 from app.core.database import Database
+from app.core.metrics_store import metrics_store
+from app.services.prompt_templates import get_prompt, register_prompt
 
 logger = logging.getLogger(__name__)
 
+# Optimized system prompts for streaming responses
+STREAMING_PERSONA_PROMPTS = {
+    "pulse": """You are Pulse, an emotionally intelligent wellness companion. Your responses should be:
+- Warm, empathetic, and supportive
+- Focused on emotional validation and understanding
+- Encouraging without being dismissive
+- Genuinely caring and present
+
+Respond naturally as if having a real conversation. Keep your response focused and authentic.""",
+    
+    "sage": """You are Sage, a wise strategic guide focused on growth and patterns. Your responses should be:
+- Thoughtful and insightful
+- Focused on bigger picture and growth opportunities
+- Connecting current experiences to life themes
+- Offering perspective and wisdom
+
+Respond with depth and contemplation, as if sharing hard-earned wisdom.""",
+    
+    "spark": """You are Spark, an energetic motivational companion. Your responses should be:
+- Enthusiastic and motivating
+- Action-oriented and creative
+- Focused on possibilities and potential
+- Encouraging bold steps and new perspectives
+
+Respond with energy and optimism, inspiring forward movement.""",
+    
+    "anchor": """You are Anchor, a grounding practical guide. Your responses should be:
+- Calm, stable, and reassuring
+- Practical and solution-oriented
+- Focused on present moment grounding
+- Offering concrete steps and stability
+
+Respond with steady presence and practical wisdom."""
+}
+
+def _register_streaming_prompts() -> None:
+    for persona, prompt in STREAMING_PERSONA_PROMPTS.items():
+        register_prompt(f"streaming:{persona}", prompt)
+
+_register_streaming_prompts()
+
 class StreamingChunk:
     """Individual chunk of streamed AI response"""
     def __init__(
@@ -43,12 +86,26 @@ class StreamingChunk:
         self.metadata = metadata or {}
         self.chunk_type = chunk_type  # "typing", "content", "complete", "error"
         self.timestamp = datetime.utcnow().isoformat()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Wire format shared by the WebSocket and SSE endpoints"""
+        return {
+            "type": self.chunk_type,
+            "content": self.delta_content,
+            "persona": self.persona,
+            "timestamp": self.timestamp,
+            "is_final": self.is_complete,
+            "metadata": self.metadata
+        }
 
 class StreamingAIService:
     """
     Advanced AI service that provides real-time streaming responses
     """
     
+    # Seconds between deltas per persona typing speed (server-side pacing / client pacing profile)
+    TYPING_BASE_DELAYS = {"fast": 0.03, "moderate": 0.06, "slow": 0.08, "steady": 0.05}
+    
     def __init__(self, db: Database):
         self.db = db
         self.client = None
@@ -103,11 +160,15 @@ class StreamingAIService:
         self,
         journal_entry: JournalEntryResponse,
         persona: str,
-        callback: Callable[[StreamingChunk], None],
-        stream_id: Optional[str] = None
+        callback: Optional[Callable[[StreamingChunk], None]] = None,
+        stream_id: Optional[str] = None,
+        paced: bool = True
     ) -> AsyncGenerator[StreamingChunk, None]:
         """
         Stream AI response in real-time with typing indicators
+        
+        paced=True adds the server-side typing feel (a pause after the typing indicator
+        and a persona delay after every delta); paced=False forwards deltas as they arrive.
         """
         if not self.client:
             error_chunk = StreamingChunk(
@@ -123,6 +184,7 @@ class StreamingAIService:
         
         # Mark stream as active
         self.active_streams[stream_id] = True
+        stream = None
         
         try:
             # Send initial typing indicator
@@ -134,7 +196,8 @@ class StreamingAIService:
             yield typing_chunk
             
             # Brief delay to show typing indicator
-            await asyncio.sleep(0.5)
+            if paced:
+                await asyncio.sleep(0.5)
             
             # Check if stream was cancelled
             if not self.active_streams.get(stream_id, False):
@@ -194,7 +257,8 @@ class StreamingAIService:
                     yield content_chunk
                     
                     # Persona-specific delays for natural typing feel
-                    await self._apply_persona_typing_delay(delta_content, persona_config)
+                    if paced:
+                        await self._apply_persona_typing_delay(delta_content, persona_config)
             
             # Send completion indicator
             complete_chunk = StreamingChunk(
@@ -230,8 +294,122 @@ class StreamingAIService:
             yield error_chunk
             
         finally:
-            # Clean up stream tracking
+            # Clean up stream tracking; closing the HTTP response stops an abandoned generation
             self.active_streams.pop(stream_id, None)
+            if stream is not None:
+                await self._close_upstream(stream)
+    
+    async def stream_frames(
+        self,
+        journal_entry: JournalEntryResponse,
+        persona: str,
+        stream_id: Optional[str] = None,
+        max_chars: Optional[int] = None,
+        max_delay_ms: Optional[float] = None
+    ) -> AsyncGenerator[StreamingChunk, None]:
+        """
+        Pass-through stream: deltas are forwarded as they arrive, coalesced into frames
+        
+        A content frame is sent once it holds max_chars characters or its first delta is
+        max_delay_ms old; other chunks (typing, complete, error) flush pending content and
+        pass through. The OpenAI stream is read by a task into a bounded queue: while the
+        consumer is busy sending, deltas pile up there and go out as one larger frame, and
+        once STREAM_BUFFER_CHUNKS are waiting the read pauses. Closing this generator
+        cancels the read and the upstream request.
+        """
+        max_chars = max_chars or settings.STREAM_FRAME_MAX_CHARS
+        max_delay = (settings.STREAM_FRAME_MAX_DELAY_MS if max_delay_ms is None else max_delay_ms) / 1000
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.STREAM_BUFFER_CHUNKS))
+        
+        async def read_upstream():
+            chunks = self.stream_ai_response(journal_entry, persona, stream_id=stream_id, paced=False)
+            try:
+                async for chunk in chunks:
+                    await queue.put(chunk)
+            except Exception as e:
+                await queue.put(StreamingChunk(persona=persona, chunk_type="error", metadata={"error": str(e)}))
+            finally:
+                await chunks.aclose()
+            await queue.put(None)
+        
+        reader = asyncio.create_task(read_upstream())
+        started = time.monotonic()
+        pending: List[str] = []
+        pending_chars = 0
+        pending_since = 0.0
+        accumulated_length = 0
+        frames = 0
+        
+        def content_frame() -> StreamingChunk:
+            nonlocal accumulated_length, frames, pending_chars
+            content = "".join(pending)
+            accumulated_length += len(content)
+            frames += 1
+            pending_chars = 0
+            if frames == 1 and not metrics_store.disabled:
+                metrics_store.record("ai_stream_first_frame_ms", (time.monotonic() - started) * 1000, {"persona": persona})
+            pending.clear()
+            return StreamingChunk(
+                persona=persona,
+                delta_content=content,
+                metadata={"accumulated_length": accumulated_length}
+            )
+        
+        try:
+            while True:
+                if pending:
+                    # asyncio.timeout rather than wait_for: wait_for can swallow a cancel (disconnect)
+                    try:
+                        async with asyncio.timeout(pending_since + max_delay - time.monotonic()):
+                            chunk = await queue.get()
+                    except asyncio.TimeoutError:
+                        yield content_frame()
+                        continue
+                else:
+                    chunk = await queue.get()
+                
+                if chunk is None:
+                    break
+                if chunk.chunk_type == "content":
+                    if not pending:
+                        pending_since = time.monotonic()
+                    pending.append(chunk.delta_content)
+                    pending_chars += len(chunk.delta_content)
+                    if pending_chars >= max_chars:
+                        yield content_frame()
+                    continue
+                
+                if pending:
+                    yield content_frame()
+                yield chunk
+            
+            if pending:
+                yield content_frame()
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+            if frames and not metrics_store.disabled:
+                metrics_store.record("ai_stream_frames", frames, {"persona": persona})
+    
+    def get_pacing_profile(self, persona: str) -> Dict[str, Any]:
+        """Typing-feel parameters for clients that animate pass-through frames themselves"""
+        persona_config = self.persona_configs.get(persona, self.persona_configs["pulse"])
+        return {
+            "typing_speed": persona_config["typing_speed"],
+            "delay_ms": int(self.TYPING_BASE_DELAYS[persona_config["typing_speed"]] * 1000),
+            "pause_words": persona_config["pause_words"],
+            "pause_multiplier": 1.5
+        }
+    
+    async def _close_upstream(self, stream) -> None:
+        """Close the OpenAI HTTP stream so a cancelled response stops generating"""
+        response = getattr(stream, "response", None)
+        if response is None:
+            return
+        try:
+            await response.aclose()
+        except Exception as e:
+            logger.debug(f"Closing upstream stream failed: {e}")
     
     async def stream_multi_persona_responses(
         self,
@@ -383,14 +561,7 @@ class StreamingAIService:
         pause_words = persona_config["pause_words"]
         
         # Base delay based on typing speed
-        if typing_speed == "fast":
-            base_delay = 0.03
-        elif typing_speed == "slow":
-            base_delay = 0.08
-        elif typing_speed == "steady":
-            base_delay = 0.05
-        else:  # moderate
-            base_delay = 0.06
+        base_delay = self.TYPING_BASE_DELAYS.get(typing_speed, self.TYPING_BASE_DELAYS["moderate"])
         
         # Add extra pause for thoughtful words
         if any(word in content.lower() for word in pause_words):
@@ -403,42 +574,8 @@ class StreamingAIService:
         await asyncio.sleep(actual_delay)
     
     def _build_streaming_system_prompt(self, persona: str) -> str:
-        """Build optimized system prompt for streaming responses"""
-        persona_prompts = {
-            "pulse": """You are Pulse, an emotionally intelligent wellness companion. Your responses should be:
-- Warm, empathetic, and supportive
-- Focused on emotional validation and understanding
-- Encouraging without being dismissive
-- Genuinely caring and present
-
-Respond naturally as if having a real conversation. Keep your response focused and authentic.""",
-            
-            "sage": """You are Sage, a wise strategic guide focused on growth and patterns. Your responses should be:
-- Thoughtful and insightful
-- Focused on bigger picture and growth opportunities
-- Connecting current experiences to life themes
-- Offering perspective and wisdom
-
-Respond with depth and contemplation, as if sharing hard-earned wisdom.""",
-            
-            "spark": """You are Spark, an energetic motivational companion. Your responses should be:
-- Enthusiastic and motivating
-- Action-oriented and creative
-- Focused on possibilities and potential
-- Encouraging bold steps and new perspectives
-
-Respond with energy and optimism, inspiring forward movement.""",
-            
-            "anchor": """You are Anchor, a grounding practical guide. Your responses should be:
-- Calm, stable, and reassuring
-- Practical and solution-oriented
-- Focused on present moment grounding
-- Offering concrete steps and stability
-
-Respond with steady presence and practical wisdom."""
-        }
-        
-        return persona_prompts.get(persona, persona_prompts["pulse"])
+        """Precompiled system prompt for streaming responses"""
+        return get_prompt(f"streaming:{persona if persona in STREAMING_PERSONA_PROMPTS else 'pulse'}").prefix
     
     def _build_streaming_user_prompt(self, journal_entry: JournalEntryResponse) -> str:
         """Build user prompt optimized for streaming"""
@@ -26,9 +26,85 @@ from app.models.ai_insights import (
     EmotionalTone, ResponseType
 )
 from app.core.database import Database
+from app.services.persona_batching import (
+    MODE_AUTO, MODE_COMBINED, MODE_FANOUT, build_combined_system_prompt, combined_response_format,
+    combined_response_schema, estimate_input_tokens, parse_combined_response, persona_mode_selector, record_call,
+)
+from app.services.prompt_templates import get_prompt, register_prompt, register_schema
 
 logger = logging.getLogger(__name__)
 
+# Persona definitions with enhanced characteristics
+PERSONA_DEFINITIONS = {
+    "pulse": {
+        "name": "Pulse",
+        "description": "Emotionally intelligent wellness companion",
+        "strengths": ["emotional_support", "empathy", "validation"],
+        "default_tone": EmotionalTone.EMPATHETIC,
+        "response_style": "warm and understanding"
+    },
+    "sage": {
+        "name": "Sage", 
+        "description": "Wise strategic thinker focused on growth",
+        "strengths": ["pattern_recognition", "strategic_thinking", "long_term_perspective"],
+        "default_tone": EmotionalTone.ANALYTICAL,
+        "response_style": "thoughtful and insightful"
+    },
+    "spark": {
+        "name": "Spark",
+        "description": "Energetic motivational coach",
+        "strengths": ["motivation", "creativity", "action_oriented"],
+        "default_tone": EmotionalTone.MOTIVATIONAL,
+        "response_style": "enthusiastic and energizing"
+    },
+    "anchor": {
+        "name": "Anchor",
+        "description": "Grounding practical guide",
+        "strengths": ["practical_advice", "stability", "grounding"],
+        "default_tone": EmotionalTone.GROUNDING,
+        "response_style": "calm and stabilizing"
+    }
+}
+
+def _render_structured_system_prompt(persona_info: Dict[str, Any]) -> str:
+    """System prompt optimized for structured output"""
+    return f"""You are {persona_info['name']}, a {persona_info['description']}.
+
+Your key strengths are: {', '.join(persona_info['strengths'])}
+Your response style is: {persona_info['response_style']}
+
+You must respond with a JSON object that matches this exact structure:
+{{
+    "response_text": "Your main response to the user (20-1000 characters)",
+    "emotional_tone": "One of: supportive, encouraging, analytical, grounding, empathetic, motivational, reflective, practical",
+    "confidence_score": 0.85,
+    "topics_identified": ["array", "of", "key", "topics"],
+    "follow_up_suggested": true/false,
+    "suggested_actions": ["up to 3 actionable suggestions"],
+    "estimated_helpfulness": 0.9,
+    "encourages_reflection": true/false,
+    "validates_feelings": true/false
+}}
+
+Guidelines:
+- Be authentic to your persona's voice and strengths
+- Provide genuine empathy and support
+- Include actionable insights when appropriate
+- Identify key topics and themes from the user's entry
+- Keep response_text between 20-1000 characters
+- Set confidence_score based on how well you understand the situation (0.0-1.0)
+- Be honest about your emotional_tone and response characteristics
+"""
+
+def _register_structured_prompts() -> None:
+    """One structured-output system prompt per persona, compiled at import"""
+    for persona, persona_info in PERSONA_DEFINITIONS.items():
+        register_prompt(f"structured:{persona}", _render_structured_system_prompt(persona_info))
+
+_register_structured_prompts()
+STRUCTURED_RESPONSE_FORMAT = register_schema("structured_ai_response", StructuredAIPersonaResponse)
+PERSONA_RESPONSE_SCHEMA = STRUCTURED_RESPONSE_FORMAT["json_schema"]["schema"]
+
 class StructuredAIService:
     """
     Advanced AI service that generates structured responses with rich metadata
@@ -54,36 +130,7 @@ class StructuredAIService:
         self.max_tokens = 800
         
         # Persona definitions with enhanced characteristics
-        self.persona_definitions = {
-            "pulse": {
-                "name": "Pulse",
-                "description": "Emotionally intelligent wellness companion",
-                "strengths": ["emotional_support", "empathy", "validation"],
-                "default_tone": EmotionalTone.EMPATHETIC,
-                "response_style": "warm and understanding"
-            },
-            "sage": {
-                "name": "Sage", 
-                "description": "Wise strategic thinker focused on growth",
-                "strengths": ["pattern_recognition", "strategic_thinking", "long_term_perspective"],
-                "default_tone": EmotionalTone.ANALYTICAL,
-                "response_style": "thoughtful and insightful"
-            },
-            "spark": {
-                "name": "Spark",
-                "description": "Energetic motivational coach",
-                "strengths": ["motivation", "creativity", "action_oriented"],
-                "default_tone": EmotionalTone.MOTIVATIONAL,
-                "response_style": "enthusiastic and energizing"
-            },
-            "anchor": {
-                "name": "Anchor",
-                "description": "Grounding practical guide",
-                "strengths": ["practical_advice", "stability", "grounding"],
-                "default_tone": EmotionalTone.GROUNDING,
-                "response_style": "calm and stabilizing"
-            }
-        }
+        self.persona_definitions = PERSONA_DEFINITIONS
     
     async def generate_structured_response(
         self, 
@@ -101,7 +148,7 @@ class StructuredAIService:
         persona_info = self.persona_definitions.get(persona, self.persona_definitions["pulse"])
         
         # Build system prompt for structured output
-        system_prompt = self._build_structured_system_prompt(persona_info, response_type)
+        system_prompt = self._build_structured_system_prompt(persona, response_type)
         
         # Build user prompt with journal content
         user_prompt = self._build_user_prompt(journal_entry, additional_context)
@@ -118,16 +165,12 @@ class StructuredAIService:
                 ],
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": "structured_ai_response",
-                        "schema": StructuredAIPersonaResponse.model_json_schema()
-                    }
-                }
+                response_format=STRUCTURED_RESPONSE_FORMAT
             )
             
             response_time = (time.time() - start_time) * 1000
+            record_call("structured_ai", MODE_FANOUT, response_time, getattr(completion, "usage", None))
+            persona_mode_selector.observe(MODE_FANOUT, 1, response_time)
             
             # Parse the structured response
             if completion.choices and completion.choices[0].message.content:
@@ -135,22 +178,7 @@ class StructuredAIService:
                 response_data = json.loads(completion.choices[0].message.content)
                 
                 # Create structured response with validation
-                structured_response = StructuredAIPersonaResponse(
-                    persona_name=persona_info["name"],
-                    response_text=response_data["response_text"],
-                    emotional_tone=EmotionalTone(response_data.get("emotional_tone", persona_info["default_tone"])),
-                    confidence_score=response_data.get("confidence_score", 0.8),
-                    topics_identified=response_data.get("topics_identified", []),
-                    follow_up_suggested=response_data.get("follow_up_suggested", False),
-                    response_type=response_type,
-                    persona_strengths=persona_info["strengths"],
-                    suggested_actions=response_data.get("suggested_actions", []),
-                    estimated_helpfulness=response_data.get("estimated_helpfulness", 0.8),
-                    encourages_reflection=response_data.get("encourages_reflection", True),
-                    validates_feelings=response_data.get("validates_feelings", True),
-                    response_length_category=self._categorize_response_length(response_data["response_text"]),
-                    contains_question="?" in response_data["response_text"]
-                )
+                structured_response = self._to_persona_response(persona_info, response_data, response_type)
                 
                 logger.info(f"✅ Generated structured {persona} response in {response_time:.1f}ms")
                 return structured_response
@@ -169,57 +197,29 @@ class StructuredAIService:
         self,
         journal_entry: JournalEntryResponse,
         personas: List[str],
-        delivery_strategy: str = "staggered"
+        delivery_strategy: str = "staggered",
+        mode: Optional[str] = None
     ) -> MultiPersonaStructuredResponse:
         """
         Generate structured responses from multiple personas concurrently
+        
+        mode: "fanout" (one call per persona), "combined" (one call for all personas)
+        or "auto"; defaults to MULTI_PERSONA_MODE. Responses keep the order of personas.
         """
         if not personas:
             personas = ["pulse"]
         
-        # Generate responses concurrently for better performance
-        tasks = []
-        for persona in personas:
-            task = self.generate_structured_response(
-                journal_entry=journal_entry,
-                persona=persona,
-                response_type=ResponseType.COLLABORATIVE if len(personas) > 1 else ResponseType.INITIAL
-            )
-            tasks.append(task)
-        
         try:
-            # Execute all persona responses concurrently
-            persona_responses = await asyncio.gather(*tasks)
-            
-            # Analyze overall patterns
-            overall_sentiment = self._analyze_overall_sentiment(journal_entry)
-            complexity_level = self._assess_complexity(journal_entry)
-            priority_level = self._assess_priority(journal_entry)
-            
-            # Extract recurring themes and growth opportunities
-            all_topics = []
-            for response in persona_responses:
-                all_topics.extend(response.topics_identified)
-            
-            recurring_themes = list(set(all_topics))  # Remove duplicates
-            growth_opportunities = self._identify_growth_opportunities(persona_responses, journal_entry)
-            
-            # Calculate estimated reading time
-            total_text_length = sum(len(response.response_text) for response in persona_responses)
-            estimated_reading_time = max(1, min(10, total_text_length // 200))  # ~200 chars per minute
+            if self._choose_generation_mode(journal_entry, personas, mode) == MODE_COMBINED:
+                try:
+                    persona_responses = await self._generate_combined(journal_entry, personas)
+                except Exception as e:
+                    logger.warning(f"⚠️ Combined persona generation failed, fanning out: {e}")
+                    persona_responses = await self._generate_fanout(journal_entry, personas)
+            else:
+                persona_responses = await self._generate_fanout(journal_entry, personas)
             
-            multi_response = MultiPersonaStructuredResponse(
-                journal_entry_id=journal_entry.id,
-                user_id=journal_entry.user_id,
-                persona_responses=persona_responses,
-                overall_sentiment=overall_sentiment,
-                complexity_level=complexity_level,
-                priority_level=priority_level,
-                delivery_strategy=delivery_strategy,
-                estimated_reading_time_minutes=estimated_reading_time,
-                recurring_themes=recurring_themes,
-                growth_opportunities=growth_opportunities
-            )
+            multi_response = self._build_multi_persona_response(journal_entry, persona_responses, delivery_strategy)
             
             logger.info(f"✅ Generated multi-persona structured response with {len(personas)} personas")
             return multi_response
@@ -228,35 +228,166 @@ class StructuredAIService:
             logger.error(f"Error generating multi-persona structured response: {e}")
             raise
     
-    def _build_structured_system_prompt(self, persona_info: Dict[str, Any], response_type: ResponseType) -> str:
-        """Build system prompt optimized for structured output"""
-        return f"""You are {persona_info['name']}, a {persona_info['description']}.
-
-Your key strengths are: {', '.join(persona_info['strengths'])}
-Your response style is: {persona_info['response_style']}
-
-You must respond with a JSON object that matches this exact structure:
-{{
-    "response_text": "Your main response to the user (20-1000 characters)",
-    "emotional_tone": "One of: supportive, encouraging, analytical, grounding, empathetic, motivational, reflective, practical",
-    "confidence_score": 0.85,
-    "topics_identified": ["array", "of", "key", "topics"],
-    "follow_up_suggested": true/false,
-    "suggested_actions": ["up to 3 actionable suggestions"],
-    "estimated_helpfulness": 0.9,
-    "encourages_reflection": true/false,
-    "validates_feelings": true/false
-}}
-
-Guidelines:
-- Be authentic to your persona's voice and strengths
-- Provide genuine empathy and support
-- Include actionable insights when appropriate
-- Identify key topics and themes from the user's entry
-- Keep response_text between 20-1000 characters
-- Set confidence_score based on how well you understand the situation (0.0-1.0)
-- Be honest about your emotional_tone and response characteristics
-"""
+    async def _generate_fanout(
+        self,
+        journal_entry: JournalEntryResponse,
+        personas: List[str]
+    ) -> List[StructuredAIPersonaResponse]:
+        """One completion per persona, concurrently"""
+        tasks = []
+        for persona in personas:
+            task = self.generate_structured_response(
+                journal_entry=journal_entry,
+                persona=persona,
+                response_type=ResponseType.COLLABORATIVE if len(personas) > 1 else ResponseType.INITIAL
+            )
+            tasks.append(task)
+        
+        # Execute all persona responses concurrently
+        return list(await asyncio.gather(*tasks))
+    
+    def _choose_generation_mode(
+        self,
+        journal_entry: JournalEntryResponse,
+        personas: List[str],
+        mode: Optional[str]
+    ) -> str:
+        """Fan-out or combined; auto compares the prompt tokens each mode would send"""
+        mode = (mode or settings.MULTI_PERSONA_MODE or MODE_AUTO).lower()
+        if len(personas) <= 1 or mode != MODE_AUTO:
+            return persona_mode_selector.choose(len(personas), 0, 0, mode=mode)
+        
+        user_prompt = self._build_user_prompt(journal_entry, None)
+        fanout_tokens = estimate_input_tokens(
+            [self._build_structured_system_prompt(persona, ResponseType.COLLABORATIVE) for persona in personas],
+            user_prompt,
+            [PERSONA_RESPONSE_SCHEMA] * len(personas)
+        )
+        combined_tokens = estimate_input_tokens(
+            [self._build_combined_system_prompt(personas)], user_prompt, [combined_response_schema(personas)]
+        )
+        return persona_mode_selector.choose(len(personas), fanout_tokens, combined_tokens, mode=mode, concurrency=len(personas))
+    
+    async def _generate_combined(
+        self,
+        journal_entry: JournalEntryResponse,
+        personas: List[str]
+    ) -> List[StructuredAIPersonaResponse]:
+        """One completion for every persona; any persona it leaves out is generated on its own"""
+        if not self.client:
+            raise Exception("OpenAI client not configured")
+        
+        start_time = time.time()
+        completion = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self._build_combined_system_prompt(personas)},
+                {"role": "user", "content": self._build_user_prompt(journal_entry, None)}
+            ],
+            max_tokens=self.max_tokens * len(personas),
+            temperature=self.temperature,
+            response_format=combined_response_format(personas)
+        )
+        response_time = (time.time() - start_time) * 1000
+        record_call("structured_ai", MODE_COMBINED, response_time, getattr(completion, "usage", None))
+        
+        if not (completion.choices and completion.choices[0].message.content):
+            raise Exception("No valid response content from OpenAI")
+        parsed = parse_combined_response(completion.choices[0].message.content, personas)
+        persona_mode_selector.observe(MODE_COMBINED, len(personas), response_time)
+        
+        responses: Dict[str, StructuredAIPersonaResponse] = {}
+        for persona, response_data in parsed.items():
+            persona_info = self.persona_definitions.get(persona, self.persona_definitions["pulse"])
+            try:
+                responses[persona] = self._to_persona_response(persona_info, response_data, ResponseType.COLLABORATIVE)
+            except Exception as e:
+                logger.warning(f"⚠️ Combined response for {persona} was invalid: {e}")
+        
+        missing = [persona for persona in personas if persona not in responses]
+        if missing:
+            logger.warning(f"⚠️ Combined response missed {missing}, generating them individually")
+            retries = await asyncio.gather(*[
+                self.generate_structured_response(journal_entry, persona, ResponseType.COLLABORATIVE)
+                for persona in missing
+            ])
+            responses.update(zip(missing, retries))
+        
+        logger.info(f"✅ Combined {len(personas)} structured persona responses in one completion ({response_time:.1f}ms)")
+        return [responses[persona] for persona in personas]
+    
+    def _build_multi_persona_response(
+        self,
+        journal_entry: JournalEntryResponse,
+        persona_responses: List[StructuredAIPersonaResponse],
+        delivery_strategy: str
+    ) -> MultiPersonaStructuredResponse:
+        """Aggregate persona responses with entry-level metadata"""
+        # Analyze overall patterns
+        overall_sentiment = self._analyze_overall_sentiment(journal_entry)
+        complexity_level = self._assess_complexity(journal_entry)
+        priority_level = self._assess_priority(journal_entry)
+        
+        # Extract recurring themes and growth opportunities
+        all_topics = []
+        for response in persona_responses:
+            all_topics.extend(response.topics_identified)
+        
+        recurring_themes = list(set(all_topics))  # Remove duplicates
+        growth_opportunities = self._identify_growth_opportunities(persona_responses, journal_entry)
+        
+        # Calculate estimated reading time
+        total_text_length = sum(len(response.response_text) for response in persona_responses)
+        estimated_reading_time = max(1, min(10, total_text_length // 200))  # ~200 chars per minute
+        
+        return MultiPersonaStructuredResponse(
+            journal_entry_id=journal_entry.id,
+            user_id=journal_entry.user_id,
+            persona_responses=persona_responses,
+            overall_sentiment=overall_sentiment,
+            complexity_level=complexity_level,
+            priority_level=priority_level,
+            delivery_strategy=delivery_strategy,
+            estimated_reading_time_minutes=estimated_reading_time,
+            recurring_themes=recurring_themes,
+            growth_opportunities=growth_opportunities
+        )
+    
+    def _to_persona_response(
+        self,
+        persona_info: Dict[str, Any],
+        response_data: Dict[str, Any],
+        response_type: ResponseType
+    ) -> StructuredAIPersonaResponse:
+        """Structured response from the fields the model wrote (per-persona or combined)"""
+        return StructuredAIPersonaResponse(
+            persona_name=persona_info["name"],
+            response_text=response_data["response_text"],
+            emotional_tone=EmotionalTone(response_data.get("emotional_tone", persona_info["default_tone"])),
+            confidence_score=response_data.get("confidence_score", 0.8),
+            topics_identified=response_data.get("topics_identified", []),
+            follow_up_suggested=response_data.get("follow_up_suggested", False),
+            response_type=response_type,
+            persona_strengths=persona_info["strengths"],
+            suggested_actions=response_data.get("suggested_actions", []),
+            estimated_helpfulness=response_data.get("estimated_helpfulness", 0.8),
+            encourages_reflection=response_data.get("encourages_reflection", True),
+            validates_feelings=response_data.get("validates_feelings", True),
+            response_length_category=self._categorize_response_length(response_data["response_text"]),
+            contains_question="?" in response_data["response_text"]
+        )
+    
+    def _build_combined_system_prompt(self, personas: List[str]) -> str:
+        """System prompt for one completion that answers as every persona"""
+        voices = []
+        for persona in personas:
+            info = self.persona_definitions.get(persona, self.persona_definitions["pulse"])
+            voices.append((persona, f"{info['name']}, a {info['description']}. Strengths: {', '.join(info['strengths'])}. Style: {info['response_style']}."))
+        return build_combined_system_prompt(voices)
+    
+    def _build_structured_system_prompt(self, persona: str, response_type: ResponseType) -> str:
+        """Precompiled system prompt for structured output (the same for every response type)"""
+        return get_prompt(f"structured:{persona if persona in self.persona_definitions else 'pulse'}").prefix
     
     def _build_user_prompt(self, journal_entry: JournalEntryResponse, additional_context: Optional[Dict[str, Any]]) -> str:
         """Build user prompt with journal entry and context"""
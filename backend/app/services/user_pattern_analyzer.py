@@ -14,6 +14,7 @@ import json
 
 from app.models.journal import JournalEntryResponse
 from app.core.monitoring import log_error, ErrorSeverity, ErrorCategory
+from app.core.utils import EntryTimeline
 
 logger = logging.getLogger(__name__)
 
@@ -114,18 +115,21 @@ class UserPatternAnalyzer:
                 if datetime.now() - cached_patterns.get("timestamp", datetime.min) < self.cache_duration:
                     return cached_patterns["patterns"]
             
+            # Parse created_at once for every time-based analysis below
+            timeline = EntryTimeline(journal_entries)
+            
             # Analyze patterns
             patterns = UserPatterns(
                 user_id=user_id,
                 avg_entry_length=self._analyze_entry_length(journal_entries),
-                preferred_entry_times=self._analyze_entry_times(journal_entries),
-                entry_frequency=self._analyze_entry_frequency(journal_entries),
+                preferred_entry_times=self._analyze_entry_times(timeline),
+                entry_frequency=self._analyze_entry_frequency(timeline),
                 writing_style=self._analyze_writing_style(journal_entries),
                 common_topics=self._analyze_topics(journal_entries),
                 avoided_topics=self._analyze_avoided_topics(journal_entries),
                 topic_cycles=self._analyze_topic_cycles(journal_entries),
                 mood_trends=self._analyze_mood_trends(journal_entries),
-                mood_cycles=self._analyze_mood_cycles(journal_entries),
+                mood_cycles=self._analyze_mood_cycles(timeline),
                 mood_triggers=self._analyze_mood_triggers(journal_entries),
                 prefers_questions=self._analyze_interaction_preferences(journal_entries, "questions"),
                 prefers_validation=self._analyze_interaction_preferences(journal_entries, "validation"),
@@ -197,26 +201,22 @@ class UserPatternAnalyzer:
         except Exception:
             return 100
     
-    def _analyze_entry_times(self, entries: List[JournalEntryResponse]) -> List[int]:
+    def _analyze_entry_times(self, timeline: EntryTimeline) -> List[int]:
         """Analyze preferred entry times"""
         try:
-            hours = [entry.created_at.hour for entry in entries if entry.created_at]
-            hour_counts = Counter(hours)
+            hour_counts = timeline.hour_counts()
             return [hour for hour, count in hour_counts.most_common(3)]
         except Exception:
             return [9, 12, 18]  # Default: morning, noon, evening
     
-    def _analyze_entry_frequency(self, entries: List[JournalEntryResponse]) -> float:
+    def _analyze_entry_frequency(self, timeline: EntryTimeline) -> float:
         """Analyze entry frequency per week"""
         try:
-            if len(entries) < 2:
+            if len(timeline) < 2:
                 return 1.0
             
-            first_entry = min(entries, key=lambda x: x.created_at)
-            last_entry = max(entries, key=lambda x: x.created_at)
-            days_between = (last_entry.created_at - first_entry.created_at).days
-            weeks = max(days_between / 7, 1)
-            return len(entries) / weeks
+            weeks = max(timeline.span_days() / 7, 1)
+            return len(timeline) / weeks
         except Exception:
             return 3.0  # Default: 3 entries per week
     
@@ -333,14 +333,13 @@ class UserPatternAnalyzer:
         except Exception:
             return {"mood": 5.0, "energy": 5.0, "stress": 5.0}
     
-    def _analyze_mood_cycles(self, entries: List[JournalEntryResponse]) -> Dict[str, List[int]]:
+    def _analyze_mood_cycles(self, timeline: EntryTimeline) -> Dict[str, List[int]]:
         """Analyze mood patterns by day of week"""
         try:
             mood_by_day = {i: [] for i in range(7)}  # 0=Monday, 6=Sunday
             
-            for entry in entries:
-                if entry.created_at and hasattr(entry, 'mood_level'):
-                    day_of_week = entry.created_at.weekday()
+            for entry, day_of_week in zip(timeline.entries, timeline.weekday):
+                if hasattr(entry, 'mood_level'):
                     mood_by_day[day_of_week].append(entry.mood_level)
             
             # Calculate average mood for each day
@@ -3,6 +3,7 @@ Weekly Summary Generation Service for PulseCheck
 Generates AI-powered weekly wellness summaries with pattern analysis and insights
 """
 
+import calendar
 import json
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Any, Tuple
@@ -11,6 +12,7 @@ from enum import Enum
 import logging
 
 from app.core.monitoring import log_error, ErrorSeverity, ErrorCategory
+from app.core.utils import EntryTimeline
 from app.models.journal import JournalEntryResponse
 
 logger = logging.getLogger(__name__)
@@ -144,14 +146,16 @@ class WeeklySummaryService:
             # Calculate week boundaries
             week_start, week_end = self._get_week_boundaries(week_offset)
             
-            # Filter entries for the target week
-            week_entries = self._filter_entries_by_week(journal_entries, week_start, week_end)
+            # Parse every created_at once; the week filter and day metrics share it
+            timeline = EntryTimeline(journal_entries)
+            week_timeline = self._filter_entries_by_week(timeline, week_start, week_end)
+            week_entries = week_timeline.entries
             
             if not week_entries:
                 return self._generate_empty_summary(week_start, week_end, summary_type)
             
             # Calculate metrics
-            metrics = self._calculate_weekly_metrics(week_entries)
+            metrics = self._calculate_weekly_metrics(week_entries, week_timeline)
             
             # Generate insights
             insights = self._generate_insights(week_entries, metrics)
@@ -209,40 +213,27 @@ class WeeklySummaryService:
     
     def _filter_entries_by_week(
         self,
-        entries: List[JournalEntryResponse],
+        timeline: EntryTimeline,
         week_start: datetime,
         week_end: datetime
-    ) -> List[JournalEntryResponse]:
+    ) -> EntryTimeline:
         """
-        Filter journal entries for the target week
+        Filter journal entries for the target week (oldest first; unparseable dates are dropped)
         """
-        week_entries = []
-        
-        for entry in entries:
-            try:
-                # Parse entry date
-                if hasattr(entry, 'created_at') and entry.created_at:
-                    if isinstance(entry.created_at, str):
-                        entry_date = datetime.fromisoformat(entry.created_at.replace('Z', '+00:00'))
-                    else:
-                        entry_date = entry.created_at
-                    
-                    # Check if entry is in target week
-                    if week_start <= entry_date <= week_end:
-                        week_entries.append(entry)
-                        
-            except Exception as e:
-                logger.warning(f"Error parsing entry date: {e}")
-                continue
-        
-        return week_entries
+        return timeline.between(week_start, week_end)
     
-    def _calculate_weekly_metrics(self, entries: List[JournalEntryResponse]) -> WeeklyMetrics:
+    def _calculate_weekly_metrics(
+        self,
+        entries: List[JournalEntryResponse],
+        timeline: Optional[EntryTimeline] = None
+    ) -> WeeklyMetrics:
         """
         Calculate comprehensive weekly metrics
         """
         if not entries:
             return WeeklyMetrics()
+        if timeline is None:
+            timeline = EntryTimeline(entries)
         
         # Basic metrics
         total_entries = len(entries)
@@ -263,19 +254,10 @@ class WeeklySummaryService:
         stress_variance = self._calculate_variance(stresses) if len(stresses) > 1 else 0
         
         # Activity by day
-        day_counts = {}
-        for entry in entries:
-            try:
-                if hasattr(entry, 'created_at') and entry.created_at:
-                    if isinstance(entry.created_at, str):
-                        entry_date = datetime.fromisoformat(entry.created_at.replace('Z', '+00:00'))
-                    else:
-                        entry_date = entry.created_at
-                    
-                    day_name = entry_date.strftime('%A')
-                    day_counts[day_name] = day_counts.get(day_name, 0) + 1
-            except:
-                continue
+        day_counts = {
+            calendar.day_name[weekday]: count
+            for weekday, count in timeline.weekday_counts().items()
+        }
         
         most_active_day = max(day_counts, key=day_counts.get) if day_counts else ""
         least_active_day = min(day_counts, key=day_counts.get) if day_counts else ""
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+JSON Serialization Benchmark
+Compares FastAPI's default dict -> jsonable_encoder -> stdlib json path with
+FastJSONResponse (orjson, and its stdlib fallback) on realistic PulseCheck payloads
+
+Usage: python benchmark_json_serialization.py [--repeat N]
+"""
+
+import argparse
+import json
+import random
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core import json_response
+from app.core.json_response import FastJSONResponse
+from app.models.journal import JournalEntryResponse
+
+PERSONAS = ["pulse", "sage", "spark", "anchor"]
+WORDS = "today work meeting tired grateful anxious deadline walk friend sleep coffee focus".split()
+
+
+def _text(words: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+
+def make_entry_rows(count: int, insights_per_entry: int = 3):
+    """Rows shaped like /all-entries-with-ai-insights (Supabase returns ISO strings)"""
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(count):
+        created = (now - timedelta(hours=i * 7)).isoformat()
+        entry_id = str(uuid.uuid4())
+        rows.append({
+            "id": entry_id,
+            "user_id": str(uuid.uuid4()),
+            "content": _text(120),
+            "mood_level": random.randint(1, 10),
+            "energy_level": random.randint(1, 10),
+            "stress_level": random.randint(1, 10),
+            "sleep_hours": round(random.uniform(4, 9), 1),
+            "work_hours": round(random.uniform(0, 12), 1),
+            "tags": random.sample(WORDS, 3),
+            "work_challenges": [],
+            "gratitude_items": [_text(5)],
+            "created_at": created,
+            "updated_at": created,
+            "ai_insights": [
+                {
+                    "id": str(uuid.uuid4()),
+                    "ai_response": _text(80),
+                    "persona_used": PERSONAS[j % len(PERSONAS)],
+                    "topic_flags": random.sample(WORDS, 2),
+                    "confidence_score": 0.85,
+                    "created_at": created,
+                }
+                for j in range(insights_per_entry)
+            ],
+        })
+    return rows
+
+
+def make_entry_models(count: int):
+    """JournalEntryResponse models, as returned by response_model endpoints"""
+    models = []
+    for row in make_entry_rows(count):
+        row = dict(row, created_at=datetime.fromisoformat(row["created_at"]), updated_at=datetime.fromisoformat(row["updated_at"]))
+        models.append(JournalEntryResponse(**row))
+    return models
+
+
+def current_path(content) -> bytes:
+    """What FastAPI does for a plain dict/model return with the default JSONResponse"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def orjson_path(content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def stdlib_fallback_path(content) -> bytes:
+    original = json_response.ORJSON_AVAILABLE
+    json_response.ORJSON_AVAILABLE = False
+    try:
+        return FastJSONResponse(content).body
+    finally:
+        json_response.ORJSON_AVAILABLE = original
+
+
+def bench(label: str, content, repeat: int, compare: bool = True):
+    paths = [("current", current_path)]
+    if json_response.ORJSON_AVAILABLE:
+        paths.append(("orjson", orjson_path))
+    paths.append(("stdlib", stdlib_fallback_path))
+    
+    # Same document regardless of path (pydantic's json mode writes UTC as "Z", so models differ in offset spelling only)
+    if compare:
+        reference = json.loads(current_path(content))
+        for name, fn in paths[1:]:
+            assert json.loads(fn(content)) == reference, f"{name} output differs from the current path"
+    
+    baseline = None
+    size = len(current_path(content))
+    print(f"\n{label}  ({size / 1024:.0f} KB)")
+    for name, fn in paths:
+        seconds = min(timeit.repeat(lambda: fn(content), number=repeat, repeat=3)) / repeat
+        baseline = baseline or seconds
+        print(f"  {name:<8} {seconds * 1000:8.2f} ms   {baseline / seconds:5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per timing run")
+    args = parser.parse_args()
+    random.seed(42)
+    
+    print(f"🏁 JSON serialization benchmark (python {sys.version.split()[0]}, orjson={'yes' if json_response.ORJSON_AVAILABLE else 'no'})")
+    
+    for per_page in (30, 100):
+        bench(
+            f"all-entries-with-ai-insights, {per_page} entries x 3 insights",
+            {"entries": make_entry_rows(per_page), "page": 1, "per_page": per_page, "total": 500},
+            args.repeat,
+        )
+    
+    bench(
+        "admin comprehensive logs, 500 entries x 4 insights",
+        {"journal_entries": make_entry_rows(500, 4), "generated_at": datetime.now(timezone.utc)},
+        max(1, args.repeat // 4),
+    )
+    
+    bench(
+        "response_model page, 100 JournalEntryResponse models",
+        {"entries": make_entry_models(100), "total": 100},
+        args.repeat,
+        compare=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tokenizer Benchmark
+Per-request token counting cost of the beta context builder: the old TokenManager
+(encoding loaded per instance, every text re-encoded) against the shared tokenizer
+(process singleton, content-hash memo, batch counting)
+
+Each simulated request is one user's next journal entry: the new entry, their
+previous entries as history and their weekly summaries, as ContextBuilderService
+counts them. Consecutive requests share most of their history, as in production.
+
+Usage: python benchmark_tokenizer.py [--requests N] [--history N] [--summaries N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core import tokenizer as tokenizer_module
+from app.core.tokenizer import TIKTOKEN_AVAILABLE, Tokenizer, tiktoken
+from app.services.beta_optimization import TokenManager, format_history_line, format_summary_line
+
+WORDS = "today work meeting tired grateful anxious deadline walk friend sleep coffee focus family proud".split()
+
+
+def _text(words: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+
+class LegacyTokenManager:
+    """TokenManager before the shared tokenizer: one encoding per instance, no memo"""
+    
+    def __init__(self):
+        self.encoder = tiktoken.encoding_for_model("gpt-3.5-turbo") if TIKTOKEN_AVAILABLE else None
+    
+    def count_tokens(self, text: str) -> int:
+        try:
+            if self.encoder:
+                return len(self.encoder.encode(text))
+            return len(text) // 4
+        except Exception:
+            return len(text) // 4
+
+
+class _Entry:
+    """Just the fields format_history_line reads"""
+    
+    def __init__(self, content: str, created_at: datetime):
+        self.content = content
+        self.created_at = created_at
+
+
+def make_requests(count: int, history: int, summaries: int):
+    """(current entry text, history lines, summary lines) for consecutive requests of one user"""
+    start = datetime.now(timezone.utc) - timedelta(days=count)
+    entries = [_Entry(_text(random.randint(60, 250)), start + timedelta(hours=i * 20)) for i in range(count + history)]
+    weekly = [
+        format_summary_line({"period_start": f"2025-W{week:02d}", "key_insights": _text(30)})
+        for week in range(summaries)
+    ]
+    requests = []
+    for i in range(history, history + count):
+        current = entries[i]
+        previous = [format_history_line(entry) for entry in reversed(entries[i - history:i])]
+        current_text = f"Entry: {current.content}\nMood: 6/10\nEnergy: 5/10\nStress: 4/10"
+        requests.append((current_text, previous, weekly))
+    return requests
+
+
+def legacy_request(current: str, history, summaries) -> int:
+    manager = LegacyTokenManager()
+    return manager.count_tokens(current) + sum(manager.count_tokens(text) for text in [*history, *summaries])
+
+
+def shared_request(current: str, history, summaries) -> int:
+    manager = TokenManager()
+    return manager.count_tokens(current) + sum(manager.count_tokens_batch([*history, *summaries]))
+
+
+def run(label: str, fn, requests) -> float:
+    started = time.perf_counter()
+    for request in requests:
+        fn(*request)
+    per_request = (time.perf_counter() - started) / len(requests)
+    print(f"  {label:<22} {per_request * 1000:8.3f} ms/request")
+    return per_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500, help="Consecutive requests to simulate")
+    parser.add_argument("--history", type=int, default=10, help="Recent entries per context")
+    parser.add_argument("--summaries", type=int, default=8, help="Weekly summaries per context")
+    args = parser.parse_args()
+    random.seed(42)
+    
+    print(f"🏁 Tokenizer benchmark (python {sys.version.split()[0]}, tiktoken={'yes' if TIKTOKEN_AVAILABLE else 'no'})")
+    if not TIKTOKEN_AVAILABLE:
+        print("  ⚠️ tiktoken is not installed: both paths use the characters / 4 estimate")
+    
+    # Cold start: the first encoding load in a process (what every worker pays once)
+    started = time.perf_counter()
+    Tokenizer().encoder
+    print(f"\nEncoding load (first in process): {(time.perf_counter() - started) * 1000:.1f} ms")
+    
+    requests = make_requests(args.requests, args.history, args.summaries)
+    texts = 1 + args.history + args.summaries
+    
+    for request in requests[:20]:
+        assert legacy_request(*request) == shared_request(*request), "token counts differ between paths"
+    
+    print(f"\n{args.requests} requests x {texts} texts")
+    tokenizer_module.tokenizer.clear()
+    before = run("legacy TokenManager", legacy_request, requests)
+    tokenizer_module.tokenizer.clear()
+    after = run("shared + memo + batch", shared_request, requests)
+    print(f"  speedup                {before / after:8.1f}x")
+    
+    stats = tokenizer_module.tokenizer.stats()
+    print(f"  memo: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,6 @@ Last Updated: 2025-01-25 - Enhanced CORS handling for Vercel domains
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse, Response
 import time
 import logging
@@ -327,6 +326,8 @@ except Exception as e:
 # Import required modules for lifespan and services
 from app.core.database import get_database, init_supabase
 from app.middleware.observability_middleware import ObservabilityMiddleware
+from app.middleware.compression import SSEAwareGZipMiddleware
+from app.middleware.request_metrics import RequestMetricsMiddleware
 
 # Import scheduler service with error handling for Railway deployment
 try:
@@ -431,6 +432,35 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"⚠️ Observability initialization failed: {e}")
         
+        # Start always-on sampling profiler (daemon thread, self-throttled)
+        try:
+            from app.core.profiler import init_profiler
+            init_profiler()
+        except Exception as e:
+            logger.warning(f"⚠️ Sampling profiler failed to start: {e}")
+        
+        # Start persistent metrics store (flush + downsample loop)
+        try:
+            from app.core.metrics_store import metrics_store
+            await metrics_store.start()
+        except Exception as e:
+            logger.warning(f"⚠️ Metrics store failed to start: {e}")
+        
+        # Open persistent AI response cache (warm in-memory tier + write-behind loop) when Pulse replies are cached
+        try:
+            if config_loaded and settings.RESPONSE_CACHE_ENABLED:
+                from app.services.response_cache_store import response_cache_store
+                await response_cache_store.start()
+        except Exception as e:
+            logger.warning(f"⚠️ Response cache failed to start: {e}")
+        
+        # Start background health collector (probes refresh on their own schedule)
+        try:
+            from app.core.health_collector import health_collector
+            await health_collector.start()
+        except Exception as e:
+            logger.warning(f"⚠️ Background health collector failed to start: {e}")
+        
         # Test database connection (fast check with error handling)
         try:
             if database_loaded:
@@ -511,6 +541,36 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"⚠️ Failed to get AI debugging summary: {e}")
         
+        try:
+            if observability_loaded:
+                observability.shutdown()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to flush async logging pipeline: {e}")
+        
+        try:
+            from app.core.health_collector import health_collector
+            await health_collector.stop()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to stop health collector: {e}")
+        
+        try:
+            from app.core.profiler import profiler
+            profiler.stop()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to stop sampling profiler: {e}")
+        
+        try:
+            from app.core.metrics_store import metrics_store
+            await metrics_store.stop()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to flush metrics store: {e}")
+        
+        try:
+            from app.services.response_cache_store import response_cache_store
+            await response_cache_store.stop()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to flush response cache: {e}")
+        
         if scheduler_service and scheduler_available:
             try:
                 await scheduler_service.stop()
@@ -643,8 +703,8 @@ else:
         logger.warning("Rate limiting disabled - limiter not available")
 
 # Performance middleware (order matters!)
-# 1. GZip compression for response optimization
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# 1. GZip compression for response optimization (SSE streams are left uncompressed)
+app.add_middleware(SSEAwareGZipMiddleware, minimum_size=1000)
 
 # 2. CORS middleware with optimized settings
 # Custom CORS configuration to handle Vercel preview deployments
@@ -741,6 +801,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency into the metrics store (api_response_time, read by predictive monitoring)
+app.add_middleware(RequestMetricsMiddleware)
+
 # TEMPORARILY DISABLE OTHER MIDDLEWARE FOR CORS DEBUGGING
 print("🔧 CORS DEBUG MODE: Only CORS middleware enabled")
 sys.stdout.flush()
@@ -984,154 +1047,26 @@ async def health_check_fast():
 # Comprehensive health check with detailed diagnostics
 @app.get("/health-detailed")
 async def health_check_detailed():
-    """Comprehensive health check with detailed system diagnostics"""
-    diagnostics = {
-        "status": "checking",
-        "timestamp": time.time(),
-        "checks": {}
-    }
+    """Comprehensive system diagnostics, served from the background health collector snapshot"""
+    from app.core.health_collector import health_collector, summarize_diagnostics
     
-    # 1. Python Runtime Check
-    try:
-        import sys
-        diagnostics["checks"]["python_runtime"] = {
-            "status": "healthy",
-            "version": sys.version,
-            "executable": sys.executable,
-            "recursion_limit": sys.getrecursionlimit()
-        }
-    except Exception as e:
-        diagnostics["checks"]["python_runtime"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-    
-    # 2. Memory Check
-    try:
-        import psutil
-        memory_info = psutil.virtual_memory()
-        diagnostics["checks"]["memory"] = {
-            "status": "healthy" if memory_info.percent < 90 else "warning",
-            "available_gb": round(memory_info.available / (1024**3), 2),
-            "usage_percent": memory_info.percent
-        }
-    except Exception as e:
-        diagnostics["checks"]["memory"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-    
-    # 3. Network Connectivity Check
-    try:
-        import socket
-        import requests
-        
-        # DNS check
-        try:
-            socket.gethostbyname('google.com')
-            dns_status = "healthy"
-        except Exception as e:
-            dns_status = "unhealthy"
-            dns_error = str(e)
-        
-        # HTTP check
-        try:
-            response = requests.get("https://httpbin.org/get", timeout=5)
-            http_status = "healthy"
-            http_status_code = response.status_code
-        except Exception as e:
-            http_status = "unhealthy"
-            http_error = str(e)
-        
-        diagnostics["checks"]["network"] = {
-            "status": "healthy" if dns_status == "healthy" and http_status == "healthy" else "unhealthy",
-            "dns": {"status": dns_status, "error": locals().get("dns_error", None)},
-            "http": {"status": http_status, "status_code": locals().get("http_status_code", None), "error": locals().get("http_error", None)}
-        }
-    except Exception as e:
-        diagnostics["checks"]["network"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-    
-    # 4. Package Availability Check
-    required_packages = [
-        'fastapi', 'uvicorn', 'pydantic', 'supabase',
-        'openai', 'python-dotenv', 'slowapi', 'requests'
-    ]
-    
-    package_status = {}
-    for package in required_packages:
-        try:
-            __import__(package)
-            package_status[package] = "available"
-        except ImportError:
-            package_status[package] = "missing"
-    
-    diagnostics["checks"]["packages"] = {
-        "status": "healthy" if all(status == "available" for status in package_status.values()) else "unhealthy",
-        "packages": package_status
-    }
-    
-    # 5. Environment Variables Check
-    critical_env_vars = {
-        "SUPABASE_URL": os.getenv("SUPABASE_URL"),
-        "SUPABASE_ANON_KEY": os.getenv("SUPABASE_ANON_KEY"),
-        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
-    }
-    
-    env_status = {}
-    for var_name, var_value in critical_env_vars.items():
-        env_status[var_name] = "present" if var_value else "missing"
-    
-    diagnostics["checks"]["environment"] = {
-        "status": "healthy" if all(status == "present" for status in env_status.values()) else "unhealthy",
-        "variables": env_status
-    }
-    
-    # 6. Database Connection Check
-    try:
-        if database_loaded:
-            db = get_database()
-            # Quick connection test
-            result = db.get_client().table('profiles').select('id').limit(1).execute()
-            diagnostics["checks"]["database"] = {
-                "status": "healthy",
-                "connection": "successful"
-            }
-        else:
-            diagnostics["checks"]["database"] = {
-                "status": "unhealthy",
-                "error": "Database system not loaded"
-            }
-    except Exception as e:
-        diagnostics["checks"]["database"] = {
+    snapshot = await health_collector.get_or_refresh("detailed_diagnostics")
+    if snapshot.value is None:
+        return {
             "status": "unhealthy",
-            "error": str(e)
+            "message": "Diagnostics unavailable",
+            "error": snapshot.error,
+            "timestamp": time.time(),
+            "snapshot": snapshot.metadata()
         }
     
-    # 7. Overall Status
-    all_checks = diagnostics["checks"]
-    healthy_checks = sum(1 for check in all_checks.values() if check.get("status") == "healthy")
-    total_checks = len(all_checks)
-    
-    if healthy_checks == total_checks:
-        diagnostics["status"] = "healthy"
-        diagnostics["message"] = "All systems operational"
-    elif healthy_checks >= total_checks * 0.8:  # 80% healthy
-        diagnostics["status"] = "degraded"
-        diagnostics["message"] = "Some systems degraded but operational"
-    else:
-        diagnostics["status"] = "unhealthy"
-        diagnostics["message"] = "Multiple systems unhealthy"
-    
-    diagnostics["summary"] = {
-        "total_checks": total_checks,
-        "healthy_checks": healthy_checks,
-        "unhealthy_checks": total_checks - healthy_checks
-    }
+    # Outbound connectivity is checked on demand, not by the background loop (only a cold start waits on it)
+    network = await health_collector.get_or_refresh("network_connectivity")
+    diagnostics = {**snapshot.value, "checks": dict(snapshot.value["checks"])}
+    diagnostics["checks"]["network"] = network.value or {"status": "unhealthy", "error": network.error}
+    summarize_diagnostics(diagnostics)
     
-    return diagnostics
+    return {**diagnostics, "snapshot": snapshot.metadata()}
 
 # Monitoring endpoints
 @app.get("/monitoring/errors")
@@ -1251,7 +1186,7 @@ async def get_error_pattern_analysis():
     Get comprehensive error pattern analysis for AI debugging
     """
     try:
-        recent_errors = monitor.errors[-100:] if len(monitor.errors) > 100 else monitor.errors
+        recent_errors = monitor.get_recent_errors(100)
         
         pattern_analysis = {
             "total_errors_analyzed": len(recent_errors),
@@ -1329,7 +1264,7 @@ async def record_ai_debugging_attempt(error_id: str, attempt_details: Dict[str,
     """
     try:
         # Find the error
-        error = next((e for e in monitor.errors if e.error_id == error_id), None)
+        error = monitor.get_error(error_id)
         if not error:
             return {"error": "Error not found"}
         
@@ -1428,6 +1363,7 @@ def register_routers():
         ("admin_monitoring", "app.routers.admin_monitoring", "admin-monitoring"),
         ("manual_ai_response", "app.routers.manual_ai_response", "manual-ai"),
         ("webhook_handler", "app.routers.webhook_handler", "webhook"),
+        ("profiler", "app.routers.profiler", "debug/profiler"),
     ]
     
     # Register optional routers with individual error handling
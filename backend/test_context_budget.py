@@ -0,0 +1,120 @@
+"""
+Test Context Budget
+TokenManager.optimize_context_for_budget fills the prompt budget in order and holds room for summaries
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.models.journal import JournalEntryResponse
+from app.services.beta_optimization import JournalSummary, TokenManager
+
+NOW = datetime(2025, 7, 10, 9, 0, tzinfo=timezone.utc)
+
+
+def make_entry(index, content):
+    created_at = NOW - timedelta(days=index)
+    return JournalEntryResponse(
+        id=f"entry-{index}",
+        user_id="user-1",
+        content=content,
+        mood_level=6,
+        energy_level=5,
+        stress_level=4,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def make_summary(week, key_insights):
+    start = date(2025, 6, 30) - timedelta(weeks=week)
+    return JournalSummary(
+        user_id="user-1",
+        summary_type="weekly",
+        period_start=start,
+        period_end=start + timedelta(days=6),
+        mood_trend=6.0,
+        energy_trend=5.0,
+        stress_trend=4.0,
+        key_insights=key_insights,
+        top_themes=["work"],
+        entry_count=5,
+        token_count=0,
+    )
+
+
+LONG = "Long day of back to back meetings about the launch plan and the hiring pipeline, " * 3
+SHORT = "Quiet evening"
+
+
+class TestOptimizeContextForBudget:
+    """Newest first, never skipping ahead, with SUMMARY_BUDGET_SHARE held for summaries"""
+    
+    @pytest.fixture
+    def manager(self):
+        return TokenManager()
+    
+    def test_no_entries(self, manager):
+        assert manager.optimize_context_for_budget([], [make_summary(0, "Busy week")], 1000) == ([], [], 0)
+    
+    def test_current_entry_is_kept_over_budget(self, manager):
+        current = make_entry(0, LONG)
+        
+        entries, summaries, used = manager.optimize_context_for_budget(
+            [current, make_entry(1, SHORT)], [make_summary(0, "Busy week")], 1
+        )
+        
+        assert entries == [current]
+        assert summaries == []
+        assert used == manager.estimate_entry_tokens(current)
+    
+    def test_history_stops_at_the_first_entry_that_does_not_fit(self, manager):
+        current, fits, too_long, small = (
+            make_entry(0, SHORT), make_entry(1, SHORT), make_entry(2, LONG), make_entry(3, SHORT)
+        )
+        budget = (
+            manager.estimate_entry_tokens(current)
+            + manager.estimate_history_tokens(fits)
+            + manager.estimate_history_tokens(small)
+        )
+        
+        entries, _, used = manager.optimize_context_for_budget([current, fits, too_long, small], [], budget)
+        
+        # The older, smaller entry would fit but is not taken ahead of the longer one
+        assert entries == [current, fits]
+        assert used == budget - manager.estimate_history_tokens(small)
+    
+    def test_summaries_keep_their_share_against_long_entries(self, manager):
+        current = make_entry(0, SHORT)
+        history = [make_entry(index, LONG) for index in range(1, 6)]
+        summary = make_summary(0, "Steady sleep")
+        # Room for one long entry and all but one token of the summary: without the
+        # reserve the entry would take it and leave the summary out
+        budget = (
+            manager.estimate_entry_tokens(current)
+            + manager.estimate_history_tokens(history[0])
+            + manager.estimate_summary_tokens(summary)
+            - 1
+        )
+        
+        entries, summaries, used = manager.optimize_context_for_budget([current] + history, [summary], budget)
+        
+        assert entries == [current]
+        assert summaries == [summary]
+        assert used <= budget
+    
+    def test_unused_history_room_goes_to_summaries(self, manager):
+        current, recent = make_entry(0, SHORT), make_entry(1, SHORT)
+        older = [make_summary(week, LONG) for week in range(2)]
+        budget = (
+            manager.estimate_entry_tokens(current)
+            + manager.estimate_history_tokens(recent)
+            + sum(manager.estimate_summary_tokens(summary) for summary in older)
+        )
+        
+        entries, summaries, used = manager.optimize_context_for_budget([current, recent], older, budget)
+        
+        assert entries == [current, recent]
+        assert summaries == older
+        assert used == budget
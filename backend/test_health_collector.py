@@ -0,0 +1,60 @@
+"""
+Test Background Health Collector
+Readers of on-demand probes wait only on a cold start
+"""
+
+import asyncio
+
+from app.core.health_collector import BackgroundHealthCollector
+
+
+class SlowProbe:
+    """Async probe (probe.run) that takes delay seconds and counts its runs"""
+    
+    def __init__(self, delay):
+        self.delay = delay
+        self.runs = 0
+    
+    async def run(self):
+        self.runs += 1
+        await asyncio.sleep(self.delay)
+        return {"run": self.runs}
+
+
+class TestOnDemandProbes:
+    """Expired on-demand snapshots are served at once and refreshed in the background"""
+    
+    def test_cold_start_waits_for_the_probe(self):
+        collector = BackgroundHealthCollector()
+        probe = SlowProbe(0.01)
+        collector.register("network", probe.run, interval_seconds=60, background=False)
+        
+        snapshot = asyncio.run(collector.get_or_refresh("network"))
+        
+        assert snapshot.value == {"run": 1}
+        assert probe.runs == 1
+    
+    def test_expired_snapshot_is_served_while_refreshing(self):
+        collector = BackgroundHealthCollector()
+        probe = SlowProbe(0.2)
+        collector.register("network", probe.run, interval_seconds=60, background=False)
+        
+        async def run():
+            await collector.get_or_refresh("network")
+            collector.get("network").refreshed_at -= 120  # Past its interval
+            
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            readers = await asyncio.gather(*(collector.get_or_refresh("network") for _ in range(5)))
+            waited = loop.time() - started
+            served = [(snapshot.value, snapshot.age_seconds) for snapshot in readers]
+            
+            await asyncio.gather(*collector._refresh_tasks.values())
+            return served, waited
+        
+        served, waited = asyncio.run(run())
+        
+        assert waited < 0.1
+        assert all(value == {"run": 1} and age >= 120 for value, age in served)
+        assert probe.runs == 2  # One cold start, one coalesced background refresh
+        assert collector.get("network").value == {"run": 2}
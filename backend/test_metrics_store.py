@@ -0,0 +1,67 @@
+"""
+Test Metrics Store
+Minute flushes, hourly downsampling and late rows from other workers
+"""
+
+import pytest
+
+from app.core.metrics_store import MetricsStore, HOUR
+
+
+HOUR_START = 1_700_000_000 // HOUR * HOUR
+
+
+class TestMetricsStoreDownsample:
+    """Hourly rollups must include minute rows flushed after the hour was downsampled"""
+    
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = MetricsStore(str(tmp_path / "metrics.db"))
+        yield store
+        if store._conn is not None:
+            store._conn.close()
+    
+    def _hourly(self, store, now):
+        return store.query("api_response_time", HOUR_START, now, resolution="1h")
+    
+    def test_completed_hour_is_rolled_up(self, store):
+        store.record("api_response_time", 100, timestamp=HOUR_START + 60)
+        store.record("api_response_time", 300, timestamp=HOUR_START + 120)
+        store.flush()
+        
+        assert store.downsample(now=HOUR_START + HOUR + 5) == 1
+        
+        points = self._hourly(store, HOUR_START + HOUR + 5)
+        assert [(p["bucket"], p["count"], p["avg"]) for p in points] == [(HOUR_START, 2, 200.0)]
+        assert store.downsample(now=HOUR_START + HOUR + 10) == 0
+    
+    def test_late_rows_are_re_aggregated(self, store):
+        store.record("api_response_time", 100, timestamp=HOUR_START + 60)
+        store.flush()
+        store.downsample(now=HOUR_START + HOUR + 5)
+        
+        # Another worker flushes the same hour after it was downsampled
+        late = MetricsStore(store.path)
+        late.record("api_response_time", 500, timestamp=HOUR_START + 3000)
+        late.flush()
+        late._conn.close()
+        
+        # Visible before the next downsample (dirty hours read from minute rows)...
+        points = self._hourly(store, HOUR_START + HOUR + 30)
+        assert [(p["count"], p["max"]) for p in points] == [(2, 500.0)]
+        
+        # ...and folded into the hourly rollup by it
+        assert store.downsample(now=HOUR_START + HOUR + 60) == 1
+        row = store._conn.execute(
+            "SELECT count, sum, max FROM rollup_1h WHERE name = 'api_response_time' AND bucket = ?",
+            (HOUR_START,),
+        ).fetchone()
+        assert row == (2, 600.0, 500.0)
+    
+    def test_current_hour_is_not_downsampled(self, store):
+        store.record("api_response_time", 100, timestamp=HOUR_START + 60)
+        store.flush()
+        
+        assert store.downsample(now=HOUR_START + 600) == 0
+        points = self._hourly(store, HOUR_START + 600)
+        assert [p["count"] for p in points] == [1]
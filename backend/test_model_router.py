@@ -0,0 +1,102 @@
+"""
+Test Model Router
+Degradation, cheapest-healthy routing, probes, shedding and the fallback
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import model_router as model_router_module
+from app.services.model_router import ModelRouter
+
+SLO_MS = 1000.0
+PRICES = {
+    "large": {"input": 0.005, "output": 0.015},
+    "small": {"input": 0.00015, "output": 0.0006},
+}
+
+
+class FakeClock:
+    """time.time() stand-in the tests move forward by hand"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def time(self):
+        return self.now
+
+
+def slow(router, model, samples=3):
+    for _ in range(samples):
+        router.observe(model, SLO_MS * 5)
+
+
+def fast(router, model, latency_ms=100.0, samples=3):
+    for _ in range(samples):
+        router.observe(model, latency_ms)
+
+
+class TestModelRouter:
+    """Route decisions from EWMA health"""
+    
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(model_router_module, "time", SimpleNamespace(time=clock.time))
+        return clock
+    
+    @pytest.fixture
+    def router(self, clock):
+        router = ModelRouter(min_samples=3, probe_interval_seconds=30.0)
+        router.prices = dict(PRICES)
+        router.register_route("pulse", ["large", "small"], SLO_MS)
+        return router
+    
+    def test_degraded_only_after_min_samples(self, router):
+        slow(router, "small", samples=2)
+        assert not router.is_degraded("small", SLO_MS)
+        
+        slow(router, "small", samples=1)
+        assert router.is_degraded("small", SLO_MS)
+    
+    def test_cheapest_healthy_model_wins(self, router):
+        fast(router, "large")
+        fast(router, "small")
+        
+        decision = router.route("pulse")
+        assert (decision.model, decision.reason) == ("small", "within_slo")
+    
+    def test_one_probe_per_interval(self, router, clock):
+        fast(router, "large")
+        slow(router, "small")
+        
+        reasons = [(decision.model, decision.reason) for decision in (router.route("pulse") for _ in range(3))]
+        assert reasons == [("small", "probe"), ("large", "within_slo"), ("large", "within_slo")]
+        
+        clock.now += 29
+        assert router.route("pulse").model == "large"
+        clock.now += 1
+        assert router.route("pulse").reason == "probe"
+        assert router.route("pulse").model == "large"
+    
+    def test_sheds_to_the_fastest_model(self, router):
+        router.register_route("multi_persona", ["large"], SLO_MS, shed_to=["small", "mini"])
+        slow(router, "large")
+        fast(router, "small", latency_ms=800)
+        fast(router, "mini", latency_ms=300)
+        
+        assert router.route("multi_persona").reason == "probe"
+        decision = router.route("multi_persona")
+        assert (decision.model, decision.reason) == ("mini", "shed")
+    
+    def test_falls_back_when_every_model_is_degraded(self, router):
+        router.register_route("multi_persona", ["large"], SLO_MS, shed_to=["small"])
+        slow(router, "large")
+        slow(router, "small")
+        
+        assert router.route("multi_persona").reason == "probe"
+        decision = router.route("multi_persona")
+        assert decision.use_fallback
+        assert decision.reason == "fallback"
+        assert router.snapshot()["routes"]["multi_persona"]["degraded"] == ["large"]
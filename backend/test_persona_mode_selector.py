@@ -0,0 +1,49 @@
+"""
+Test Persona Mode Selector
+Auto choice between fan-out and one combined multi-persona completion
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.services.persona_batching import MODE_AUTO, MODE_COMBINED, MODE_FANOUT, PersonaModeSelector
+
+
+class TestPersonaModeSelector:
+    """Combined only when the tokens it saves pay for its extra latency within the budget"""
+    
+    @pytest.fixture
+    def selector(self, monkeypatch):
+        # Priors: fan-out 4000 ms per call, combined 2500 ms per persona
+        monkeypatch.setattr(settings, "MULTI_PERSONA_MODE", MODE_AUTO)
+        monkeypatch.setattr(settings, "MULTI_PERSONA_MS_PER_1K_TOKENS", 2000.0)
+        monkeypatch.setattr(settings, "MULTI_PERSONA_LATENCY_BUDGET_MS", 12000.0)
+        return PersonaModeSelector()
+    
+    def test_single_persona_fans_out(self, selector):
+        assert selector.choose(1, 5000, 1000) == MODE_FANOUT
+        assert selector.choose(1, 5000, 1000, mode=MODE_COMBINED) == MODE_FANOUT
+    
+    def test_explicit_mode_wins(self, selector, monkeypatch):
+        assert selector.choose(3, 1000, 1000, mode=MODE_COMBINED) == MODE_COMBINED
+        
+        monkeypatch.setattr(settings, "MULTI_PERSONA_MODE", MODE_FANOUT)
+        assert selector.choose(3, 100000, 1000) == MODE_FANOUT
+    
+    def test_combined_when_savings_cover_the_extra_latency(self, selector):
+        # 3 personas: combined is 7500 ms against 4000 ms, so 3500 ms costs 1750 saved tokens
+        assert selector.choose(3, 3000, 1000) == MODE_COMBINED
+        assert selector.choose(3, 2500, 1000) == MODE_FANOUT
+        assert selector.decisions == {MODE_FANOUT: 1, MODE_COMBINED: 1}
+    
+    def test_fanout_when_combined_exceeds_the_budget(self, selector):
+        # 6 personas: combined is 15000 ms, over the 12000 ms budget whatever it saves
+        assert selector.choose(6, 100000, 1000) == MODE_FANOUT
+    
+    def test_observed_latency_replaces_the_priors(self, selector):
+        assert selector.choose(3, 3000, 1000) == MODE_COMBINED
+        
+        for _ in range(10):
+            selector.observe(MODE_COMBINED, 3, 15000)
+        assert selector.choose(3, 3000, 1000) == MODE_FANOUT
+        assert selector.stats()["observations"][MODE_COMBINED] == 10
@@ -0,0 +1,128 @@
+"""
+Test GCRA Rate Limiter
+Burst and refill behaviour, and limit state shared between workers through SQLite
+"""
+
+import sqlite3
+import time
+
+import pytest
+from limits import parse
+
+import app.core.rate_limit as rate_limit
+from app.core.rate_limit import GCRARateLimiter, SQLiteStorage, gcra_update
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def db_uri(tmp_path):
+    return f"sqlite:///{tmp_path}/ratelimit.db"
+
+
+class TestGCRAUpdate:
+    """The pure algorithm step"""
+    
+    def test_allows_burst_of_limit_then_denies(self):
+        tat, now = 0.0, 100.0
+        results = []
+        for _ in range(4):
+            allowed, tat = gcra_update(tat, now, period=60, limit=3)
+            results.append(allowed)
+        assert results == [True, True, True, False]
+    
+    def test_refills_one_slot_per_emission_interval(self):
+        tat, now = 0.0, 100.0
+        for _ in range(3):
+            _, tat = gcra_update(tat, now, period=60, limit=3)
+        
+        assert gcra_update(tat, now + 19.9, period=60, limit=3)[0] is False
+        assert gcra_update(tat, now + 20.0, period=60, limit=3)[0] is True
+    
+    def test_denied_step_keeps_tat(self):
+        allowed, tat = gcra_update(160.0, 100.0, period=60, limit=3)
+        assert allowed is False
+        assert tat == 160.0
+
+
+class TestGCRARateLimiter:
+    """The limits strategy on the shared SQLite storage"""
+    
+    def test_hit_enforces_limit(self, clock, db_uri):
+        limiter = GCRARateLimiter(SQLiteStorage(db_uri))
+        item = parse("3/minute")
+        
+        assert [limiter.hit(item, "user-1") for _ in range(4)] == [True, True, True, False]
+        assert limiter.hit(item, "user-2") is True
+        
+        clock.now += 20
+        assert limiter.hit(item, "user-1") is True
+        assert limiter.hit(item, "user-1") is False
+    
+    def test_test_and_window_stats_do_not_consume(self, clock, db_uri):
+        limiter = GCRARateLimiter(SQLiteStorage(db_uri))
+        item = parse("3/minute")
+        
+        limiter.hit(item, "user-1")
+        assert limiter.test(item, "user-1") is True
+        assert limiter.get_window_stats(item, "user-1").remaining == 2
+        
+        limiter.hit(item, "user-1")
+        limiter.hit(item, "user-1")
+        assert limiter.test(item, "user-1") is False
+        assert limiter.get_window_stats(item, "user-1").remaining == 0
+    
+    def test_workers_share_one_budget(self, clock, db_uri):
+        # Two storages on one file stand in for two uvicorn workers
+        worker_a = GCRARateLimiter(SQLiteStorage(db_uri))
+        worker_b = GCRARateLimiter(SQLiteStorage(db_uri))
+        item = parse("4/minute")
+        
+        results = [limiter.hit(item, "user-1") for limiter in (worker_a, worker_b) * 3]
+        assert results == [True, True, True, True, False, False]
+    
+    def test_falls_back_to_process_memory(self, clock, tmp_path):
+        blocker = tmp_path / "not-a-directory"
+        blocker.write_text("")
+        storage = SQLiteStorage(f"sqlite:///{blocker}/ratelimit.db")
+        assert storage.check() is False
+        
+        limiter = GCRARateLimiter(storage)
+        item = parse("2/minute")
+        assert [limiter.hit(item, "user-1") for _ in range(3)] == [True, True, False]
+        
+        storage.reset()
+        assert limiter.hit(item, "user-1") is True
+    
+    def test_locked_database_fails_open(self, db_uri):
+        storage = SQLiteStorage(db_uri)
+        limiter = GCRARateLimiter(storage)
+        item = parse("1/minute")
+        assert limiter.hit(item, "user-1") is True
+        
+        # Another worker holds the write lock
+        other = sqlite3.connect(storage.path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            started = time.perf_counter()
+            assert limiter.hit(item, "user-1") is True
+            assert time.perf_counter() - started < 1.0
+            assert storage.busy_allowed == 1
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+        
+        assert limiter.hit(item, "user-1") is False
@@ -0,0 +1,163 @@
+"""
+Test Request Deadlines
+Hedged completions, the deadline and replies delivered after it
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.journal import JournalEntryResponse
+from app.services import pulse_ai as pulse_ai_module
+from app.services.adaptive_ai_service import AdaptiveAIService
+from app.services.cost_optimization import CostOptimizationService
+from app.services.pulse_ai import PulseAI
+from app.services.request_deadline import CompletionHedger, DeadlineExceeded, deadline_after, request_deadline
+from app.services.response_cache_store import ResponseCacheStore
+from app.services.user_pattern_analyzer import UserPatternAnalyzer
+
+
+def make_hedger(p95_ms=None, budget=5.0):
+    hedger = CompletionHedger(min_delay_ms=0, min_samples=1)
+    if p95_ms is not None:
+        hedger.observe("test", p95_ms)
+    hedger._budget = budget
+    return hedger
+
+
+class SlowCalls:
+    """call() factory: each request sleeps for the next delay and records whether it was cancelled"""
+    
+    def __init__(self, *delays):
+        self.delays = list(delays)
+        self.started = 0
+        self.cancelled = 0
+    
+    async def __call__(self):
+        index = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delays[index])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"reply {index}"
+
+
+class TestCompletionHedger:
+    """Hedging after the p95 and the deadline"""
+    
+    def test_fast_reply_is_not_hedged(self):
+        hedger = make_hedger(p95_ms=50)
+        calls = SlowCalls(0.0)
+        
+        assert asyncio.run(hedger.run("test", calls)) == "reply 0"
+        assert calls.started == 1
+    
+    def test_slow_primary_is_hedged_and_loser_cancelled(self):
+        hedger = make_hedger(p95_ms=20)
+        calls = SlowCalls(1.0, 0.0)
+        
+        assert asyncio.run(hedger.run("test", calls)) == "reply 1"
+        assert calls.started == 2
+        assert calls.cancelled == 1
+        assert hedger.snapshot()["operations"]["test"]["hedge_won"] == 1
+    
+    def test_no_hedge_without_budget(self):
+        hedger = make_hedger(p95_ms=20, budget=0.0)
+        calls = SlowCalls(0.1)
+        
+        assert asyncio.run(hedger.run("test", calls)) == "reply 0"
+        assert calls.started == 1
+        assert hedger.snapshot()["operations"]["test"]["budget_exhausted"] == 1
+    
+    def test_deadline_cancels_pending_requests(self):
+        hedger = make_hedger()
+        calls = SlowCalls(1.0)
+        
+        async def run():
+            with request_deadline(deadline_after(30)):
+                await hedger.run("test", calls)
+        
+        with pytest.raises(DeadlineExceeded) as raised:
+            asyncio.run(run())
+        assert raised.value.late is None
+        assert calls.cancelled == 1
+    
+    def test_keep_late_hands_on_the_running_request(self):
+        hedger = make_hedger()
+        calls = SlowCalls(0.1)
+        
+        async def run():
+            with request_deadline(deadline_after(30), keep_late=True):
+                try:
+                    await hedger.run("test", calls)
+                except DeadlineExceeded as e:
+                    return await e.late
+        
+        assert asyncio.run(run()) == "reply 0"
+        assert calls.started == 1
+        assert calls.cancelled == 0
+        assert hedger.snapshot()["operations"]["test"]["kept_late"] == 1
+
+
+class GatedCompletions:
+    """chat.completions stand-in that answers once released"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.release = None
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.release is None:
+            self.release = asyncio.Event()
+        await self.release.wait()
+        message = SimpleNamespace(content="Sorting out the move one box at a time is real progress, keep going.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(total_tokens=90))
+
+
+class TestDeliverLater:
+    """A reply that misses the deadline is the same completion, delivered later"""
+    
+    @pytest.fixture
+    def services(self, tmp_path, monkeypatch):
+        optimizer = CostOptimizationService(ResponseCacheStore(str(tmp_path / "response_cache.db")))
+        monkeypatch.setattr(pulse_ai_module, "cost_optimizer", optimizer)
+        pulse = PulseAI()
+        pulse.backup_enabled = False
+        completions = GatedCompletions()
+        pulse.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return AdaptiveAIService(pulse, UserPatternAnalyzer()), completions
+    
+    def test_late_reply_reuses_the_original_completion(self, services):
+        adaptive_ai, completions = services
+        now = datetime.now(timezone.utc)
+        entry = JournalEntryResponse(
+            id="entry-late",
+            user_id="user-1",
+            content="Packed up the last boxes for the move and sorted out the new lease today",
+            mood_level=6,
+            energy_level=5,
+            stress_level=5,
+            created_at=now,
+            updated_at=now,
+        )
+        
+        async def run():
+            with request_deadline(deadline_after(50), keep_late=True):
+                fallback = await adaptive_ai.generate_adaptive_response(
+                    user_id=entry.user_id, journal_entry=entry, journal_history=[], persona="pulse"
+                )
+            late = adaptive_ai.take_late_response(entry.id)
+            completions.release.set()
+            return fallback, await late
+        
+        fallback, late_response = asyncio.run(run())
+        
+        assert fallback.metadata == {"deadline_exceeded": True}
+        assert late_response.insight.startswith("Sorting out the move")
+        assert completions.calls == 1
+        assert adaptive_ai.take_late_response(entry.id) is None
@@ -0,0 +1,128 @@
+"""
+Test Similarity Cache
+PulseAI reuses replies for near-duplicate entries and never for excluded ones
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.journal import JournalEntryResponse
+from app.services import pulse_ai as pulse_ai_module
+from app.services.cost_optimization import CostOptimizationService
+from app.services.pulse_ai import PulseAI
+from app.services.response_cache_store import ResponseCacheStore
+
+
+ENTRY = (
+    "Spent the whole afternoon reorganizing my desk and finally finished the "
+    "quarterly report that has been hanging over me for weeks"
+)
+NEAR_DUPLICATE = (
+    "Spent the whole afternoon reorganizing my desk and finally finished the "
+    "quarterly report that has been hanging over me for weeks now"
+)
+
+
+class FakeCompletions:
+    """chat.completions stand-in that counts requests"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=f"Finishing that report must feel like a weight lifted, reply {self.calls}.")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(total_tokens=120),
+        )
+
+
+def make_entry(content, mood_level=6, user_id="user-1"):
+    now = datetime.now(timezone.utc)
+    return JournalEntryResponse(
+        id="entry-1",
+        user_id=user_id,
+        content=content,
+        mood_level=mood_level,
+        energy_level=5,
+        stress_level=4,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class TestPulseSimilarityCache:
+    """Lookups run before the completion, stores after a successful one"""
+    
+    @pytest.fixture
+    def optimizer(self, tmp_path, monkeypatch):
+        # Never started: an in-memory store with its own index
+        optimizer = CostOptimizationService(ResponseCacheStore(str(tmp_path / "response_cache.db")))
+        monkeypatch.setattr(pulse_ai_module, "cost_optimizer", optimizer)
+        return optimizer
+    
+    @pytest.fixture
+    def pulse(self, optimizer):
+        pulse = PulseAI()
+        pulse.backup_enabled = False
+        completions = FakeCompletions()
+        pulse.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return pulse, completions
+    
+    def test_near_duplicate_entry_reuses_reply(self, pulse, optimizer):
+        pulse, completions = pulse
+        
+        first = asyncio.run(pulse.generate_pulse_response_async(make_entry(ENTRY)))
+        second = asyncio.run(pulse.generate_pulse_response_async(make_entry(NEAR_DUPLICATE)))
+        
+        assert completions.calls == 1
+        assert second.message == first.message
+        assert optimizer.daily_metrics.similarity_hits == 1
+        assert optimizer.daily_metrics.similarity_tokens_saved == 120
+    
+    def test_other_user_does_not_reuse_reply(self, pulse):
+        pulse, completions = pulse
+        
+        asyncio.run(pulse.generate_pulse_response_async(make_entry(ENTRY)))
+        asyncio.run(pulse.generate_pulse_response_async(make_entry(NEAR_DUPLICATE, user_id="user-2")))
+        
+        assert completions.calls == 2
+    
+    @pytest.mark.parametrize("content,mood_level", [
+        (ENTRY + " and I keep thinking I want to die", 6),  # Crisis language
+        (ENTRY, 2),  # Very low mood
+    ], ids=["crisis_language", "low_mood"])
+    def test_excluded_entry_always_misses(self, pulse, optimizer, content, mood_level):
+        pulse, completions = pulse
+        
+        asyncio.run(pulse.generate_pulse_response_async(make_entry(content, mood_level=mood_level)))
+        asyncio.run(pulse.generate_pulse_response_async(make_entry(content, mood_level=mood_level)))
+        
+        assert completions.calls == 2
+        assert optimizer.response_cache.l1_entries() == []
+        assert optimizer.daily_metrics.similarity_excluded == 2
+    
+    def test_test_account_bypasses_cache(self, pulse):
+        pulse, completions = pulse
+        
+        entry = make_entry(ENTRY, user_id=pulse.test_user_id)
+        asyncio.run(pulse.generate_pulse_response_async(entry))
+        asyncio.run(pulse.generate_pulse_response_async(entry))
+        
+        assert completions.calls == 2
+
+
+class TestResponseCacheListener:
+    """One near-duplicate index mirrors a store"""
+    
+    def test_second_service_cannot_take_over_the_store(self, tmp_path):
+        store = ResponseCacheStore(str(tmp_path / "response_cache.db"))
+        optimizer = CostOptimizationService(store)
+        
+        with pytest.raises(RuntimeError):
+            CostOptimizationService(store)
+        assert store.on_evict == optimizer.similarity_index.remove
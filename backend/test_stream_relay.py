@@ -0,0 +1,197 @@
+"""
+Test Resumable AI Streams
+Relay replay/resume semantics, and SSE frames read through the app's full middleware stack
+"""
+
+import asyncio
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.stream_relay import StreamRelay
+from app.services.streaming_ai_service import StreamingChunk
+
+
+async def chunk_source(count: int, gate: asyncio.Event = None, content: str = "word"):
+    """count content chunks then a final one; waits on gate (if given) before the final chunk"""
+    for i in range(count):
+        yield StreamingChunk(persona="pulse", delta_content=f"{content}-{i}")
+    if gate is not None:
+        await gate.wait()
+    yield StreamingChunk(persona="pulse", is_complete=True, chunk_type="complete")
+
+
+async def collect(stream, last_event_id: int = 0):
+    return [event async for event in stream.follow(last_event_id, heartbeat_seconds=5) if event is not None]
+
+
+class TestStreamRelay:
+    """Replay, resume and join semantics of the relay"""
+    
+    def test_follow_replays_everything_from_the_start(self):
+        async def scenario():
+            relay = StreamRelay()
+            stream = relay.start("k", chunk_source(3))
+            events = await collect(stream)
+            return [event.id for event in events], events[-1].data
+        
+        ids, last = asyncio.run(scenario())
+        assert ids == [1, 2, 3, 4]
+        assert b'"is_final":true' in last
+    
+    def test_resume_sends_only_missed_events(self):
+        async def scenario():
+            relay = StreamRelay()
+            stream = relay.start("k", chunk_source(3))
+            await collect(stream)
+            resumed = relay.find("k", resume=True)
+            return resumed is stream, [event.id for event in await collect(resumed, last_event_id=2)]
+        
+        same, ids = asyncio.run(scenario())
+        assert same
+        assert ids == [3, 4]
+    
+    def test_second_request_joins_running_stream(self):
+        async def scenario():
+            relay = StreamRelay()
+            gate = asyncio.Event()
+            stream = relay.start("k", chunk_source(2, gate))
+            await asyncio.sleep(0)
+            joined = relay.find("k")
+            first, second = collect(stream), collect(joined)
+            gate.set()
+            return joined is stream, await asyncio.gather(first, second)
+        
+        same, (first, second) = asyncio.run(scenario())
+        assert same
+        assert [event.id for event in first] == [event.id for event in second] == [1, 2, 3]
+    
+    def test_finished_stream_is_only_found_when_resuming(self, monkeypatch):
+        async def scenario():
+            relay = StreamRelay()
+            stream = relay.start("k", chunk_source(1))
+            await collect(stream)
+            found = relay.find("k"), relay.find("k", resume=True)
+            # Past the resume TTL the buffer is gone
+            monkeypatch.setattr(stream, "finished_at", stream.finished_at - 10_000)
+            return found, relay.find("k", resume=True)
+        
+        (fresh, resumed), expired = asyncio.run(scenario())
+        assert fresh is None
+        assert resumed is not None
+        assert expired is None
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def select(self, *args, **kwargs):
+        return self
+    
+    def eq(self, *args):
+        return self
+    
+    def limit(self, *args):
+        return self
+    
+    def execute(self):
+        return type("Result", (), {"data": self.rows})()
+
+
+class FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def get_client(self):
+        return type("Client", (), {"table": lambda _, name: FakeQuery(self.rows)})()
+
+
+class FakeStreamingAI:
+    """Large frames (well above GZip's minimum_size) so a compressor would hold them back"""
+    
+    def stream_frames(self, journal_entry, persona):
+        return chunk_source(3, content="x" * 2000)
+
+
+@pytest.fixture
+def sse_app(monkeypatch):
+    import main
+    from app.core import security
+    from app.core.database import get_database
+    from app.routers.journal import get_streaming_ai_service
+    
+    if not any(getattr(route, "path", "").endswith("/stream/sse") for route in main.app.routes):
+        main.register_routers()
+    
+    async def verify_token(token):
+        return {"id": "sse-user"}
+    
+    now = datetime.now(timezone.utc).isoformat()
+    entry = {"id": "entry-1", "user_id": "sse-user", "content": "A long and busy day", "mood_level": 5,
+             "energy_level": 5, "stress_level": 5, "created_at": now, "updated_at": now}
+    monkeypatch.setattr(security, "verify_token", verify_token)
+    main.app.dependency_overrides[get_database] = lambda: FakeDatabase([entry])
+    main.app.dependency_overrides[get_streaming_ai_service] = lambda: FakeStreamingAI()
+    yield main.app
+    main.app.dependency_overrides.clear()
+
+
+class TestSSEThroughMiddleware:
+    """The SSE endpoint behind main.app's middleware stack (GZip included)"""
+    
+    def test_frames_arrive_uncompressed_one_message_each(self, sse_app):
+        async def scenario():
+            messages = []
+            request = {"type": "http.request", "body": b"", "more_body": False}
+            
+            async def receive():
+                nonlocal request
+                if request is None:
+                    await asyncio.Event().wait()
+                message, request = request, None
+                return message
+            
+            async def send(message):
+                messages.append(message)
+            
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                "scheme": "http", "server": ("testserver", 80), "client": ("127.0.0.1", 1234), "root_path": "",
+                "path": "/api/v1/journal/entries/entry-1/stream/sse", "raw_path": b"/api/v1/journal/entries/entry-1/stream/sse",
+                "query_string": b"token=test", "headers": [(b"host", b"testserver"), (b"accept-encoding", b"gzip")],
+            }
+            await sse_app(scope, receive, send)
+            return messages
+        
+        messages = asyncio.run(scenario())
+        start = messages[0]
+        headers = {key.decode().lower(): value.decode() for key, value in start["headers"]}
+        assert start["status"] == 200
+        assert headers["content-type"].startswith("text/event-stream")
+        assert "content-encoding" not in headers
+        
+        # Every frame is its own plain-text body message, so it reaches the client when written
+        bodies = [message.get("body", b"") for message in messages[1:] if message.get("body")]
+        assert bodies[0].startswith(b"retry: ")
+        frames = [body for body in bodies if body.startswith(b"id: ")]
+        assert [frame.split(b"\n", 1)[0] for frame in frames] == [b"id: 1", b"id: 2", b"id: 3", b"id: 4"]
+        assert all(frame.endswith(b"\n\n") for frame in frames)
+        assert b'"is_final":true' in frames[-1]
+    
+    def test_regular_responses_are_still_gzipped(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.middleware.compression import SSEAwareGZipMiddleware
+        
+        app = FastAPI()
+        
+        @app.get("/big")
+        def big():
+            return {"payload": "y" * 5000}
+        
+        app.add_middleware(SSEAwareGZipMiddleware, minimum_size=1000)
+        response = TestClient(app).get("/big", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["payload"] == "y" * 5000
@@ -0,0 +1,214 @@
+"""
+Test Journal Sync Cursor
+Delta pages over an in-memory PostgREST stand-in, including rows that commit late
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.journal_sync_service import (
+    InvalidSyncCursor,
+    JournalSyncService,
+    MAX_SYNC_LIMIT,
+    SYNC_OVERLAP_SECONDS,
+    decode_sync_cursor,
+    encode_sync_cursor,
+)
+
+USER_ID = "user-1"
+BASE = datetime(2025, 7, 5, 12, 0, tzinfo=timezone.utc)
+
+
+def ts(seconds: float) -> str:
+    return (BASE + timedelta(seconds=seconds)).isoformat()
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """The subset of the supabase query builder the sync service uses"""
+    
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.orders = []
+        self.max_rows = None
+    
+    def select(self, *_):
+        return self
+    
+    def eq(self, column, value):
+        self.rows = [row for row in self.rows if row[column] == value]
+        return self
+    
+    def gte(self, column, value):
+        bound = datetime.fromisoformat(value)
+        self.rows = [row for row in self.rows if datetime.fromisoformat(row[column]) >= bound]
+        return self
+    
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+    
+    def limit(self, count):
+        self.max_rows = count
+        return self
+    
+    def execute(self):
+        rows = self.rows
+        for column, desc in reversed(self.orders):
+            key = (lambda row: datetime.fromisoformat(row[column])) if column.endswith("_at") else (lambda row: row[column])
+            rows = sorted(rows, key=key, reverse=desc)
+        return FakeResult(rows[:self.max_rows])
+
+
+class FakeClient:
+    def __init__(self):
+        self.tables = {}
+    
+    def table(self, name):
+        return FakeQuery(self.tables.get(name, []))
+    
+    def put(self, table, row_id, updated_at, **fields):
+        rows = self.tables.setdefault(table, [])
+        rows[:] = [row for row in rows if row["id"] != row_id]
+        rows.append({"id": row_id, "user_id": USER_ID, "updated_at": updated_at, **fields})
+    
+    def tombstone(self, tombstone_id, row_id, deleted_at):
+        self.tables.setdefault("sync_tombstones", []).append({
+            "id": tombstone_id,
+            "table_name": "journal_entries",
+            "row_id": row_id,
+            "user_id": USER_ID,
+            "journal_entry_id": row_id,
+            "deleted_at": deleted_at,
+        })
+
+
+def sync(service, cursor=None, limit=200):
+    return asyncio.run(service.get_changes(USER_ID, cursor, limit))
+
+
+def ids(page, table="journal_entries"):
+    return [row["id"] for row in page[table]]
+
+
+class TestSyncCursor:
+    """Nothing is skipped or repeated across incremental syncs"""
+    
+    @pytest.fixture
+    def client(self):
+        return FakeClient()
+    
+    @pytest.fixture
+    def service(self, client):
+        return JournalSyncService(client)
+    
+    def test_full_then_incremental(self, client, service):
+        client.put("journal_entries", "a", ts(0))
+        client.put("journal_entries", "b", ts(1))
+        first = sync(service)
+        assert ids(first) == ["a", "b"]
+        
+        client.put("journal_entries", "c", ts(2))
+        second = sync(service, first["cursor"])
+        assert ids(second) == ["c"]
+        assert ids(sync(service, second["cursor"])) == []
+    
+    def test_late_commit_below_watermark_is_delivered_once(self, client, service):
+        client.put("journal_entries", "a", ts(10))
+        first = sync(service)
+        
+        # Stamped before "a" but committed after the client synced
+        client.put("journal_entries", "late", ts(10 - SYNC_OVERLAP_SECONDS / 2))
+        second = sync(service, first["cursor"])
+        assert ids(second) == ["late"]
+        assert ids(sync(service, second["cursor"])) == []
+    
+    def test_update_of_a_synced_row_is_delivered_again(self, client, service):
+        client.put("journal_entries", "a", ts(0), content="v1")
+        first = sync(service)
+        
+        client.put("journal_entries", "a", ts(1), content="v2")
+        second = sync(service, first["cursor"])
+        assert [row["content"] for row in second["journal_entries"]] == ["v2"]
+    
+    def test_pages_through_ties_without_repeats(self, client, service):
+        for row_id in "abcde":
+            client.put("journal_entries", row_id, ts(0))
+        
+        seen, cursor = [], None
+        for _ in range(5):
+            page = sync(service, cursor, limit=2)
+            seen += ids(page)
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                break
+        assert seen == ["a", "b", "c", "d", "e"]
+    
+    def test_window_forgets_rows_older_than_the_overlap(self, client, service):
+        client.put("journal_entries", "old", ts(0))
+        client.put("journal_entries", "new", ts(SYNC_OVERLAP_SECONDS * 2))
+        page = sync(service)
+        
+        watermarks, _ = decode_sync_cursor(page["cursor"], USER_ID)
+        assert watermarks["journal_entries"] == (ts(SYNC_OVERLAP_SECONDS * 2), [("new", ts(SYNC_OVERLAP_SECONDS * 2))], None)
+    
+    def test_burst_moves_the_floor_up_instead_of_growing_the_cursor(self, client, service):
+        burst = MAX_SYNC_LIMIT + 50
+        for index in range(burst):
+            client.put("journal_entries", f"row-{index:04d}", ts(index / burst))
+        
+        seen, cursor = [], None
+        while True:
+            page = sync(service, cursor, limit=MAX_SYNC_LIMIT)
+            seen += ids(page)
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                break
+        assert len(seen) == len(set(seen)) == burst
+        
+        watermarks, _ = decode_sync_cursor(cursor, USER_ID)
+        high, window, pinned = watermarks["journal_entries"]
+        assert pinned == high == ts((burst - 1) / burst)
+        assert window == [(f"row-{burst - 1:04d}", high)]
+        
+        client.put("journal_entries", "after", ts(1))
+        assert ids(sync(service, cursor)) == ["after"]
+        
+        # The pinned floor lapses once the overlap window has moved past it
+        client.put("journal_entries", "later", ts(SYNC_OVERLAP_SECONDS * 2))
+        later = sync(service, sync(service, cursor)["cursor"])
+        client.put("journal_entries", "late", ts(SYNC_OVERLAP_SECONDS * 2 - 1))
+        assert ids(sync(service, later["cursor"])) == ["late"]
+    
+    def test_tombstones_start_at_head_and_pick_up_late_deletes(self, client, service):
+        client.tombstone(1, "gone-before", ts(0))
+        first = sync(service)
+        assert first["deleted"] == []
+        
+        client.tombstone(3, "gone", ts(5))
+        client.tombstone(2, "gone-late", ts(3))  # Lower id and timestamp, committed last
+        second = sync(service, first["cursor"])
+        assert [row["id"] for row in second["deleted"]] == ["gone-late", "gone"]
+        assert sync(service, second["cursor"])["deleted"] == []
+
+
+class TestCursorEncoding:
+    def test_round_trip(self):
+        watermarks = {"ai_insights": (ts(0), [("x", ts(0))], None), "journal_entries": (ts(2), [], ts(2))}
+        cursor = encode_sync_cursor(USER_ID, watermarks, (ts(1), [("7", ts(1))], None))
+        assert decode_sync_cursor(cursor, USER_ID) == (watermarks, (ts(1), [("7", ts(1))], None))
+    
+    def test_rejects_other_user(self):
+        cursor = encode_sync_cursor(USER_ID, {}, None)
+        with pytest.raises(InvalidSyncCursor):
+            decode_sync_cursor(cursor, "user-2")
+    
+    def test_rejects_garbage(self):
+        with pytest.raises(InvalidSyncCursor):
+            decode_sync_cursor("not-a-cursor", USER_ID)
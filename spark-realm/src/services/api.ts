@@ -584,6 +584,28 @@ class ApiService {
     return ws;
   }
 
+  // Server-Sent Events streaming (same frames as the WebSocket; EventSource resumes with Last-Event-ID)
+  connectToAIStreamSSE(entryId: string, persona: string = "auto", token: string): EventSource {
+    const sseUrl = `${this.baseURL}/api/v1/journal/entries/${entryId}/stream/sse?persona=${persona}&token=${token}`;
+    console.log('Connecting to AI SSE stream:', sseUrl);
+    
+    const source = new EventSource(sseUrl);
+
+    source.addEventListener('message', (event) => {
+      // Stop EventSource reconnecting once the response has finished
+      const frame = JSON.parse((event as MessageEvent).data);
+      if (['complete', 'error', 'cancelled'].includes(frame.type)) {
+        source.close();
+      }
+    });
+    
+    source.onerror = (error) => {
+      console.error('AI SSE stream error (will resume):', error);
+    };
+    
+    return source;
+  }
+
   // Enhanced error handling utility with AI debugging
   handleError(error: any, context?: Record<string, any>): string {
     // Import error handler dynamically to avoid circular dependencies
@@ -0,0 +1,132 @@
+-- Delta sync support for GET /api/v1/journal/sync
+-- Every synced table gets a maintained updated_at plus a (user_id, updated_at) index,
+-- and hard deletes leave a tombstone so clients can drop rows they already hold.
+--
+-- updated_at / deleted_at come from clock_timestamp() on the database for inserts and
+-- updates alike (app-supplied values are overwritten). A row can still commit after a
+-- later-stamped row is visible, so the sync service re-reads an overlap window below
+-- each cursor and skips the rows it already delivered.
+
+-- 1. UPDATED_AT ON EVERY SYNCED TABLE
+ALTER TABLE journal_entries ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE ai_insights ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE ai_user_replies ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+-- Backfill rows written before the column existed
+UPDATE journal_entries SET updated_at = created_at WHERE updated_at IS NULL;
+UPDATE ai_insights SET updated_at = created_at WHERE updated_at IS NULL;
+UPDATE ai_user_replies SET updated_at = created_at WHERE updated_at IS NULL;
+UPDATE ai_reactions SET updated_at = created_at WHERE updated_at IS NULL;
+
+-- Replaces the trigger function from 20250703000001_create_ai_reactions_table.sql.
+-- clock_timestamp() rather than NOW(): NOW() is the transaction start, which lags
+-- further behind the commit for long transactions
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_journal_entries_updated_at ON journal_entries;
+CREATE TRIGGER update_journal_entries_updated_at
+BEFORE INSERT OR UPDATE ON journal_entries
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_ai_insights_updated_at ON ai_insights;
+CREATE TRIGGER update_ai_insights_updated_at
+BEFORE INSERT OR UPDATE ON ai_insights
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_ai_user_replies_updated_at ON ai_user_replies;
+CREATE TRIGGER update_ai_user_replies_updated_at
+BEFORE INSERT OR UPDATE ON ai_user_replies
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_ai_reactions_updated_at ON ai_reactions;
+CREATE TRIGGER update_ai_reactions_updated_at
+BEFORE INSERT OR UPDATE ON ai_reactions
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at_column();
+
+-- Sync scans: WHERE user_id = ? AND updated_at >= ? ORDER BY updated_at, id
+CREATE INDEX IF NOT EXISTS idx_journal_entries_user_updated ON journal_entries(user_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_ai_insights_user_updated ON ai_insights(user_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_ai_user_replies_user_updated ON ai_user_replies(user_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_ai_reactions_user_updated ON ai_reactions(user_id, updated_at, id);
+
+-- 2. TOMBSTONES
+-- (deleted_at, id) is the sync cursor for deletions, read with the same overlap window
+-- as updated_at (sequence ids are not commit-ordered either); rows older than any live
+-- cursor can be pruned
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    id BIGSERIAL PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    row_id UUID NOT NULL,
+    user_id TEXT NOT NULL,
+    journal_entry_id UUID,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT clock_timestamp()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_user_deleted ON sync_tombstones(user_id, deleted_at, id);
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_deleted_at ON sync_tombstones(deleted_at);
+
+ALTER TABLE sync_tombstones ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "sync_tombstones_select_policy" ON sync_tombstones;
+CREATE POLICY "sync_tombstones_select_policy"
+ON sync_tombstones FOR SELECT
+USING (auth.uid()::text = user_id);
+
+GRANT SELECT ON sync_tombstones TO authenticated;
+GRANT ALL ON sync_tombstones TO service_role;
+GRANT USAGE, SELECT ON SEQUENCE sync_tombstones_id_seq TO service_role;
+
+-- SECURITY DEFINER so deletes made under RLS (and ON DELETE CASCADE) are always recorded
+CREATE OR REPLACE FUNCTION record_sync_tombstone()
+RETURNS TRIGGER
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    INSERT INTO sync_tombstones (table_name, row_id, user_id, journal_entry_id, deleted_at)
+    VALUES (
+        TG_TABLE_NAME,
+        OLD.id,
+        OLD.user_id::text,
+        CASE WHEN TG_TABLE_NAME = 'journal_entries' THEN OLD.id ELSE OLD.journal_entry_id END,
+        clock_timestamp()
+    );
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS journal_entries_sync_tombstone ON journal_entries;
+CREATE TRIGGER journal_entries_sync_tombstone
+AFTER DELETE ON journal_entries
+FOR EACH ROW
+EXECUTE FUNCTION record_sync_tombstone();
+
+DROP TRIGGER IF EXISTS ai_insights_sync_tombstone ON ai_insights;
+CREATE TRIGGER ai_insights_sync_tombstone
+AFTER DELETE ON ai_insights
+FOR EACH ROW
+EXECUTE FUNCTION record_sync_tombstone();
+
+DROP TRIGGER IF EXISTS ai_reactions_sync_tombstone ON ai_reactions;
+CREATE TRIGGER ai_reactions_sync_tombstone
+AFTER DELETE ON ai_reactions
+FOR EACH ROW
+EXECUTE FUNCTION record_sync_tombstone();
+
+DROP TRIGGER IF EXISTS ai_user_replies_sync_tombstone ON ai_user_replies;
+CREATE TRIGGER ai_user_replies_sync_tombstone
+AFTER DELETE ON ai_user_replies
+FOR EACH ROW
+EXECUTE FUNCTION record_sync_tombstone();
+
+COMMENT ON TABLE sync_tombstones IS 'Deleted row ids per user for the /journal/sync delta endpoint';
@@ -0,0 +1,94 @@
+-- Single round-trip entry pages for GET /journal/entries and /journal/all-entries-with-ai-insights
+-- Fallback for JournalEntryRepository when PostgREST resource embedding is unavailable:
+-- returns {"total": n, "entries": [entry + ai_insights (+ ai_reactions, reply_count)]}
+
+-- Ordered insight lookups per entry (the single-column journal_entry_id index needs a sort)
+CREATE INDEX IF NOT EXISTS idx_ai_insights_journal_entry_created ON ai_insights(journal_entry_id, created_at);
+
+-- SECURITY INVOKER (default): RLS still applies for JWT clients, service role sees every row
+CREATE OR REPLACE FUNCTION get_journal_entries_with_embeds(
+    p_user_id TEXT,
+    p_limit INTEGER DEFAULT 10,
+    p_offset INTEGER DEFAULT 0,
+    p_include_reactions BOOLEAN DEFAULT FALSE,
+    p_include_reply_counts BOOLEAN DEFAULT FALSE,
+    p_insights_desc BOOLEAN DEFAULT FALSE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+    SELECT jsonb_build_object(
+        'total', (SELECT COUNT(*) FROM journal_entries WHERE user_id = p_user_id),
+        'entries', COALESCE((
+            SELECT jsonb_agg(page.entry ORDER BY page.created_at DESC)
+            FROM (
+                SELECT
+                    je.created_at,
+                    -- ENTRY_COLUMNS (app/core/projections.py), so the payload matches the query strategy
+                    jsonb_build_object(
+                        'id', je.id,
+                        'user_id', je.user_id,
+                        'content', je.content,
+                        'mood_level', je.mood_level,
+                        'energy_level', je.energy_level,
+                        'stress_level', je.stress_level,
+                        'sleep_hours', je.sleep_hours,
+                        'work_hours', je.work_hours,
+                        'tags', je.tags,
+                        'work_challenges', je.work_challenges,
+                        'gratitude_items', je.gratitude_items,
+                        'created_at', je.created_at,
+                        'updated_at', je.updated_at
+                    )
+                    || jsonb_build_object(
+                        'ai_insights', COALESCE((
+                            SELECT jsonb_agg(
+                                jsonb_build_object(
+                                    'id', ai.id,
+                                    'journal_entry_id', ai.journal_entry_id,
+                                    'ai_response', ai.ai_response,
+                                    'persona_used', ai.persona_used,
+                                    'topic_flags', ai.topic_flags,
+                                    'confidence_score', ai.confidence_score,
+                                    'created_at', ai.created_at
+                                )
+                                ORDER BY
+                                    CASE WHEN p_insights_desc THEN ai.created_at END DESC,
+                                    CASE WHEN NOT p_insights_desc THEN ai.created_at END ASC
+                            )
+                            FROM ai_insights ai
+                            WHERE ai.journal_entry_id = je.id AND ai.user_id = p_user_id
+                        ), '[]'::jsonb)
+                    )
+                    || CASE WHEN p_include_reactions THEN jsonb_build_object(
+                        'ai_reactions', COALESCE((
+                            SELECT jsonb_agg(jsonb_build_object(
+                                'id', r.id,
+                                'ai_insight_id', r.ai_insight_id,
+                                'user_id', r.user_id,
+                                'reaction_type', r.reaction_type,
+                                'reaction_by', r.reaction_by,
+                                'created_at', r.created_at
+                            ))
+                            FROM ai_reactions r
+                            WHERE r.journal_entry_id = je.id
+                        ), '[]'::jsonb)
+                    ) ELSE '{}'::jsonb END
+                    || CASE WHEN p_include_reply_counts THEN jsonb_build_object(
+                        'reply_count', (SELECT COUNT(*) FROM ai_user_replies rep WHERE rep.journal_entry_id = je.id)
+                    ) ELSE '{}'::jsonb END AS entry
+                FROM journal_entries je
+                WHERE je.user_id = p_user_id
+                ORDER BY je.created_at DESC
+                LIMIT p_limit OFFSET p_offset
+            ) page
+        ), '[]'::jsonb)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION get_journal_entries_with_embeds(TEXT, INTEGER, INTEGER, BOOLEAN, BOOLEAN, BOOLEAN) TO authenticated;
+GRANT EXECUTE ON FUNCTION get_journal_entries_with_embeds(TEXT, INTEGER, INTEGER, BOOLEAN, BOOLEAN, BOOLEAN) TO service_role;
+
+COMMENT ON FUNCTION get_journal_entries_with_embeds IS 'Entry page with embedded AI insights, reactions and reply counts (JournalEntryRepository RPC fallback)';
@@ -0,0 +1,55 @@
+-- Rolling journal summaries for the beta context builder
+-- JournalSummaryStore compresses each finished week of entries into one row off the request path;
+-- ContextBuilderService packs the newest rows into the tier's prompt token budget
+
+CREATE TABLE IF NOT EXISTS journal_summaries (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id TEXT NOT NULL,
+    summary_type VARCHAR(20) NOT NULL DEFAULT 'weekly' CHECK (summary_type IN ('weekly', 'monthly')),
+    period_start DATE NOT NULL,
+    period_end DATE NOT NULL,
+    mood_trend NUMERIC(4, 1),
+    energy_trend NUMERIC(4, 1),
+    stress_trend NUMERIC(4, 1),
+    key_insights TEXT NOT NULL DEFAULT '',
+    top_themes TEXT[] NOT NULL DEFAULT '{}',
+    entry_count INTEGER NOT NULL DEFAULT 0,
+    token_count INTEGER NOT NULL DEFAULT 0,
+    last_entry_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    -- One summary per user, type and period (the store upserts on this)
+    CONSTRAINT unique_journal_summary_period UNIQUE (user_id, summary_type, period_start)
+);
+
+-- Newest summaries first for a user
+CREATE INDEX IF NOT EXISTS journal_summaries_user_period_idx ON journal_summaries(user_id, summary_type, period_start DESC);
+
+-- Enable RLS
+ALTER TABLE journal_summaries ENABLE ROW LEVEL SECURITY;
+
+-- RLS Policy: Users can read their own summaries
+CREATE POLICY "Users can view their own journal summaries"
+ON journal_summaries
+FOR SELECT USING (auth.uid()::text = user_id);
+
+-- RLS Policy: Summaries are written by the backend only
+CREATE POLICY "Service role full access for journal summaries"
+ON journal_summaries
+FOR ALL TO service_role USING (true);
+
+-- Grant permissions
+GRANT SELECT ON journal_summaries TO authenticated;
+GRANT ALL ON journal_summaries TO service_role;
+
+-- Trigger to automatically update updated_at
+CREATE TRIGGER update_journal_summaries_updated_at
+BEFORE UPDATE ON journal_summaries
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at_column();
+
+-- Optional per-tier prompt budget; NULL falls back to AI_CONTEXT_TOKEN_BUDGET(_PREMIUM)
+ALTER TABLE IF EXISTS user_tier_limits ADD COLUMN IF NOT EXISTS context_token_budget INTEGER;
+
+COMMENT ON TABLE journal_summaries IS 'Weekly compressions of older journal entries used as AI context (JournalSummaryStore)';